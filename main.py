@@ -2,17 +2,26 @@
 import pygame
 import sys
 import time
-import psutil
 import os
-from typing import Dict, List, Tuple
+from array import array
+from typing import Dict, List, Optional, Tuple
 from src.characters.player import Player
 from src.levels.level_manager import LevelManager
 from src.ui.game_ui import GameUI
 from src.equipment.equipment_manager import EquipmentManager
 from src.equipment.potion import PotionDropManager
+from src.projectiles.projectile_pool import ProjectilePool
 from src.projectiles.fireball import FireballManager
 from src.projectiles.iceball import IceballManager
 from src.audio.sound_manager import SoundManager
+from src.replay.replay_recorder import ReplayRecorder, ReplayPlayer
+from src.performance.frame_profiler import FRAME_PROFILER
+from src.performance.frame_jobs import FRAME_JOBS
+from src.performance.memory_profiler import RssSampler, AllocationTracker
+from src.ui.text_cache import DEFAULT_FONT, TEXT_CACHE
+from src.assets.asset_manager import ASSET_MANAGER
+from src.effects.particle_system import PARTICLE_BUDGET
+from src.ui.dirty_rect_renderer import DirtyRectRenderer
 
 ######################遊戲設定常數######################
 # 畫面設定
@@ -20,6 +29,21 @@ SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 800
 FPS = 60
 
+# 固定時間步進設定（模擬頻率與繪製頻率分開）
+SIMULATION_RATE = 60  # 每秒模擬步數（固定），物理和計時器的數值都以「每幀」為單位
+RENDER_RATE = 60  # 預設每秒繪製次數上限（垂直同步時改用螢幕更新率），0 表示不限制
+MAX_CATCH_UP_STEPS = 5  # 一個繪製幀內最多補跑幾次模擬，避免越補越慢
+MAX_FRAME_TIME = 0.25  # 單幀時間上限（秒），超過就當成卡頓直接截斷
+BUSY_WAIT_MARGIN = 0.002  # 精準等待時最後 2 毫秒改用忙碌迴圈
+INTERPOLATION_SNAP_DISTANCE = 100  # 兩步之間位移超過這個距離視為瞬移，不做插值
+
+# 效能分析設定
+PROFILE_TRACE_PATH = "profile_trace.json"  # F11 匯出的 Chrome trace 檔名
+OVERLAY_FONT_SIZE = 20  # 效能資訊的字型大小（系統預設字體）
+PROFILING_KEYS = (pygame.K_F9, pygame.K_F11, pygame.K_F12)  # 只影響效能工具的按鍵，不錄進重播
+FPS_HISTORY = 180  # FPS 歷史保留幀數（3 秒）
+FPS_WARNING_WINDOW = 60  # 低 FPS 警告看最近幾幀的平均
+
 # 遊戲顏色
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -38,20 +62,27 @@ class GamePerformanceMonitor:
     遊戲內建效能監控器\n
     \n
     監控 FPS 和記憶體使用，幫助發現效能問題\n
-    按 F12 開啟/關閉效能顯示\n
+    按 F12 開啟/關閉效能顯示，F9 開啟/關閉 tracemalloc 配置分析\n
+    \n
+    FPS 存在固定大小的環形陣列，RSS 由背景執行緒取樣，主迴圈不會做系統呼叫\n
     """
     
     def __init__(self):
         """初始化效能監控器"""
-        self.fps_history = []  # FPS 歷史記錄
-        self.memory_history = []  # 記憶體使用歷史
+        self.fps_history = array("d", [0.0]) * FPS_HISTORY  # FPS 歷史記錄（環形陣列）
+        self.fps_count = 0  # 累計記錄的幀數
+        self.fps_window_sum = 0.0  # 最近 FPS_WARNING_WINDOW 幀的 FPS 總和
+        self.fps_history_sum = 0.0  # 環形陣列內所有 FPS 的總和
         self.show_performance = False  # 是否顯示效能資訊
         
         # pygame 時鐘物件
         self.clock = pygame.time.Clock()
         
-        # 系統程序資訊
-        self.process = psutil.Process(os.getpid())
+        # 記憶體使用由背景執行緒取樣（互動遊戲或打開效能顯示時才啟動，無視窗模擬不會多一條執行緒）
+        self.rss_sampler = RssSampler()
+
+        # tracemalloc 配置分析（預設關閉）
+        self.allocation_tracker = AllocationTracker()
         
         # 效能警告
         self.low_fps_warning = False
@@ -61,65 +92,141 @@ class GamePerformanceMonitor:
         """
         更新效能資料\n
         \n
-        每幀呼叫一次，收集當前的 FPS 和記憶體資料\n
+        每幀呼叫一次，收集當前的 FPS，並讀取背景執行緒最新的記憶體樣本\n
         """
-        # 記錄當前 FPS
+        # 記錄當前 FPS（覆蓋最舊的一筆，同時維護區間總和，不需要每幀重算）
         current_fps = self.clock.get_fps()
-        self.fps_history.append(current_fps)
-        
-        # 記錄記憶體使用量（MB）
-        memory_usage = self.process.memory_info().rss / 1024 / 1024
-        self.memory_history.append(memory_usage)
-        
-        # 只保留最近 180 幀的資料（3 秒的歷史）
-        if len(self.fps_history) > 180:
-            self.fps_history.pop(0)
-            self.memory_history.pop(0)
+        slot = self.fps_count % FPS_HISTORY
+        self.fps_history_sum += current_fps - self.fps_history[slot]
+        self.fps_window_sum += current_fps
+        if self.fps_count >= FPS_WARNING_WINDOW:
+            self.fps_window_sum -= self.fps_history[
+                (self.fps_count - FPS_WARNING_WINDOW) % FPS_HISTORY
+            ]
+        self.fps_history[slot] = current_fps
+        self.fps_count += 1
             
         # 檢查效能警告
-        if len(self.fps_history) >= 60:  # 至少有 1 秒的資料
-            recent_fps = self.fps_history[-60:]  # 最近 1 秒
-            avg_recent_fps = sum(recent_fps) / len(recent_fps)
+        if self.fps_count >= FPS_WARNING_WINDOW:  # 至少有 1 秒的資料
+            avg_recent_fps = self.fps_window_sum / FPS_WARNING_WINDOW
             
             # FPS 低於 45 就警告
             self.low_fps_warning = avg_recent_fps < 45
             
             # 記憶體使用超過 200MB 就警告
-            self.high_memory_warning = memory_usage > 200
+            self.high_memory_warning = self.rss_sampler.latest() > 200
+
+    def get_current_fps(self) -> float:
+        """
+        取得最新一幀的 FPS\n
+        \n
+        回傳:\n
+        float: FPS\n
+        """
+        if self.fps_count == 0:
+            return 0.0
+        return self.fps_history[(self.fps_count - 1) % FPS_HISTORY]
+
+    def get_average_fps(self) -> float:
+        """
+        取得環形陣列內（最近 3 秒）的平均 FPS\n
+        \n
+        回傳:\n
+        float: 平均 FPS\n
+        """
+        count = min(self.fps_count, FPS_HISTORY)
+        return self.fps_history_sum / count if count else 0.0
+
+    def toggle_allocation_tracking(self):
+        """
+        切換 tracemalloc 配置分析\n
+        \n
+        開啟時會同時打開效能顯示，讓子系統區段開始記錄配置量\n
+        """
+        if self.allocation_tracker.active:
+            self.allocation_tracker.stop()
+            FRAME_PROFILER.allocation_tracker = None
+            print("已關閉配置分析")
+            return
+
+        if not self.show_performance:
+            self.toggle_display()
+        self.allocation_tracker.start()
+        FRAME_PROFILER.allocation_tracker = self.allocation_tracker
+        print("已開啟配置分析（tracemalloc），遊戲會變慢")
+
+    def start_sampling(self):
+        """
+        啟動記憶體背景取樣（已經啟動時不會重複啟動）\n
+        """
+        self.rss_sampler.start()
+
+    def shutdown(self):
+        """
+        停止背景取樣執行緒和配置分析\n
+        """
+        self.rss_sampler.stop()
+        if self.allocation_tracker.active:
+            self.toggle_allocation_tracking()
             
     def toggle_display(self):
-        """切換效能顯示開關"""
+        """切換效能顯示開關（同時開關幀分析器，關閉時量測點幾乎沒有成本）"""
         self.show_performance = not self.show_performance
+        FRAME_PROFILER.set_enabled(self.show_performance)
+        if self.show_performance:
+            self.start_sampling()
         
-    def draw_performance_overlay(self, screen):
+    def _render_text(self, text: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        """
+        用共用文字快取渲染效能資訊的文字\n
+        \n
+        參數:\n
+        text (str): 要顯示的文字\n
+        color (Tuple[int, int, int]): 文字顏色\n
+        \n
+        回傳:\n
+        pygame.Surface: 文字圖片（共用，不可修改）\n
+        """
+        return TEXT_CACHE.render(DEFAULT_FONT, OVERLAY_FONT_SIZE, text, True, color)
+
+    def draw_performance_overlay(self, screen) -> List[pygame.Rect]:
         """
         在螢幕上畫出效能資訊\n
         \n
         參數:\n
         screen (pygame.Surface): 遊戲畫面，用來畫出效能資訊\n
+        \n
+        回傳:\n
+        List[pygame.Rect]: 畫到的範圍（髒矩形模式只送出這些區域），沒有顯示時是空清單\n
         """
-        if not self.show_performance or not self.fps_history:
-            return
+        if not self.show_performance or self.fps_count == 0:
+            return []
             
         # 準備要顯示的資訊
-        current_fps = self.fps_history[-1] if self.fps_history else 0
-        current_memory = self.memory_history[-1] if self.memory_history else 0
+        current_fps = self.get_current_fps()
+        current_memory = self.rss_sampler.latest()
         
         # 計算平均 FPS（最近 3 秒）
-        avg_fps = sum(self.fps_history) / len(self.fps_history)
+        avg_fps = self.get_average_fps()
         
         # 建立半透明背景
-        overlay_height = 100 if (self.low_fps_warning or self.high_memory_warning) else 80
+        overlay_height = 140 if (self.low_fps_warning or self.high_memory_warning) else 120
         overlay = pygame.Surface((250, overlay_height))
         overlay.set_alpha(180)  # 半透明
         overlay.fill((0, 0, 0))  # 黑色背景
         
-        # 準備字體（使用系統預設字體）
-        font = pygame.font.Font(None, 20)
-        
         # 準備要顯示的文字
         fps_text = f"FPS: {current_fps:.1f} (平均: {avg_fps:.1f})"
         memory_text = f"記憶體: {current_memory:.1f}MB"
+        text_cache_text = (
+            f"文字快取: 命中 {TEXT_CACHE.hits} / 未命中 {TEXT_CACHE.misses}"
+            f" ({TEXT_CACHE.get_hit_rate() * 100:.0f}%)"
+        )
+        asset_text = (
+            f"圖片資源: {len(ASSET_MANAGER.images)} 張"
+            f" 圖集 {len(ASSET_MANAGER.atlas.pages)} 頁"
+            f" {ASSET_MANAGER.get_total_bytes() / 1024 / 1024:.1f}MB"
+        )
         
         # 根據 FPS 選擇顏色
         if current_fps >= 55:
@@ -130,30 +237,147 @@ class GamePerformanceMonitor:
             fps_color = (255, 0, 0)  # 紅色 - 有問題
             
         # 畫出文字
-        fps_surface = font.render(fps_text, True, fps_color)
-        memory_surface = font.render(memory_text, True, (255, 255, 255))
+        fps_surface = self._render_text(fps_text, fps_color)
+        memory_surface = self._render_text(memory_text, (255, 255, 255))
+        text_cache_surface = self._render_text(text_cache_text, (200, 200, 200))
+        asset_surface = self._render_text(asset_text, (200, 200, 200))
         
         # 把文字畫到背景上
         overlay.blit(fps_surface, (10, 10))
         overlay.blit(memory_surface, (10, 30))
+        overlay.blit(text_cache_surface, (10, 50))
+        overlay.blit(asset_surface, (10, 70))
         
         # 顯示警告訊息
-        y_offset = 50
+        y_offset = 90
         if self.low_fps_warning:
-            warning_text = font.render("⚠️ FPS 偏低", True, (255, 100, 100))
+            warning_text = self._render_text("⚠️ FPS 偏低", (255, 100, 100))
             overlay.blit(warning_text, (10, y_offset))
             y_offset += 20
             
         if self.high_memory_warning:
-            warning_text = font.render("⚠️ 記憶體偏高", True, (255, 100, 100))
+            warning_text = self._render_text("⚠️ 記憶體偏高", (255, 100, 100))
             overlay.blit(warning_text, (10, y_offset))
         
         # 把整個資訊框畫到螢幕右上角
-        screen.blit(overlay, (screen.get_width() - 260, 10))
+        rects = [screen.blit(overlay, (screen.get_width() - 260, 10))]
         
         # 在左下角顯示提示
-        hint_text = font.render("按 F12 隱藏效能資訊", True, (150, 150, 150))
-        screen.blit(hint_text, (10, screen.get_height() - 25))
+        hint_text = self._render_text(
+            "按 F12 隱藏效能資訊，F11 匯出分析紀錄，F9 配置分析", (150, 150, 150)
+        )
+        rects.append(screen.blit(hint_text, (10, screen.get_height() - 25)))
+
+        # 在資訊框下方畫各子系統的幀時間疊圖
+        graph_top = overlay_height + 20
+        graph_bottom = self._draw_profiler_graph(screen, graph_top)
+        rects.append(pygame.Rect(screen.get_width() - 260, graph_top, 250, graph_bottom - graph_top))
+
+        # 開啟配置分析時，再往下畫配置量面板
+        if self.allocation_tracker.active:
+            rects.append(self._draw_allocation_panel(screen, graph_bottom + 10))
+        return rects
+
+    def _draw_profiler_graph(self, screen, top: int) -> int:
+        """
+        畫出最近幾幀各子系統耗時的堆疊長條圖\n
+        \n
+        每一幀一條直線，由下往上依子系統疊加，\n
+        虛線是 16.7ms（60 FPS）的預算線，下方列出平均最花時間的子系統\n
+        \n
+        參數:\n
+        screen (pygame.Surface): 遊戲畫面\n
+        top (int): 圖表上緣的 Y 座標\n
+        \n
+        回傳:\n
+        int: 圖表下緣的 Y 座標\n
+        """
+        frames = FRAME_PROFILER.get_recent_frames()
+        if not frames:
+            return top
+
+        graph_width = 240
+        graph_height = 60
+        legend_lines = 5
+        panel = pygame.Surface((250, graph_height + 20 + legend_lines * 16))
+        panel.set_alpha(180)
+        panel.fill((0, 0, 0))
+
+        # 60 px 代表 33.3ms（兩幀預算）
+        pixels_per_ms = graph_height / (2000 / 60)
+        bar_width = graph_width / FRAME_PROFILER.frame_history
+        base_y = 10 + graph_height
+
+        for frame_offset, breakdown in enumerate(frames):
+            x = 5 + int(frame_offset * bar_width)
+            y = base_y
+            for name_id in sorted(breakdown):
+                height = breakdown[name_id] * pixels_per_ms
+                top_y = max(10, y - height)
+                if y - top_y >= 1:
+                    pygame.draw.line(
+                        panel, FRAME_PROFILER.get_color(name_id), (x, int(y)), (x, int(top_y))
+                    )
+                y = top_y
+
+        # 16.7ms 預算線
+        budget_y = base_y - int(1000 / 60 * pixels_per_ms)
+        for dash_x in range(5, 5 + graph_width, 8):
+            pygame.draw.line(panel, (255, 255, 255), (dash_x, budget_y), (dash_x + 3, budget_y))
+
+        # 平均耗時最高的子系統
+        legend_y = base_y + 8
+        for name, name_id, average_ms in FRAME_PROFILER.get_average_breakdown()[:legend_lines]:
+            pygame.draw.rect(panel, FRAME_PROFILER.get_color(name_id), (5, legend_y + 3, 8, 8))
+            legend_text = self._render_text(f"{name} {average_ms:.2f}ms", (230, 230, 230))
+            panel.blit(legend_text, (18, legend_y))
+            legend_y += 16
+
+        screen.blit(panel, (screen.get_width() - 260, top))
+        return top + panel.get_height()
+
+    def _draw_allocation_panel(self, screen, top: int) -> pygame.Rect:
+        """
+        畫出 tracemalloc 配置分析結果\n
+        \n
+        上半部是各子系統每幀平均配置量，接著是 GC 統計，\n
+        最後是最近一次快照比較找到的配置熱點（檔案:行號）\n
+        \n
+        參數:\n
+        screen (pygame.Surface): 遊戲畫面\n
+        top (int): 面板上緣的 Y 座標\n
+        \n
+        回傳:\n
+        pygame.Rect: 面板畫到的範圍\n
+        """
+        tracker = self.allocation_tracker
+        allocations = sorted(
+            tracker.get_average_allocations().items(), key=lambda item: item[1], reverse=True
+        )[:5]
+
+        lines = [("每幀配置量", (255, 255, 255))]
+        for name_id, kilobytes in allocations:
+            lines.append(
+                (f"{FRAME_PROFILER.names[name_id]} {kilobytes:.1f}KB", FRAME_PROFILER.get_color(name_id))
+            )
+        lines.append(
+            (
+                f"GC {tracker.gc_collections[0]}/{tracker.gc_collections[1]}/{tracker.gc_collections[2]}"
+                f" 共 {tracker.gc_pause_ms:.1f}ms 最長 {tracker.gc_max_pause_ms:.1f}ms",
+                (255, 255, 255),
+            )
+        )
+        lines.append(("配置熱點", (255, 255, 255)))
+        for site, size_diff, count_diff in tracker.top_sites:
+            lines.append((f"{site} +{size_diff / 1024:.1f}KB ({count_diff:+d})", (230, 230, 230)))
+
+        panel = pygame.Surface((250, 10 + len(lines) * 16))
+        panel.set_alpha(180)
+        panel.fill((0, 0, 0))
+        for index, (text, color) in enumerate(lines):
+            panel.blit(self._render_text(text, color), (5, 5 + index * 16))
+
+        return screen.blit(panel, (screen.get_width() - 260, top))
         
     def tick(self, fps):
         """等待下一幀（替代 pygame.time.Clock.tick）"""
@@ -185,19 +409,73 @@ class MarioClimbingGame:
     1. 初始化 → 2. 角色選擇 → 3. 遊戲進行 → 4. 結算\n
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        headless: bool = False,
+        render_enabled: bool = True,
+        render_rate: Optional[int] = None,
+        vsync: bool = False,
+        dirty_rects: bool = False,
+        enemy_batch: bool = False,
+        update_lod: bool = False,
+        frame_jobs: bool = False,
+        asset_scope_prefix: str = "",
+    ):
         """
         初始化遊戲系統\n
         \n
-        設定 pygame 基本環境、建立視窗、初始化各個遊戲系統模組
+        設定 pygame 基本環境、建立視窗、初始化各個遊戲系統模組\n
+        \n
+        參數:\n
+        headless (bool): 是否使用無視窗模式（SDL dummy 影像/音效驅動，供壓力測試與效能量測）\n
+        render_enabled (bool): 是否執行繪製，無視窗模式下可關閉以只跑遊戲邏輯\n
+        render_rate (int): 每秒繪製次數上限，None 表示預設（60，垂直同步時是螢幕更新率），\n
+        0 表示不限制（會用滿一個 CPU 核心）\n
+        vsync (bool): 是否啟用垂直同步，由 display.flip() 控制節奏\n
+        dirty_rects (bool): 是否使用髒矩形模式，暫停、遊戲結束、勝利這些靜態畫面不重畫，\n
+        只把效能資訊等疊加層的範圍送到螢幕（軟體繪製的環境使用）\n
+        enemy_batch (bool): 是否用 NumPy 批次引擎一次更新所有基本敵人（大量敵人的關卡使用）\n
+        update_lod (bool): 是否讓畫面外的敵人和陷阱降低更新頻率（遠距離未激活的敵人睡眠）\n
+        frame_jobs (bool): 是否把可以延後的整理工作交給每幀有時間預算的工作排程\n
+        asset_scope_prefix (str): 關卡資源範圍名稱的前綴（同一個行程裡有好幾個遊戲時用來區分）\n
         """
+        # 無視窗模式：必須在 pygame.init() 之前指定 dummy 驅動
+        self.headless = headless
+        self.render_enabled = render_enabled
+        if self.headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
         # pygame 系統初始化
         pygame.init()
 
-        # 建立遊戲視窗
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.vsync = False
+
+        # 建立遊戲視窗（垂直同步需要 SCALED 模式，不支援時退回一般視窗）
+        self.screen = None
+        if vsync and not headless:
+            try:
+                self.screen = pygame.display.set_mode(
+                    (SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SCALED, vsync=1
+                )
+                self.vsync = True
+            except pygame.error as e:
+                print(f"無法啟用垂直同步，改用軟體計時: {e}")
+        if self.screen is None:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("瑪莉歐攀爬遊戲")
 
+        # 繪製上限：預設 60，垂直同步時用螢幕更新率（flip() 沒有真的等待時也不會空轉）
+        if render_rate is None:
+            render_rate = self._get_refresh_rate() if self.vsync else RENDER_RATE
+        self.render_rate = render_rate
+
+        # 髒矩形繪製器（預設關閉，每幀整張重畫、整張 flip）
+        self.dirty_renderer = DirtyRectRenderer() if dirty_rects else None
+
+        # 可以延後的整理工作（敵人決策、裝備計時器、粒子補充等）是否交給工作排程
+        FRAME_JOBS.set_enabled(frame_jobs)
+
         # 時鐘和效能監控
         self.clock = pygame.time.Clock()
         self.performance_monitor = GamePerformanceMonitor()
@@ -210,12 +488,18 @@ class MarioClimbingGame:
         self.player = None
         # 初始化音效管理器
         self.sound_manager = SoundManager()
-        self.level_manager = LevelManager(self.sound_manager)
+        self.level_manager = LevelManager(
+            self.sound_manager,
+            use_enemy_batch=enemy_batch,
+            use_update_lod=update_lod,
+            asset_scope_prefix=asset_scope_prefix,
+        )
         self.ui = GameUI(SCREEN_WIDTH, SCREEN_HEIGHT)
         self.equipment_manager = EquipmentManager()
         self.potion_drop_manager = PotionDropManager()
-        self.fireball_manager = FireballManager()  # 火球管理系統
-        self.iceball_manager = IceballManager()  # 冰球管理系統
+        self.projectile_pool = ProjectilePool()  # 火球、冰球共用的投射物引擎
+        self.fireball_manager = FireballManager(self.projectile_pool)  # 火球管理系統
+        self.iceball_manager = IceballManager(self.projectile_pool)  # 冰球管理系統
 
         # 選角相關變數
         self.selected_character_index = 0  # 目前選中的角色編號
@@ -223,6 +507,16 @@ class MarioClimbingGame:
 
         # 相機系統變數
         self.camera_y = 0  # 當前相機 Y 位置
+        self.previous_camera_y = 0  # 上一個模擬步的相機位置（繪製插值用）
+        self.previous_positions = []  # 上一個模擬步的物件位置 (物件, x 屬性, y 屬性, x, y)
+        self.saved_projectile_positions = None  # 繪製插值時暫存的投射物實際位置
+
+        # 輸入錄製與重播（用來重現效能問題，預設關閉）
+        self.record_path = None  # 設定後，開始遊戲時自動錄製到這個路徑
+        self.record_seed = None  # 錄製用的亂數種子，None 表示隨機產生
+        self.replay_recorder = None
+        self.replay_player = None
+        self.input_override = None  # 腳本輸入（例如效能測試），回傳每幀按鍵狀態的函式
         self.camera_smoothing = (
             0.08  # 相機平滑跟隨速度（0.05-0.2 之間，數值越小越平滑但反應越慢）
         )
@@ -250,133 +544,168 @@ class MarioClimbingGame:
             if event.type == pygame.QUIT:
                 self.running = False
 
+            # 視窗被蓋住後重新顯示，髒矩形模式要整張重畫
+            elif event.type == pygame.WINDOWEXPOSED:
+                if self.dirty_renderer:
+                    self.dirty_renderer.reset()
+
             elif event.type == pygame.KEYDOWN:
-                # ESC 鍵按下回到選單（若在選單則不變）
-                if event.key == pygame.K_ESCAPE:
-                    # 如果在遊戲中或暫停或結束畫面，回到選單
-                    self._return_to_menu()
+                # 重播中忽略真實鍵盤（效能工具按鍵除外），按鍵改由重播檔提供
+                if self.replay_player and event.key not in PROFILING_KEYS:
                     continue
 
-                # Q 鍵按下在遊戲中重置當前關卡
-                if event.key == pygame.K_q:
-                    if self.game_state == "playing" and self.player:
-                        self._reset_current_level()
-                    # 如果在遊戲結束畫面，也接受 Q 重新開始當前關卡
-                    elif self.game_state == "game_over":
-                        self._reset_current_level()
-                    continue
+                # 錄製模式：記錄按鍵，重播時在同一個模擬幀送回（效能工具按鍵只影響顯示，不錄）
+                if self.replay_recorder and event.key not in PROFILING_KEYS:
+                    self.replay_recorder.record_key_down(event.key)
 
-                # F12 鍵切換效能顯示
-                elif event.key == pygame.K_F12:
-                    self.performance_monitor.toggle_display()
-                    continue
+                self._handle_key_down(event.key)
 
-                # F1-F6 鍵快速跳轉關卡（測試用途）
-                elif event.key == pygame.K_F1:
-                    if self.game_state == "playing" and self.player:
-                        self._jump_to_level(1)
-                    continue
-                elif event.key == pygame.K_F2:
-                    if self.game_state == "playing" and self.player:
-                        self._jump_to_level(2)
-                    continue
-                elif event.key == pygame.K_F3:
-                    if self.game_state == "playing" and self.player:
-                        self._jump_to_level(3)
-                    continue
-                elif event.key == pygame.K_F4:
-                    if self.game_state == "playing" and self.player:
-                        self._jump_to_level(4)
-                    continue
-                elif event.key == pygame.K_F5:
-                    if self.game_state == "playing" and self.player:
-                        self._jump_to_level(5)
-                    continue
-                elif event.key == pygame.K_F6:
-                    if self.game_state == "playing" and self.player:
-                        self._jump_to_level(6)
-                    continue
+    def _handle_key_down(self, key: int):
+        """
+        處理單一按鍵按下事件\n
+        \n
+        從 handle_events() 拆出來，讓重播系統可以在正確的模擬幀重送按鍵\n
+        \n
+        參數:\n
+        key (int): pygame 按鍵代碼\n
+        """
+        # ESC 鍵按下回到選單（若在選單則不變）
+        if key == pygame.K_ESCAPE:
+            # 如果在遊戲中或暫停或結束畫面，回到選單
+            self._return_to_menu()
+            return
 
-                # 測試藥水掉落鍵改為 F10
-                elif event.key == pygame.K_F10:
-                    if self.game_state == "playing" and self.player:
-                        # 強制掉落三種藥水各一個，方便測試
-                        self.potion_drop_manager.force_drop_potion(
-                            self.player.x - 50, self.player.y, "healing"
-                        )
-                        self.potion_drop_manager.force_drop_potion(
-                            self.player.x, self.player.y, "shield"
-                        )
-                        self.potion_drop_manager.force_drop_potion(
-                            self.player.x + 50, self.player.y, "attack"
-                        )
-                        print(
-                            "測試藥水已掉落！治療藥水(左)、護盾藥水(中)、攻擊藥水(右)"
-                        )
-                    continue
+        # Q 鍵按下在遊戲中重置當前關卡
+        if key == pygame.K_q:
+            if self.game_state == "playing" and self.player:
+                self._reset_current_level()
+            # 如果在遊戲結束畫面，也接受 Q 重新開始當前關卡
+            elif self.game_state == "game_over":
+                self._reset_current_level()
+            return
 
-                # 1鍵使用攻擊藥水
-                elif event.key == pygame.K_1:
-                    if self.game_state == "playing" and self.player:
-                        if self.player.use_attack_potion():
-                            print("使用攻擊藥水！攻擊力提升50%，持續15秒")
-                        else:
-                            print("沒有攻擊藥水或效果已存在")
-                    continue
+        # F12 鍵切換效能顯示
+        elif key == pygame.K_F12:
+            self.performance_monitor.toggle_display()
+            return
 
-                # 2鍵使用護盾藥水
-                elif event.key == pygame.K_2:
-                    if self.game_state == "playing" and self.player:
-                        if self.player.use_shield_potion():
-                            print("使用護盾藥水！獲得50點護盾")
-                        else:
-                            print("沒有護盾藥水或護盾已滿")
-                    continue
+        # F9 鍵切換 tracemalloc 配置分析
+        elif key == pygame.K_F9:
+            self.performance_monitor.toggle_allocation_tracking()
+            return
 
-                # 3鍵使用治療藥水（防禦藥水）
-                elif event.key == pygame.K_3:
-                    if self.game_state == "playing" and self.player:
-                        if self.player.use_healing_potion():
-                            print("使用防禦藥水！回復60點血量")
-                        else:
-                            print("沒有防禦藥水或血量已滿")
-                    continue
+        # F11 鍵匯出效能分析紀錄（Chrome trace 格式）
+        elif key == pygame.K_F11:
+            self.export_profile_trace(PROFILE_TRACE_PATH)
+            return
+
+        # F1-F6 鍵快速跳轉關卡（測試用途）
+        elif key == pygame.K_F1:
+            if self.game_state == "playing" and self.player:
+                self._jump_to_level(1)
+            return
+        elif key == pygame.K_F2:
+            if self.game_state == "playing" and self.player:
+                self._jump_to_level(2)
+            return
+        elif key == pygame.K_F3:
+            if self.game_state == "playing" and self.player:
+                self._jump_to_level(3)
+            return
+        elif key == pygame.K_F4:
+            if self.game_state == "playing" and self.player:
+                self._jump_to_level(4)
+            return
+        elif key == pygame.K_F5:
+            if self.game_state == "playing" and self.player:
+                self._jump_to_level(5)
+            return
+        elif key == pygame.K_F6:
+            if self.game_state == "playing" and self.player:
+                self._jump_to_level(6)
+            return
+
+        # 測試藥水掉落鍵改為 F10
+        elif key == pygame.K_F10:
+            if self.game_state == "playing" and self.player:
+                # 強制掉落三種藥水各一個，方便測試
+                self.potion_drop_manager.force_drop_potion(
+                    self.player.x - 50, self.player.y, "healing"
+                )
+                self.potion_drop_manager.force_drop_potion(
+                    self.player.x, self.player.y, "shield"
+                )
+                self.potion_drop_manager.force_drop_potion(
+                    self.player.x + 50, self.player.y, "attack"
+                )
+                print(
+                    "測試藥水已掉落！治療藥水(左)、護盾藥水(中)、攻擊藥水(右)"
+                )
+            return
+
+        # 1鍵使用攻擊藥水
+        elif key == pygame.K_1:
+            if self.game_state == "playing" and self.player:
+                if self.player.use_attack_potion():
+                    print("使用攻擊藥水！攻擊力提升50%，持續15秒")
+                else:
+                    print("沒有攻擊藥水或效果已存在")
+            return
+
+        # 2鍵使用護盾藥水
+        elif key == pygame.K_2:
+            if self.game_state == "playing" and self.player:
+                if self.player.use_shield_potion():
+                    print("使用護盾藥水！獲得50點護盾")
+                else:
+                    print("沒有護盾藥水或護盾已滿")
+            return
+
+        # 3鍵使用治療藥水（防禦藥水）
+        elif key == pygame.K_3:
+            if self.game_state == "playing" and self.player:
+                if self.player.use_healing_potion():
+                    print("使用防禦藥水！回復60點血量")
                 else:
-                    # 選單狀態的按鍵處理
-                    if self.game_state == "menu":
-                        if event.key == pygame.K_LEFT:
-                            # 選擇前一個角色（循環選擇）
-                            self.selected_character_index = (
-                                self.selected_character_index - 1
-                            ) % 3
-                        elif event.key == pygame.K_RIGHT:
-                            # 選擇下一個角色（循環選擇）
-                            self.selected_character_index = (
-                                self.selected_character_index + 1
-                            ) % 3
-                        elif event.key == pygame.K_UP:
-                            # 切換難度
-                            self.selected_difficulty = "hard" if self.selected_difficulty == "easy" else "easy"
-                        elif event.key == pygame.K_DOWN:
-                            # 切換難度
-                            self.selected_difficulty = "hard" if self.selected_difficulty == "easy" else "easy"
-                        elif event.key == pygame.K_RETURN:
-                            # 按 Enter 開始遊戲，建立選定的角色和難度
-                            self.start_game_with_character(
-                                self.selected_character_index, self.selected_difficulty
-                            )
-
-                    # 暫停狀態的按鍵處理
-                    elif self.game_state == "paused":
-                        if event.key == pygame.K_SPACE:
-                            self.game_state = "playing"  # 空白鍵繼續遊戲
-
-                    # 勝利畫面的按鍵處理
-                    elif self.game_state == "victory":
-                        if event.key == pygame.K_SPACE:
-                            self.running = False  # 關閉遊戲
-                        elif event.key == pygame.K_ESCAPE:
-                            self.game_state = "menu"  # 回到主選單
+                    print("沒有防禦藥水或血量已滿")
+            return
+        else:
+            # 選單狀態的按鍵處理
+            if self.game_state == "menu":
+                if key == pygame.K_LEFT:
+                    # 選擇前一個角色（循環選擇）
+                    self.selected_character_index = (
+                        self.selected_character_index - 1
+                    ) % 3
+                elif key == pygame.K_RIGHT:
+                    # 選擇下一個角色（循環選擇）
+                    self.selected_character_index = (
+                        self.selected_character_index + 1
+                    ) % 3
+                elif key == pygame.K_UP:
+                    # 切換難度
+                    self.selected_difficulty = "hard" if self.selected_difficulty == "easy" else "easy"
+                elif key == pygame.K_DOWN:
+                    # 切換難度
+                    self.selected_difficulty = "hard" if self.selected_difficulty == "easy" else "easy"
+                elif key == pygame.K_RETURN:
+                    # 按 Enter 開始遊戲，建立選定的角色和難度
+                    self.start_game_with_character(
+                        self.selected_character_index, self.selected_difficulty
+                    )
+
+            # 暫停狀態的按鍵處理
+            elif self.game_state == "paused":
+                if key == pygame.K_SPACE:
+                    self.game_state = "playing"  # 空白鍵繼續遊戲
+
+            # 勝利畫面的按鍵處理
+            elif self.game_state == "victory":
+                if key == pygame.K_SPACE:
+                    self.running = False  # 關閉遊戲
+                elif key == pygame.K_ESCAPE:
+                    self.game_state = "menu"  # 回到主選單
+
 
     def start_game_with_character(self, character_type: int, difficulty: str):
         """
@@ -413,7 +742,8 @@ class MarioClimbingGame:
         self.player.set_iceball_manager(self.iceball_manager)
         self.player.set_sound_manager(self.sound_manager)
 
-        # 重置關卡管理器到第一關，並設定難度
+        # 重新開始：丟掉上一局排隊中的工作，再重置關卡管理器到第一關，並設定難度
+        FRAME_JOBS.clear()
         self.level_manager.reset_to_first_level()
         self.level_manager.set_difficulty(difficulty)
 
@@ -426,6 +756,88 @@ class MarioClimbingGame:
         # 切換到遊戲狀態
         self.game_state = "playing"
 
+        # 有指定錄製路徑就從這裡開始錄製（只錄第一次開局）
+        if self.record_path and not self.replay_recorder and not self.replay_player:
+            self.start_recording(self.record_path, self.record_seed)
+
+    def export_profile_trace(self, path: str):
+        """
+        匯出效能分析紀錄\n
+        \n
+        參數:\n
+        path (str): 輸出的 Chrome trace JSON 路徑\n
+        """
+        span_count = FRAME_PROFILER.export_chrome_trace(path)
+        print(f"效能分析紀錄已匯出: {path}（{span_count} 個區段，可用 chrome://tracing 開啟）")
+
+    def start_recording(self, path: str, seed: int = None):
+        """
+        開始錄製輸入到重播檔\n
+        \n
+        參數:\n
+        path (str): 重播檔路徑\n
+        seed (int): 亂數種子，None 表示隨機產生\n
+        """
+        # 延後的工作不在關鍵幀裡，錄製和重播時全部同步執行才對得上
+        FRAME_JOBS.set_enabled(False)
+        self.replay_recorder = ReplayRecorder(path, seed)
+        self.replay_recorder.start(self)
+        print(f"開始錄製重播: {path}（亂數種子 {self.replay_recorder.seed}）")
+
+    def start_replay(self, path: str, seek_frame: int = 0):
+        """
+        載入重播檔並從指定幀開始播放\n
+        \n
+        參數:\n
+        path (str): 重播檔路徑\n
+        seek_frame (int): 起始幀，會從最近的關鍵幀快轉過去\n
+        """
+        FRAME_JOBS.set_enabled(False)
+        self.replay_player = ReplayPlayer(path)
+        self.replay_player.attach(self)
+        if seek_frame > 0:
+            self.replay_player.seek(self, seek_frame)
+        print(
+            f"開始重播: {path}（共 {self.replay_player.frame_count} 幀，從第 {self.replay_player.current_frame} 幀開始）"
+        )
+
+    def _read_frame_keys(self):
+        """
+        取得這一個模擬幀的按鍵狀態\n
+        \n
+        重播中由重播檔提供，有腳本輸入時用腳本，否則讀取鍵盤；錄製中會順便記錄下來\n
+        \n
+        回傳:\n
+        按鍵狀態，可以用 keys[pygame.K_*] 查詢\n
+        """
+        if self.replay_player:
+            # 先送回錄製時這一幀之前發生的按鍵事件
+            for key in self.replay_player.get_key_down_events():
+                self._handle_key_down(key)
+            keys = self.replay_player.get_frame_keys()
+        elif self.input_override:
+            keys = self.input_override()
+        else:
+            keys = pygame.key.get_pressed()
+
+        if self.replay_recorder:
+            self.replay_recorder.record_frame(keys)
+
+        return keys
+
+    def _end_replay_frame(self):
+        """
+        結束一個模擬幀的錄製或重播\n
+        """
+        if self.replay_recorder:
+            self.replay_recorder.end_frame(self)
+
+        if self.replay_player:
+            self.replay_player.end_frame()
+            if self.replay_player.finished:
+                print("重播結束")
+                self.running = False
+
     def _return_to_menu(self):
         """
         將遊戲狀態切換回選單，並重置部分暫存狀態
@@ -433,8 +845,9 @@ class MarioClimbingGame:
         # 停止遊戲進行，回到選單畫面
         self.game_state = "menu"
 
-        # 清除玩家物件（選單中不需要持續玩家狀態）
+        # 清除玩家物件（選單中不需要持續玩家狀態），排隊中的工作也不再需要
         self.player = None
+        FRAME_JOBS.clear()
 
         # 可選：清空掉落與裝備（保持玩家選擇狀態）
         self.potion_drop_manager.clear_all()
@@ -448,7 +861,8 @@ class MarioClimbingGame:
         # 取得當前關卡物件
         current_level = self.level_manager.get_current_level()
 
-        # 重置關卡結構與狀態
+        # 重置關卡結構與狀態（先丟掉排隊中的工作，它們拿的是重置前的敵人和計時器）
+        FRAME_JOBS.clear()
         current_level.reset()
 
         # 如果玩家不存在（例如從遊戲結束畫面按下 Q），建立新玩家並放置在起點
@@ -495,6 +909,9 @@ class MarioClimbingGame:
         參數:\n
         target_level (int): 目標關卡編號，範圍 1-6\n
         """
+        # 排隊中的工作屬於目前的關卡，切換前先做完
+        FRAME_JOBS.flush()
+
         # 使用關卡管理器跳轉到目標關卡
         if self.level_manager.jump_to_level(target_level):
             # 取得新關卡的起始位置
@@ -543,75 +960,82 @@ class MarioClimbingGame:
         4. 裝備效果更新\n
         5. UI 資訊更新\n
         """
-        # 更新效能監控資料
-        self.performance_monitor.update()
-        
-        if self.game_state == "playing" and self.player:
-            # 取得當前按住的按鍵狀態
-            keys = pygame.key.get_pressed()
+        with FRAME_PROFILER.span("update"):
+            # 每幀重新開始計算粒子預算
+            PARTICLE_BUDGET.begin_frame()
 
-            # 取得當前關卡資料
-            current_level = self.level_manager.get_current_level()
+            # 更新效能監控資料
+            with FRAME_PROFILER.span("performance_monitor.update"):
+                self.performance_monitor.update()
 
-            # 讓玩家根據按鍵狀態更新（傳遞平台資料用於蹲下碰撞檢測）
-            self.player.handle_input(keys, current_level.platforms)
+            # 取得這一幀的按鍵狀態（鍵盤或重播檔）
+            keys = self._read_frame_keys()
 
-            # 更新玩家物理狀態（移動、重力、碰撞）
-            # 建立包含移動平台的完整平台清單
-            all_platforms = current_level.platforms.copy()
+            if self.game_state == "playing" and self.player:
+                # 取得當前關卡資料
+                current_level = self.level_manager.get_current_level()
 
-            # 把移動平台也加入平台清單，讓玩家可以站在上面
-            from src.traps.moving_platform import MovingPlatform
+                # 關卡的碰撞索引（平台、移動平台、陷阱、敵人），所有碰撞檢查都透過它查詢
+                spatial_index = current_level.spatial_index
 
-            for trap in current_level.traps:
-                if isinstance(trap, MovingPlatform):
-                    all_platforms.append(trap)
+                # 讓玩家根據按鍵狀態更新（傳遞碰撞索引用於蹲下碰撞檢測）
+                with FRAME_PROFILER.span("player.handle_input"):
+                    self.player.handle_input(keys, spatial_index)
 
-            self.player.update(all_platforms, current_level.traps)
+                # 更新玩家物理狀態（移動、重力、碰撞）
+                with FRAME_PROFILER.span("player.update"):
+                    self.player.update(spatial_index)
 
-            # 更新當前關卡（敵人移動、陷阱動作）
-            self.level_manager.update(self.player)
+                # 更新當前關卡（敵人移動、陷阱動作）
+                with FRAME_PROFILER.span("level.update"):
+                    self.level_manager.update(self.player)
 
-            # 更新火球系統（火球會自動處理與敵人的碰撞和傷害）
-            self.fireball_manager.update(
-                all_platforms, current_level.enemies, SCREEN_WIDTH
-            )
+                # 更新火球和冰球（引擎會自動處理與敵人的碰撞、傷害、燃燒和暈眩）
+                with FRAME_PROFILER.span("projectile_pool.update"):
+                    self.projectile_pool.update(spatial_index, SCREEN_WIDTH)
 
-            # 更新冰球系統（冰球會自動處理與敵人的碰撞、傷害和暈眩）
-            self.iceball_manager.update(
-                all_platforms, current_level.enemies, SCREEN_WIDTH
-            )
+                # 更新裝備效果
+                with FRAME_PROFILER.span("equipment_manager.update"):
+                    self.equipment_manager.update(self.player)
 
-            # 更新裝備效果
-            self.equipment_manager.update(self.player)
+                # 更新藥水掉落物品
+                with FRAME_PROFILER.span("potion_drop_manager.update"):
+                    self.potion_drop_manager.update()
 
-            # 更新藥水掉落物品
-            self.potion_drop_manager.update()
+                    # 檢查玩家撿拾藥水
+                    picked_potions = self.potion_drop_manager.check_pickup(
+                        self.player.x + self.player.width // 2,  # 玩家中心點
+                        self.player.y + self.player.height // 2,
+                        self.player,
+                    )
 
-            # 更新音效系統狀態
-            self.sound_manager.update()
+                # 更新音效系統狀態
+                with FRAME_PROFILER.span("sound_manager.update"):
+                    self.sound_manager.update()
 
-            # 檢查玩家撿拾藥水
-            picked_potions = self.potion_drop_manager.check_pickup(
-                self.player.x + self.player.width // 2,  # 玩家中心點
-                self.player.y + self.player.height // 2,
-                self.player,
-            )
+                # 如果撿到藥水，顯示提示訊息
+                if picked_potions:
+                    for potion_info in picked_potions:
+                        print(f"收集了 {potion_info['name']}！按對應數字鍵使用")
+
+                with FRAME_PROFILER.span("game_rules"):
+                    # 處理敵人死亡掉落
+                    self._handle_enemy_drops()
 
-            # 如果撿到藥水，顯示提示訊息
-            if picked_potions:
-                for potion_info in picked_potions:
-                    print(f"收集了 {potion_info['name']}！按對應數字鍵使用")
+                    # 檢查是否需要切換關卡或遊戲結束
+                    self._check_level_transition()
+                    self._check_game_over()
 
-            # 處理敵人死亡掉落
-            self._handle_enemy_drops()
+                # 更新相機位置（平滑跟隨玩家）
+                self._update_camera()
 
-            # 檢查是否需要切換關卡或遊戲結束
-            self._check_level_transition()
-            self._check_game_over()
+                # 在這一幀的時間預算內執行延後的工作
+                with FRAME_PROFILER.span("frame_jobs"):
+                    FRAME_JOBS.run_frame()
 
-            # 更新相機位置（平滑跟隨玩家）
-            self._update_camera()
+            # 錄製/重播的幀計數和關鍵幀
+            with FRAME_PROFILER.span("replay"):
+                self._end_replay_frame()
 
     def _update_camera(self):
         """
@@ -734,7 +1158,8 @@ class MarioClimbingGame:
                     self.player.y = current_level.level_completion_height + 50
                     return
 
-            # 可以進入下一關
+            # 可以進入下一關（排隊中的工作屬於這一關，切換前先做完）
+            FRAME_JOBS.flush()
             success = self.level_manager.advance_to_next_level()
             if success:
                 # 重新定位玩家到新關卡的起始位置
@@ -784,7 +1209,7 @@ class MarioClimbingGame:
         elif self.player.y > SCREEN_HEIGHT + 100:  # 掉出畫面底部
             self.game_state = "game_over"
 
-    def render(self):
+    def render(self, interpolation_alpha: float = 1.0):
         """
         繪製遊戲畫面\n
         \n
@@ -796,43 +1221,91 @@ class MarioClimbingGame:
         \n
         繪製順序:\n
         1. 背景 → 2. 關卡元素 → 3. 遊戲物件 → 4. UI 介面\n
+        \n
+        參數:\n
+        interpolation_alpha (float): 前後兩個模擬步之間的插值比例，1 表示直接畫目前狀態\n
+        """
+        # 插值只在遊戲進行中套用，繪製完立刻還原，不影響模擬結果
+        saved_positions = []
+        saved_camera_y = self.camera_y
+        if interpolation_alpha < 1.0 and self.game_state == "playing":
+            saved_positions = self._apply_interpolation(interpolation_alpha)
+            camera_delta = self.camera_y - self.previous_camera_y
+            if abs(camera_delta) <= INTERPOLATION_SNAP_DISTANCE:
+                self.camera_y = self.previous_camera_y + camera_delta * interpolation_alpha
+
+        with FRAME_PROFILER.span("render"):
+            # 髒矩形模式：靜態畫面沒變時直接沿用螢幕上畫好的場景
+            redraw_scene = True
+            if self.dirty_renderer:
+                redraw_scene = self.dirty_renderer.begin_frame(
+                    self.screen, self._get_static_scene_key()
+                )
+            if redraw_scene:
+                self._render_scene()
+                if self.dirty_renderer:
+                    self.dirty_renderer.end_scene(self.screen)
+
+            # 還原模擬狀態
+            self._restore_interpolation(saved_positions)
+            self.camera_y = saved_camera_y
+
+            # 勝利畫面的星星動畫每幀都會動，畫在場景上面
+            overlay_rects = []
+            if self.game_state == "victory":
+                overlay_rects.append(self.ui.draw_victory_stars(self.screen))
+
+            # 繪製效能監控資訊（在所有內容之上）
+            with FRAME_PROFILER.span("performance_overlay"):
+                overlay_rects.extend(self.performance_monitor.draw_performance_overlay(self.screen))
+
+            # 更新顯示（把準備好的畫面顯示到螢幕），髒矩形模式的靜態畫面只送疊加層的範圍
+            if self.dirty_renderer:
+                with FRAME_PROFILER.span("display.update"):
+                    self.dirty_renderer.present(self.screen, overlay_rects)
+            else:
+                with FRAME_PROFILER.span("display.flip"):
+                    pygame.display.flip()
+
+    def _render_scene(self):
+        """
+        依遊戲狀態繪製場景（不含效能資訊疊加層）\n
         """
         # 清空畫面，填上天空色
         self.screen.fill(BLUE)
 
         if self.game_state == "menu":
             # 繪製角色選擇選單
-            self.ui.draw_character_selection(self.screen, self.selected_character_index, self.selected_difficulty)
+            with FRAME_PROFILER.span("ui.draw_character_selection"):
+                self.ui.draw_character_selection(self.screen, self.selected_character_index, self.selected_difficulty)
 
         elif self.game_state == "playing" and self.player:
             # 繪製遊戲中的所有物件
             current_level = self.level_manager.get_current_level()
 
             # 先畫背景和關卡結構（使用平滑的相機位置）
-            current_level.render(
-                self.screen, self.camera_y + SCREEN_HEIGHT // 2
-            )  # 傳入玩家高度做視角調整
-
+            with FRAME_PROFILER.span("level.render"):
+                current_level.render(
+                    self.screen, self.camera_y + SCREEN_HEIGHT // 2
+                )  # 傳入玩家高度做視角調整\n
             # 畫藥水掉落物品（使用平滑的相機位置）
-            self.potion_drop_manager.draw(self.screen, 0, self.camera_y)
+            with FRAME_PROFILER.span("potion_drop_manager.draw"):
+                self.potion_drop_manager.draw(self.screen, 0, self.camera_y)
 
-            # 畫火球（使用平滑的相機位置）
-            self.fireball_manager.render_all(
-                self.screen, self.camera_y + SCREEN_HEIGHT // 2
-            )
-
-            # 畫冰球（使用平滑的相機位置）
-            self.iceball_manager.render_all(
-                self.screen, self.camera_y + SCREEN_HEIGHT // 2
-            )
+            # 畫火球和冰球（使用平滑的相機位置）
+            with FRAME_PROFILER.span("projectile_pool.render"):
+                self.projectile_pool.render_all(
+                    self.screen, self.camera_y + SCREEN_HEIGHT // 2
+                )
 
             # 畫玩家角色（使用平滑的相機位置）
-            self.player.render(
-                self.screen, self.camera_y + SCREEN_HEIGHT // 2
-            )  # 傳入視角偏移
-
+            with FRAME_PROFILER.span("player.render"):
+                self.player.render(
+                    self.screen, self.camera_y + SCREEN_HEIGHT // 2
+                )  # 傳入視角偏移\n
             # 畫 UI 資訊（血量、分數、關卡資訊、剩餘敵人數）
-            self.ui.draw_game_ui(self.screen, self.player, self.level_manager)
+            with FRAME_PROFILER.span("ui.draw_game_ui"):
+                self.ui.draw_game_ui(self.screen, self.player, self.level_manager)
 
         elif self.game_state == "paused":
             # 暫停時先畫遊戲畫面（但不更新），再畫暫停選單
@@ -850,14 +1323,32 @@ class MarioClimbingGame:
             self.ui.draw_game_over(self.screen)
 
         elif self.game_state == "victory":
-            # 繪製勝利畫面
+            # 繪製勝利畫面（星星動畫在 render() 另外畫）
             self.ui.draw_victory_screen(self.screen)
 
-        # 繪製效能監控資訊（在所有內容之上）
-        self.performance_monitor.draw_performance_overlay(self.screen)
-
-        # 更新顯示（把準備好的畫面顯示到螢幕）
-        pygame.display.flip()
+    def _get_static_scene_key(self):
+        """
+        取得靜態畫面的鍵值，給髒矩形模式判斷場景有沒有變\n
+        \n
+        暫停、遊戲結束和勝利畫面不會動（勝利畫面的星星另外畫），鍵值相同就沿用上次畫好的場景；\n
+        選單（選取框會閃）和遊戲中的畫面每幀都會變\n
+        \n
+        回傳:\n
+        tuple: 靜態畫面的鍵值，畫面會動時回傳 None\n
+        """
+        if self.game_state == "paused":
+            if not self.player:
+                return ("paused",)
+            return (
+                "paused",
+                self.level_manager.current_level_number,
+                self.camera_y,
+                self.player.x,
+                self.player.y,
+            )
+        if self.game_state in ("game_over", "victory"):
+            return (self.game_state,)
+        return None
 
     def run(self):
         """
@@ -870,35 +1361,349 @@ class MarioClimbingGame:
         4. 控制幀率\n
         \n
         這個方法會一直執行到遊戲結束\n
+        \n
+        採用固定時間步進（accumulator）：\n
+        - 累積實際經過的時間，每滿一個模擬步長就執行一次 update()\n
+        - 畫面卡頓後會補跑多個模擬步，讓遊戲速度維持即時\n
+        - 繪製時依剩餘時間比例在前後兩步之間插值，高更新率螢幕也能平滑顯示\n
         """
+        # 模擬頻率固定為 SIMULATION_RATE：物理、計時器的數值都是每幀的量，改頻率會直接改變遊戲速度
+        step_duration = 1.0 / SIMULATION_RATE
+        accumulator = 0.0
+        previous_time = time.perf_counter()
+        self.performance_monitor.start_sampling()
+
         while self.running:
+            frame_start = time.perf_counter()
+            frame_time = min(frame_start - previous_time, MAX_FRAME_TIME)
+            previous_time = frame_start
+            accumulator += frame_time
+
+            FRAME_PROFILER.begin_frame()
+
             # 1. 處理所有輸入事件
-            self.handle_events()
+            with FRAME_PROFILER.span("handle_events"):
+                self.handle_events()
 
-            # 2. 更新遊戲狀態
-            self.update()
+            # 2. 以固定步長更新遊戲狀態，落後時補跑
+            steps = 0
+            while accumulator >= step_duration and steps < MAX_CATCH_UP_STEPS:
+                self._capture_previous_positions()
+                self.update()
+                accumulator -= step_duration
+                steps += 1
 
-            # 3. 繪製畫面
-            self.render()
+            # 補跑上限用完還追不上，就丟掉多餘時間，避免死亡螺旋
+            if steps >= MAX_CATCH_UP_STEPS:
+                accumulator = 0.0
+
+            # 3. 繪製畫面（在前後兩個模擬步之間插值）
+            self.render(accumulator / step_duration)
+            FRAME_PROFILER.end_frame()
 
-            # 4. 限制幀率，確保遊戲穩定運行
-            self.performance_monitor.tick(FPS)
+            # 4. 控制繪製節奏（垂直同步時 flip() 已經等過，這裡只是保險）
+            if self.render_rate > 0:
+                self._wait_until(frame_start + 1.0 / self.render_rate)
+
+            # 記錄這一幀的時間給效能監控（不限速）
+            self.performance_monitor.tick(0)
 
         # 遊戲結束後清理資源
+        if self.replay_recorder:
+            self.replay_recorder.save()
+        self.performance_monitor.shutdown()
         pygame.quit()
         sys.exit()
 
+    def _get_refresh_rate(self) -> int:
+        """
+        取得螢幕更新率，舊版 pygame 或取不到時用 RENDER_RATE\n
+        \n
+        回傳:\n
+        int: 每秒更新次數\n
+        """
+        get_refresh_rates = getattr(pygame.display, "get_desktop_refresh_rates", None)
+        if get_refresh_rates:
+            try:
+                refresh_rates = get_refresh_rates()
+                if refresh_rates and refresh_rates[0] > 0:
+                    return refresh_rates[0]
+            except pygame.error:
+                pass
+        return RENDER_RATE
+
+    def _wait_until(self, target_time: float):
+        """
+        精準等待到指定時間點\n
+        \n
+        先用 sleep 讓出 CPU，最後幾毫秒改用忙碌迴圈，\n
+        避免作業系統 sleep 精度不足造成的畫面抖動\n
+        \n
+        參數:\n
+        target_time (float): 目標時間（time.perf_counter() 的秒數）\n
+        """
+        remaining = target_time - time.perf_counter()
+        if remaining > BUSY_WAIT_MARGIN:
+            time.sleep(remaining - BUSY_WAIT_MARGIN)
+        while time.perf_counter() < target_time:
+            pass
+
+    def _get_interpolated_objects(self) -> List[Tuple]:
+        """
+        取得需要做繪製插值的物件清單\n
+        \n
+        回傳:\n
+        List[Tuple]: (物件, x 屬性名稱, y 屬性名稱) 清單\n
+        """
+        if self.game_state not in ("playing", "paused") or not self.player:
+            return []
+
+        from src.traps.moving_platform import MovingPlatform
+
+        current_level = self.level_manager.get_current_level()
+        objects = [(self.player, "x", "y")]
+        objects.extend((enemy, "x", "y") for enemy in current_level.enemies)
+        objects.extend(
+            (trap, "current_x", "current_y")
+            for trap in current_level.traps
+            if isinstance(trap, MovingPlatform)
+        )
+        return objects
+
+    def _capture_previous_positions(self):
+        """
+        記錄模擬步開始前的物件位置\n
+        \n
+        每次 update() 之前呼叫，供 render() 在前後兩步之間插值\n
+        """
+        self.previous_camera_y = self.camera_y
+        self.previous_positions = [
+            (obj, x_attr, y_attr, getattr(obj, x_attr), getattr(obj, y_attr))
+            for obj, x_attr, y_attr in self._get_interpolated_objects()
+        ]
+        self.projectile_pool.capture_previous_positions()
+
+    def _apply_interpolation(self, alpha: float) -> List[Tuple]:
+        """
+        把物件位置暫時移到插值位置\n
+        \n
+        參數:\n
+        alpha (float): 插值比例，0 是上一步，1 是目前這一步\n
+        \n
+        回傳:\n
+        List[Tuple]: 原本的位置，繪製完交給 _restore_interpolation() 還原\n
+        """
+        saved = []
+        for obj, x_attr, y_attr, previous_x, previous_y in self.previous_positions:
+            current_x = getattr(obj, x_attr)
+            current_y = getattr(obj, y_attr)
+
+            # 瞬移（重生、換關）不插值，避免畫面拖影
+            if (
+                abs(current_x - previous_x) > INTERPOLATION_SNAP_DISTANCE
+                or abs(current_y - previous_y) > INTERPOLATION_SNAP_DISTANCE
+            ):
+                continue
+
+            saved.append((obj, x_attr, y_attr, current_x, current_y))
+            setattr(obj, x_attr, previous_x + (current_x - previous_x) * alpha)
+            setattr(obj, y_attr, previous_y + (current_y - previous_y) * alpha)
+
+        # 投射物的位置存在投射物引擎的陣列裡，整批一起插值
+        self.saved_projectile_positions = self.projectile_pool.apply_interpolation(
+            alpha, INTERPOLATION_SNAP_DISTANCE
+        )
+        return saved
+
+    def _restore_interpolation(self, saved: List[Tuple]):
+        """
+        還原插值前的物件位置\n
+        \n
+        參數:\n
+        saved (List[Tuple]): _apply_interpolation() 回傳的原始位置\n
+        """
+        for obj, x_attr, y_attr, x, y in saved:
+            setattr(obj, x_attr, x)
+            setattr(obj, y_attr, y)
+
+        if self.saved_projectile_positions is not None:
+            self.projectile_pool.restore_interpolation(self.saved_projectile_positions)
+            self.saved_projectile_positions = None
+
+    def step(self):
+        """
+        執行單一幀的遊戲邏輯\n
+        \n
+        處理事件並更新一次遊戲狀態，render_enabled 開啟時才繪製畫面\n
+        不會等待時鐘，呼叫者可以在緊密迴圈中連續呼叫\n
+        """
+        FRAME_PROFILER.begin_frame()
+        with FRAME_PROFILER.span("handle_events"):
+            self.handle_events()
+        self.update()
+        if self.render_enabled:
+            self.render()
+        FRAME_PROFILER.end_frame()
+
+    def run_headless(self, max_frames: int, speed_multiplier: float = 0) -> Dict:
+        """
+        以無視窗模式連續模擬指定幀數\n
+        \n
+        不受 60 FPS 時鐘限制，可用來做壓力測試和效能量測\n
+        \n
+        參數:\n
+        max_frames (int): 要模擬的幀數\n
+        speed_multiplier (float): 遊戲速度倍率，0 表示不限速，2 表示以 120 FPS 執行\n
+        \n
+        回傳:\n
+        Dict: 模擬結果，包含幀數、實際耗時、模擬 FPS 和相對 60 FPS 的倍速\n
+        """
+        frames = 0
+        start_time = time.perf_counter()
+
+        while self.running and frames < max_frames:
+            self.step()
+            frames += 1
+
+            # 有設定倍率才限速，否則盡可能快地執行
+            if speed_multiplier > 0:
+                self.performance_monitor.tick(FPS * speed_multiplier)
+
+        elapsed = time.perf_counter() - start_time
+        simulated_fps = frames / elapsed if elapsed > 0 else 0.0
+
+        return {
+            "frames": frames,
+            "elapsed_seconds": elapsed,
+            "simulated_fps": simulated_fps,
+            "realtime_factor": simulated_fps / FPS,
+            "game_state": self.game_state,
+        }
+
 
 ######################主程式進入點######################
+def print_allocation_report(tracker: AllocationTracker):
+    """
+    在終端機印出配置分析結果\n
+    \n
+    參數:\n
+    tracker (AllocationTracker): 已經跑過一段時間的配置分析器\n
+    """
+    print("各子系統每幀平均配置量:")
+    allocations = sorted(
+        tracker.get_average_allocations().items(), key=lambda item: item[1], reverse=True
+    )
+    for name_id, kilobytes in allocations:
+        print(f"  {FRAME_PROFILER.names[name_id]:<28} {kilobytes:8.1f} KB")
+    print(
+        f"GC 次數（第 0/1/2 代）: {tracker.gc_collections[0]}/{tracker.gc_collections[1]}/"
+        f"{tracker.gc_collections[2]}，暫停共 {tracker.gc_pause_ms:.1f}ms，"
+        f"最長 {tracker.gc_max_pause_ms:.1f}ms"
+    )
+    print("配置熱點:")
+    for site, size_diff, count_diff in tracker.top_sites:
+        print(f"  {site:<36} +{size_diff / 1024:.1f} KB ({count_diff:+d} 個物件)")
+
+
 def main():
     """
     主程式進入點\n
     \n
     建立遊戲實例並開始執行遊戲循環\n
+    \n
+    命令列參數:\n
+    --headless: 無視窗模擬，跑完指定幀數後印出模擬 FPS\n
+    --frames N: 無視窗模式要模擬的幀數（預設 3600，約 1 分鐘遊戲時間）\n
+    --speed X: 遊戲速度倍率，0 表示不限速\n
+    --render: 無視窗模式下仍執行繪製\n
+    --character N / --difficulty D: 無視窗模式使用的角色與難度\n
+    --render-rate N: 每秒繪製次數上限，預設 60（垂直同步時是螢幕更新率），0 表示不限制\n
+    --vsync: 啟用垂直同步\n
+    --dirty-rects: 髒矩形模式，靜態畫面不重畫，只把疊加層的範圍送到螢幕\n
+    --enemy-batch: 用 NumPy 批次引擎更新基本敵人\n
+    --update-lod: 畫面外的敵人和陷阱降低更新頻率\n
+    --frame-jobs: 可以延後的整理工作交給每幀 2 毫秒預算的工作排程（錄製和重播時停用）\n
+    --record PATH: 開始遊戲後把輸入錄製到重播檔\n
+    --seed N: 錄製用的亂數種子\n
+    --replay PATH: 播放重播檔（可搭配 --headless 做效能量測）\n
+    --seek N: 重播從第 N 幀開始\n
+    --profile-trace PATH: 無視窗模式下啟用幀分析器，結束時匯出 Chrome trace\n
+    --trace-allocations: 無視窗模式下開啟 tracemalloc 配置分析，結束時印出結果\n
     """
-    game = MarioClimbingGame()
-    game.run()
-
-
-# 直接執行主程式
-main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="瑪莉歐攀爬遊戲")
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--frames", type=int, default=3600)
+    parser.add_argument("--speed", type=float, default=0)
+    parser.add_argument("--render", action="store_true")
+    parser.add_argument("--character", type=int, default=0)
+    parser.add_argument("--difficulty", default="easy")
+    parser.add_argument("--render-rate", type=int)
+    parser.add_argument("--vsync", action="store_true")
+    parser.add_argument("--dirty-rects", action="store_true")
+    parser.add_argument("--enemy-batch", action="store_true")
+    parser.add_argument("--update-lod", action="store_true")
+    parser.add_argument("--frame-jobs", action="store_true")
+    parser.add_argument("--record")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--replay")
+    parser.add_argument("--seek", type=int, default=0)
+    parser.add_argument("--profile-trace")
+    parser.add_argument("--trace-allocations", action="store_true")
+    args = parser.parse_args()
+
+    if not args.headless:
+        game = MarioClimbingGame(
+            render_rate=args.render_rate,
+            vsync=args.vsync,
+            dirty_rects=args.dirty_rects,
+            enemy_batch=args.enemy_batch,
+            update_lod=args.update_lod,
+            frame_jobs=args.frame_jobs,
+        )
+        game.record_path = args.record
+        game.record_seed = args.seed
+        if args.replay:
+            game.start_replay(args.replay, args.seek)
+        game.run()
+        return
+
+    # 無視窗模式：直接進入遊戲（或重播）並連續模擬
+    game = MarioClimbingGame(
+        headless=True,
+        render_enabled=args.render,
+        enemy_batch=args.enemy_batch,
+        update_lod=args.update_lod,
+        frame_jobs=args.frame_jobs,
+    )
+    if args.replay:
+        game.start_replay(args.replay, args.seek)
+    else:
+        if args.record:
+            game.record_path = args.record
+            game.record_seed = args.seed
+        game.start_game_with_character(args.character, args.difficulty)
+    if args.profile_trace:
+        FRAME_PROFILER.set_enabled(True)
+    if args.trace_allocations:
+        game.performance_monitor.toggle_allocation_tracking()
+    result = game.run_headless(args.frames, args.speed)
+    if args.profile_trace:
+        game.export_profile_trace(args.profile_trace)
+    if args.trace_allocations:
+        print_allocation_report(game.performance_monitor.allocation_tracker)
+    if game.replay_recorder:
+        game.replay_recorder.save()
+    game.performance_monitor.shutdown()
+    pygame.quit()
+
+    print(
+        f"模擬 {result['frames']} 幀，耗時 {result['elapsed_seconds']:.2f} 秒，"
+        f"模擬 FPS: {result['simulated_fps']:.1f}（{result['realtime_factor']:.1f}x 即時）"
+    )
+
+
+# 直接執行主程式（被 import 時不啟動遊戲，方便當作函式庫使用）
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+######################載入套件######################
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pygame
+
+from src.assets.texture_atlas import AtlasRegion, TextureAtlas
+
+######################資源管理設定######################
+GLOBAL_SCOPE = "global"  # 沒有指定範圍時使用，永遠不會釋放（玩家、UI 等常駐圖片）
+RESIDENT_IMAGE_BYTES = 64 * 1024  # 原圖小於這個大小就常駐（tile、角色圖），釋放時只移除衍生版本
+
+
+######################圖片資源管理器######################
+class AssetManager:
+    """
+    全遊戲共用的圖片資源管理器\n
+    \n
+    負責：\n
+    1. 每個圖片檔只解碼一次，轉換格式後的圖片共用\n
+    2. 縮放、翻轉等衍生版本依 (路徑, 尺寸, 翻轉, 透明) 記住，不重複產生\n
+    3. 以「範圍」計算參考次數（例如每個關卡一個範圍），範圍釋放後沒人用的圖片才移除\n
+    4. 統計每張圖片佔用的記憶體\n
+    5. 可以在背景執行緒預先解碼圖片（只做檔案讀取和解碼，convert 留在主執行緒）\n
+    6. tile、角色等小圖片可以打包進圖集，用 get_region() 取得圖集區塊\n
+    \n
+    注意: 回傳的圖片是共用的，呼叫端不能直接修改（要加效果請先 copy()）\n
+    \n
+    屬性:\n
+    images (Dict): 圖片鍵值對應的 Surface\n
+    atlas (TextureAtlas): 小圖片共用的圖集\n
+    regions (Dict): (路徑, 尺寸, 翻轉, 色調) 對應的圖集區塊\n
+    ref_counts (Dict): 圖片鍵值對應的參考次數\n
+    decode_counts (Dict[str, int]): 每個檔案被解碼的次數\n
+    """
+
+    def __init__(self):
+        """
+        初始化資源管理器（背景解碼執行緒在第一次預先載入時才啟動）\n
+        """
+        self.images: Dict[tuple, pygame.Surface] = {}
+        self.ref_counts: Dict[tuple, int] = {}
+        self.decode_counts: Dict[str, int] = {}
+        self.atlas = TextureAtlas()
+        self.regions: Dict[tuple, AtlasRegion] = {}
+
+        # 範圍：名稱對應這個範圍取得過的圖片鍵值（可以重複，每次取得算一次參考）
+        self._scope_keys: Dict[str, List[tuple]] = {}
+        # 常駐範圍永遠不會釋放，每個鍵值只算一次參考（UI 每幀取得圖片也不會一直累積）
+        self._global_keys = set()
+        self._scope_stack: List[str] = []
+
+        # 背景解碼（已解碼、還沒 convert 的圖片）
+        self._decoded: Dict[str, pygame.Surface] = {}
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._queue = queue.Queue()
+        self._thread = None
+
+    ######################取得圖片######################
+    def get_image(
+        self,
+        path: str,
+        size: Optional[Tuple[int, int]] = None,
+        flip_x: bool = False,
+        alpha: bool = True,
+        scope: str = None,
+    ) -> pygame.Surface:
+        """
+        取得圖片（或它的縮放、翻轉版本），第一次用到才載入或產生\n
+        \n
+        失敗時和 pygame.image.load 一樣丟出 pygame.error 或 FileNotFoundError\n
+        \n
+        參數:\n
+        path (str): 圖片檔案路徑\n
+        size (Tuple[int, int]): 縮放尺寸，None 表示原尺寸\n
+        flip_x (bool): 是否左右翻轉\n
+        alpha (bool): True 用 convert_alpha()，False 用 convert()\n
+        scope (str): 參考次數記在哪個範圍，None 表示目前 scope() 區塊的範圍\n
+        \n
+        回傳:\n
+        pygame.Surface: 共用的圖片（不可修改）\n
+        """
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+        key = (path, size, flip_x, alpha)
+        surface = self._get_variant(key)
+
+        # 記錄參考
+        if scope is None:
+            scope = self._scope_stack[-1] if self._scope_stack else GLOBAL_SCOPE
+        if scope == GLOBAL_SCOPE:
+            if key not in self._global_keys:
+                self._global_keys.add(key)
+                self.ref_counts[key] = self.ref_counts.get(key, 0) + 1
+            return surface
+        self.ref_counts[key] = self.ref_counts.get(key, 0) + 1
+        self._scope_keys.setdefault(scope, []).append(key)
+        return surface
+
+    def _get_variant(self, key: tuple) -> pygame.Surface:
+        """
+        取得圖片版本，沒有就從原圖產生（不增加參考次數）\n
+        \n
+        參數:\n
+        key (tuple): (路徑, 尺寸, 翻轉, 透明)\n
+        \n
+        回傳:\n
+        pygame.Surface: 圖片\n
+        """
+        surface = self.images.get(key)
+        if surface is not None:
+            return surface
+
+        path, size, flip_x, alpha = key
+        if flip_x:
+            # 翻轉版本從同尺寸的版本產生
+            surface = pygame.transform.flip(
+                self._get_variant((path, size, False, alpha)), True, False
+            )
+        elif size is not None:
+            surface = self._get_variant((path, None, False, alpha))
+            if surface.get_size() != size:
+                surface = pygame.transform.scale(surface, size)
+        else:
+            decoded = self._decode(path)
+            surface = decoded.convert_alpha() if alpha else decoded.convert()
+
+        self.images[key] = surface
+        return surface
+
+    def _decode(self, path: str) -> pygame.Surface:
+        """
+        取得解碼後的圖片，背景執行緒已經解碼就直接拿走\n
+        \n
+        解碼結果只在轉換格式前用一次，拿走後就不保留，避免同一張圖佔兩份記憶體\n
+        \n
+        參數:\n
+        path (str): 圖片檔案路徑\n
+        \n
+        回傳:\n
+        pygame.Surface: 還沒 convert 的圖片\n
+        """
+        with self._lock:
+            decoded = self._decoded.pop(path, None)
+        if decoded is None:
+            decoded = pygame.image.load(path)
+            self.decode_counts[path] = self.decode_counts.get(path, 0) + 1
+        return decoded
+
+    ######################圖集區塊######################
+    def get_region(
+        self,
+        path: str,
+        size: Optional[Tuple[int, int]] = None,
+        flip_x: bool = False,
+        tint: Optional[Tuple[Tuple[int, int, int, int], int]] = None,
+    ) -> AtlasRegion:
+        """
+        取得圖片在圖集中的區塊，第一次用到才打包\n
+        \n
+        圖集區塊永遠常駐，不記參考次數；打包後不再需要的縮放版本會從 images 移除，\n
+        同一份像素只留在圖集裡\n
+        \n
+        失敗時和 get_image 一樣丟出 pygame.error 或 FileNotFoundError\n
+        \n
+        參數:\n
+        path (str): 圖片檔案路徑\n
+        size (Tuple[int, int]): 縮放尺寸，None 表示原尺寸\n
+        flip_x (bool): 是否左右翻轉\n
+        tint (tuple): 預先套用的色調 (RGBA, 混色模式)，例如 ((255, 255, 255, 30), pygame.BLEND_RGBA_ADD)\n
+        \n
+        回傳:\n
+        AtlasRegion: 圖集區塊（不可修改，要加效果請先 copy()）\n
+        """
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+        key = (path, size, flip_x, tint)
+        region = self.regions.get(key)
+        if region is not None:
+            return region
+
+        variant_key = (path, size, flip_x, True)
+        surface = self._get_variant(variant_key)
+        if tint is not None:
+            color, blend_flags = tint
+            overlay = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+            overlay.fill(color)
+            surface = surface.copy()
+            surface.blit(overlay, (0, 0), special_flags=blend_flags)
+
+        if self.atlas.can_pack(surface):
+            page, rect = self.atlas.pack(surface)
+            region = AtlasRegion(key, page, rect)
+            # 衍生版本的像素已經在圖集裡，沒有人用 get_image 取得的話就不再保留
+            is_original = size is None and not flip_x
+            if not is_original and not self.ref_counts.get(variant_key):
+                self.images.pop(variant_key, None)
+        else:
+            region = AtlasRegion(key, surface, surface.get_rect())
+        self.regions[key] = region
+        return region
+
+    def get_image_size(self, path: str) -> Tuple[int, int]:
+        """
+        取得原圖尺寸（會載入原圖，但不增加參考次數）\n
+        \n
+        參數:\n
+        path (str): 圖片檔案路徑\n
+        \n
+        回傳:\n
+        Tuple[int, int]: 寬高\n
+        """
+        return self._get_variant((path, None, False, True)).get_size()
+
+    ######################參考範圍######################
+    @contextmanager
+    def scope(self, name: str):
+        """
+        在 with 區塊內取得的圖片都記在這個範圍\n
+        \n
+        參數:\n
+        name (str): 範圍名稱，例如 "level_3"\n
+        """
+        self._scope_stack.append(name)
+        try:
+            yield
+        finally:
+            self._scope_stack.pop()
+
+    @property
+    def current_scope(self) -> Optional[str]:
+        """
+        目前 with scope() 區塊的範圍名稱，不在任何區塊內時是 None\n
+        """
+        return self._scope_stack[-1] if self._scope_stack else None
+
+    def release_scope(self, name: str):
+        """
+        釋放範圍內的所有參考，參考歸零的圖片檔會移除所有版本，\n
+        但小張的原圖會保留，之後的關卡再用到不需要重新解碼（大張背景圖才真的釋放）\n
+        \n
+        參數:\n
+        name (str): 範圍名稱\n
+        """
+        if name == GLOBAL_SCOPE:
+            return
+        released_paths = set()
+        for key in self._scope_keys.pop(name, []):
+            count = self.ref_counts.get(key, 0) - 1
+            if count > 0:
+                self.ref_counts[key] = count
+            else:
+                self.ref_counts.pop(key, None)
+            released_paths.add(key[0])
+
+        # 一個檔案的所有版本都沒人用了，才整個移除
+        for path in released_paths:
+            path_keys = [key for key in self.images if key[0] == path]
+            if any(self.ref_counts.get(key) for key in path_keys):
+                continue
+            for key in path_keys:
+                surface = self.images[key]
+                is_original = key[1] is None and not key[2]
+                if is_original and self._get_surface_bytes(surface) <= RESIDENT_IMAGE_BYTES:
+                    continue
+                del self.images[key]
+
+    ######################背景預先解碼######################
+    def prefetch(self, paths: Iterable[str]):
+        """
+        要求背景執行緒預先解碼這些圖片（已載入、已解碼或排隊中的會略過）\n
+        \n
+        參數:\n
+        paths (Iterable[str]): 圖片檔案路徑\n
+        """
+        loaded_paths = {key[0] for key in self.images}
+        queued = False
+        with self._lock:
+            for path in paths:
+                if path in loaded_paths or path in self._decoded or path in self._pending:
+                    continue
+                self._pending.add(path)
+                self._queue.put(path)
+                queued = True
+        if queued and not (self._thread and self._thread.is_alive()):
+            self._thread = threading.Thread(
+                target=self._run_prefetch, name="asset-prefetch", daemon=True
+            )
+            self._thread.start()
+
+    def is_ready(self, paths: Iterable[str]) -> bool:
+        """
+        檢查這些圖片是否都已經解碼完成（解碼失敗的也算完成）\n
+        \n
+        參數:\n
+        paths (Iterable[str]): 圖片檔案路徑\n
+        \n
+        回傳:\n
+        bool: 是否沒有還在排隊的圖片\n
+        """
+        with self._lock:
+            return not any(path in self._pending for path in paths)
+
+    def _run_prefetch(self):
+        """
+        背景執行緒主迴圈：依序解碼排隊中的圖片\n
+        """
+        while True:
+            path = self._queue.get()
+            try:
+                surface = pygame.image.load(path)
+            except (pygame.error, FileNotFoundError):
+                # 解碼失敗就交給主執行緒當場載入，錯誤訊息由原本的載入流程處理
+                surface = None
+            with self._lock:
+                if surface is not None:
+                    self._decoded[path] = surface
+                    self.decode_counts[path] = self.decode_counts.get(path, 0) + 1
+                self._pending.discard(path)
+
+    ######################記憶體統計######################
+    def get_memory_report(self) -> List[Dict]:
+        """
+        取得每張圖片的記憶體用量，由大到小排序\n
+        \n
+        回傳:\n
+        List[Dict]: 每筆包含 path、size、flip_x、ref_count、bytes\n
+        """
+        report = []
+        for key, surface in self.images.items():
+            path, size, flip_x, _ = key
+            report.append(
+                {
+                    "path": path,
+                    "size": surface.get_size(),
+                    "flip_x": flip_x,
+                    "ref_count": self.ref_counts.get(key, 0),
+                    "bytes": self._get_surface_bytes(surface),
+                }
+            )
+        for index, page in enumerate(self.atlas.pages):
+            report.append(
+                {
+                    "path": f"<圖集 {index}>",
+                    "size": page.get_size(),
+                    "flip_x": False,
+                    "ref_count": 0,
+                    "bytes": self._get_surface_bytes(page),
+                }
+            )
+        report.sort(key=lambda entry: entry["bytes"], reverse=True)
+        return report
+
+    def get_total_bytes(self) -> int:
+        """
+        計算所有圖片和圖集頁面佔用的像素記憶體\n
+        \n
+        回傳:\n
+        int: 位元組數\n
+        """
+        # 縮放到原尺寸的版本和原圖是同一個 Surface，只算一次
+        unique_surfaces = {id(surface): surface for surface in self.images.values()}
+        image_bytes = sum(self._get_surface_bytes(surface) for surface in unique_surfaces.values())
+        return image_bytes + self.atlas.get_total_bytes()
+
+    def _get_surface_bytes(self, surface: pygame.Surface) -> int:
+        """
+        計算圖片的像素記憶體\n
+        \n
+        參數:\n
+        surface (pygame.Surface): 圖片\n
+        \n
+        回傳:\n
+        int: 位元組數\n
+        """
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+# 全遊戲共用的資源管理器，各模組直接 import 使用
+ASSET_MANAGER = AssetManager()
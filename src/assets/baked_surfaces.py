@@ -0,0 +1,110 @@
+######################載入套件######################
+from collections import OrderedDict
+from typing import Callable, Dict
+
+import pygame
+
+######################預先合成設定######################
+BAKED_SURFACE_CAPACITY = 256  # 最多保留幾張合成好的圖片
+FLASH_LEVELS = 4  # 閃爍效果量化成幾個等級（每個等級各合成一張）
+FLASH_DURATION = 20  # 陷阱觸發後閃爍的幀數（和 BaseTrap.trigger 一致）
+
+
+def get_flash_level(flash_timer: int) -> int:
+    """
+    把閃爍計時器量化成固定的幾個等級，讓閃爍效果也能預先合成\n
+    \n
+    參數:\n
+    flash_timer (int): 剩餘閃爍幀數\n
+    \n
+    回傳:\n
+    int: 0 表示沒有閃爍，1~FLASH_LEVELS 越大越強\n
+    """
+    if flash_timer <= 0:
+        return 0
+    return min(FLASH_LEVELS, -(-flash_timer * FLASH_LEVELS // FLASH_DURATION))
+
+
+######################合成圖片快取######################
+class BakedSurfaceCache:
+    """
+    tile 拼接物件的合成圖片 LRU 快取\n
+    \n
+    平台、尖刺、火焰牆都是用 tile 重複拼出來的，每幀重新拼接要 blit 很多次，\n
+    還要為邊緣的半塊 tile 和變色效果配置暫時圖片。\n
+    這裡把整個物件（連同它有限的幾種外觀：強度、量化後的閃爍等級）合成成一張圖片，\n
+    之後繪製只要一次 blit。同樣大小、同樣外觀的物件共用同一張\n
+    \n
+    鍵值由呼叫端決定，必須包含所有會影響外觀的參數（tile、尺寸、效果等級）\n
+    \n
+    注意: 回傳的圖片是共用的，呼叫端不能直接修改\n
+    \n
+    屬性:\n
+    capacity (int): 最多保留的圖片數量\n
+    hits (int): 快取命中次數\n
+    misses (int): 快取未命中（實際合成）次數\n
+    """
+
+    def __init__(self, capacity: int = BAKED_SURFACE_CAPACITY):
+        """
+        初始化合成圖片快取\n
+        \n
+        參數:\n
+        capacity (int): 最多保留的圖片數量\n
+        """
+        self.capacity = capacity
+        self._surfaces: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, bake: Callable[..., pygame.Surface], *args) -> pygame.Surface:
+        """
+        取得合成好的圖片，快取裡沒有才呼叫 bake(*args) 合成\n
+        \n
+        參數:\n
+        key (tuple): 外觀鍵值\n
+        bake (Callable): 合成函式，回傳合成好的圖片\n
+        *args: 傳給合成函式的參數（例如效果等級）\n
+        \n
+        回傳:\n
+        pygame.Surface: 合成好的圖片（共用，不可修改）\n
+        """
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = bake(*args)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.capacity:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        取得快取統計資料\n
+        \n
+        回傳:\n
+        Dict[str, float]: 命中、未命中、目前圖片數量和佔用的位元組數\n
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._surfaces),
+            "bytes": sum(
+                surface.get_width() * surface.get_height() * surface.get_bytesize()
+                for surface in self._surfaces.values()
+            ),
+        }
+
+    def clear(self):
+        """
+        清空快取（計數器保留）\n
+        """
+        self._surfaces.clear()
+
+
+# 全遊戲共用的合成圖片快取，各模組直接 import 使用
+BAKED_SURFACES = BakedSurfaceCache()
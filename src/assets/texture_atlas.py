@@ -0,0 +1,213 @@
+######################載入套件######################
+from typing import List, Optional, Tuple
+
+import pygame
+
+######################圖集設定######################
+ATLAS_PAGE_SIZE = (1024, 1024)  # 每張圖集頁面的大小
+ATLAS_MAX_REGION = 256  # 寬或高超過這個大小的圖片不放進圖集（背景圖等）
+ATLAS_PADDING = 1  # 區塊之間保留的空白像素，避免相鄰圖片互相滲色
+
+
+######################圖集區塊######################
+class AtlasRegion:
+    """
+    圖集中的一塊區域（圖片的「把手」）\n
+    \n
+    繪製時用 screen.blit(region.surface, 位置, region.rect)，\n
+    只畫出一部分時把 region.rect 縮小成要的大小即可，不需要另外建立裁切圖片\n
+    \n
+    序列化時只存產生這塊區域的參數，還原時向資源管理器重新取得，\n
+    所以回放的關鍵幀不會把整張圖集頁面存進去\n
+    \n
+    屬性:\n
+    key (tuple): (路徑, 尺寸, 翻轉, 色調)，資源管理器用來查表\n
+    surface (pygame.Surface): 所在的圖集頁面（或放不進圖集的獨立圖片）\n
+    rect (pygame.Rect): 在頁面上的位置和大小\n
+    """
+
+    __slots__ = ("key", "surface", "rect")
+
+    def __init__(self, key: tuple, surface: pygame.Surface, rect: pygame.Rect):
+        """
+        初始化圖集區塊\n
+        \n
+        參數:\n
+        key (tuple): 區塊鍵值\n
+        surface (pygame.Surface): 圖集頁面\n
+        rect (pygame.Rect): 在頁面上的位置和大小\n
+        """
+        self.key = key
+        self.surface = surface
+        self.rect = rect
+
+    def get_size(self) -> Tuple[int, int]:
+        """
+        取得區塊大小（和 Surface.get_size() 用法相同）\n
+        \n
+        回傳:\n
+        Tuple[int, int]: 寬高\n
+        """
+        return self.rect.size
+
+    def copy(self) -> pygame.Surface:
+        """
+        複製成獨立的圖片，要加閃爍、變色等效果時使用\n
+        \n
+        回傳:\n
+        pygame.Surface: 可以修改的圖片\n
+        """
+        return self.surface.subsurface(self.rect).copy()
+
+    def __reduce__(self):
+        return (_load_region, self.key)
+
+
+def _load_region(path: str, size, flip_x: bool, tint) -> AtlasRegion:
+    """
+    回放還原時重新取得圖集區塊\n
+    \n
+    參數:\n
+    path (str): 圖片檔案路徑\n
+    size (Tuple[int, int]): 縮放尺寸\n
+    flip_x (bool): 是否左右翻轉\n
+    tint (tuple): 色調 (RGBA, 混色模式)\n
+    \n
+    回傳:\n
+    AtlasRegion: 目標遊戲的圖集區塊\n
+    """
+    from src.assets.asset_manager import ASSET_MANAGER
+
+    return ASSET_MANAGER.get_region(path, size, flip_x, tint)
+
+
+######################圖集打包器######################
+class TextureAtlas:
+    """
+    把許多小圖片打包進少數幾張大圖集頁面\n
+    \n
+    使用「架子」演算法：每張頁面由上往下分成好幾層架子，\n
+    圖片放進高度夠、寬度還有空間的架子，都放不下就開新架子，頁面滿了就開新頁面\n
+    \n
+    頁面只會增加不會回收（放進來的都是 tile、角色這類常駐的小圖片）\n
+    \n
+    屬性:\n
+    page_size (Tuple[int, int]): 頁面大小\n
+    pages (List[pygame.Surface]): 圖集頁面\n
+    region_count (int): 已打包的圖片數量\n
+    """
+
+    def __init__(self, page_size: Tuple[int, int] = ATLAS_PAGE_SIZE):
+        """
+        初始化圖集（第一次打包時才建立頁面）\n
+        \n
+        參數:\n
+        page_size (Tuple[int, int]): 頁面大小\n
+        """
+        self.page_size = page_size
+        self.pages: List[pygame.Surface] = []
+        self.region_count = 0
+
+        # 每張頁面的架子 [架子頂端 y, 架子高度, 下一個可用 x]
+        self._shelves: List[List[List[int]]] = []
+
+    def can_pack(self, surface: pygame.Surface) -> bool:
+        """
+        檢查圖片是否適合放進圖集\n
+        \n
+        參數:\n
+        surface (pygame.Surface): 圖片\n
+        \n
+        回傳:\n
+        bool: 寬高都不超過 ATLAS_MAX_REGION\n
+        """
+        width, height = surface.get_size()
+        return 0 < width <= ATLAS_MAX_REGION and 0 < height <= ATLAS_MAX_REGION
+
+    def pack(self, surface: pygame.Surface) -> Tuple[pygame.Surface, pygame.Rect]:
+        """
+        把圖片複製進圖集\n
+        \n
+        參數:\n
+        surface (pygame.Surface): 要打包的圖片（呼叫前先用 can_pack 檢查）\n
+        \n
+        回傳:\n
+        Tuple[pygame.Surface, pygame.Rect]: 所在頁面和位置\n
+        """
+        width, height = surface.get_size()
+        for page_index in range(len(self.pages)):
+            position = self._find_space(page_index, width, height)
+            if position is not None:
+                break
+        else:
+            page_index = self._add_page()
+            position = self._find_space(page_index, width, height)
+
+        page = self.pages[page_index]
+        # 頁面是全透明的，用 MAX 混色等於直接複製像素（包含半透明的邊緣）
+        page.blit(surface, position, special_flags=pygame.BLEND_RGBA_MAX)
+        self.region_count += 1
+        return page, pygame.Rect(position, (width, height))
+
+    def _find_space(self, page_index: int, width: int, height: int) -> Optional[Tuple[int, int]]:
+        """
+        在頁面上找一塊放得下的空間\n
+        \n
+        參數:\n
+        page_index (int): 頁面編號\n
+        width (int): 圖片寬度\n
+        height (int): 圖片高度\n
+        \n
+        回傳:\n
+        Tuple[int, int]: 左上角位置，放不下時回傳 None\n
+        """
+        page_width, page_height = self.page_size
+        padded_width = width + ATLAS_PADDING
+        padded_height = height + ATLAS_PADDING
+        shelves = self._shelves[page_index]
+
+        # 先找高度最接近的架子，減少浪費的空間
+        best_shelf = None
+        for shelf in shelves:
+            top, shelf_height, next_x = shelf
+            if shelf_height >= padded_height and next_x + padded_width <= page_width:
+                if best_shelf is None or shelf_height < best_shelf[1]:
+                    best_shelf = shelf
+        if best_shelf is not None:
+            position = (best_shelf[2], best_shelf[0])
+            best_shelf[2] += padded_width
+            return position
+
+        # 開一層新架子
+        next_top = shelves[-1][0] + shelves[-1][1] if shelves else 0
+        if next_top + padded_height > page_height:
+            return None
+        shelves.append([next_top, padded_height, padded_width])
+        return (0, next_top)
+
+    def _add_page(self) -> int:
+        """
+        建立新的全透明頁面\n
+        \n
+        回傳:\n
+        int: 新頁面的編號\n
+        """
+        page = pygame.Surface(self.page_size, pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            # 轉成和螢幕相同的像素格式，繪製時不用再轉換
+            page = page.convert_alpha()
+            page.fill((0, 0, 0, 0))
+        self.pages.append(page)
+        self._shelves.append([])
+        return len(self.pages) - 1
+
+    def get_total_bytes(self) -> int:
+        """
+        計算所有頁面佔用的像素記憶體\n
+        \n
+        回傳:\n
+        int: 位元組數\n
+        """
+        return sum(
+            page.get_width() * page.get_height() * page.get_bytesize() for page in self.pages
+        )
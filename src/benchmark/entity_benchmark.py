@@ -0,0 +1,351 @@
+######################載入套件######################
+import gc
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pygame
+
+######################實體記憶體測試設定######################
+DEFAULT_ENTITY_COUNT = 1000  # 每種實體建立的數量
+DEFAULT_ACCESS_ROUNDS = 200  # 屬性讀寫量測的輪數（每輪讀寫所有實體的熱門屬性一次）
+DEFAULT_REPEATS = 5  # 讀寫量測重複次數，取最快的一次（和 timeit 相同，排除其他程式的干擾）
+DEFAULT_THRESHOLD = 0.10  # 記憶體變多或讀寫變慢超過 10% 視為退步
+
+
+def _entity_specs() -> Dict[str, Tuple[Callable[[int], object], Tuple[str, ...]]]:
+    """
+    要量測的實體種類：建立函式（參數是第幾個）和每幀最常讀寫的屬性\n
+    \n
+    回傳:\n
+    Dict: 實體名稱對應 (建立函式, 熱門屬性)\n
+    """
+    from src.characters.player import Player
+    from src.enemies.basic_enemy import BasicEnemy
+    from src.enemies.boss import Boss
+    from src.equipment.potion import Potion
+    from src.levels.platform import Platform
+    from src.traps.fire_wall import FireWall
+    from src.traps.moving_platform import MovingPlatform
+    from src.traps.spike import Spike
+
+    return {
+        "player": (
+            lambda i: Player(i * 10, 300, i % 3),
+            ("x", "y", "velocity_x", "velocity_y", "health", "is_on_ground", "attack_cooldown", "width"),
+        ),
+        "basic_enemy": (
+            lambda i: BasicEnemy(i * 40, 300),
+            ("x", "y", "velocity_x", "velocity_y", "health", "ai_state", "is_dead", "facing_direction"),
+        ),
+        "boss": (
+            lambda i: Boss(i * 100, 300),
+            ("x", "y", "velocity_x", "health", "phase", "is_casting_skill", "cast_timer", "facing_direction"),
+        ),
+        "potion": (
+            lambda i: Potion(i * 30, 300, ("healing", "shield", "attack")[i % 3]),
+            ("x", "y", "lifetime", "float_offset", "pulse_timer", "glow_intensity"),
+        ),
+        "platform": (
+            lambda i: Platform(i * 200, 500, 150, 20),
+            ("x", "y", "width", "height", "is_active", "platform_type"),
+        ),
+        "spike": (
+            lambda i: Spike(i * 60, 480, 40, 20),
+            ("x", "y", "width", "height", "is_active", "trigger_cooldown"),
+        ),
+        "fire_wall": (
+            lambda i: FireWall(i * 100, 400, 40, 80),
+            ("x", "y", "width", "height", "is_active", "flame_phase", "pulsing_intensity"),
+        ),
+        "moving_platform": (
+            lambda i: MovingPlatform(i * 200, 400, 100, 20, i * 200 + 150, 400),
+            ("x", "y", "current_x", "current_y", "velocity_x", "velocity_y", "is_moving_to_end"),
+        ),
+    }
+
+
+######################記憶體量測######################
+def measure_instance_bytes(entity) -> int:
+    """
+    物件本身佔用的位元組（物件 + 屬性字典，不含屬性值）\n
+    \n
+    參數:\n
+    entity: 要量測的物件\n
+    \n
+    回傳:\n
+    int: 位元組數\n
+    """
+    attribute_dict = getattr(entity, "__dict__", None)
+    size = sys.getsizeof(entity)
+    if attribute_dict is not None:
+        size += sys.getsizeof(attribute_dict)
+    return size
+
+
+def measure_allocated_bytes(factory: Callable[[int], object], count: int) -> Tuple[float, List]:
+    """
+    用 tracemalloc 量測建立一個實體平均配置的記憶體\n
+    \n
+    先建立一個實體暖身，讓圖集、字型這些共用快取先載入，量到的只有每個實體自己的部分\n
+    （物件、屬性字典、每個實體各自的 list / dict / 陣列）\n
+    \n
+    參數:\n
+    factory (Callable): 建立函式\n
+    count (int): 建立數量\n
+    \n
+    回傳:\n
+    Tuple[float, List]: (每個實體平均配置的位元組, 建立的實體)\n
+    """
+    factory(0)
+    gc.collect()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return (after - before - sys.getsizeof(entities)) / count, entities
+
+
+######################屬性讀寫量測######################
+def _compile_access_loop(names: Tuple[str, ...], write: bool) -> Callable[[List], None]:
+    """
+    產生直接讀寫屬性的迴圈（和遊戲程式一樣用 entity.x 的寫法，不經過 getattr）\n
+    \n
+    參數:\n
+    names (Tuple[str, ...]): 屬性名稱\n
+    write (bool): True 量測寫入（寫回原本的值），False 量測讀取\n
+    \n
+    回傳:\n
+    Callable[[List], None]: 讀寫所有實體一次的函式\n
+    """
+    if write:
+        body = "".join(f"        entity.{name} = entity.{name}\n" for name in names)
+    else:
+        body = "".join(f"        entity.{name}\n" for name in names)
+    namespace = {}
+    exec(f"def access(entities):\n    for entity in entities:\n{body}", namespace)
+    return namespace["access"]
+
+
+def measure_attribute_access(
+    entities: List, names: Tuple[str, ...], rounds: int, write: bool, repeats: int = DEFAULT_REPEATS
+) -> float:
+    """
+    量測屬性讀寫的吞吐量\n
+    \n
+    參數:\n
+    entities (List): 實體\n
+    names (Tuple[str, ...]): 屬性名稱\n
+    rounds (int): 每次量測的輪數\n
+    write (bool): 量測寫入或讀取\n
+    repeats (int): 重複量測次數，取最快的一次\n
+    \n
+    回傳:\n
+    float: 每秒讀寫次數（百萬次）\n
+    """
+    access = _compile_access_loop(names, write)
+    access(entities)  # 暖身
+
+    elapsed = None
+    gc.disable()
+    try:
+        for _ in range(max(1, repeats)):
+            start = time.perf_counter_ns()
+            for _ in range(rounds):
+                access(entities)
+            duration = time.perf_counter_ns() - start
+            elapsed = duration if elapsed is None else min(elapsed, duration)
+    finally:
+        gc.enable()
+
+    operations = len(entities) * len(names) * rounds
+    return operations / (elapsed / 1_000) if elapsed > 0 else 0.0
+
+
+def run_entity_benchmark(name: str, count: int, rounds: int, repeats: int = DEFAULT_REPEATS) -> Dict:
+    """
+    量測一種實體的記憶體和屬性讀寫\n
+    \n
+    參數:\n
+    name (str): 實體名稱（_entity_specs 的鍵值）\n
+    count (int): 建立數量\n
+    rounds (int): 屬性讀寫量測輪數\n
+    repeats (int): 屬性讀寫量測重複次數\n
+    \n
+    回傳:\n
+    Dict: 量測結果\n
+    """
+    factory, names = _entity_specs()[name]
+    allocated_bytes, entities = measure_allocated_bytes(factory, count)
+    return {
+        "count": count,
+        "has_dict": hasattr(entities[0], "__dict__"),
+        "instance_bytes": measure_instance_bytes(entities[0]),
+        "allocated_bytes": allocated_bytes,
+        "attributes": list(names),
+        "read_mops": measure_attribute_access(entities, names, rounds, False, repeats),
+        "write_mops": measure_attribute_access(entities, names, rounds, True, repeats),
+    }
+
+
+######################結果比較######################
+# 比較的數值和「越大越好」與否
+COMPARED_METRICS = (
+    ("instance_bytes", False),
+    ("allocated_bytes", False),
+    ("read_mops", True),
+    ("write_mops", True),
+)
+
+
+def compare_with_baseline(
+    results: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD
+) -> List[Dict]:
+    """
+    和基準結果比較，找出記憶體變多或讀寫變慢的項目\n
+    \n
+    參數:\n
+    results (Dict): 這次的結果\n
+    baseline (Dict): 基準結果\n
+    threshold (float): 允許的退步比例\n
+    \n
+    回傳:\n
+    List[Dict]: 退步項目清單，每項包含實體、統計值和變化比例\n
+    """
+    regressions = []
+    for entity_name, entity_result in results["entities"].items():
+        baseline_entity = baseline.get("entities", {}).get(entity_name)
+        if not baseline_entity:
+            continue
+
+        for metric, higher_is_better in COMPARED_METRICS:
+            old_value = baseline_entity[metric]
+            new_value = entity_result[metric]
+            if old_value <= 0:
+                continue
+            change = (new_value - old_value) / old_value
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(
+                    {
+                        "entity": entity_name,
+                        "metric": metric,
+                        "baseline": old_value,
+                        "current": new_value,
+                        "change": change,
+                    }
+                )
+    return regressions
+
+
+def print_results(results: Dict, baseline: Optional[Dict] = None):
+    """
+    印出各實體的量測結果表格\n
+    \n
+    參數:\n
+    results (Dict): 量測結果\n
+    baseline (Dict): 基準結果，有的話會一併印出位元組和讀取速度的變化\n
+    """
+    print(
+        f"{'實體':<16} {'dict':>5} {'物件B':>7} {'配置B':>9} {'讀M/s':>8} {'寫M/s':>8}  變化（配置 / 讀取）"
+    )
+    for entity_name, stats in results["entities"].items():
+        change_text = ""
+        old_stats = (baseline or {}).get("entities", {}).get(entity_name)
+        if old_stats and old_stats["allocated_bytes"] > 0 and old_stats["read_mops"] > 0:
+            byte_change = (stats["allocated_bytes"] - old_stats["allocated_bytes"]) / old_stats["allocated_bytes"]
+            read_change = (stats["read_mops"] - old_stats["read_mops"]) / old_stats["read_mops"]
+            change_text = f"{byte_change:+.1%} / {read_change:+.1%}"
+        print(
+            f"{entity_name:<18} {'有' if stats['has_dict'] else '無':>4} {stats['instance_bytes']:8d} "
+            f"{stats['allocated_bytes']:10.0f} {stats['read_mops']:9.1f} {stats['write_mops']:9.1f}  {change_text}"
+        )
+
+
+######################命令列進入點######################
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    實體記憶體測試命令列進入點\n
+    \n
+    用法: python -m src.benchmark.entity_benchmark --output result.json --baseline baseline.json\n
+    \n
+    參數:\n
+    argv (List[str]): 命令列參數，None 表示使用 sys.argv\n
+    \n
+    回傳:\n
+    int: 結束代碼，有退步時回傳 1\n
+    """
+    entity_names = list(_entity_specs())
+
+    parser = argparse.ArgumentParser(description="瑪莉歐攀爬遊戲實體記憶體和屬性讀寫測試")
+    parser.add_argument("--entities", nargs="+", choices=entity_names, default=entity_names)
+    parser.add_argument("--count", type=int, default=DEFAULT_ENTITY_COUNT)
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ACCESS_ROUNDS)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--output", default="entity_benchmark_results.json")
+    parser.add_argument("--baseline", help="基準結果 JSON，用來比較改版前後")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    # 建立實體時會載入圖片，需要先有顯示模式
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    entities = {
+        name: run_entity_benchmark(name, args.count, args.rounds, args.repeats)
+        for name in args.entities
+    }
+    pygame.quit()
+
+    results = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "count": args.count,
+            "rounds": args.rounds,
+            "repeats": args.repeats,
+        },
+        "entities": entities,
+    }
+
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(results, output_file, ensure_ascii=False, indent=2)
+    print(f"實體記憶體測試結果已寫入: {args.output}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+
+    print_results(results, baseline)
+
+    if baseline is None:
+        return 0
+
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+    if not regressions:
+        print(f"沒有超過 {args.threshold:.0%} 的退步")
+        return 0
+
+    print(f"發現 {len(regressions)} 項退步（門檻 {args.threshold:.0%}）：")
+    for item in regressions:
+        print(
+            f"  {item['entity']} {item['metric']}: "
+            f"{item['baseline']:.1f} → {item['current']:.1f} ({item['change']:+.1%})"
+        )
+    return 1
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    sys.exit(main())
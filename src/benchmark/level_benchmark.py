@@ -0,0 +1,572 @@
+######################載入套件######################
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+from typing import Dict, List, Optional
+
+import pygame
+
+from src.replay.replay_recorder import RecordedKeyState, KEY_BITS
+from src.performance.frame_jobs import FRAME_JOB_BUDGET_MS, FRAME_JOBS
+
+######################效能測試設定######################
+DEFAULT_FRAMES = 1200  # 每關量測幀數（約 20 秒遊戲時間）
+DEFAULT_WARMUP_FRAMES = 60  # 暖身幀數，不列入統計（圖片縮放等延遲初始化）
+DEFAULT_SEED = 20240601  # 固定亂數種子，讓每次執行的敵人行為相同
+DEFAULT_THRESHOLD = 0.10  # 超過基準 10% 視為效能退步
+COMPARED_METRICS = ("mean", "p95", "p99")  # 和基準比較的統計值
+MATCHED_META_KEYS = (  # 這些設定和基準不同時，量測結果不能直接比較
+    "source",
+    "frames",
+    "warmup_frames",
+    "character_type",
+    "difficulty",
+    "seed",
+    "render_enabled",
+    "enemy_batch",
+    "horde",
+    "update_lod",
+    "frame_jobs",
+    "frame_job_budget_ms",
+)
+LEVEL_NUMBERS = (1, 2, 3, 4, 5, 6)
+HORDE_MIN_PLATFORM_WIDTH = 80  # 大量敵人只放在夠寬的平台上
+HORDE_PATROL_RANGE = 40  # 大量敵人的巡邏範圍
+
+
+######################腳本玩家######################
+class ScriptedInput:
+    """
+    腳本化的玩家輸入\n
+    \n
+    用固定的按鍵節奏驅動玩家：左右來回移動、定期跳躍和攻擊，\n
+    讓每一關都有移動、碰撞和戰鬥的負載，而且每次執行完全相同\n
+    \n
+    屬性:\n
+    frame (int): 目前的幀數\n
+    """
+
+    def __init__(self):
+        """
+        初始化腳本輸入\n
+        """
+        self.frame = 0
+
+    def __call__(self) -> RecordedKeyState:
+        """
+        產生下一幀的按鍵狀態\n
+        \n
+        回傳:\n
+        RecordedKeyState: 這一幀的按鍵狀態\n
+        """
+        frame = self.frame
+        self.frame += 1
+
+        mask = 0
+
+        # 每 240 幀一個循環：前半往右、後半往左
+        if frame % 240 < 120:
+            mask |= KEY_BITS[pygame.K_d]
+        else:
+            mask |= KEY_BITS[pygame.K_a]
+
+        # 每 40 幀按住跳躍 8 幀（讓二段跳角色也會用到二段跳）
+        if frame % 40 < 8:
+            mask |= KEY_BITS[pygame.K_SPACE]
+
+        # 每 30 幀攻擊一次
+        if frame % 30 < 2:
+            mask |= KEY_BITS[pygame.K_c]
+
+        return RecordedKeyState(mask)
+
+
+######################統計工具######################
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """
+    計算百分位數（線性插值）\n
+    \n
+    參數:\n
+    sorted_values (List[float]): 已排序的數值\n
+    percent (float): 百分位，例如 95\n
+    \n
+    回傳:\n
+    float: 百分位數\n
+    """
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def summarize_frame_times(samples_ns: List[int]) -> Dict:
+    """
+    把每幀耗時整理成統計值（毫秒）\n
+    \n
+    參數:\n
+    samples_ns (List[int]): 每幀耗時（奈秒）\n
+    \n
+    回傳:\n
+    Dict: mean、p50、p95、p99、max（毫秒）\n
+    """
+    values = sorted(sample / 1_000_000 for sample in samples_ns)
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "mean": sum(values) / len(values),
+        "p50": _percentile(values, 50),
+        "p95": _percentile(values, 95),
+        "p99": _percentile(values, 99),
+        "max": values[-1],
+    }
+
+
+######################關卡效能測試######################
+class LevelBenchmark:
+    """
+    關卡效能測試器\n
+    \n
+    以無視窗模式逐關執行遊戲，分別量測 update() 和 render() 的每幀耗時：\n
+    1. 腳本模式：每關用 ScriptedInput 跑固定幀數\n
+    2. 重播模式：播放重播檔，依當下關卡分類每幀耗時\n
+    \n
+    屬性:\n
+    game (MarioClimbingGame): 無視窗模式的遊戲實例\n
+    render_enabled (bool): 是否量測繪製\n
+    horde (int): 每關額外加入的基本敵人數量（模擬大量敵人的活動關卡）\n
+    """
+
+    def __init__(
+        self,
+        render_enabled: bool = True,
+        enemy_batch: bool = False,
+        horde: int = 0,
+        update_lod: bool = False,
+        frame_jobs: bool = False,
+    ):
+        """
+        初始化效能測試器\n
+        \n
+        參數:\n
+        render_enabled (bool): 是否量測繪製時間\n
+        enemy_batch (bool): 是否用批次引擎更新基本敵人\n
+        horde (int): 每關額外加入的基本敵人數量\n
+        update_lod (bool): 是否讓畫面外的敵人和陷阱降低更新頻率\n
+        frame_jobs (bool): 是否把可以延後的整理工作交給工作排程\n
+        """
+        from main import MarioClimbingGame
+
+        self.render_enabled = render_enabled
+        self.horde = horde
+        self.game = MarioClimbingGame(
+            headless=True,
+            render_enabled=render_enabled,
+            enemy_batch=enemy_batch,
+            update_lod=update_lod,
+            frame_jobs=frame_jobs,
+        )
+
+    def _spawn_horde(self, seed: int):
+        """
+        在目前關卡夠寬的平台上加入 horde 個基本敵人（同樣的種子位置相同）\n
+        \n
+        參數:\n
+        seed (int): 決定敵人位置的亂數種子\n
+        """
+        from src.enemies.basic_enemy import BasicEnemy
+
+        level = self.game.level_manager.get_current_level()
+        platforms = [
+            platform for platform in level.platforms if platform.width >= HORDE_MIN_PLATFORM_WIDTH
+        ]
+        if not platforms:
+            return
+
+        rng = random.Random(seed)
+        for index in range(self.horde):
+            platform = platforms[index % len(platforms)]
+            x = rng.uniform(platform.x, platform.x + platform.width - 25)
+            enemy = BasicEnemy(x, platform.y - 30, patrol_range=HORDE_PATROL_RANGE)
+            enemy.adjust_patrol_range_for_platforms(level.platforms)
+            level.add_enemy(enemy)
+
+    def _measure_frame(self, update_samples: List[int], render_samples: List[int]):
+        """
+        執行一幀並記錄 update 和 render 耗時\n
+        \n
+        參數:\n
+        update_samples (List[int]): update 耗時清單（奈秒）\n
+        render_samples (List[int]): render 耗時清單（奈秒）\n
+        """
+        game = self.game
+        game.handle_events()
+
+        start = time.perf_counter_ns()
+        game.update()
+        after_update = time.perf_counter_ns()
+        update_samples.append(after_update - start)
+
+        if self.render_enabled:
+            game.render()
+            render_samples.append(time.perf_counter_ns() - after_update)
+
+    def run_scripted_level(
+        self,
+        level_number: int,
+        frames: int,
+        warmup_frames: int,
+        character_type: int,
+        difficulty: str,
+        seed: int,
+    ) -> Dict:
+        """
+        用腳本玩家量測單一關卡\n
+        \n
+        玩家死亡或離開關卡時會被拉回本關重來，確保量測期間都在同一關\n
+        \n
+        參數:\n
+        level_number (int): 關卡編號 1-6\n
+        frames (int): 量測幀數\n
+        warmup_frames (int): 暖身幀數\n
+        character_type (int): 角色類型\n
+        difficulty (str): 難度\n
+        seed (int): 亂數種子\n
+        \n
+        回傳:\n
+        Dict: 這一關的量測結果\n
+        """
+        game = self.game
+        random.seed(seed + level_number)
+        game.start_game_with_character(character_type, difficulty)
+        if level_number != 1:
+            game._jump_to_level(level_number)
+        if self.horde:
+            self._spawn_horde(seed + level_number)
+        game.input_override = ScriptedInput()
+
+        update_samples = []
+        render_samples = []
+        restarts = 0
+
+        for frame in range(warmup_frames + frames):
+            if frame == warmup_frames:
+                update_samples.clear()
+                render_samples.clear()
+                update_lod = game.level_manager.get_current_level().update_lod
+                if update_lod is not None:
+                    update_lod.reset_totals()
+                FRAME_JOBS.reset_stats()
+
+            self._measure_frame(update_samples, render_samples)
+
+            # 死亡、過關或勝利都拉回本關，保持負載穩定
+            if (
+                game.game_state != "playing"
+                or game.level_manager.current_level_number != level_number
+            ):
+                restarts += 1
+                game.game_state = "playing"
+                if game.level_manager.current_level_number != level_number:
+                    game._jump_to_level(level_number)
+                game.player.health = game.player.max_health
+                game._reset_current_level()
+                if self.horde:
+                    self._spawn_horde(seed + level_number)
+
+        game.input_override = None
+
+        result = {
+            "frames": len(update_samples),
+            "restarts": restarts,
+            "update_ms": summarize_frame_times(update_samples),
+            "render_ms": summarize_frame_times(render_samples),
+        }
+
+        # 更新細節層級排程：每幀平均有多少物件在各層級
+        update_lod = game.level_manager.get_current_level().update_lod
+        if update_lod is not None and update_samples:
+            result["update_lod"] = {
+                tier: count / len(update_samples)
+                for tier, count in update_lod.get_tier_counts(total=True).items()
+            }
+
+        # 工作排程：每種工作的執行次數、耗時和延後的幀數
+        if FRAME_JOBS.enabled:
+            result["frame_jobs"] = {
+                "max_frame_ms": FRAME_JOBS.max_frame_ns / 1_000_000,
+                "jobs": FRAME_JOBS.get_stats(),
+            }
+        return result
+
+    def run_replay(self, replay_path: str) -> Dict:
+        """
+        播放重播檔並依關卡分類量測\n
+        \n
+        參數:\n
+        replay_path (str): 重播檔路徑\n
+        \n
+        回傳:\n
+        Dict: 各關卡的量測結果（只包含重播中出現過的關卡）\n
+        """
+        game = self.game
+        game.start_replay(replay_path)
+
+        update_by_level = {}
+        render_by_level = {}
+        while game.running:
+            level_number = game.level_manager.current_level_number
+            self._measure_frame(
+                update_by_level.setdefault(level_number, []),
+                render_by_level.setdefault(level_number, []),
+            )
+
+        return {
+            str(level_number): {
+                "frames": len(samples),
+                "restarts": 0,
+                "update_ms": summarize_frame_times(samples),
+                "render_ms": summarize_frame_times(render_by_level[level_number]),
+            }
+            for level_number, samples in sorted(update_by_level.items())
+        }
+
+
+######################結果比較######################
+def find_meta_mismatches(results: Dict, baseline: Dict) -> List[Dict]:
+    """
+    找出和基準不同的量測設定（幀數、開關、敵人數量、角色、是否繪製等）\n
+    \n
+    基準沒有記錄的設定（舊版結果檔）不列入檢查\n
+    \n
+    參數:\n
+    results (Dict): 這次的結果\n
+    baseline (Dict): 基準結果\n
+    \n
+    回傳:\n
+    List[Dict]: 不同的設定清單，每項包含設定名稱、基準值和這次的值\n
+    """
+    meta = results.get("meta", {})
+    baseline_meta = baseline.get("meta", {})
+    mismatches = []
+    for key in MATCHED_META_KEYS:
+        if key not in baseline_meta:
+            continue
+        if meta.get(key) != baseline_meta[key]:
+            mismatches.append(
+                {"key": key, "baseline": baseline_meta[key], "current": meta.get(key)}
+            )
+    return mismatches
+
+
+def compare_with_baseline(
+    results: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD
+) -> List[Dict]:
+    """
+    和基準結果比較，找出效能退步的項目\n
+    \n
+    參數:\n
+    results (Dict): 這次的結果\n
+    baseline (Dict): 基準結果\n
+    threshold (float): 允許的變慢比例，0.1 表示慢 10% 以內不算退步\n
+    \n
+    回傳:\n
+    List[Dict]: 退步項目清單，每項包含關卡、階段、統計值和變化比例\n
+    """
+    regressions = []
+    for level_key, level_result in results["levels"].items():
+        baseline_level = baseline.get("levels", {}).get(level_key)
+        if not baseline_level:
+            continue
+
+        for phase in ("update_ms", "render_ms"):
+            for metric in COMPARED_METRICS:
+                old_value = baseline_level[phase][metric]
+                new_value = level_result[phase][metric]
+                if old_value <= 0:
+                    continue
+                change = (new_value - old_value) / old_value
+                if change > threshold:
+                    regressions.append(
+                        {
+                            "level": level_key,
+                            "phase": phase,
+                            "metric": metric,
+                            "baseline": old_value,
+                            "current": new_value,
+                            "change": change,
+                        }
+                    )
+    return regressions
+
+
+def print_results(results: Dict, baseline: Optional[Dict] = None):
+    """
+    印出各關卡的量測結果表格\n
+    \n
+    參數:\n
+    results (Dict): 量測結果\n
+    baseline (Dict): 基準結果，有的話會一併印出平均值的變化\n
+    """
+    print(f"{'關卡':<4} {'階段':<7} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  變化")
+    for level_key, level_result in results["levels"].items():
+        for phase in ("update_ms", "render_ms"):
+            stats = level_result[phase]
+            change_text = ""
+            if baseline and level_key in baseline.get("levels", {}):
+                old_mean = baseline["levels"][level_key][phase]["mean"]
+                if old_mean > 0:
+                    change_text = f"{(stats['mean'] - old_mean) / old_mean:+.1%}"
+            print(
+                f"{level_key:<6} {phase[:-3]:<9} {stats['mean']:8.3f} {stats['p50']:8.3f} "
+                f"{stats['p95']:8.3f} {stats['p99']:8.3f} {stats['max']:8.3f}  {change_text}"
+            )
+        if "update_lod" in level_result:
+            tiers = ", ".join(
+                f"{tier} {count:.1f}" for tier, count in level_result["update_lod"].items()
+            )
+            print(f"{level_key:<6} 每幀更新層級: {tiers}")
+        if "frame_jobs" in level_result:
+            frame_jobs = level_result["frame_jobs"]
+            print(f"{level_key:<6} 延後工作: 單幀最多 {frame_jobs['max_frame_ms']:.3f} ms")
+            for name, stats in frame_jobs["jobs"].items():
+                print(
+                    f"{'':<6}   {name:<28} {stats['runs']:>6} 次  平均 {stats['mean_ms']:.4f} ms  "
+                    f"平均延後 {stats['mean_wait_frames']:.2f} 幀（最多 {stats['max_wait_frames']}）"
+                )
+
+
+######################命令列進入點######################
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    效能測試命令列進入點\n
+    \n
+    用法: python -m src.benchmark.level_benchmark --output result.json --baseline baseline.json\n
+    \n
+    參數:\n
+    argv (List[str]): 命令列參數，None 表示使用 sys.argv\n
+    \n
+    回傳:\n
+    int: 結束代碼，有效能退步時回傳 1，量測設定和基準不同而拒絕比較時回傳 2\n
+    """
+    parser = argparse.ArgumentParser(description="瑪莉歐攀爬遊戲關卡效能測試")
+    parser.add_argument("--levels", type=int, nargs="+", default=list(LEVEL_NUMBERS))
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP_FRAMES)
+    parser.add_argument("--character", type=int, default=0)
+    parser.add_argument("--difficulty", default="hard")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--replay", help="用重播檔驅動玩家，取代腳本輸入")
+    parser.add_argument("--no-render", action="store_true", help="只量測 update()")
+    parser.add_argument("--enemy-batch", action="store_true", help="用批次引擎更新基本敵人")
+    parser.add_argument("--horde", type=int, default=0, help="每關額外加入的基本敵人數量")
+    parser.add_argument("--update-lod", action="store_true", help="畫面外的敵人和陷阱降低更新頻率")
+    parser.add_argument("--frame-jobs", action="store_true", help="可以延後的整理工作交給工作排程")
+    parser.add_argument(
+        "--frame-job-budget", type=float, default=FRAME_JOB_BUDGET_MS, help="工作排程每幀的預算（毫秒）"
+    )
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="基準結果 JSON，用來檢查效能退步")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        "--allow-meta-mismatch", action="store_true", help="量測設定和基準不同時仍然比較（只顯示警告）"
+    )
+    args = parser.parse_args(argv)
+
+    benchmark = LevelBenchmark(
+        render_enabled=not args.no_render,
+        enemy_batch=args.enemy_batch,
+        horde=args.horde,
+        update_lod=args.update_lod,
+        frame_jobs=args.frame_jobs,
+    )
+    FRAME_JOBS.set_budget(args.frame_job_budget)
+
+    if args.replay:
+        levels = benchmark.run_replay(args.replay)
+    else:
+        levels = {
+            str(level_number): benchmark.run_scripted_level(
+                level_number,
+                args.frames,
+                args.warmup,
+                args.character,
+                args.difficulty,
+                args.seed,
+            )
+            for level_number in args.levels
+        }
+    pygame.quit()
+
+    results = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "source": f"replay:{os.path.basename(args.replay)}" if args.replay else "scripted",
+            "frames": args.frames,
+            "warmup_frames": args.warmup,
+            "character_type": args.character,
+            "difficulty": args.difficulty,
+            "seed": args.seed,
+            "render_enabled": not args.no_render,
+            "enemy_batch": args.enemy_batch,
+            "horde": args.horde,
+            "update_lod": args.update_lod,
+            "frame_jobs": args.frame_jobs,
+            "frame_job_budget_ms": args.frame_job_budget,
+        },
+        "levels": levels,
+    }
+
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(results, output_file, ensure_ascii=False, indent=2)
+    print(f"效能測試結果已寫入: {args.output}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+
+    if baseline is not None:
+        mismatches = find_meta_mismatches(results, baseline)
+        if mismatches:
+            print("量測設定和基準不同：")
+            for item in mismatches:
+                print(f"  {item['key']}: {item['baseline']!r} → {item['current']!r}")
+            if not args.allow_meta_mismatch:
+                print_results(results)
+                print("拒絕和基準比較，請用相同設定重新量測基準，或加上 --allow-meta-mismatch")
+                return 2
+            print("警告：已加上 --allow-meta-mismatch，比較結果僅供參考")
+
+    print_results(results, baseline)
+
+    if baseline is None:
+        return 0
+
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+    if not regressions:
+        print(f"沒有超過 {args.threshold:.0%} 的效能退步")
+        return 0
+
+    print(f"發現 {len(regressions)} 項效能退步（門檻 {args.threshold:.0%}）：")
+    for item in regressions:
+        print(
+            f"  第 {item['level']} 關 {item['phase'][:-3]} {item['metric']}: "
+            f"{item['baseline']:.3f}ms → {item['current']:.3f}ms ({item['change']:+.1%})"
+        )
+    return 1
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    sys.exit(main())
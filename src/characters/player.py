@@ -1,6 +1,9 @@
 ######################載入套件######################
 import pygame
 from typing import List, Tuple, Dict
+from src.assets.asset_manager import ASSET_MANAGER
+from src.levels.swept_collision import PLAYER_CONTACT_TOLERANCE, sweep_solids
+from src.performance.frame_jobs import FRAME_JOBS, JOB_PRIORITY_LOW
 
 ######################角色能力設定######################
 # 各種角色的基礎能力數值
@@ -34,6 +37,8 @@ CHARACTER_CONFIGS = {
     },
 }
 
+LOW_HEALTH_CHECK_DEADLINE = 30  # 殘血警告最多可以延後幾幀（啟用工作排程時）
+
 
 ######################玩家類別定義######################
 class Player:
@@ -68,6 +73,62 @@ class Player:
     - R+W/空白鍵: 加速跳躍，跳躍高度提升 30%\n
     """
 
+    __slots__ = (
+        "x",
+        "y",
+        "velocity_x",
+        "velocity_y",
+        "character_type",
+        "name",
+        "max_health",
+        "health",
+        "speed",
+        "jump_power",
+        "has_double_jump_ability",
+        "attack_damage",
+        "color",
+        "width",
+        "height",
+        "is_on_ground",
+        "can_double_jump",
+        "is_crouching",
+        "is_sprinting",
+        "base_speed",
+        "sprint_multiplier",
+        "jump_boost_multiplier",
+        "attack_cooldown",
+        "max_attack_cooldown",
+        "is_attacking",
+        "attack_just_started",
+        "fireball_manager",
+        "iceball_manager",
+        "projectile_type",
+        "image_cache",
+        "invulnerability_time",
+        "previous_jump_key_pressed",
+        "previous_attack_key_pressed",
+        "previous_switch_key_pressed",
+        "jump_buffer_time",
+        "idle_time",
+        "idle_heal_interval",
+        "idle_heal_amount",
+        "last_velocity_x",
+        "last_velocity_y",
+        "shield",
+        "max_shield",
+        "attack_boost_percentage",
+        "attack_boost_duration",
+        "potion_inventory",
+        "max_potion_count",
+        "base_attack",
+        "base_jump_power",
+        "base_max_health",
+        "last_facing_direction",
+        "equipment_manager",
+        "sound_manager",
+        "last_low_health_check",
+    )
+
     def __init__(self, start_x: float, start_y: float, character_type: int = 0):
         """
         初始化玩家角色\n
@@ -161,6 +222,14 @@ class Player:
         }
         self.max_potion_count = 99  # 每種藥水最大持有數量
 
+        # 套裝效果加成前的原始數值（第一次套用加成時才記錄，None 表示還沒套用過）
+        self.base_attack = None
+        self.base_jump_power = None
+        self.base_max_health = None
+
+        # 最後移動的方向（用於發射投射物），還沒移動過是 None
+        self.last_facing_direction = None
+
         # 裝備管理器引用
         self.equipment_manager = None
 
@@ -168,7 +237,7 @@ class Player:
         self.sound_manager = None
         self.last_low_health_check = 0  # 上次檢查低血量的時間
 
-    def handle_input(self, keys, platforms: List = None):
+    def handle_input(self, keys, spatial_index=None):
         """
         處理玩家輸入\n
         \n
@@ -177,6 +246,7 @@ class Player:
         \n
         參數:\n
         keys (dict): pygame.key.get_pressed() 回傳的按鍵狀態字典\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引，站起來時檢查頭頂空間\n
         \n
         支援的按鍵配置:\n
         - 移動: WASD 或 方向鍵\n
@@ -228,7 +298,7 @@ class Player:
         self.previous_jump_key_pressed = jump_key_pressed  # 記錄當前幀的按鍵狀態
 
         # 蹲下（S 鍵或下方向鍵）- 改良版本，正確處理位置調整
-        self._handle_crouch_input(keys[pygame.K_s] or keys[pygame.K_DOWN], platforms)
+        self._handle_crouch_input(keys[pygame.K_s] or keys[pygame.K_DOWN], spatial_index)
 
         # 攻擊（C 鍵） - 發射投射物攻擊
         attack_key_pressed = keys[pygame.K_c]
@@ -242,7 +312,7 @@ class Player:
         self._handle_projectile_type_switch(keys)
 
         # 裝備技能快捷鍵（數字鍵 1-4）
-        if hasattr(self, "equipment_manager") and self.equipment_manager:
+        if self.equipment_manager:
             if keys[pygame.K_1]:
                 self.equipment_manager.use_skill("fire_ball", self)
             elif keys[pygame.K_2]:
@@ -286,11 +356,12 @@ class Player:
         
         for key, file_path in image_files.items():
             try:
-                image = pygame.image.load(file_path).convert_alpha()
-                # 預先縮放到不同尺寸以備使用
+                # 預先縮放到不同尺寸以備使用（打包在資源管理器的圖集裡）
                 self.image_cache[key] = {
-                    "normal": pygame.transform.scale(image, (self.width, self.height)),
-                    "crouched": pygame.transform.scale(image, (self.width, self.height // 2))
+                    "normal": ASSET_MANAGER.get_region(file_path, (self.width, self.height)),
+                    "crouched": ASSET_MANAGER.get_region(
+                        file_path, (self.width, self.height // 2)
+                    ),
                 }
             except (pygame.error, FileNotFoundError) as e:
                 print(f"無法載入角色圖片 {file_path}: {e}")
@@ -340,7 +411,7 @@ class Player:
 
         return False  # 無法跳躍
 
-    def _handle_crouch_input(self, crouch_key_pressed: bool, platforms: List = None):
+    def _handle_crouch_input(self, crouch_key_pressed: bool, spatial_index=None):
         """
         處理蹲下輸入並調整玩家位置\n
         \n
@@ -349,6 +420,7 @@ class Player:
         \n
         參數:\n
         crouch_key_pressed (bool): 是否按下蹲下鍵\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引\n
         \n
         邏輯說明:\n
         - 從站立變為蹲下：Y座標向下移動 (height - height//2)，保持腳部位置不變\n
@@ -374,25 +446,26 @@ class Player:
         elif was_crouching and not want_to_crouch:
             # 從蹲下變為站立
             # 需要檢查頭部上方是否有空間站起來
-            if self._can_stand_up(platforms):
+            if self._can_stand_up(spatial_index):
                 # 向上調整Y座標，恢復站立高度
                 self.y -= height_difference
                 self.is_crouching = False
             # 如果無法站起來，保持蹲下狀態
 
-    def _can_stand_up(self, platforms: List = None) -> bool:
+    def _can_stand_up(self, spatial_index=None) -> bool:
         """
         檢查玩家是否能從蹲下狀態站起來\n
         \n
         檢查玩家頭部上方是否有足夠空間站立，避免站起來時頭部卡在天花板或平台裡\n
+        （只檢查一般平台，移動平台不算）\n
         \n
         參數:\n
-        platforms (List): 平台物件清單，用於碰撞檢測\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引\n
         \n
         回傳:\n
         bool: 是否能夠站起來\n
         """
-        if platforms is None:
+        if spatial_index is None:
             return True  # 如果沒有平台資料，預設允許站起來
 
         # 計算站立時的碰撞矩形
@@ -404,9 +477,10 @@ class Player:
             self.height,  # 完整高度
         )
 
-        # 檢查是否與任何平台碰撞
-        for platform in platforms:
-            platform_rect = platform.get_collision_rect()
+        # 檢查是否與附近的平台碰撞
+        for platform, platform_rect in spatial_index.query_solid_rects(
+            standing_rect, include_moving=False
+        ):
             if standing_rect.colliderect(platform_rect):
                 return False  # 有碰撞，無法站起來
 
@@ -425,7 +499,7 @@ class Player:
             return  # 還在冷卻中，無法攻擊
 
         # 確定發射方向（根據最後的移動方向或面向方向）
-        if hasattr(self, "last_facing_direction"):
+        if self.last_facing_direction is not None:
             direction = self.last_facing_direction
         elif abs(self.velocity_x) > 0.1:
             # 根據當前移動方向
@@ -483,7 +557,7 @@ class Player:
         self._perform_projectile_attack()
         self.projectile_type = old_type
 
-    def update(self, platforms: List, traps: List):
+    def update(self, spatial_index):
         """
         更新玩家狀態\n
         \n
@@ -494,8 +568,7 @@ class Player:
         4. 狀態計時器更新\n
         \n
         參數:\n
-        platforms (List): 當前關卡的平台清單\n
-        traps (List): 當前關卡的陷阱清單\n
+        spatial_index (LevelSpatialIndex): 當前關卡的碰撞索引（平台、移動平台、陷阱）\n
         """
         # 更新各種計時器
         if self.invulnerability_time > 0:
@@ -515,37 +588,49 @@ class Player:
         if not self.is_on_ground:
             self.velocity_y += 0.8  # 重力加速度
 
-        # 限制最大下墜速度，避免穿過平台（更嚴格的限制）
+        # 限制最大下墜速度（手感用，穿透由垂直移動的連續碰撞處理）
         if self.velocity_y > 12:
             self.velocity_y = 12
 
         # 分別處理水平和垂直移動，避免高速穿透
-        self._update_horizontal_movement(platforms)
-        self._update_vertical_movement(platforms)
+        self._update_horizontal_movement(spatial_index)
+        self._update_vertical_movement(spatial_index)
 
         # 處理移動平台互動（讓玩家跟隨移動平台）
-        self._handle_moving_platforms(traps)
+        self._handle_moving_platforms(spatial_index)
 
         # 碰撞檢測陷阱
-        self._check_trap_collisions(traps)
+        self._check_trap_collisions(spatial_index)
 
         # 更新面向方向記錄（用於火球發射）
         if abs(self.velocity_x) > 0.1:
             self.last_facing_direction = 1 if self.velocity_x > 0 else -1
-        elif not hasattr(self, "last_facing_direction"):
+        elif self.last_facing_direction is None:
             self.last_facing_direction = 1  # 預設向右
 
         # 處理靜止回血機制
         self._handle_idle_healing()
 
-        # 定期檢查殘血狀態並播放音效（比在 take_damage 中更可靠）
+        # 定期檢查殘血狀態並播放音效（比在 take_damage 中更可靠，只影響音效所以可以延後）
         current_time = pygame.time.get_ticks()
         if current_time - self.last_low_health_check > 3000:  # 每3秒檢查一次
             self.last_low_health_check = current_time
-            if self.health <= 20 and self.health > 0 and self.sound_manager:
-                self.sound_manager.play_low_health_warning(self.health, self.max_health)
+            FRAME_JOBS.submit(
+                "player.low_health_check",
+                self._check_low_health,
+                key=(self, "low_health_check"),
+                priority=JOB_PRIORITY_LOW,
+                deadline=LOW_HEALTH_CHECK_DEADLINE,
+            )
 
-    def _update_horizontal_movement(self, platforms: List):
+    def _check_low_health(self):
+        """
+        殘血時播放警告音效\n
+        """
+        if self.health <= 20 and self.health > 0 and self.sound_manager:
+            self.sound_manager.play_low_health_warning(self.health, self.max_health)
+
+    def _update_horizontal_movement(self, spatial_index):
         """
         更新水平移動並檢查碰撞\n
         \n
@@ -553,7 +638,7 @@ class Player:
         特別處理移動平台，避免站在平台上時被誤判為側邊碰撞\n
         \n
         參數:\n
-        platforms (List): 平台物件清單\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引\n
         """
         if abs(self.velocity_x) < 0.01:  # 水平速度很小時直接設為 0
             self.velocity_x = 0
@@ -568,10 +653,8 @@ class Player:
         # 建立玩家碰撞矩形
         player_rect = self._get_current_collision_rect()
 
-        # 檢查與平台的水平碰撞
-        for platform in platforms:
-            platform_rect = platform.get_collision_rect()
-
+        # 檢查與附近平台的水平碰撞
+        for platform, platform_rect in spatial_index.query_solid_rects(player_rect):
             if player_rect.colliderect(platform_rect):
                 # 檢查是否為移動平台且玩家站在上面的情況
                 from src.traps.moving_platform import MovingPlatform
@@ -606,14 +689,15 @@ class Player:
                 self.velocity_x = 0  # 停止水平移動
                 break
 
-    def _update_vertical_movement(self, platforms: List):
+    def _update_vertical_movement(self, spatial_index):
         """
         更新垂直移動並檢查碰撞\n
         \n
-        將垂直移動和碰撞檢測分開處理，避免高速下降時穿透平台\n
+        用連續碰撞（swept AABB）沿著位移找出最先碰到的平台，直接停在接觸位置，\n
+        不管下墜多快都不會穿過平台\n
         \n
         參數:\n
-        platforms (List): 平台物件清單\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引\n
         """
         # 先假設不在地面上
         was_on_ground = self.is_on_ground
@@ -623,79 +707,48 @@ class Player:
             self.velocity_y = 0
             # 如果速度很小但之前在地面上，檢查是否還在地面上
             if was_on_ground:
-                self._check_ground_contact(platforms)
+                self._check_ground_contact(spatial_index)
             return
 
-        # 儲存原始位置
-        original_y = self.y
-
-        # 嘗試移動
+        # 沿著這一幀的位移找出最先碰到的平台（碰撞矩形和 pygame.Rect 一樣捨去小數）
+        current_height = self.height if not self.is_crouching else self.height // 2
+        start_top = int(self.y)
         self.y += self.velocity_y
+        contact = sweep_solids(
+            spatial_index,
+            int(self.x),
+            start_top,
+            self.width,
+            current_height,
+            0,
+            int(self.y) - start_top,
+            tolerance=PLAYER_CONTACT_TOLERANCE,
+        )
+        if contact is None:
+            return
 
-        # 建立玩家碰撞矩形
-        player_rect = self._get_current_collision_rect()
+        _, platform_rect, _, _, normal_y = contact
+        if normal_y < 0:  # 從上方落到平台上
+            self.y = platform_rect.top - current_height
+            self.velocity_y = 0
+            self.is_on_ground = True
 
-        # 檢查與平台的垂直碰撞
-        for platform in platforms:
-            platform_rect = platform.get_collision_rect()
+            # 恢復二段跳能力（只有在真正著地時）
+            if self.has_double_jump_ability:
+                self.can_double_jump = True
 
-            if player_rect.colliderect(platform_rect):
-                if self.velocity_y > 0:  # 正在下降，可能落在平台上
-                    # 確認玩家之前在平台上方
-                    current_height = (
-                        self.height if not self.is_crouching else self.height // 2
-                    )
-                    player_bottom_before = original_y + current_height
-
-                    # 使用更嚴格的檢查，確保玩家確實從上方下來
-                    if (
-                        player_bottom_before <= platform_rect.top + 3
-                    ):  # 減少容錯範圍到3像素
-                        # 玩家確實是從上方落到平台上
-                        new_y = platform_rect.top - current_height
-
-                        # 驗證新位置的有效性
-                        if self._is_valid_position(new_y, platforms, platform):
-                            self.y = new_y
-                            self.velocity_y = 0
-                            self.is_on_ground = True
-
-                            # 恢復二段跳能力（只有在真正著地時）
-                            if self.has_double_jump_ability:
-                                self.can_double_jump = True
-                        else:
-                            # 如果新位置無效，稍微調整
-                            self.y = original_y
-                            self.velocity_y = 1  # 給一點小速度繼續下降
-
-                        break
-
-                elif self.velocity_y < 0:  # 正在上升，撞到平台下方
-                    # 確認玩家之前在平台下方
-                    player_top_before = original_y
-                    if player_top_before >= platform_rect.bottom - 3:  # 減少容錯範圍
-                        # 玩家確實是從下方撞到平台底部
-                        new_y = platform_rect.bottom
-
-                        # 驗證新位置的有效性
-                        if self._is_valid_position(new_y, platforms, platform):
-                            self.y = new_y
-                            self.velocity_y = 0
-                        else:
-                            # 如果新位置無效，稍微調整
-                            self.y = original_y
-                            self.velocity_y = -1  # 給一點小速度繼續上升
-
-                        break
-
-    def _check_ground_contact(self, platforms: List):
+        elif normal_y > 0:  # 從下方撞到平台底部
+            self.y = platform_rect.bottom
+            self.velocity_y = 0
+
+    def _check_ground_contact(self, spatial_index):
         """
         檢查玩家是否還與地面接觸\n
         \n
         當玩家垂直速度很小時，檢查是否還站在平台上\n
         \n
         參數:\n
-        platforms (List): 平台物件清單\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引\n
         """
         current_height = self.height if not self.is_crouching else self.height // 2
 
@@ -707,46 +760,11 @@ class Player:
             3,  # 向下延伸3像素檢查地面
         )
 
-        for platform in platforms:
-            platform_rect = platform.get_collision_rect()
+        for platform, platform_rect in spatial_index.query_solid_rects(ground_check_rect):
             if ground_check_rect.colliderect(platform_rect):
                 self.is_on_ground = True
                 return
 
-    def _is_valid_position(
-        self, new_y: float, platforms: List, current_platform
-    ) -> bool:
-        """
-        驗證新位置是否有效\n
-        \n
-        檢查調整後的位置是否會與其他平台產生不合理的碰撞\n
-        \n
-        參數:\n
-        new_y (float): 新的Y座標\n
-        platforms (List): 平台物件清單\n
-        current_platform: 當前碰撞的平台（排除檢查）\n
-        \n
-        回傳:\n
-        bool: 位置是否有效\n
-        """
-        # 建立新位置的碰撞矩形
-        test_rect = pygame.Rect(
-            self.x,
-            new_y,
-            self.width,
-            self.height if not self.is_crouching else self.height // 2,
-        )
-
-        # 檢查是否與其他平台重疊
-        for platform in platforms:
-            if platform == current_platform:
-                continue  # 跳過當前碰撞的平台
-
-            if test_rect.colliderect(platform.get_collision_rect()):
-                return False  # 與其他平台重疊，位置無效
-
-        return True  # 位置有效
-
     def _get_current_collision_rect(self) -> pygame.Rect:
         """
         取得當前玩家的碰撞矩形（考慮蹲下狀態）\n
@@ -757,7 +775,7 @@ class Player:
         height = self.height if not self.is_crouching else self.height // 2
         return pygame.Rect(self.x, self.y, self.width, height)
 
-    def _check_trap_collisions(self, traps: List):
+    def _check_trap_collisions(self, spatial_index):
         """
         檢查與陷阱的碰撞\n
         \n
@@ -767,7 +785,7 @@ class Player:
         - 移動平台：跟隨移動（特殊處理，不當作陷阱）\n
         \n
         參數:\n
-        traps (List): 陷阱物件清單\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引\n
         """
         if self.invulnerability_time > 0:
             return  # 無敵時間內不會受到陷阱傷害
@@ -779,15 +797,15 @@ class Player:
             self.height if not self.is_crouching else self.height // 2,
         )
 
-        for trap in traps:
-            # 導入 MovingPlatform 類別來檢查
-            from src.traps.moving_platform import MovingPlatform
+        # 導入 MovingPlatform 類別來檢查
+        from src.traps.moving_platform import MovingPlatform
 
+        for trap, trap_rect in spatial_index.query_trap_rects(player_rect):
             # 移動平台不算陷阱，跳過傷害處理
             if isinstance(trap, MovingPlatform):
                 continue
 
-            if trap.is_active and player_rect.colliderect(trap.get_collision_rect()):
+            if trap.is_active and player_rect.colliderect(trap_rect):
                 # 觸發陷阱效果
                 damage = trap.get_damage()
                 self.take_damage(damage)
@@ -897,14 +915,13 @@ class Player:
         character_image = None
         image_key = "default"  # 預設值
         
-        if hasattr(self, 'projectile_type'):
-            if self.projectile_type == "fireball":
-                image_key = "fireball"
-            elif self.projectile_type == "iceball":
-                image_key = "iceball"
+        if self.projectile_type == "fireball":
+            image_key = "fireball"
+        elif self.projectile_type == "iceball":
+            image_key = "iceball"
         
         # 從快取中獲取圖片
-        if hasattr(self, 'image_cache') and self.image_cache.get(image_key):
+        if self.image_cache.get(image_key):
             character_image = self.image_cache[image_key][height_key]
         
         if character_image:
@@ -913,10 +930,10 @@ class Player:
                 # 創建一個半透明的表面
                 alpha_surface = pygame.Surface((self.width, height), pygame.SRCALPHA)
                 alpha_surface.set_alpha(128)  # 50% 透明
-                alpha_surface.blit(character_image, (0, 0))
+                alpha_surface.blit(character_image.surface, (0, 0), character_image.rect)
                 screen.blit(alpha_surface, (screen_x, screen_y))
             else:
-                screen.blit(character_image, (screen_x, screen_y))
+                screen.blit(character_image.surface, (screen_x, screen_y), character_image.rect)
         else:
             # 如果沒有快取圖片，使用原本的矩形
             pygame.draw.rect(screen, color, (screen_x, screen_y, self.width, height))
@@ -977,59 +994,59 @@ class Player:
         if health_width > 0:
             pygame.draw.rect(screen, health_color, (x, y, health_width, bar_height))
 
-    def _handle_moving_platforms(self, traps: List):
+    def _handle_moving_platforms(self, spatial_index):
         """
         處理移動平台互動\n
         \n
         檢查玩家是否站在移動平台上，如果是則跟隨平台移動\n
         \n
         參數:\n
-        traps (List): 陷阱清單（包含移動平台）\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引（包含移動平台）\n
         """
-        from src.traps.moving_platform import MovingPlatform
-
         player_rect = self.get_collision_rect()
 
-        for trap in traps:
-            if isinstance(trap, MovingPlatform):
-                platform_rect = trap.get_collision_rect()
-
-                # 檢查玩家是否站在平台上
-                # 玩家的底部要接觸平台的頂部，且水平位置要重疊
-                is_on_top = (
-                    player_rect.bottom >= platform_rect.top
-                    and player_rect.bottom <= platform_rect.top + 10
-                )  # 允許一些容錯
-                is_horizontal_aligned = (
-                    player_rect.left < platform_rect.right
-                    and player_rect.right > platform_rect.left
-                )
-
-                # 玩家必須是向下移動或靜止（不是向上跳），才能站在平台上
-                is_falling_or_stationary = self.velocity_y >= 0
-
-                if is_on_top and is_horizontal_aligned and is_falling_or_stationary:
-                    # 讓玩家貼合平台頂部
-                    self.y = platform_rect.top - self.height
-                    self.velocity_y = 0  # 停止垂直移動
-                    self.is_on_ground = True  # 設定為站在地面上
-
-                    # 讓玩家跟隨平台移動
-                    platform_velocity = trap.get_platform_velocity()
-                    self.x += platform_velocity[0]  # 跟隨平台的水平移動
-                    # 垂直移動已經透過 y 座標調整處理了
-
-                    # 如果平台水平移動，給玩家一點慣性
-                    if abs(platform_velocity[0]) > 0.1:
-                        self.velocity_x += platform_velocity[0] * 0.3
-                        # 限制慣性不要太大
-                        max_inertia = 3.0
-                        if abs(self.velocity_x) > max_inertia:
-                            self.velocity_x = (
-                                max_inertia if self.velocity_x > 0 else -max_inertia
-                            )
-
-                    break  # 一次只能站在一個平台上
+        # 只有頂部落在玩家腳底往上 10 像素內的移動平台才可能站得上去
+        feet_rect = pygame.Rect(player_rect.left, player_rect.bottom - 10, player_rect.width, 10)
+
+        for trap in spatial_index.query_moving_platforms(feet_rect):
+            platform_rect = spatial_index.get_rect(trap)
+
+            # 檢查玩家是否站在平台上
+            # 玩家的底部要接觸平台的頂部，且水平位置要重疊
+            is_on_top = (
+                player_rect.bottom >= platform_rect.top
+                and player_rect.bottom <= platform_rect.top + 10
+            )  # 允許一些容錯
+            is_horizontal_aligned = (
+                player_rect.left < platform_rect.right
+                and player_rect.right > platform_rect.left
+            )
+
+            # 玩家必須是向下移動或靜止（不是向上跳），才能站在平台上
+            is_falling_or_stationary = self.velocity_y >= 0
+
+            if is_on_top and is_horizontal_aligned and is_falling_or_stationary:
+                # 讓玩家貼合平台頂部
+                self.y = platform_rect.top - self.height
+                self.velocity_y = 0  # 停止垂直移動
+                self.is_on_ground = True  # 設定為站在地面上
+
+                # 讓玩家跟隨平台移動
+                platform_velocity = trap.get_platform_velocity()
+                self.x += platform_velocity[0]  # 跟隨平台的水平移動
+                # 垂直移動已經透過 y 座標調整處理了
+
+                # 如果平台水平移動，給玩家一點慣性
+                if abs(platform_velocity[0]) > 0.1:
+                    self.velocity_x += platform_velocity[0] * 0.3
+                    # 限制慣性不要太大
+                    max_inertia = 3.0
+                    if abs(self.velocity_x) > max_inertia:
+                        self.velocity_x = (
+                            max_inertia if self.velocity_x > 0 else -max_inertia
+                        )
+
+                break  # 一次只能站在一個平台上
 
     def _is_completely_idle(self) -> bool:
         """
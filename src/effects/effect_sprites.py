@@ -0,0 +1,193 @@
+######################載入套件######################
+from typing import Tuple
+
+import pygame
+
+from src.assets.baked_surfaces import BakedSurfaceCache
+
+######################特效圖片設定######################
+EFFECT_SPRITE_CAPACITY = 256  # 最多保留幾張預先畫好的特效圖片
+EFFECT_ALPHA_STEP = 8  # 透明度量化的間距（每 8 一個等級）
+EFFECT_EXACT_SIZE = 16  # 不超過這個大小的半徑和長度不量化（小圖差 1 像素很明顯）
+EFFECT_SIZE_STEP = 4  # 比較大的半徑和長度量化的間距
+
+# 預先畫好的特效圖片（光暈、圓環、斬擊、閃爍覆蓋），同樣外觀共用一張
+EFFECT_SPRITES = BakedSurfaceCache(EFFECT_SPRITE_CAPACITY)
+
+
+def quantize_alpha(alpha: float) -> int:
+    """
+    把透明度量化成固定的幾個等級，讓淡入淡出的特效也能共用圖片\n
+    \n
+    參數:\n
+    alpha (float): 透明度\n
+    \n
+    回傳:\n
+    int: 量化後的透明度（0~255）\n
+    """
+    return max(0, min(255, int(alpha / EFFECT_ALPHA_STEP + 0.5) * EFFECT_ALPHA_STEP))
+
+
+def quantize_size(size: float) -> int:
+    """
+    把半徑或長度量化，會擴大或伸長的特效每隔幾像素才需要一張新圖片\n
+    \n
+    參數:\n
+    size (float): 半徑或長度（像素）\n
+    \n
+    回傳:\n
+    int: 量化後的大小\n
+    """
+    if size <= EFFECT_EXACT_SIZE:
+        return max(0, int(size))
+    return int(size / EFFECT_SIZE_STEP + 0.5) * EFFECT_SIZE_STEP
+
+
+######################特效圖片######################
+def get_circle_sprite(
+    radius: float, color: Tuple[int, int, int], alpha: float, width: int = 0
+) -> pygame.Surface:
+    """
+    取得半透明圓形或圓環圖片\n
+    \n
+    參數:\n
+    radius (float): 半徑\n
+    color (Tuple[int, int, int]): RGB 顏色\n
+    alpha (float): 透明度\n
+    width (int): 圓環線寬，0 表示實心圓形\n
+    \n
+    回傳:\n
+    pygame.Surface: 圖片（共用，不可修改），大小 (半徑 * 2, 半徑 * 2)，左上角對齊 (圓心 - 半徑)\n
+    """
+    radius = quantize_size(radius)
+    alpha = quantize_alpha(alpha)
+    shape = "ring" if width else "circle"
+    return EFFECT_SPRITES.get(
+        (shape, radius, width, tuple(color), alpha), _bake_circle, radius, color, alpha, width
+    )
+
+
+def get_glow_sprite(
+    size: int, color: Tuple[int, int, int], alpha: float, rings: int = 4, ring_step: int = 4
+) -> pygame.Surface:
+    """
+    取得多層光暈圖片（外圈最亮，越裡面的圓越淡）\n
+    \n
+    參數:\n
+    size (int): 圖片邊長\n
+    color (Tuple[int, int, int]): RGB 顏色\n
+    alpha (float): 最外圈的透明度，第 i 圈是 alpha // (i + 1)\n
+    rings (int): 圈數\n
+    ring_step (int): 每一圈半徑縮小的像素\n
+    \n
+    回傳:\n
+    pygame.Surface: 圖片（共用，不可修改），大小 (size, size)\n
+    """
+    alpha = quantize_alpha(alpha)
+    return EFFECT_SPRITES.get(
+        ("glow", size, rings, ring_step, tuple(color), alpha),
+        _bake_glow,
+        size,
+        color,
+        alpha,
+        rings,
+        ring_step,
+    )
+
+
+def get_fill_sprite(
+    width: int, height: int, color: Tuple[int, int, int], alpha: float
+) -> pygame.Surface:
+    """
+    取得填滿單一半透明顏色的矩形圖片（閃爍、警告覆蓋用）\n
+    \n
+    參數:\n
+    width (int): 寬度\n
+    height (int): 高度\n
+    color (Tuple[int, int, int]): RGB 顏色\n
+    alpha (float): 透明度\n
+    \n
+    回傳:\n
+    pygame.Surface: 圖片（共用，不可修改）\n
+    """
+    alpha = quantize_alpha(alpha)
+    return EFFECT_SPRITES.get(
+        ("fill", width, height, tuple(color), alpha), _bake_fill, width, height, color, alpha
+    )
+
+
+def get_slash_sprite(
+    length: float, height: int, thickness: int, color: Tuple[int, int, int], alpha: float
+) -> pygame.Surface:
+    """
+    取得斜向斬擊圖片（從左上往右下的粗線）\n
+    \n
+    參數:\n
+    length (float): 斬擊的水平長度\n
+    height (int): 斬擊的高度\n
+    thickness (int): 線寬\n
+    color (Tuple[int, int, int]): RGB 顏色\n
+    alpha (float): 透明度\n
+    \n
+    回傳:\n
+    pygame.Surface: 圖片（共用，不可修改），大小 (長度 + 線寬, 高度)\n
+    """
+    length = quantize_size(length)
+    alpha = quantize_alpha(alpha)
+    return EFFECT_SPRITES.get(
+        ("slash", length, height, thickness, tuple(color), alpha),
+        _bake_slash,
+        length,
+        height,
+        thickness,
+        color,
+        alpha,
+    )
+
+
+######################繪製特效圖片######################
+def _bake_circle(
+    radius: int, color: Tuple[int, int, int], alpha: int, width: int
+) -> pygame.Surface:
+    """
+    畫一張半透明圓形（width 不是 0 時畫圓環）\n
+    """
+    sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, (*color, alpha), (radius, radius), radius, width)
+    return sprite
+
+
+def _bake_glow(
+    size: int, color: Tuple[int, int, int], alpha: int, rings: int, ring_step: int
+) -> pygame.Surface:
+    """
+    畫一張多層光暈，每一圈直接覆蓋外圈（不混色），所以越裡面越淡\n
+    """
+    sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+    for i in range(rings):
+        radius = (size // 2) - i * ring_step
+        if radius > 0:
+            pygame.draw.circle(sprite, (*color, alpha // (i + 1)), (size // 2, size // 2), radius)
+    return sprite
+
+
+def _bake_fill(
+    width: int, height: int, color: Tuple[int, int, int], alpha: int
+) -> pygame.Surface:
+    """
+    畫一張填滿單一半透明顏色的矩形\n
+    """
+    sprite = pygame.Surface((width, height), pygame.SRCALPHA)
+    sprite.fill((*color, alpha))
+    return sprite
+
+
+def _bake_slash(
+    length: int, height: int, thickness: int, color: Tuple[int, int, int], alpha: int
+) -> pygame.Surface:
+    """
+    畫一張斜向斬擊（粗線）\n
+    """
+    sprite = pygame.Surface((length + thickness, height), pygame.SRCALPHA)
+    pygame.draw.line(sprite, (*color, alpha), (thickness // 2, 0), (length, height), thickness)
+    return sprite
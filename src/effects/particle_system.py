@@ -0,0 +1,440 @@
+######################載入套件######################
+from typing import Sequence, Tuple
+
+import numpy as np
+import pygame
+
+from src.assets.baked_surfaces import BakedSurfaceCache
+
+######################粒子系統設定######################
+PARTICLE_BUDGET_LIMIT = 2000  # 每幀所有發射器加起來最多存活的粒子數量
+PARTICLE_EMITTER_CAPACITY = 32  # 發射器一開始配置的粒子數量，不夠時加倍
+PARTICLE_SPRITE_CAPACITY = 512  # 最多保留幾張預先畫好的粒子圖片
+PARTICLE_ALPHA_LEVELS = 16  # 透明度量化成幾個等級（每個等級各畫一張圖片）
+PARTICLE_SHADE_LEVELS = 16  # 顏色明暗每 1.0 量化成幾個等級
+PARTICLE_MAX_SIZE = 127  # 粒子半徑上限（像素）
+
+PARTICLE_STYLE_FADE = "fade"  # 半透明圓形，透明度隨壽命降低（投射物軌跡、爆炸）
+PARTICLE_STYLE_SHADE = "shade"  # 不透明圓形，顏色和大小隨壽命變暗變小（火焰）
+
+# 只影響畫面的隨機數（粒子位置偏移、速度）使用獨立的產生器，不會改變遊戲邏輯的 random 序列
+PARTICLE_RNG = np.random.default_rng()
+
+
+######################粒子預算######################
+class ParticleBudget:
+    """
+    全域粒子預算\n
+    \n
+    每幀開始時呼叫 begin_frame() 歸零，這一幀有更新或發射的發射器依序登記自己的存活粒子數量，\n
+    總數超過上限時後面的發射器只能保留預算內的粒子（新的粒子先被丟掉）。\n
+    很大的火焰牆、大量投射物同時在場上時，粒子的更新和繪製成本都有固定上限\n
+    \n
+    屬性:\n
+    limit (int): 每幀最多存活的粒子數量\n
+    used (int): 這一幀已登記的粒子數量\n
+    frame (int): 幀數編號（發射器用來判斷登記是不是這一幀的）\n
+    dropped (int): 累計因為超過預算而沒有產生或被丟掉的粒子數量\n
+    """
+
+    def __init__(self, limit: int = PARTICLE_BUDGET_LIMIT):
+        """
+        初始化粒子預算\n
+        \n
+        參數:\n
+        limit (int): 每幀最多存活的粒子數量\n
+        """
+        self.limit = limit
+        self.used = 0
+        self.frame = 0
+        self.dropped = 0
+
+    def begin_frame(self):
+        """
+        開始新的一幀，所有發射器重新登記\n
+        """
+        self.frame += 1
+        self.used = 0
+
+    def claim(self, count: int) -> int:
+        """
+        申請粒子數量\n
+        \n
+        參數:\n
+        count (int): 想要的數量\n
+        \n
+        回傳:\n
+        int: 實際拿到的數量\n
+        """
+        granted = max(0, min(count, self.limit - self.used))
+        self.used += granted
+        self.dropped += count - granted
+        return granted
+
+    def release(self, count: int):
+        """
+        歸還粒子數量（粒子在同一幀死亡時）\n
+        \n
+        參數:\n
+        count (int): 歸還的數量\n
+        """
+        self.used = max(0, self.used - count)
+
+    @property
+    def remaining(self) -> int:
+        """
+        這一幀還能產生的粒子數量\n
+        """
+        return max(0, self.limit - self.used)
+
+    def swap_state(self, other: "ParticleBudget"):
+        """
+        和另一個粒子預算交換所有狀態\n
+        \n
+        同一個行程輪流推進好幾個遊戲時，每個遊戲有自己的預算和幀數編號，\n
+        推進前後各交換一次，遊戲之間不會互相用掉預算或弄亂發射器的登記\n
+        \n
+        參數:\n
+        other (ParticleBudget): 要交換的粒子預算\n
+        """
+        self.__dict__, other.__dict__ = other.__dict__, self.__dict__
+
+
+# 全遊戲共用的粒子預算，遊戲每幀更新前呼叫 begin_frame()
+PARTICLE_BUDGET = ParticleBudget()
+
+# 預先畫好的粒子圖片（同樣顏色、大小、透明度等級共用一張）
+PARTICLE_SPRITES = BakedSurfaceCache(PARTICLE_SPRITE_CAPACITY)
+
+
+def _bake_particle_sprite(color: Tuple[int, int, int], size: int, alpha: int) -> pygame.Surface:
+    """
+    畫一張粒子圖片（帶透明度的圓形）\n
+    \n
+    參數:\n
+    color (Tuple[int, int, int]): RGB 顏色\n
+    size (int): 半徑\n
+    alpha (int): 透明度\n
+    \n
+    回傳:\n
+    pygame.Surface: 粒子圖片，左上角對齊 (粒子位置 - 半徑)\n
+    """
+    sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, (*color, alpha), (size, size), size)
+    return sprite
+
+
+######################粒子發射器######################
+class ParticleEmitter:
+    """
+    粒子發射器（Structure of Arrays）\n
+    \n
+    一個發射器的粒子存在連續的 NumPy 陣列裡（位置、速度、壽命、大小、透明度、顏色編號），\n
+    存活的粒子永遠排在最前面 count 格，每幀一次算完移動、壽命、淡出和縮小，\n
+    死掉的粒子整批移除；繪製時依 (顏色, 大小, 透明度等級) 從預先畫好的圖片取用，\n
+    用一次 Surface.blits() 畫完，不會每個粒子都建立新的圖片（每個發射器另外記住編號對應的圖片，\n
+    同一種粒子不用每幀重新查詢）\n
+    \n
+    兩種外觀:\n
+    - PARTICLE_STYLE_FADE：透明度 = alpha × 壽命比例，顏色依壽命比例從 palette 依序選（ramp 是門檻）\n
+    - PARTICLE_STYLE_SHADE：不透明，顏色 = palette[顏色編號] × 壽命比例，半徑 = size × 壽命比例 × 縮放\n
+    \n
+    每次更新和發射都向全域 PARTICLE_BUDGET 登記存活數量，超過預算的新粒子會被丟掉\n
+    \n
+    屬性:\n
+    palette (Tuple[Tuple[int, int, int], ...]): 顏色表\n
+    style (str): 外觀，PARTICLE_STYLE_FADE 或 PARTICLE_STYLE_SHADE\n
+    decay (float): 每幀減少的壽命\n
+    fade (float): 每幀減少的透明度\n
+    shrink (float): 每幀縮小的半徑\n
+    min_size (float): 半徑下限\n
+    ramp (Tuple[float, ...]): FADE 外觀依壽命比例選顏色的門檻（由大到小）\n
+    bounds_x (Tuple[float, float]): 粒子水平活動範圍，超出時反彈（None 表示不限制）\n
+    bounce (float): 反彈時水平速度乘上的倍數\n
+    count (int): 存活的粒子數量\n
+    """
+
+    FIELDS = ("x", "y", "velocity_x", "velocity_y", "life", "max_life", "size", "alpha")
+
+    def __init__(
+        self,
+        palette: Sequence[Tuple[int, int, int]],
+        style: str = PARTICLE_STYLE_FADE,
+        decay: float = 1.0,
+        fade: float = 0.0,
+        shrink: float = 0.0,
+        min_size: float = 1.0,
+        ramp: Tuple[float, ...] = (),
+        bounds_x: Tuple[float, float] = None,
+        bounce: float = -0.5,
+        capacity: int = PARTICLE_EMITTER_CAPACITY,
+    ):
+        """
+        建立粒子發射器\n
+        \n
+        參數:\n
+        palette (Sequence): 顏色表\n
+        style (str): 外觀\n
+        decay (float): 每幀減少的壽命\n
+        fade (float): 每幀減少的透明度\n
+        shrink (float): 每幀縮小的半徑\n
+        min_size (float): 半徑下限\n
+        ramp (Tuple[float, ...]): 依壽命比例選顏色的門檻\n
+        bounds_x (Tuple[float, float]): 水平活動範圍\n
+        bounce (float): 反彈倍數\n
+        capacity (int): 一開始配置的粒子數量\n
+        """
+        self.palette = tuple(tuple(rgb) for rgb in palette)
+        self.style = style
+        self.decay = decay
+        self.fade = fade
+        self.shrink = shrink
+        self.min_size = min_size
+        self.ramp = np.array(ramp, dtype=np.float64)
+        self.bounds_x = bounds_x
+        self.bounce = bounce
+
+        self.capacity = max(1, capacity)
+        self.count = 0
+        for name in self.FIELDS:
+            setattr(self, name, np.zeros(self.capacity))
+        self.color = np.zeros(self.capacity, dtype=np.int64)
+
+        # 這一幀向預算登記的數量
+        self._claim_frame = -1
+        self._claimed = 0
+
+        # 每個顏色表的粒子編號 -> 圖片
+        self._sprite_lookup = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_sprite_lookup"] = {}
+        return state
+
+    def emit(
+        self,
+        x,
+        y,
+        velocity_x=0.0,
+        velocity_y=0.0,
+        life=1.0,
+        size=1.0,
+        color=0,
+        max_life=None,
+        alpha=255.0,
+    ) -> int:
+        """
+        產生粒子（參數可以是陣列或單一數值，數量依 x 的長度）\n
+        \n
+        參數:\n
+        x, y: 位置\n
+        velocity_x, velocity_y: 每幀位移\n
+        life: 壽命\n
+        size: 半徑\n
+        color: 顏色編號（palette 的索引）\n
+        max_life: 壽命上限（計算壽命比例用），None 表示和 life 相同\n
+        alpha: 透明度\n
+        \n
+        回傳:\n
+        int: 實際產生的數量（超過預算時會比要求的少）\n
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+        amount = len(x)
+        if amount == 0:
+            return 0
+        if max_life is None:
+            max_life = life
+
+        start = self.count
+        if start + amount > self.capacity:
+            self._grow(max(self.capacity * 2, start + amount))
+        end = start + amount
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.velocity_x[start:end] = velocity_x
+        self.velocity_y[start:end] = velocity_y
+        self.life[start:end] = life
+        self.max_life[start:end] = max_life
+        self.size[start:end] = size
+        self.alpha[start:end] = alpha
+        self.color[start:end] = color
+        self.count = end
+
+        self._claim_budget()
+        return max(0, self.count - start)
+
+    def update(self, velocity_scale: float = 1.0, steps: int = 1) -> int:
+        """
+        更新所有粒子：移動、減少壽命、淡出、縮小，移除死掉的粒子\n
+        \n
+        參數:\n
+        velocity_scale (float): 垂直速度倍率（火焰脈動用）\n
+        steps (int): 時間步長（幀數），畫面外降低更新頻率時一次推進好幾幀\n
+        \n
+        回傳:\n
+        int: 這一幀壽命用完的粒子數量\n
+        """
+        count = self.count
+        if count == 0:
+            self._claim_budget()
+            return 0
+
+        self.x[:count] += self.velocity_x[:count] * steps
+        self.y[:count] += self.velocity_y[:count] * (velocity_scale * steps)
+        self.life[:count] -= self.decay * steps
+        if self.fade:
+            np.maximum(self.alpha[:count] - self.fade * steps, 0, out=self.alpha[:count])
+        if self.shrink:
+            np.maximum(self.size[:count] - self.shrink * steps, self.min_size, out=self.size[:count])
+
+        dead = self.life[:count] <= 0
+        if self.fade:
+            dead |= self.alpha[:count] <= 0
+        expired = int(np.count_nonzero(dead))
+        if expired:
+            keep = np.flatnonzero(~dead)
+            for name in self.FIELDS + ("color",):
+                array = getattr(self, name)
+                array[: len(keep)] = array[keep]
+            self.count = count = len(keep)
+
+        if self.bounds_x is not None and count:
+            left, right = self.bounds_x
+            x = self.x[:count]
+            outside = (x < left) | (x > right)
+            self.velocity_x[:count][outside] *= self.bounce
+
+        self._claim_budget()
+        return expired
+
+    def clear(self):
+        """
+        移除所有粒子\n
+        """
+        self.count = 0
+        self._claim_budget()
+
+    def render(
+        self,
+        screen: pygame.Surface,
+        camera_y: float,
+        size_scale: float = 1.0,
+        palette: Sequence[Tuple[int, int, int]] = None,
+    ):
+        """
+        一次繪製所有看得到的粒子\n
+        \n
+        參數:\n
+        screen (pygame.Surface): 螢幕表面\n
+        camera_y (float): 攝影機偏移（和各物件 render() 使用的相同）\n
+        size_scale (float): SHADE 外觀的半徑倍率\n
+        palette (Sequence): 這次繪製使用的顏色表，None 表示使用發射器的顏色表\n
+        """
+        count = self.count
+        if count == 0:
+            return
+        palette = self.palette if palette is None else tuple(tuple(rgb) for rgb in palette)
+        screen_width, screen_height = screen.get_size()
+
+        ratio = self.life[:count] / self.max_life[:count]
+        if self.style == PARTICLE_STYLE_SHADE:
+            size = (self.size[:count] * ratio * size_scale).astype(np.int64)
+            shade = np.clip(np.round(ratio * PARTICLE_SHADE_LEVELS), 0, 255).astype(np.int64)
+            alpha_level = np.full(count, PARTICLE_ALPHA_LEVELS, dtype=np.int64)
+            color = self.color[:count]
+            visible = size > 1
+        else:
+            size = np.maximum(1, self.size[:count].astype(np.int64))
+            alpha = np.minimum(255, (self.alpha[:count] * ratio).astype(np.int64))
+            alpha_level = -(-alpha * PARTICLE_ALPHA_LEVELS // 255)
+            shade = np.full(count, PARTICLE_SHADE_LEVELS, dtype=np.int64)
+            color = np.searchsorted(-self.ramp, -ratio, side="right") if len(self.ramp) else self.color[:count]
+            visible = alpha_level > 0
+        size = np.minimum(size, PARTICLE_MAX_SIZE)
+
+        screen_x = self.x[:count].astype(np.int64) - size
+        screen_y = (self.y[:count] - camera_y + screen_height // 2).astype(np.int64) - size
+        visible &= (
+            (screen_x < screen_width) & (screen_x + size * 2 > 0)
+            & (screen_y < screen_height) & (screen_y + size * 2 > 0)
+        )
+        if not visible.any():
+            return
+
+        color = np.minimum(color[visible], len(palette) - 1)
+        codes = ((color * 256 + shade[visible]) * 128 + size[visible]) * 32 + alpha_level[visible]
+
+        lookup = self._sprite_lookup.get(palette)
+        if lookup is None or len(lookup) > PARTICLE_SPRITE_CAPACITY:
+            lookup = self._sprite_lookup[palette] = {}
+
+        blit_list = []
+        for code, left, top in zip(
+            codes.tolist(), screen_x[visible].tolist(), screen_y[visible].tolist()
+        ):
+            sprite = lookup.get(code)
+            if sprite is None:
+                sprite = lookup[code] = self._get_sprite(palette, code)
+            blit_list.append((sprite, (left, top)))
+
+        screen.blits(blit_list, doreturn=False)
+
+    def _get_sprite(self, palette: Tuple[Tuple[int, int, int], ...], code: int) -> pygame.Surface:
+        """
+        依粒子編號從共用快取取得（或畫出）粒子圖片\n
+        \n
+        參數:\n
+        palette (Tuple): 顏色表\n
+        code (int): render() 算出的粒子編號（顏色、明暗、半徑、透明度等級）\n
+        \n
+        回傳:\n
+        pygame.Surface: 粒子圖片\n
+        """
+        code, level = divmod(code, 32)
+        code, radius = divmod(code, 128)
+        index, shade_level = divmod(code, 256)
+        rgb = tuple(
+            min(255, int(channel * shade_level / PARTICLE_SHADE_LEVELS)) for channel in palette[index]
+        )
+        alpha_value = min(255, level * 255 // PARTICLE_ALPHA_LEVELS)
+        return PARTICLE_SPRITES.get(
+            ("particle", rgb, radius, alpha_value),
+            _bake_particle_sprite,
+            rgb,
+            radius,
+            alpha_value,
+        )
+
+    def _claim_budget(self):
+        """
+        讓這一幀向預算登記的數量和存活數量一致，拿不到預算的新粒子直接丟掉\n
+        """
+        if self._claim_frame != PARTICLE_BUDGET.frame:
+            self._claim_frame = PARTICLE_BUDGET.frame
+            self._claimed = 0
+
+        if self.count > self._claimed:
+            granted = PARTICLE_BUDGET.claim(self.count - self._claimed)
+            self._claimed += granted
+            self.count = self._claimed
+        elif self.count < self._claimed:
+            PARTICLE_BUDGET.release(self._claimed - self.count)
+            self._claimed = self.count
+
+    def _grow(self, capacity: int):
+        """
+        擴充陣列容量\n
+        \n
+        參數:\n
+        capacity (int): 新的容量\n
+        """
+        for name in self.FIELDS + ("color",):
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[: self.count] = array[: self.count]
+            setattr(self, name, grown)
+        self.capacity = capacity
@@ -4,6 +4,7 @@ import math
 import random
 from typing import Tuple, Optional
 from abc import ABC, abstractmethod
+from src.levels.swept_collision import ENEMY_CONTACT_TOLERANCE, sweep_solids
 
 
 ######################敵人基礎抽象類別######################
@@ -31,6 +32,58 @@ class BaseEnemy(ABC):
     - attack_player(): 攻擊玩家的行為\n
     """
 
+    # 所有屬性都在 __init__ 宣告，用固定欄位存放（沒有 __dict__，省記憶體、讀寫也比較快）
+    __slots__ = (
+        "enemy_batch",
+        "batch_slot",
+        "x",
+        "y",
+        "start_x",
+        "start_y",
+        "health",
+        "max_health",
+        "attack_damage",
+        "speed",
+        "width",
+        "height",
+        "ai_state",
+        "target_player",
+        "last_known_player_pos",
+        "velocity_x",
+        "velocity_y",
+        "is_on_ground",
+        "facing_direction",
+        "standing_on_moving_platform",
+        "patrol_center_x",
+        "patrol_range",
+        "patrol_direction",
+        "attack_cooldown",
+        "max_attack_cooldown",
+        "detection_range",
+        "attack_range",
+        "damage_flash_timer",
+        "is_dead",
+        "death_timer",
+        "is_burning",
+        "burn_timer",
+        "burn_damage_timer",
+        "burn_damage_interval",
+        "burn_particle_timer",
+        "is_stunned",
+        "stunned_time",
+        "original_ai_state",
+        "animation_frame",
+        "sprite_flip",
+        "has_been_touched",
+        "reset_protection_time",
+        "is_emergency_resetting",
+        "lod_frame",
+        "lod_slot",
+    )
+
+    # 可以交給更新細節層級排程（UpdateLodScheduler）在畫面外降低更新頻率
+    allows_update_lod = True
+
     def __init__(
         self,
         x: float,
@@ -51,6 +104,10 @@ class BaseEnemy(ABC):
         attack_damage (int): 敵人攻擊傷害\n
         speed (float): 敵人移動速度\n
         """
+        # 交給批次引擎（EnemyBatch）管理時記錄所屬批次和欄位編號，要最先設定
+        self.enemy_batch = None
+        self.batch_slot = -1
+
         # 基本位置和物理屬性
         self.x = float(x)
         self.y = float(y)
@@ -114,8 +171,17 @@ class BaseEnemy(ABC):
         # 追蹤激活狀態 - 只有被玩家碰到後才會開始追蹤
         self.has_been_touched = False
 
+        # 緊急重置（_emergency_reset）後的保護時間，保護期間不能攻擊
+        self.reset_protection_time = 0
+        self.is_emergency_resetting = False
+
+        # 更新細節層級排程最後一次更新這個敵人的幀數，沒有啟用排程時不使用
+        self.lod_frame = None
+        # 更新細節層級排程分配的固定編號（錯開更新的幀），第一次排程前是 None
+        self.lod_slot = None
+
     @abstractmethod
-    def update_ai(self, player, platforms=None):
+    def update_ai(self, player, spatial_index=None):
         """
         更新 AI 行為（抽象方法）\n
         \n
@@ -123,7 +189,7 @@ class BaseEnemy(ABC):
         \n
         參數:\n
         player: 玩家物件\n
-        platforms (list): 平台列表，用於移動和碰撞檢測\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引，用於移動和碰撞檢測\n
         """
         pass
 
@@ -155,7 +221,7 @@ class BaseEnemy(ABC):
         """
         pass
 
-    def update(self, player, platforms=None):
+    def update(self, player, spatial_index=None):
         """
         更新敵人狀態\n
         \n
@@ -163,7 +229,7 @@ class BaseEnemy(ABC):
         \n
         參數:\n
         player: 玩家物件\n
-        platforms (list): 當前關卡的平台列表，用於碰撞檢測\n
+        spatial_index (LevelSpatialIndex): 當前關卡的碰撞索引，用於碰撞檢測\n
         """
         if self.is_dead:
             self._update_death_animation()
@@ -174,14 +240,41 @@ class BaseEnemy(ABC):
 
         # 只有不在暈眩狀態時才更新 AI 行為
         if not self.is_stunned:
-            self.update_ai(player, platforms)
+            self.update_ai(player, spatial_index)
 
-        # 應用物理效果（傳入平台資料）
-        self._apply_physics(platforms)
+        # 應用物理效果（傳入碰撞索引）
+        self._apply_physics(spatial_index)
 
         # 更新動畫
         self._update_animation()
 
+    def update_scaled(self, player, spatial_index=None, steps: int = 1):
+        """
+        一次推進好幾幀的敵人狀態（畫面外降低更新頻率時使用）\n
+        \n
+        計時器（冷卻、燃燒、暈眩、動畫幀）逐幀推進，結果和每幀更新相同；\n
+        AI 只決策一次，移動和重力的時間步長放大成 steps 幀\n
+        \n
+        參數:\n
+        player: 玩家物件\n
+        spatial_index (LevelSpatialIndex): 當前關卡的碰撞索引，用於碰撞檢測\n
+        steps (int): 要推進的幀數\n
+        """
+        if self.is_dead:
+            for _ in range(steps):
+                self._update_death_animation()
+            return
+
+        for _ in range(steps):
+            self._update_base_properties()
+
+        if not self.is_stunned:
+            self.update_ai(player, spatial_index)
+
+        self._apply_physics(spatial_index, steps)
+
+        self._update_animation()
+
     def _update_base_properties(self):
         """
         更新基礎屬性\n
@@ -208,12 +301,12 @@ class BaseEnemy(ABC):
             self.animation_frame = 0
 
         # 更新重置保護時間
-        if hasattr(self, "reset_protection_time") and self.reset_protection_time > 0:
+        if self.reset_protection_time > 0:
             self.reset_protection_time -= 1
             if self.reset_protection_time <= 0:
                 self.is_emergency_resetting = False
 
-    def _apply_physics(self, platforms=None):
+    def _apply_physics(self, spatial_index=None, steps: int = 1):
         """
         應用物理效果\n
         \n
@@ -221,10 +314,11 @@ class BaseEnemy(ABC):
         同時處理移動平台的跟隨移動\n
         \n
         參數:\n
-        platforms (list): 當前關卡的平台列表，用於碰撞檢測\n
+        spatial_index (LevelSpatialIndex): 當前關卡的碰撞索引，用於碰撞檢測\n
+        steps (int): 時間步長（幀數），畫面外降低更新頻率時一次移動好幾幀的距離\n
         """
         # 檢查敵人是否掉落到底部平台以下（摔死檢測）
-        if platforms and self._check_fall_death(platforms):
+        if spatial_index and self._check_fall_death(spatial_index):
             # 敵人摔死了，標記為死亡
             self._die_from_fall()
             return  # 死亡敵人不再進行物理計算
@@ -237,56 +331,52 @@ class BaseEnemy(ABC):
                 platform_vel_x, platform_vel_y = (
                     self.standing_on_moving_platform.get_platform_velocity()
                 )
-                self.x += platform_vel_x
+                self.x += platform_vel_x * steps
                 # 垂直方向只有當平台向上移動時才跟隨
                 if platform_vel_y < 0:  # 向上移動
-                    self.y += platform_vel_y
+                    self.y += platform_vel_y * steps
             else:
                 # 已經離開平台
                 self.standing_on_moving_platform = None
 
         # 應用重力（除非在地面上）
         if not self.is_on_ground:
-            self.velocity_y += 0.5  # 重力加速度
+            self.velocity_y += 0.5 * steps  # 重力加速度
 
-        # 限制下墜速度
+        # 限制下墜速度（手感用，穿透由垂直移動的連續碰撞處理）
         if self.velocity_y > 10:
             self.velocity_y = 10
 
         # 暫存舊位置用於碰撞回退
         old_x = self.x
-        old_y = self.y
 
         # 應用水平移動
-        self.x += self.velocity_x
+        self.x += self.velocity_x * steps
 
         # 檢查水平碰撞（與平台的邊緣碰撞）
-        if platforms:
-            if self._check_horizontal_collision(platforms):
+        if spatial_index:
+            if self._check_horizontal_collision(spatial_index):
                 self.x = old_x  # 撞到東西就回到原位
                 self.velocity_x = 0  # 停止水平移動
 
-        # 應用垂直移動
-        self.y += self.velocity_y
+        # 應用垂直移動（碰撞矩形和 pygame.Rect 一樣捨去小數）
+        start_top = int(self.y)
+        self.y += self.velocity_y * steps
 
         # 檢查垂直碰撞（著陸在平台上或撞到頭）
-        if platforms:
-            collision_result = self._check_vertical_collision(platforms)
+        if spatial_index:
+            collision_result = self._check_vertical_collision(spatial_index, start_top)
             if collision_result:
+                # 著陸在平台上或撞到天花板，位置已經停在接觸的地方
+                self.velocity_y = 0
                 if collision_result == "landing":
-                    # 著陸在平台上
-                    self.velocity_y = 0
                     self.is_on_ground = True
-                elif collision_result == "ceiling":
-                    # 撞到天花板
-                    self.y = old_y
-                    self.velocity_y = 0
         else:
             # 沒有平台資料時使用簡化版本（向下兼容）
             self._apply_simple_physics()
 
         # 重置地面狀態（如果沒踩到任何平台）
-        if not self._is_standing_on_platform(platforms):
+        if not self._is_standing_on_platform(spatial_index):
             self.is_on_ground = False
             self.standing_on_moving_platform = None  # 清除移動平台狀態
 
@@ -306,28 +396,24 @@ class BaseEnemy(ABC):
         else:
             self.is_on_ground = False
 
-    def _check_horizontal_collision(self, platforms) -> bool:
+    def _check_horizontal_collision(self, spatial_index) -> bool:
         """
         檢查水平碰撞\n
         \n
         檢查敵人是否在水平移動時撞到平台的邊緣\n
         \n
         參數:\n
-        platforms (list): 平台列表\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引\n
         \n
         回傳:\n
         bool: 是否發生水平碰撞\n
         """
-        if not platforms:
+        if not spatial_index:
             return False
 
         enemy_rect = self.get_collision_rect()
 
-        for platform in platforms:
-            platform_rect = pygame.Rect(
-                platform.x, platform.y, platform.width, platform.height
-            )
-
+        for platform, platform_rect in spatial_index.query_solid_rects(enemy_rect):
             # 檢查是否與平台重疊
             if enemy_rect.colliderect(platform_rect):
                 # 檢查是否是側面碰撞（不是從上方踩到）
@@ -339,70 +425,70 @@ class BaseEnemy(ABC):
 
         return False
 
-    def _check_vertical_collision(self, platforms):
+    def _check_vertical_collision(self, spatial_index, start_top: int):
         """
         檢查垂直碰撞\n
         \n
-        檢查敵人是否著陸在平台上或撞到天花板\n
+        用連續碰撞（swept AABB）沿著這一幀的垂直位移找出最先碰到的平台，\n
+        著陸時停在平台上方、撞到天花板時停在平台下方，高速下墜也不會穿過平台\n
         同時處理移動平台的跟隨移動\n
         \n
         參數:\n
-        platforms (list): 平台列表\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引\n
+        start_top (int): 這一幀移動前碰撞矩形的上緣\n
         \n
         回傳:\n
         str: 碰撞類型 ('landing', 'ceiling') 或 None\n
         """
-        if not platforms:
+        if not spatial_index:
             return None
 
-        enemy_rect = self.get_collision_rect()
+        contact = sweep_solids(
+            spatial_index,
+            int(self.x),
+            start_top,
+            self.width,
+            self.height,
+            0,
+            int(self.y) - start_top,
+            tolerance=ENEMY_CONTACT_TOLERANCE,
+        )
+        if contact is None:
+            return None
 
-        for platform in platforms:
-            platform_rect = pygame.Rect(
-                platform.x, platform.y, platform.width, platform.height
-            )
+        platform, platform_rect, _, _, normal_y = contact
+        if normal_y > 0:  # 向上移動撞到天花板
+            self.y = platform_rect.bottom
+            return "ceiling"
+
+        # 將敵人放在平台正上方
+        self.y = platform_rect.top - self.height
+
+        # 如果是移動平台，讓敵人跟隨平台移動
+        if hasattr(platform, "get_platform_velocity"):
+            platform_vel_x, platform_vel_y = platform.get_platform_velocity()
+            # 只在水平方向跟隨移動平台，垂直方向由重力處理
+            self.x += platform_vel_x
+            # 記錄站在移動平台上的狀態
+            self.standing_on_moving_platform = platform
+        else:
+            self.standing_on_moving_platform = None
 
-            if enemy_rect.colliderect(platform_rect):
-                # 判斷是從上方還是下方碰撞
-                if self.velocity_y > 0:  # 向下移動
-                    # 檢查是否是從上方著陸
-                    if enemy_rect.bottom - self.velocity_y <= platform_rect.top + 5:
-                        # 將敵人放在平台正上方
-                        self.y = platform_rect.top - self.height
-
-                        # 如果是移動平台，讓敵人跟隨平台移動
-                        if hasattr(platform, "get_platform_velocity"):
-                            platform_vel_x, platform_vel_y = (
-                                platform.get_platform_velocity()
-                            )
-                            # 只在水平方向跟隨移動平台，垂直方向由重力處理
-                            self.x += platform_vel_x
-                            # 記錄站在移動平台上的狀態
-                            self.standing_on_moving_platform = platform
-                        else:
-                            self.standing_on_moving_platform = None
-
-                        return "landing"
-                elif self.velocity_y < 0:  # 向上移動
-                    # 檢查是否撞到天花板
-                    if enemy_rect.top - self.velocity_y >= platform_rect.bottom - 5:
-                        return "ceiling"
-
-        return None
-
-    def _is_standing_on_platform(self, platforms) -> bool:
+        return "landing"
+
+    def _is_standing_on_platform(self, spatial_index) -> bool:
         """
         檢查敵人是否站在某個平台上\n
         \n
         用於更新 is_on_ground 狀態\n
         \n
         參數:\n
-        platforms (list): 平台列表\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引\n
         \n
         回傳:\n
         bool: 是否站在平台上\n
         """
-        if not platforms:
+        if not spatial_index:
             return False
 
         # 創建一個稍微向下延伸的檢測矩形
@@ -410,10 +496,7 @@ class BaseEnemy(ABC):
             self.x + 2, self.y + self.height - 2, self.width - 4, 4
         )
 
-        for platform in platforms:
-            platform_rect = pygame.Rect(
-                platform.x, platform.y, platform.width, platform.height
-            )
+        for platform, platform_rect in spatial_index.query_solid_rects(check_rect):
             if check_rect.colliderect(platform_rect):
                 return True
 
@@ -643,7 +726,7 @@ class BaseEnemy(ABC):
             return False
 
         # 正在進行緊急重置的敵人不能攻擊
-        if hasattr(self, "is_emergency_resetting") and self.is_emergency_resetting:
+        if self.is_emergency_resetting:
             return False
 
         distance = self.get_distance_to_player(player)
@@ -691,17 +774,17 @@ class BaseEnemy(ABC):
         else:
             self.velocity_x = 0
 
-    def patrol_movement(self, platforms=None):
+    def patrol_movement(self, spatial_index=None):
         """
         巡邏移動邏輯\n
         \n
         在指定範圍內來回移動，並避免掉下懸崖\n
         \n
         參數:\n
-        platforms (list): 平台列表，用於懸崖檢測\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引，用於懸崖檢測\n
         """
         # 首先檢查前方是否有懸崖（最高優先級）
-        if platforms and self._is_cliff_ahead(platforms):
+        if spatial_index and self._is_cliff_ahead(spatial_index):
             # 前方是懸崖，立即轉向並停止當前移動
             self.patrol_direction *= -1
             self.velocity_x = 0  # 立即停止移動
@@ -716,19 +799,19 @@ class BaseEnemy(ABC):
         # 設定巡邏速度
         self.velocity_x = self.patrol_direction * self.speed * 0.5  # 巡邏時慢一些
 
-    def _is_cliff_ahead(self, platforms) -> bool:
+    def _is_cliff_ahead(self, spatial_index) -> bool:
         """
         檢查前方是否有懸崖\n
         \n
         檢測敵人前方一小段距離內是否還有平台支撐\n
         \n
         參數:\n
-        platforms (list): 平台列表\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引\n
         \n
         回傳:\n
         bool: 前方是否是懸崖\n
         """
-        if not platforms:
+        if not spatial_index:
             return False
 
         # 檢測前方距離（考慮敵人的寬度和速度）
@@ -746,17 +829,14 @@ class BaseEnemy(ABC):
         # 創建較大的檢測矩形，確保不會漏檢
         check_rect = pygame.Rect(check_x - 2, check_y - 2, 10, 10)
 
-        # 檢查是否有平台支撐這個檢測區域
-        for platform in platforms:
-            platform_rect = pygame.Rect(
-                platform.x, platform.y, platform.width, platform.height
-            )
+        # 檢查附近是否有平台支撐這個檢測區域
+        for platform, platform_rect in spatial_index.query_solid_rects(check_rect):
             if check_rect.colliderect(platform_rect):
                 return False  # 有平台，不是懸崖
 
         return True  # 沒有平台，是懸崖
 
-    def _check_fall_death(self, platforms) -> bool:
+    def _check_fall_death(self, spatial_index) -> bool:
         """
         檢查敵人是否掉落到底部平台以下（摔死檢測）\n
         \n
@@ -764,15 +844,16 @@ class BaseEnemy(ABC):
         底部平台在所有關卡中都是座標 y=750 的長平台\n
         \n
         參數:\n
-        platforms (list): 平台列表\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引\n
         \n
         回傳:\n
         bool: 是否應該因摔落而死亡\n
         """
-        if not platforms:
+        if not spatial_index:
             return False
 
         # 在所有關卡中，底部平台都是第一個平台，座標為 (0, 750, 1200, 50)
+        platforms = spatial_index.platforms
         ground_platform = platforms[0] if platforms else None
         
         # 確保我們找到的確實是底部平台（檢查Y座標和寬度）
@@ -943,9 +1024,26 @@ class BaseEnemy(ABC):
         回傳:\n
         bool: 是否在可見範圍內\n
         """
-        screen_y = self.y - camera_y + screen.get_height() // 2
+        return self.is_in_view(camera_y, screen.get_width(), screen.get_height())
+
+    def is_in_view(
+        self, camera_y: float, view_width: int, view_height: int, margin: float = 0
+    ) -> bool:
+        """
+        檢查敵人是否在畫面範圍內（不需要螢幕表面，更新排程也用它判斷遠近）\n
+        \n
+        參數:\n
+        camera_y (float): 攝影機偏移（畫面中心的世界 Y 座標）\n
+        view_width (int): 畫面寬度\n
+        view_height (int): 畫面高度\n
+        margin (float): 畫面外還算在範圍內的距離\n
+        \n
+        回傳:\n
+        bool: 是否在範圍內\n
+        """
+        screen_y = self.y - camera_y + view_height // 2
 
         return (
-            -self.height < screen_y < screen.get_height() + self.height
-            and -self.width < self.x < screen.get_width() + self.width
+            -self.height - margin < screen_y < view_height + self.height + margin
+            and -self.width - margin < self.x < view_width + self.width + margin
         )
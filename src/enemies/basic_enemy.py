@@ -4,6 +4,12 @@ import math
 import random
 from typing import Tuple
 from src.enemies.base_enemy import BaseEnemy
+from src.assets.asset_manager import ASSET_MANAGER
+from src.effects.particle_system import PARTICLE_RNG
+from src.performance.frame_jobs import FRAME_JOBS, JOB_PRIORITY_HIGH
+
+######################基本敵人設定######################
+ENEMY_DECISION_DEADLINE = 2  # 發現玩家、開始攻擊的決策最多可以延後幾幀（啟用工作排程時）
 
 
 ######################基本敵人類別######################
@@ -24,6 +30,19 @@ class BasicEnemy(BaseEnemy):
     - 可以成群出現增加挑戰\n
     """
 
+    __slots__ = (
+        "enemy_color",
+        "damaged_color",
+        "dead_color",
+        "chase_timer",
+        "lose_target_timer",
+        "aggressive_mode",
+        "attack_windup",
+        "attack_active",
+        "current_spatial_index",
+        "enemy_image_cache",
+    )
+
     def __init__(self, x: float, y: float, patrol_range: int = 100):
         """
         初始化基本敵人\n
@@ -54,6 +73,9 @@ class BasicEnemy(BaseEnemy):
         self.attack_windup = 0  # 攻擊前搖時間
         self.attack_active = 0  # 攻擊判定持續時間
 
+        # 最近一次 update_ai 收到的碰撞索引，巡邏移動時使用
+        self.current_spatial_index = None
+
         # 圖片快取 - 避免每幀重複載入
         self.enemy_image_cache = self._load_enemy_image()
 
@@ -65,18 +87,18 @@ class BasicEnemy(BaseEnemy):
         dict: 包含原始和翻轉版本的圖片快取\n
         """
         try:
-            enemy_image = pygame.image.load("assets/images/角色2圖片1.png").convert_alpha()
-            enemy_image = pygame.transform.scale(enemy_image, (self.width, self.height))
-            
+            # 同尺寸的敵人共用圖集裡同一份縮放和翻轉後的圖片
+            image_path = "assets/images/角色2圖片1.png"
+            image_size = (self.width, self.height)
             return {
-                "normal": enemy_image,
-                "flipped": pygame.transform.flip(enemy_image, True, False)
+                "normal": ASSET_MANAGER.get_region(image_path, image_size),
+                "flipped": ASSET_MANAGER.get_region(image_path, image_size, flip_x=True),
             }
         except (pygame.error, FileNotFoundError) as e:
             print(f"無法載入敵人圖片: {e}")
             return None
 
-    def update_ai(self, player, platforms=None):
+    def update_ai(self, player, spatial_index=None):
         """
         更新基本敵人的 AI 行為\n
         \n
@@ -84,13 +106,13 @@ class BasicEnemy(BaseEnemy):
         \n
         參數:\n
         player: 玩家物件\n
-        platforms (list): 平台列表，用於移動和碰撞檢測\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引，用於移動和碰撞檢測\n
         """
         if self.is_dead:
             return
 
-        # 儲存平台資料供後續使用
-        self.current_platforms = platforms
+        # 儲存碰撞索引供後續使用
+        self.current_spatial_index = spatial_index
 
         # 更新狀態計時器
         if self.ai_state == "chase":
@@ -113,17 +135,43 @@ class BasicEnemy(BaseEnemy):
         參數:\n
         player: 玩家物件\n
         """
-        # 執行巡邏移動（傳入平台資料）
-        self.patrol_movement(getattr(self, "current_platforms", None))
+        # 執行巡邏移動（傳入碰撞索引）
+        self.patrol_movement(self.current_spatial_index)
+
+        # 檢查是否發現玩家（決策可以交給工作排程延後幾幀）
+        FRAME_JOBS.submit(
+            "enemy.look_for_player",
+            self._look_for_player,
+            player,
+            key=(self, "look_for_player"),
+            priority=JOB_PRIORITY_HIGH,
+            deadline=ENEMY_DECISION_DEADLINE,
+        )
 
-        # 檢查是否發現玩家
-        if self.can_see_player(player):
-            self.ai_state = "chase"
-            self.target_player = player
-            self.last_known_player_pos = (player.x, player.y)
-            self.chase_timer = 0
-            # 發現玩家時稍微加速
-            self.speed *= 1.2
+    def _look_for_player(self, player) -> bool:
+        """
+        巡邏時發現玩家就開始追蹤\n
+        \n
+        參數:\n
+        player: 玩家物件\n
+        \n
+        回傳:\n
+        bool: 是否開始追蹤\n
+        """
+        # 延後執行時敵人可能已經死亡、暈眩或換了狀態
+        if self.is_dead or self.is_stunned or self.ai_state != "patrol":
+            return False
+
+        if not self.can_see_player(player):
+            return False
+
+        self.ai_state = "chase"
+        self.target_player = player
+        self.last_known_player_pos = (player.x, player.y)
+        self.chase_timer = 0
+        # 發現玩家時稍微加速
+        self.speed *= 1.2
+        return True
 
     def _handle_chase_state(self, player):
         """
@@ -134,11 +182,15 @@ class BasicEnemy(BaseEnemy):
         參數:\n
         player: 玩家物件\n
         """
-        # 檢查是否能攻擊
-        if self.can_attack_player(player):
-            self.ai_state = "attack"
-            self.attack_windup = 30  # 30幀的攻擊前搖
-            self.velocity_x = 0  # 攻擊時停止移動
+        # 檢查是否能攻擊（決策可以交給工作排程延後幾幀，延後時這一幀照常追蹤）
+        if FRAME_JOBS.submit(
+            "enemy.try_attack",
+            self._try_start_attack,
+            player,
+            key=(self, "try_attack"),
+            priority=JOB_PRIORITY_HIGH,
+            deadline=ENEMY_DECISION_DEADLINE,
+        ):
             return
 
         # 檢查是否還能看見玩家
@@ -171,6 +223,28 @@ class BasicEnemy(BaseEnemy):
         if self.chase_timer > self.lose_target_timer:
             self._return_to_patrol()
 
+    def _try_start_attack(self, player) -> bool:
+        """
+        追蹤時玩家進入攻擊範圍就開始攻擊前搖\n
+        \n
+        參數:\n
+        player: 玩家物件\n
+        \n
+        回傳:\n
+        bool: 是否開始攻擊\n
+        """
+        # 延後執行時敵人可能已經死亡、暈眩或換了狀態
+        if self.is_dead or self.is_stunned or self.ai_state != "chase":
+            return False
+
+        if not self.can_attack_player(player):
+            return False
+
+        self.ai_state = "attack"
+        self.attack_windup = 30  # 30幀的攻擊前搖
+        self.velocity_x = 0  # 攻擊時停止移動
+        return True
+
     def _handle_attack_state(self, player):
         """
         處理攻擊狀態\n
@@ -251,10 +325,7 @@ class BasicEnemy(BaseEnemy):
 
         if attack_rect.colliderect(player_rect):
             # 造成傷害
-            damage = self.attack_damage
-            if self.aggressive_mode:
-                damage = int(damage * 1.2)  # 激進模式傷害加成
-
+            damage = self.get_attack_damage()
             player.take_damage(damage)
 
             # 計算擊退方向
@@ -270,6 +341,18 @@ class BasicEnemy(BaseEnemy):
         else:
             return {"hit": False, "effect": "attack_miss"}
 
+    def get_attack_damage(self) -> int:
+        """
+        取得這次攻擊的傷害\n
+        \n
+        回傳:\n
+        int: 攻擊傷害，激進模式有加成\n
+        """
+        damage = self.attack_damage
+        if self.aggressive_mode:
+            damage = int(damage * 1.2)  # 激進模式傷害加成
+        return damage
+
     def get_attack_rect(self) -> pygame.Rect:
         """
         取得攻擊範圍矩形\n
@@ -321,31 +404,38 @@ class BasicEnemy(BaseEnemy):
         # 繪製敵人圖片（使用快取避免重複載入）
         enemy_rect = pygame.Rect(screen_x, screen_y, self.width, self.height)
         
-        if hasattr(self, 'enemy_image_cache') and self.enemy_image_cache:
+        if self.enemy_image_cache:
             # 選擇正確的圖片方向
             if self.facing_direction == -1:  # 面向左時使用翻轉圖片
-                enemy_image = self.enemy_image_cache["flipped"].copy()
+                enemy_region = self.enemy_image_cache["flipped"]
             else:
-                enemy_image = self.enemy_image_cache["normal"].copy()
+                enemy_region = self.enemy_image_cache["normal"]
             
-            # 處理各種視覺效果
+            # 處理各種視覺效果（有效果時才複製圖片，沒有就直接從圖集繪製）
+            enemy_image = None
             if self.is_dead:
                 # 死亡時變暗
                 darken_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
                 darken_surface.fill((0, 0, 0, 150))  # 半透明黑色覆蓋
+                enemy_image = enemy_region.copy()
                 enemy_image.blit(darken_surface, (0, 0))
             elif self.damage_flash_timer > 0 and (self.damage_flash_timer // 2) % 2:
                 # 受傷時變紅
                 flash_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
                 flash_surface.fill((255, 0, 0, 100))  # 半透明紅色覆蓋
+                enemy_image = enemy_region.copy()
                 enemy_image.blit(flash_surface, (0, 0))
             elif self.aggressive_mode:
                 # 激進模式時變深
                 darken_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
                 darken_surface.fill((50, 0, 0, 80))  # 半透明深紅色覆蓋
+                enemy_image = enemy_region.copy()
                 enemy_image.blit(darken_surface, (0, 0))
             
-            screen.blit(enemy_image, (screen_x, screen_y))
+            if enemy_image is None:
+                screen.blit(enemy_region.surface, (screen_x, screen_y), enemy_region.rect)
+            else:
+                screen.blit(enemy_image, (screen_x, screen_y))
         else:
             # 如果沒有快取圖片，使用原本的矩形繪製
             pygame.draw.rect(screen, color, enemy_rect)
@@ -444,14 +534,16 @@ class BasicEnemy(BaseEnemy):
         if not self.is_burning:
             return
 
-        import random
         import math
 
+        # 粒子位置隨機分布在敵人周圍（只影響畫面，用 PARTICLE_RNG，不動到遊戲邏輯的 random）
+        offsets_x = PARTICLE_RNG.integers(-5, 6, 6).tolist()
+        offsets_y = PARTICLE_RNG.integers(-10, 6, 6).tolist()
+
         # 繪製燃燒粒子效果
         for i in range(6):  # 6個火焰粒子
-            # 粒子位置隨機分布在敵人周圍
-            offset_x = random.randint(-5, 5)
-            offset_y = random.randint(-10, 5)
+            offset_x = offsets_x[i]
+            offset_y = offsets_y[i]
 
             particle_x = x + self.width // 2 + offset_x
             particle_y = (
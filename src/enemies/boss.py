@@ -3,6 +3,9 @@ import pygame
 import random
 import math
 from src.enemies.base_enemy import BaseEnemy
+from src.assets.asset_manager import ASSET_MANAGER
+from src.effects.particle_system import PARTICLE_RNG
+from src.effects.effect_sprites import get_circle_sprite, get_fill_sprite, get_slash_sprite
 
 
 ######################Boss 敵人基礎類別######################
@@ -22,6 +25,39 @@ class Boss(BaseEnemy):
     skill_cooldowns (dict): 技能冷卻時間\n
     """
 
+    __slots__ = (
+        "boss_type",
+        "phase",
+        "max_phases",
+        "phase_health_thresholds",
+        "special_skills",
+        "skill_cooldowns",
+        "is_casting_skill",
+        "cast_timer",
+        "current_skill",
+        "state",
+        "patrol_target_x",
+        "patrol_change_timer",
+        "area_attack_active",
+        "area_attack_damage",
+        "area_attack_range",
+        "shockwave_active",
+        "shockwave_direction",
+        "shockwave_damage",
+        "charge_attack_active",
+        "charge_attack_damage",
+        "visual_effects",
+        "boss_color",
+        "phase_colors",
+        "attack_patterns",
+        "movement_timer",
+        "movement_pattern",
+        "boss_image_cache",
+    )
+
+    # Boss 戰是整個關卡的重點，不管距離多遠都每幀更新
+    allows_update_lod = False
+
     def __init__(self, x, y, boss_type="basic"):
         """
         初始化 Boss 敵人\n
@@ -57,6 +93,21 @@ class Boss(BaseEnemy):
         self.is_casting_skill = False
         self.cast_timer = 0
         self.current_skill = None
+        self.state = "patrol"  # patrol, chase, attack
+
+        # 整個關卡範圍的巡邏目標，第一次巡邏時才隨機決定
+        self.patrol_target_x = None
+        self.patrol_change_timer = 0
+
+        # 技能命中狀態（由主遊戲邏輯讀取傷害）
+        self.area_attack_active = False
+        self.area_attack_damage = 0
+        self.area_attack_range = 0
+        self.shockwave_active = False
+        self.shockwave_direction = None  # 震波方向（單位向量）
+        self.shockwave_damage = 0
+        self.charge_attack_active = False
+        self.charge_attack_damage = 0
 
         # 視覺效果系統
         self.visual_effects = {
@@ -109,12 +160,11 @@ class Boss(BaseEnemy):
         cache = {}
         for phase, file_path in boss_files.items():
             try:
-                boss_image = pygame.image.load(file_path).convert_alpha()
-                boss_image = pygame.transform.scale(boss_image, (self.width, self.height))
-                
                 cache[phase] = {
-                    "normal": boss_image,
-                    "flipped": pygame.transform.flip(boss_image, True, False)
+                    "normal": ASSET_MANAGER.get_region(file_path, (self.width, self.height)),
+                    "flipped": ASSET_MANAGER.get_region(
+                        file_path, (self.width, self.height), flip_x=True
+                    ),
                 }
             except (pygame.error, FileNotFoundError) as e:
                 print(f"無法載入Boss圖片 {file_path}: {e}")
@@ -122,7 +172,7 @@ class Boss(BaseEnemy):
         
         return cache
 
-    def update(self, player, platforms=None):
+    def update(self, player, spatial_index=None):
         """
         更新 Boss 狀態\n
         \n
@@ -130,7 +180,7 @@ class Boss(BaseEnemy):
         \n
         參數:\n
         player: 玩家物件\n
-        platforms (list): 平台列表，用於碰撞檢測\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞索引，用於碰撞檢測\n
         """
         if self.is_dead:
             self._update_death_animation()
@@ -154,7 +204,7 @@ class Boss(BaseEnemy):
             self._update_skill_casting(player)
 
         # 應用物理效果（重力、碰撞檢測等）
-        self._apply_physics(platforms)
+        self._apply_physics(spatial_index)
 
         # 更新動畫
         self._update_animation()
@@ -248,7 +298,7 @@ class Boss(BaseEnemy):
         boss_speed = self.speed * 0.4
         
         # 巡邏方向管理
-        if not hasattr(self, 'patrol_target_x'):
+        if self.patrol_target_x is None:
             self.patrol_target_x = random.randint(100, 1100)  # 隨機巡邏目標
             self.patrol_change_timer = random.randint(180, 300)  # 3-5秒後改變目標
         
@@ -542,7 +592,7 @@ class Boss(BaseEnemy):
                 if self.visual_effects[effect_name]["timer"] <= 0:
                     self.visual_effects[effect_name]["active"] = False
 
-    def update_ai(self, player, platforms=None):
+    def update_ai(self, player, spatial_index=None):
         """
         Boss AI 更新（實現抽象方法）\n
         \n
@@ -601,11 +651,11 @@ class Boss(BaseEnemy):
             attack_info["hit"] = True
 
             # 根據當前技能狀態增加特殊效果
-            if hasattr(self, "area_attack_active") and self.area_attack_active:
+            if self.area_attack_active:
                 attack_info["damage"] += 15
                 attack_info["special_effects"].append("area_damage")
 
-            if hasattr(self, "charge_attack_active") and self.charge_attack_active:
+            if self.charge_attack_active:
                 attack_info["damage"] += 25
                 attack_info["special_effects"].append("knockback")
 
@@ -650,22 +700,24 @@ class Boss(BaseEnemy):
         self._draw_skill_effects(screen, camera_x, camera_y)
 
         # 繪製 Boss 主體（使用快取圖片）
-        if hasattr(self, 'boss_image_cache') and self.boss_image_cache.get(self.phase):
+        if self.boss_image_cache.get(self.phase):
             # 選擇正確的圖片方向
-            if hasattr(self, 'facing_direction') and self.facing_direction == -1:
-                boss_image = self.boss_image_cache[self.phase]["flipped"].copy()
+            if self.facing_direction == -1:
+                boss_region = self.boss_image_cache[self.phase]["flipped"]
             else:
-                boss_image = self.boss_image_cache[self.phase]["normal"].copy()
+                boss_region = self.boss_image_cache[self.phase]["normal"]
             
-            # 施法時的視覺效果
+            # 施法時的視覺效果（複製一份再混色）
             if self.is_casting_skill:
+                boss_image = boss_region.copy()
                 flash_intensity = abs(math.sin(pygame.time.get_ticks() * 0.02)) * 100
-                flash_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-                flash_surface.fill((int(flash_intensity), int(flash_intensity), int(flash_intensity), 50))
+                flash_level = int(flash_intensity)
+                flash_surface = get_fill_sprite(self.width, self.height, (flash_level, flash_level, flash_level), 50)
                 boss_image.blit(flash_surface, (0, 0))
-            
-            # 繪製Boss圖片
-            screen.blit(boss_image, (screen_x, screen_y))
+                screen.blit(boss_image, (screen_x, screen_y))
+            else:
+                # 繪製Boss圖片（直接從圖集繪製）
+                screen.blit(boss_region.surface, (screen_x, screen_y), boss_region.rect)
         else:
             # 如果沒有快取圖片，使用原本的矩形繪製
             boss_color = self.boss_color
@@ -730,10 +782,11 @@ class Boss(BaseEnemy):
             
             # 繪製劍氣斬擊（黃白色）
             alpha = int(255 * (timer / max_timer))
-            slash_surface = pygame.Surface((abs(end_x - start_x) + slash_width, 60), pygame.SRCALPHA)
-            pygame.draw.line(slash_surface, (255, 255, 150, alpha), 
-                           (slash_width//2, 0), (abs(end_x - start_x), 60), slash_width)
-            screen.blit(slash_surface, (min(start_x, end_x) - slash_width//2, start_y))
+            slash_surface = get_slash_sprite(abs(end_x - start_x), 60, slash_width, (255, 255, 150), alpha)
+            # 長度量化過，面向左邊時用圖片實際長度往左排
+            slash_length_drawn = slash_surface.get_width() - slash_width
+            slash_left = start_x if self.facing_direction == 1 else start_x - slash_length_drawn
+            screen.blit(slash_surface, (slash_left - slash_width//2, start_y))
 
         # 範圍攻擊效果：多重爆炸圓環
         if self.visual_effects["area_attack"]["active"]:
@@ -748,15 +801,14 @@ class Boss(BaseEnemy):
                     ring_radius = int(30 + ring_progress * 90)
                     ring_alpha = int(150 * (1 - ring_progress) * (timer / max_timer))
                     
-                    # 創建半透明表面
-                    ring_surface = pygame.Surface((ring_radius * 2, ring_radius * 2), pygame.SRCALPHA)
-                    ring_color = [255, 100 - i * 30, 0, ring_alpha]  # 從橙色漸變到紅色
-                    
-                    pygame.draw.circle(ring_surface, ring_color, (ring_radius, ring_radius), ring_radius, 5)
-                    screen.blit(ring_surface, (center_x - ring_radius, center_y - ring_radius))
+                    # 半透明圓環（半徑量化過，用圖片實際大小置中）
+                    ring_color = (255, 100 - i * 30, 0)  # 從橙色漸變到紅色
+                    ring_surface = get_circle_sprite(ring_radius, ring_color, ring_alpha, width=5)
+                    half_size = ring_surface.get_width() // 2
+                    screen.blit(ring_surface, (center_x - half_size, center_y - half_size))
 
         # 震波攻擊效果：電磁波動
-        if self.visual_effects["shockwave"]["active"] and hasattr(self, "shockwave_direction"):
+        if self.visual_effects["shockwave"]["active"] and self.shockwave_direction is not None:
             timer = self.visual_effects["shockwave"]["timer"]
             max_timer = 90
             progress = (max_timer - timer) / max_timer
@@ -794,10 +846,11 @@ class Boss(BaseEnemy):
             # 在 Boss 周圍繪製雷電效果
             alpha = int(255 * (timer / max_timer))
             
-            # 繪製多條隨機雷電
+            # 繪製多條隨機雷電（長度只影響畫面，用 PARTICLE_RNG，不動到遊戲邏輯的 random）
+            lightning_lengths = (40 + PARTICLE_RNG.integers(-10, 11, 6)).tolist()
             for i in range(6):
                 angle = (i * 60 + pygame.time.get_ticks() // 10) % 360
-                lightning_length = 40 + random.randint(-10, 10)
+                lightning_length = lightning_lengths[i]
                 
                 end_x = center_x + math.cos(math.radians(angle)) * lightning_length
                 end_y = center_y + math.sin(math.radians(angle)) * lightning_length
@@ -807,9 +860,8 @@ class Boss(BaseEnemy):
                 pygame.draw.line(screen, lightning_color, (center_x, center_y), (end_x, end_y), 3)
                 
             # 中心發光效果
-            glow_surface = pygame.Surface((80, 80), pygame.SRCALPHA)
             glow_alpha = int(alpha * 0.3)
-            pygame.draw.circle(glow_surface, (255, 255, 255, glow_alpha), (40, 40), 40)
+            glow_surface = get_circle_sprite(40, (255, 255, 255), glow_alpha)
             screen.blit(glow_surface, (center_x - 40, center_y - 40))
 
     def _draw_phase_indicators(self, screen, screen_x, screen_y):
@@ -0,0 +1,995 @@
+######################載入套件######################
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.enemies.basic_enemy import BasicEnemy
+from src.levels.swept_collision import ENEMY_CONTACT_TOLERANCE, sweep_rects
+
+######################批次引擎設定######################
+ENEMY_BATCH_CAPACITY = 64  # 一開始配置的欄位數量，不夠時加倍
+ENEMY_GRAVITY = 0.5  # 重力加速度（和 BaseEnemy._apply_physics 相同）
+ENEMY_MAX_FALL_SPEED = 10  # 最大下墜速度
+ENEMY_BURN_DAMAGE = 3  # 每次燃燒傷害（和 BaseEnemy._apply_burn_damage 相同）
+BASIC_ATTACK_WIDTH = 35  # 攻擊範圍寬度（和 BasicEnemy.get_attack_rect 相同）
+
+# AI 狀態在陣列中用編號儲存，遇到新的狀態名稱時自動加到清單後面
+AI_STATE_NAMES: List[str] = ["patrol", "chase", "attack", "dead"]
+AI_PATROL, AI_CHASE, AI_ATTACK, AI_DEAD = range(4)
+NO_AI_STATE = -1
+
+# 存在批次陣列中的屬性和型別，其他屬性（圖片、顏色等）仍然存在敵人物件上
+BATCH_FIELDS: Dict[str, type] = {
+    # 位置和移動
+    "x": np.float64,
+    "y": np.float64,
+    "width": np.int64,
+    "height": np.int64,
+    "velocity_x": np.float64,
+    "velocity_y": np.float64,
+    "speed": np.float64,
+    "is_on_ground": np.bool_,
+    "facing_direction": np.int64,
+    "sprite_flip": np.bool_,
+    # 巡邏
+    "patrol_center_x": np.float64,
+    "patrol_range": np.float64,
+    "patrol_direction": np.int64,
+    # 戰鬥
+    "health": np.int64,
+    "attack_cooldown": np.int64,
+    "max_attack_cooldown": np.int64,
+    "detection_range": np.float64,
+    "attack_range": np.float64,
+    "has_been_touched": np.bool_,
+    "damage_flash_timer": np.int64,
+    "animation_frame": np.int64,
+    "is_dead": np.bool_,
+    "death_timer": np.int64,
+    # 燃燒和暈眩
+    "is_burning": np.bool_,
+    "burn_timer": np.int64,
+    "burn_damage_timer": np.int64,
+    "burn_damage_interval": np.int64,
+    "burn_particle_timer": np.int64,
+    "is_stunned": np.bool_,
+    "stunned_time": np.int64,
+    # BasicEnemy 的 AI 狀態
+    "chase_timer": np.int64,
+    "lose_target_timer": np.int64,
+    "aggressive_mode": np.bool_,
+    "attack_windup": np.int64,
+    "attack_active": np.int64,
+}
+
+# 不能直接存成數字的屬性，用編碼後的陣列儲存
+ENCODED_ARRAYS: Dict[str, type] = {
+    "ai_state": np.int64,
+    "original_ai_state": np.int64,
+    "moving_platform": np.int64,  # 站著的移動平台在 moving_platforms 的編號，-1 表示沒有
+    "last_known_x": np.float64,
+    "last_known_y": np.float64,
+    "has_last_known": np.bool_,
+    "has_target": np.bool_,
+}
+ENCODED_ATTRIBUTES = [
+    "ai_state",
+    "original_ai_state",
+    "standing_on_moving_platform",
+    "last_known_player_pos",
+    "target_player",
+]
+
+
+def get_ai_state_code(name: Optional[str]) -> int:
+    """
+    取得 AI 狀態名稱的編號\n
+    \n
+    參數:\n
+    name (str): 狀態名稱，None 表示沒有狀態\n
+    \n
+    回傳:\n
+    int: 狀態編號，None 回傳 NO_AI_STATE\n
+    """
+    if name is None:
+        return NO_AI_STATE
+    if name not in AI_STATE_NAMES:
+        AI_STATE_NAMES.append(name)
+    return AI_STATE_NAMES.index(name)
+
+
+def _to_rect_int(values: np.ndarray) -> np.ndarray:
+    """
+    把浮點座標換成整數，和 pygame.Rect 收到浮點數時一樣直接捨去小數\n
+    \n
+    參數:\n
+    values (np.ndarray): 浮點座標\n
+    \n
+    回傳:\n
+    np.ndarray: 整數座標\n
+    """
+    return np.trunc(values).astype(np.int64)
+
+
+def _overlaps_rect(left, top, width, height, rect) -> np.ndarray:
+    """
+    一次檢查很多個矩形是否和同一個 pygame.Rect 重疊（和 colliderect 相同的規則）\n
+    \n
+    參數:\n
+    left, top, width, height: 各矩形的整數範圍（陣列或單一數值）\n
+    rect (pygame.Rect): 要比對的矩形\n
+    \n
+    回傳:\n
+    np.ndarray: 每個矩形是否重疊\n
+    """
+    if rect.width <= 0 or rect.height <= 0:
+        return np.zeros(np.shape(left), dtype=bool)
+    return (
+        (left < rect.right)
+        & (rect.left < left + width)
+        & (top < rect.bottom)
+        & (rect.top < top + height)
+        & (np.asarray(width) > 0)
+        & (np.asarray(height) > 0)
+    )
+
+
+# BasicEnemy 每個固定欄位（__slots__）原本的描述器，批次屬性蓋掉同名欄位後仍然透過它讀寫物件本身
+SLOT_MEMBERS: Dict[str, object] = {
+    name: cls.__dict__[name]
+    for cls in reversed(BasicEnemy.__mro__)
+    for name in cls.__dict__.get("__slots__", ())
+}
+
+
+def _read_slots(enemy, names) -> Dict:
+    """
+    直接讀取敵人物件本身的固定欄位（不經過批次屬性），沒有設定的欄位略過\n
+    \n
+    參數:\n
+    enemy (BasicEnemy): 敵人物件\n
+    names: 欄位名稱\n
+    \n
+    回傳:\n
+    Dict: 欄位名稱對應的值\n
+    """
+    state = {}
+    for name in names:
+        try:
+            state[name] = SLOT_MEMBERS[name].__get__(enemy)
+        except AttributeError:
+            pass
+    return state
+
+
+######################批次屬性描述器######################
+class _BatchField:
+    """
+    批次屬性描述器\n
+    \n
+    敵人在批次裡時，讀寫都轉到 EnemyBatch 的陣列；\n
+    離開批次（enemy_batch 是 None）時存在敵人物件自己的固定欄位，行為和一般屬性相同\n
+    """
+
+    def __init__(self, name: str, cast: type = None):
+        self.name = name
+        self.cast = cast
+        self.slot = SLOT_MEMBERS[name]
+
+    def __get__(self, enemy, owner=None):
+        if enemy is None:
+            return self
+        batch = enemy.enemy_batch
+        if batch is None:
+            return self.slot.__get__(enemy, owner)
+        return self._read(batch, enemy.batch_slot)
+
+    def __set__(self, enemy, value):
+        batch = enemy.enemy_batch
+        if batch is None:
+            self.slot.__set__(enemy, value)
+        else:
+            self._write(batch, enemy.batch_slot, value)
+
+    def _read(self, batch, slot: int):
+        return self.cast(batch.arrays[self.name][slot])
+
+    def _write(self, batch, slot: int, value):
+        batch.arrays[self.name][slot] = value
+
+
+class _AIStateField(_BatchField):
+    """
+    AI 狀態屬性：陣列存編號，讀寫時換成狀態名稱\n
+    """
+
+    def _read(self, batch, slot: int):
+        code = batch.arrays[self.name][slot]
+        return None if code < 0 else AI_STATE_NAMES[code]
+
+    def _write(self, batch, slot: int, value):
+        batch.arrays[self.name][slot] = get_ai_state_code(value)
+
+
+class _MovingPlatformField(_BatchField):
+    """
+    站著的移動平台：陣列存移動平台的編號\n
+    """
+
+    def _read(self, batch, slot: int):
+        index = batch.arrays["moving_platform"][slot]
+        return None if index < 0 else batch.moving_platforms[index]
+
+    def _write(self, batch, slot: int, value):
+        index = -1 if value is None else batch.moving_platforms.index(value)
+        batch.arrays["moving_platform"][slot] = index
+
+
+class _LastKnownPositionField(_BatchField):
+    """
+    最後看到玩家的位置：陣列存 x、y 和是否有記錄\n
+    """
+
+    def _read(self, batch, slot: int):
+        arrays = batch.arrays
+        if not arrays["has_last_known"][slot]:
+            return None
+        return (float(arrays["last_known_x"][slot]), float(arrays["last_known_y"][slot]))
+
+    def _write(self, batch, slot: int, value):
+        arrays = batch.arrays
+        arrays["has_last_known"][slot] = value is not None
+        if value is not None:
+            arrays["last_known_x"][slot] = value[0]
+            arrays["last_known_y"][slot] = value[1]
+
+
+class _TargetPlayerField(_BatchField):
+    """
+    追蹤目標：批次裡只有一個玩家，陣列存是否正在追蹤\n
+    """
+
+    def _read(self, batch, slot: int):
+        return batch.target_player if batch.arrays["has_target"][slot] else None
+
+    def _write(self, batch, slot: int, value):
+        batch.arrays["has_target"][slot] = value is not None
+        if value is not None:
+            batch.target_player = value
+
+
+######################批次敵人######################
+class BatchedBasicEnemy(BasicEnemy):
+    """
+    由 EnemyBatch 管理的基本敵人\n
+    \n
+    行為和 BasicEnemy 完全相同，只是位置、速度、計時器、AI 狀態這些屬性存在批次陣列裡，\n
+    繪製、受傷、暈眩、燃燒等程式照常透過屬性讀寫，不需要知道自己在批次裡。\n
+    離開批次後屬性搬回物件本身，繼續當一般的 BasicEnemy 使用\n
+    """
+
+    __slots__ = ()
+
+    def __init__(self, batch: "EnemyBatch", x: float, y: float, patrol_range: int = 100):
+        """
+        建立批次敵人\n
+        \n
+        參數:\n
+        batch (EnemyBatch): 所屬的批次引擎\n
+        x (float): 敵人起始 X 座標\n
+        y (float): 敵人起始 Y 座標\n
+        patrol_range (int): 巡邏範圍\n
+        """
+        super().__init__(x, y, patrol_range)
+        batch.adopt(self)
+
+    def __getstate__(self):
+        """
+        序列化時只存物件本身的固定欄位，批次屬性存在 EnemyBatch 的陣列裡跟著批次一起序列化\n
+        """
+        return _read_slots(self, SLOT_MEMBERS)
+
+    def __setstate__(self, state: Dict):
+        for name, value in state.items():
+            SLOT_MEMBERS[name].__set__(self, value)
+
+
+for _name, _dtype in BATCH_FIELDS.items():
+    _cast = bool if _dtype is np.bool_ else int if _dtype is np.int64 else float
+    setattr(BatchedBasicEnemy, _name, _BatchField(_name, _cast))
+BatchedBasicEnemy.ai_state = _AIStateField("ai_state")
+BatchedBasicEnemy.original_ai_state = _AIStateField("original_ai_state")
+BatchedBasicEnemy.standing_on_moving_platform = _MovingPlatformField("standing_on_moving_platform")
+BatchedBasicEnemy.last_known_player_pos = _LastKnownPositionField("last_known_player_pos")
+BatchedBasicEnemy.target_player = _TargetPlayerField("target_player")
+
+
+######################敵人批次引擎######################
+class EnemyBatch:
+    """
+    敵人批次引擎（Structure of Arrays）\n
+    \n
+    把關卡裡所有基本敵人的狀態存在 NumPy 陣列（每個屬性一個陣列、每個敵人一格），\n
+    每幀一次算完所有敵人的：\n
+    1. 計時器（攻擊冷卻、受傷閃爍、燃燒、暈眩、動畫）\n
+    2. AI 狀態機（巡邏 → 追蹤 → 攻擊 → 返回巡邏）和到玩家的距離\n
+    3. 重力、移動、和平台的水平 / 垂直碰撞、著陸、跟隨移動平台\n
+    4. 哪些敵人這一幀可能和玩家互動（碰觸、被攻擊、攻擊玩家）\n
+    \n
+    計算規則和 BaseEnemy / BasicEnemy 逐一更新完全相同（包含 pygame.Rect 捨去小數的方式），\n
+    同樣的輸入會得到同樣的結果。只有可能互動的敵人才交給 Level 逐一處理，\n
+    其他敵人整幀都不用執行 Python 程式，適合同時有上百個敵人的關卡\n
+    \n
+    Boss 和其他自訂敵人仍然逐一更新；緊急重置（_emergency_reset）的保護時間不在批次裡計算\n
+    \n
+    屬性:\n
+    arrays (Dict[str, np.ndarray]): 屬性名稱對應的陣列\n
+    members (List): 每一格對應的敵人，空格是 None\n
+    count (int): 目前在批次裡的敵人數量\n
+    moving_platforms (List): 關卡的移動平台（站著的平台用編號記錄）\n
+    target_player: 最近一次被追蹤的玩家\n
+    ai_hits (np.ndarray): 這一幀 AI 攻擊判定命中玩家的敵人\n
+    pending (np.ndarray): 這一幀可能和玩家互動的敵人\n
+    """
+
+    def __init__(self, spatial_index, capacity: int = ENEMY_BATCH_CAPACITY):
+        """
+        建立敵人批次引擎\n
+        \n
+        參數:\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞世界（平台、移動平台）\n
+        capacity (int): 一開始配置的欄位數量\n
+        """
+        self.spatial_index = spatial_index
+        self.moving_platforms = spatial_index.moving_platforms
+        self.target_player = None
+
+        self.capacity = 0
+        self.count = 0
+        self.arrays: Dict[str, np.ndarray] = {"in_use": np.zeros(0, dtype=bool)}
+        for name, dtype in {**BATCH_FIELDS, **ENCODED_ARRAYS}.items():
+            self.arrays[name] = np.zeros(0, dtype=dtype)
+        self.members: List = []
+        self._free_slots: List[int] = []
+        self.ai_hits = np.zeros(0, dtype=bool)
+        self.pending = np.zeros(0, dtype=bool)
+
+        self._platform_index = None
+        self._grow(capacity)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, enemy) -> bool:
+        return isinstance(enemy, BatchedBasicEnemy) and enemy.enemy_batch is self
+
+    @staticmethod
+    def can_adopt(enemy) -> bool:
+        """
+        檢查敵人能不能交給批次引擎（只支援基本敵人）\n
+        \n
+        參數:\n
+        enemy: 敵人物件\n
+        \n
+        回傳:\n
+        bool: 是否可以加入批次\n
+        """
+        return type(enemy) in (BasicEnemy, BatchedBasicEnemy)
+
+    def attach(self, enemy: BatchedBasicEnemy):
+        """
+        配置一格給批次敵人（屬性都先歸零）\n
+        \n
+        參數:\n
+        enemy (BatchedBasicEnemy): 要加入的敵人\n
+        """
+        if not self._free_slots:
+            self._grow(self.capacity * 2)
+        slot = self._free_slots.pop()
+
+        for name, array in self.arrays.items():
+            array[slot] = 0
+        self.arrays["in_use"][slot] = True
+        self.arrays["original_ai_state"][slot] = NO_AI_STATE
+        self.arrays["moving_platform"][slot] = -1
+        self.members[slot] = enemy
+        self.count += 1
+
+        enemy.enemy_batch = self
+        enemy.batch_slot = slot
+
+    def adopt(self, enemy) -> BatchedBasicEnemy:
+        """
+        把基本敵人換成批次敵人，所有狀態原封不動搬過去\n
+        \n
+        參數:\n
+        enemy (BasicEnemy): 原本的敵人（已經離開批次的批次敵人也可以）\n
+        \n
+        回傳:\n
+        BatchedBasicEnemy: 在這個批次裡的敵人\n
+        """
+        if isinstance(enemy, BatchedBasicEnemy):
+            if enemy.enemy_batch is self:
+                return enemy
+            if enemy.enemy_batch is not None:
+                enemy.enemy_batch.detach(enemy)
+            names = list(BATCH_FIELDS) + ENCODED_ATTRIBUTES
+            state = _read_slots(enemy, names)
+            for name in state:
+                SLOT_MEMBERS[name].__delete__(enemy)
+            view = enemy
+        else:
+            names = [name for name in SLOT_MEMBERS if name not in ("enemy_batch", "batch_slot")]
+            state = _read_slots(enemy, names)
+            view = BatchedBasicEnemy.__new__(BatchedBasicEnemy)
+
+        self.attach(view)
+        for name, value in state.items():
+            setattr(view, name, value)
+        return view
+
+    def detach(self, enemy: BatchedBasicEnemy):
+        """
+        讓敵人離開批次，屬性搬回敵人物件上\n
+        \n
+        參數:\n
+        enemy (BatchedBasicEnemy): 要離開的敵人\n
+        """
+        if enemy.enemy_batch is not self:
+            return
+        state = {name: getattr(enemy, name) for name in list(BATCH_FIELDS) + ENCODED_ATTRIBUTES}
+        slot = enemy.batch_slot
+
+        enemy.enemy_batch = None
+        enemy.batch_slot = -1
+        for name, value in state.items():
+            setattr(enemy, name, value)
+
+        self.arrays["in_use"][slot] = False
+        self.members[slot] = None
+        self._free_slots.append(slot)
+        self.count -= 1
+
+    def clear(self):
+        """
+        讓所有敵人離開批次\n
+        """
+        for enemy in self.members:
+            if enemy is not None:
+                self.detach(enemy)
+
+    def retain(self, enemies: List):
+        """
+        只保留還在敵人清單裡的批次敵人（被擊敗移除的敵人離開批次，空出來的格子可以重複使用）\n
+        \n
+        參數:\n
+        enemies (List): 關卡目前的敵人清單\n
+        """
+        if not self.count:
+            return
+        present = np.zeros(self.capacity, dtype=bool)
+        present[[enemy.batch_slot for enemy in enemies if enemy.enemy_batch is self]] = True
+        for slot in np.flatnonzero(self.arrays["in_use"] & ~present):
+            self.detach(self.members[slot])
+
+    def update(self, player, spatial_index):
+        """
+        一次更新批次裡所有敵人（和逐一呼叫 enemy.update(player, spatial_index) 相同）\n
+        \n
+        參數:\n
+        player: 玩家物件\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞世界\n
+        """
+        arrays = self.arrays
+        self.ai_hits[:] = False
+        self.pending[:] = False
+        if not self.count:
+            return
+
+        in_use = arrays["in_use"]
+        dead = in_use & arrays["is_dead"]
+        arrays["death_timer"][dead] += 1
+        alive = in_use & ~arrays["is_dead"]
+
+        self._load_platforms(spatial_index)
+        self._update_timers(alive)
+        self._update_ai(alive & ~arrays["is_stunned"] & ~arrays["is_dead"], player)
+        self._apply_physics(alive, spatial_index)
+
+        # 根據移動方向更新面向
+        velocity_x = arrays["velocity_x"]
+        moving_right = alive & (velocity_x > 0)
+        moving_left = alive & (velocity_x < 0)
+        arrays["facing_direction"][moving_right] = 1
+        arrays["sprite_flip"][moving_right] = False
+        arrays["facing_direction"][moving_left] = -1
+        arrays["sprite_flip"][moving_left] = True
+
+        self._find_interactions(player)
+
+    def begin_interaction(self, enemy: BatchedBasicEnemy, player) -> bool:
+        """
+        Level 處理這個敵人和玩家的互動前呼叫\n
+        \n
+        先補上這一幀 AI 攻擊判定對玩家造成的傷害（和逐一更新時在 update_ai 裡的順序相同），\n
+        再回報需不需要檢查碰觸、被攻擊、攻擊玩家\n
+        \n
+        參數:\n
+        enemy (BatchedBasicEnemy): 批次敵人\n
+        player: 玩家物件\n
+        \n
+        回傳:\n
+        bool: 是否需要做互動檢查，False 表示這一幀不可能和玩家互動\n
+        """
+        slot = enemy.batch_slot
+        if self.ai_hits[slot]:
+            player.take_damage(enemy.get_attack_damage())
+        return bool(self.pending[slot])
+
+    def _grow(self, capacity: int):
+        """
+        擴充陣列容量\n
+        \n
+        參數:\n
+        capacity (int): 新的容量\n
+        """
+        capacity = max(capacity, 1)
+        for name, array in self.arrays.items():
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[: self.capacity] = array
+            self.arrays[name] = grown
+        self.ai_hits = np.zeros(capacity, dtype=bool)
+        self.pending = np.zeros(capacity, dtype=bool)
+        self.members.extend([None] * (capacity - self.capacity))
+        # 反向放入，pop() 會先拿到編號小的格子
+        self._free_slots = list(range(capacity - 1, self.capacity - 1, -1)) + self._free_slots
+        self.capacity = capacity
+
+    def _load_platforms(self, spatial_index):
+        """
+        準備平台的碰撞範圍陣列（一般平台只建一次，移動平台每幀更新位置和速度）\n
+        \n
+        參數:\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞世界\n
+        """
+        if self._platform_index is not spatial_index:
+            self._platform_index = spatial_index
+            self.spatial_index = spatial_index
+            self.moving_platforms = spatial_index.moving_platforms
+            platforms = spatial_index.all_platforms
+            rects = [spatial_index.get_rect(platform) for platform in platforms]
+            self._platform_left = np.array([rect.x for rect in rects], dtype=np.int64)
+            self._platform_top = np.array([rect.y for rect in rects], dtype=np.int64)
+            self._platform_width = np.array([rect.width for rect in rects], dtype=np.int64)
+            self._platform_height = np.array([rect.height for rect in rects], dtype=np.int64)
+            self._platform_velocity_x = np.zeros(len(platforms))
+            self._platform_velocity_y = np.zeros(len(platforms))
+            # 移動平台接在一般平台後面
+            first_moving = len(platforms) - len(self.moving_platforms)
+            self._moving_rows = np.arange(first_moving, len(platforms))
+            self._platform_moving_index = np.full(len(platforms), -1, dtype=np.int64)
+            self._platform_moving_index[self._moving_rows] = np.arange(len(self.moving_platforms))
+
+        for row, platform in zip(self._moving_rows, self.moving_platforms):
+            rect = spatial_index.get_rect(platform)
+            self._platform_left[row] = rect.x
+            self._platform_top[row] = rect.y
+            self._platform_width[row] = rect.width
+            self._platform_height[row] = rect.height
+            self._platform_velocity_x[row], self._platform_velocity_y[row] = (
+                platform.get_platform_velocity()
+            )
+
+    def _overlaps_platforms(self, left, top, width, height) -> np.ndarray:
+        """
+        一次檢查很多個矩形和所有平台是否重疊\n
+        \n
+        參數:\n
+        left, top, width, height: 各矩形的整數範圍（陣列或單一數值）\n
+        \n
+        回傳:\n
+        np.ndarray: (矩形數量, 平台數量) 的重疊表，平台順序和 all_platforms 相同\n
+        """
+        left = np.asarray(left)[:, None]
+        top = np.asarray(top)[:, None]
+        width = np.broadcast_to(width, left.shape[:1])[:, None]
+        height = np.broadcast_to(height, top.shape[:1])[:, None]
+        platform_left = self._platform_left[None, :]
+        platform_top = self._platform_top[None, :]
+        return (
+            (left < platform_left + self._platform_width[None, :])
+            & (platform_left < left + width)
+            & (top < platform_top + self._platform_height[None, :])
+            & (platform_top < top + height)
+            & (width > 0)
+            & (height > 0)
+        )
+
+    def _update_timers(self, alive: np.ndarray):
+        """
+        更新計時器（對應 BaseEnemy._update_base_properties）\n
+        \n
+        參數:\n
+        alive (np.ndarray): 這一幀開始時還活著的敵人\n
+        """
+        arrays = self.arrays
+
+        cooldown = arrays["attack_cooldown"]
+        cooldown[alive & (cooldown > 0)] -= 1
+        flash = arrays["damage_flash_timer"]
+        flash[alive & (flash > 0)] -= 1
+
+        # 燃燒：持續扣血，時間到就熄滅
+        burning = alive & arrays["is_burning"]
+        burn_timer = arrays["burn_timer"]
+        burn_damage_timer = arrays["burn_damage_timer"]
+        ticking = burning & (burn_timer > 0)
+        burn_timer[ticking] -= 1
+        burn_damage_timer[ticking] += 1
+        burned = ticking & (burn_damage_timer >= arrays["burn_damage_interval"])
+        health = arrays["health"]
+        health[burned] -= ENEMY_BURN_DAMAGE
+        killed = burned & (health <= 0)
+        health[killed] = 0
+        arrays["is_dead"][killed] = True
+        arrays["ai_state"][killed] = AI_DEAD
+        arrays["is_burning"][killed] = False
+        flash[burned] = 5
+        burn_damage_timer[burned] = 0
+        arrays["burn_particle_timer"][ticking] += 1
+        burned_out = burning & ~ticking
+        arrays["is_burning"][burned_out] = False
+        burn_damage_timer[burned_out] = 0
+        arrays["burn_particle_timer"][burned_out] = 0
+
+        # 暈眩：期間停止移動，結束後恢復原本的 AI 狀態
+        stunned = alive & arrays["is_stunned"] & ~arrays["is_dead"]
+        stunned_time = arrays["stunned_time"]
+        dizzy = stunned & (stunned_time > 0)
+        stunned_time[dizzy] -= 1
+        arrays["velocity_x"][dizzy] = 0
+        recovered = stunned & ~dizzy
+        arrays["is_stunned"][recovered] = False
+        original_state = arrays["original_ai_state"]
+        restored = recovered & (original_state != NO_AI_STATE)
+        arrays["ai_state"][restored] = original_state[restored]
+        original_state[restored] = NO_AI_STATE
+
+        frame = arrays["animation_frame"]
+        frame[alive] += 1
+        frame[alive & (frame >= 1000)] = 0
+
+    def _update_ai(self, thinking: np.ndarray, player):
+        """
+        更新 AI 狀態機（對應 BasicEnemy.update_ai）\n
+        \n
+        參數:\n
+        thinking (np.ndarray): 這一幀要執行 AI 的敵人（活著而且沒有暈眩）\n
+        player: 玩家物件\n
+        """
+        arrays = self.arrays
+        state = arrays["ai_state"]
+        x = arrays["x"]
+        velocity_x = arrays["velocity_x"]
+        speed = arrays["speed"]
+        chase_timer = arrays["chase_timer"]
+
+        chasing = thinking & (state == AI_CHASE)
+        chase_timer[chasing] += 1
+        patrolling = thinking & (state == AI_PATROL)
+        attacking = thinking & (state == AI_ATTACK)
+
+        player_x = player.x
+        player_y = player.y
+        dx = player_x - x
+        dy = player_y - arrays["y"]
+        distance = np.sqrt(dx * dx + dy * dy)
+        can_see = arrays["has_been_touched"] & (distance <= arrays["detection_range"])
+
+        # 巡邏：前方是懸崖就轉向，到達巡邏邊界就折返
+        if patrolling.any():
+            direction = arrays["patrol_direction"]
+            cliff = patrolling & self._find_cliffs(patrolling)
+            direction[cliff] *= -1
+            velocity_x[cliff] = 0
+
+            walking = patrolling & ~cliff
+            center = arrays["patrol_center_x"]
+            patrol_range = arrays["patrol_range"]
+            turn_right = walking & (x <= center - patrol_range)
+            turn_left = walking & ~turn_right & (x >= center + patrol_range)
+            direction[turn_right] = 1
+            direction[turn_left] = -1
+            velocity_x[walking] = direction[walking] * speed[walking] * 0.5
+
+            spotted = patrolling & can_see
+            if spotted.any():
+                state[spotted] = AI_CHASE
+                arrays["has_target"][spotted] = True
+                self.target_player = player
+                arrays["last_known_x"][spotted] = player_x
+                arrays["last_known_y"][spotted] = player_y
+                arrays["has_last_known"][spotted] = True
+                chase_timer[spotted] = 0
+                speed[spotted] *= 1.2
+
+        # 追蹤：進入攻擊距離就攻擊，看得到就追，看不到就走到最後看到的位置
+        if chasing.any():
+            attack_range = arrays["attack_range"]
+            start_attack = (
+                chasing
+                & (arrays["attack_cooldown"] <= 0)
+                & arrays["is_on_ground"]
+                & (distance <= attack_range)
+            )
+            state[start_attack] = AI_ATTACK
+            arrays["attack_windup"][start_attack] = 30
+            velocity_x[start_attack] = 0
+
+            pursuing = chasing & ~start_attack
+            seen = pursuing & can_see
+            arrays["last_known_x"][seen] = player_x
+            arrays["last_known_y"][seen] = player_y
+            arrays["has_last_known"][seen] = True
+            chase_timer[seen] = 0
+            approach = seen & (np.abs(dx) > 5)
+            velocity_x[approach] = np.where(dx[approach] > 0, speed[approach], -speed[approach])
+            velocity_x[seen & ~approach] = 0
+
+            aggressive = arrays["aggressive_mode"]
+            enraged = seen & ~aggressive & (chase_timer > 180)
+            aggressive[enraged] = True
+            speed[enraged] *= 1.3
+            attack_range[enraged] *= 1.2
+
+            lost = pursuing & ~can_see
+            has_last_known = arrays["has_last_known"]
+            tracking = lost & has_last_known
+            last_dx = arrays["last_known_x"] - x
+            returning = tracking & (np.abs(last_dx) > 10)
+            velocity_x[returning] = np.where(
+                last_dx[returning] > 0, speed[returning], -speed[returning]
+            )
+            has_last_known[tracking & ~returning] = False
+            chase_timer[lost] += 1
+
+            give_up = pursuing & (chase_timer > arrays["lose_target_timer"])
+            state[give_up] = AI_PATROL
+            arrays["has_target"][give_up] = False
+            has_last_known[give_up] = False
+            chase_timer[give_up] = 0
+            aggressive[give_up] = False
+            speed[give_up] = 1.5
+            attack_range[give_up] = 40
+
+        # 攻擊：前搖（稍微後退） → 攻擊判定（向前衝刺） → 下一輪
+        if attacking.any():
+            windup = arrays["attack_windup"]
+            active = arrays["attack_active"]
+            facing = arrays["facing_direction"]
+
+            winding = attacking & (windup > 0)
+            windup[winding] -= 1
+            velocity_x[winding] = 0
+            step_back = winding & (windup > 15)
+            velocity_x[step_back] = -facing[step_back] * 0.5
+
+            striking = attacking & ~winding & (active > 0)
+            active[striking] -= 1
+            swing = striking & (active == 9)
+            if swing.any():
+                self.ai_hits[:] = swing & self._attack_overlaps(player.get_collision_rect())
+                velocity_x[swing] = facing[swing] * speed[swing] * 2
+
+            active[attacking & ~winding & ~striking] = 10
+
+    def _find_cliffs(self, patrolling: np.ndarray) -> np.ndarray:
+        """
+        檢查巡邏中的敵人前方是否是懸崖（對應 BaseEnemy._is_cliff_ahead）\n
+        \n
+        參數:\n
+        patrolling (np.ndarray): 巡邏中的敵人\n
+        \n
+        回傳:\n
+        np.ndarray: 前方是懸崖的敵人\n
+        """
+        arrays = self.arrays
+        rows = np.flatnonzero(patrolling)
+        x = arrays["x"][rows]
+        width = arrays["width"][rows]
+        check_x = np.where(arrays["patrol_direction"][rows] > 0, x + width + 5, x - 5)
+        check_y = arrays["y"][rows] + arrays["height"][rows] + 2
+
+        supported = self._overlaps_platforms(
+            _to_rect_int(check_x - 2), _to_rect_int(check_y - 2), 10, 10
+        ).any(axis=1)
+        cliffs = np.zeros(self.capacity, dtype=bool)
+        cliffs[rows[~supported]] = True
+        return cliffs
+
+    def _attack_overlaps(self, player_rect) -> np.ndarray:
+        """
+        檢查敵人的攻擊範圍是否碰到玩家（對應 BasicEnemy.get_attack_rect）\n
+        \n
+        參數:\n
+        player_rect (pygame.Rect): 玩家碰撞矩形\n
+        \n
+        回傳:\n
+        np.ndarray: 攻擊範圍碰到玩家的敵人\n
+        """
+        arrays = self.arrays
+        x = arrays["x"]
+        attack_x = np.where(arrays["facing_direction"] == 1, x + arrays["width"], x - BASIC_ATTACK_WIDTH)
+        return _overlaps_rect(
+            _to_rect_int(attack_x),
+            _to_rect_int(arrays["y"]),
+            BASIC_ATTACK_WIDTH,
+            arrays["height"],
+            player_rect,
+        )
+
+    def _apply_physics(self, alive: np.ndarray, spatial_index):
+        """
+        重力、移動和平台碰撞（對應 BaseEnemy._apply_physics）\n
+        \n
+        參數:\n
+        alive (np.ndarray): 這一幀開始時還活著的敵人\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞世界\n
+        """
+        arrays = self.arrays
+
+        # 掉到底部平台下方太深就摔死
+        platforms = spatial_index.platforms
+        ground_platform = platforms[0] if platforms else None
+        if ground_platform and ground_platform.y == 750 and ground_platform.width >= 1000:
+            fall_death_threshold = ground_platform.y + ground_platform.height + 50
+            fallen = alive & (arrays["y"] > fall_death_threshold)
+            if fallen.any():
+                arrays["is_dead"][fallen] = True
+                arrays["health"][fallen] = 0
+                arrays["ai_state"][fallen] = AI_DEAD
+                arrays["velocity_x"][fallen] = 0
+                arrays["velocity_y"][fallen] = 0
+                arrays["is_on_ground"][fallen] = False
+                arrays["is_burning"][fallen] = False
+                arrays["is_stunned"][fallen] = False
+                arrays["moving_platform"][fallen] = -1
+                arrays["death_timer"][fallen] = 0
+                alive = alive & ~fallen
+
+        rows = np.flatnonzero(alive)
+        if not rows.size:
+            return
+        x = arrays["x"][rows]
+        y = arrays["y"][rows]
+        velocity_x = arrays["velocity_x"][rows]
+        velocity_y = arrays["velocity_y"][rows]
+        width = arrays["width"][rows]
+        height = arrays["height"][rows]
+        on_ground = arrays["is_on_ground"][rows]
+        moving_platform = arrays["moving_platform"][rows]
+        has_platforms = self._platform_left.size > 0
+
+        # 站在移動平台上：還站得住就跟著平台移動（垂直方向只跟著往上）
+        riding = np.flatnonzero(moving_platform >= 0)
+        if riding.size:
+            platform_rows = self._moving_rows[moving_platform[riding]]
+            check_left = _to_rect_int(x[riding] + 2)
+            check_bottom = _to_rect_int(y[riding] + height[riding] - 2) + 6
+            platform_left = self._platform_left[platform_rows]
+            still_on = (
+                (check_left + width[riding] - 4 > platform_left)
+                & (check_left < platform_left + self._platform_width[platform_rows])
+                & (np.abs(check_bottom - self._platform_top[platform_rows]) <= 5)
+            )
+            staying = riding[still_on]
+            x[staying] += self._platform_velocity_x[platform_rows[still_on]]
+            rise = self._platform_velocity_y[platform_rows[still_on]]
+            y[staying[rise < 0]] += rise[rise < 0]
+            moving_platform[riding[~still_on]] = -1
+
+        # 重力
+        velocity_y[~on_ground] += ENEMY_GRAVITY
+        velocity_y[velocity_y > ENEMY_MAX_FALL_SPEED] = ENEMY_MAX_FALL_SPEED
+
+        old_x = x.copy()
+
+        # 水平移動，撞到平台側面就退回原位
+        x += velocity_x
+        if has_platforms:
+            top = _to_rect_int(y)
+            hits = self._overlaps_platforms(_to_rect_int(x), top, width, height)
+            platform_height = self._platform_height
+            platform_center_y = self._platform_top + platform_height // 2
+            side_hits = hits & (
+                np.abs((top + height // 2)[:, None] - platform_center_y[None, :])
+                < (platform_height // 2)[None, :]
+            )
+            blocked = side_hits.any(axis=1)
+            x[blocked] = old_x[blocked]
+            velocity_x[blocked] = 0
+
+        # 垂直移動，沿著位移找出最先碰到的平台（同時碰到時取平台順序最前面的）
+        start_top = _to_rect_int(y)
+        y += velocity_y
+        # 碰撞矩形沒有上下移動的敵人（站在地上）不會碰到新的平台
+        moving = np.flatnonzero(_to_rect_int(y) != start_top)
+        if has_platforms and moving.size:
+            platform_left = self._platform_left[None, :]
+            platform_top = self._platform_top[None, :]
+            contact_time, _, normal_y = sweep_rects(
+                _to_rect_int(x[moving])[:, None],
+                start_top[moving][:, None],
+                width[moving][:, None],
+                height[moving][:, None],
+                0,
+                (_to_rect_int(y[moving]) - start_top[moving])[:, None],
+                platform_left,
+                platform_top,
+                platform_left + self._platform_width[None, :],
+                platform_top + self._platform_height[None, :],
+                ENEMY_CONTACT_TOLERANCE,
+            )
+            first = contact_time.argmin(axis=1)
+            found = np.isfinite(contact_time[np.arange(moving.size), first])
+            contact_normal = normal_y[np.arange(moving.size), first]
+
+            landing = found & (contact_normal < 0)
+            landed = moving[landing]
+            if landed.size:
+                landed_rows = first[landing]
+                y[landed] = self._platform_top[landed_rows] - height[landed]
+                moving_index = self._platform_moving_index[landed_rows]
+                on_moving = moving_index >= 0
+                x[landed[on_moving]] += self._platform_velocity_x[landed_rows[on_moving]]
+                moving_platform[landed] = moving_index
+                velocity_y[landed] = 0
+                on_ground[landed] = True
+
+            bumping = found & (contact_normal > 0)
+            bumped = moving[bumping]
+            y[bumped] = (self._platform_top + self._platform_height)[first[bumping]]
+            velocity_y[bumped] = 0
+
+        # 腳底沒有踩到任何平台就不在地面上
+        if has_platforms:
+            standing = self._overlaps_platforms(
+                _to_rect_int(x + 2), _to_rect_int(y + height - 2), width - 4, 4
+            ).any(axis=1)
+        else:
+            standing = np.zeros(rows.size, dtype=bool)
+        on_ground[~standing] = False
+        moving_platform[~standing] = -1
+
+        arrays["x"][rows] = x
+        arrays["y"][rows] = y
+        arrays["velocity_x"][rows] = velocity_x
+        arrays["velocity_y"][rows] = velocity_y
+        arrays["is_on_ground"][rows] = on_ground
+        arrays["moving_platform"][rows] = moving_platform
+
+    def _find_interactions(self, player):
+        """
+        找出這一幀可能和玩家互動的敵人\n
+        \n
+        和 Level.update 逐一檢查的條件相同：還沒被碰過而且碰到玩家、\n
+        玩家剛出手而且打得到、攻擊冷卻結束而且攻擊範圍碰到玩家，或是 AI 攻擊判定命中\n
+        \n
+        參數:\n
+        player: 玩家物件\n
+        """
+        arrays = self.arrays
+        in_use = arrays["in_use"]
+        left = _to_rect_int(arrays["x"])
+        top = _to_rect_int(arrays["y"])
+        width = arrays["width"]
+        height = arrays["height"]
+
+        player_rect = player.get_collision_rect()
+        pending = in_use & ~arrays["has_been_touched"] & _overlaps_rect(
+            left, top, width, height, player_rect
+        )
+        if player.attack_just_started:
+            pending |= in_use & _overlaps_rect(left, top, width, height, player.get_attack_rect())
+        pending |= in_use & (arrays["attack_cooldown"] <= 0) & self._attack_overlaps(player_rect)
+        self.pending[:] = pending | self.ai_hits
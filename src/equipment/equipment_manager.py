@@ -2,6 +2,10 @@
 import pygame
 import random
 from typing import Dict, List, Optional
+from src.performance.frame_jobs import FRAME_JOBS
+
+######################裝備系統設定######################
+EQUIPMENT_UPDATE_DEADLINE = 2  # 技能冷卻和效果計時器最多可以延後幾幀（啟用工作排程時）
 
 
 ######################裝備管理系統######################
@@ -98,6 +102,9 @@ class EquipmentManager:
         self.invisibility_timer = 0
         self.shield_timer = 0
 
+        # 工作排程延後更新時累積的幀數
+        self.pending_frames = 0
+
     def add_set_piece(self, set_name: str) -> bool:
         """
         添加套裝件數\n
@@ -154,28 +161,27 @@ class EquipmentManager:
         """
         # 攻擊力加成
         if "attack_bonus" in self.active_effects:
-            player.base_attack = getattr(player, "base_attack", player.attack_damage)
+            if player.base_attack is None:
+                player.base_attack = player.attack_damage
             player.attack_damage = (
                 player.base_attack + self.active_effects["attack_bonus"]
             )
 
         # 速度加成
         if "speed_bonus" in self.active_effects:
-            player.base_speed = getattr(player, "base_speed", player.speed)
             player.speed = player.base_speed + self.active_effects["speed_bonus"]
 
         # 跳躍力加成
         if "jump_bonus" in self.active_effects:
-            player.base_jump_power = getattr(
-                player, "base_jump_power", player.jump_power
-            )
+            if player.base_jump_power is None:
+                player.base_jump_power = player.jump_power
             player.jump_power = (
                 player.base_jump_power + self.active_effects["jump_bonus"]
             )
 
         # 血量加成（只在第一次應用時增加）
         if "health_bonus" in self.active_effects:
-            if not hasattr(player, "base_max_health"):
+            if player.base_max_health is None:
                 player.base_max_health = player.max_health
                 player.max_health += self.active_effects["health_bonus"]
                 player.health += self.active_effects["health_bonus"]  # 同時恢復血量
@@ -273,9 +279,9 @@ class EquipmentManager:
         發射火球攻擊，傷害基於玩家攻擊力\n
         """
         # 確認火球管理器存在
-        if hasattr(player, "fireball_manager") and player.fireball_manager:
+        if player.fireball_manager:
             # 決定發射方向
-            if hasattr(player, "last_facing_direction"):
+            if player.last_facing_direction is not None:
                 direction = player.last_facing_direction
             elif abs(player.velocity_x) > 0.1:
                 direction = 1 if player.velocity_x > 0 else -1
@@ -303,9 +309,9 @@ class EquipmentManager:
         發射冰球攻擊，傷害基於玩家攻擊力\n
         """
         # 確認冰球管理器存在
-        if hasattr(player, "iceball_manager") and player.iceball_manager:
+        if player.iceball_manager:
             # 決定發射方向
-            if hasattr(player, "last_facing_direction"):
+            if player.last_facing_direction is not None:
                 direction = player.last_facing_direction
             elif abs(player.velocity_x) > 0.1:
                 direction = 1 if player.velocity_x > 0 else -1
@@ -355,17 +361,37 @@ class EquipmentManager:
         參數:\n
         player: 玩家物件\n
         """
+        # 計時器和持續效果交給工作排程，延後時累積經過的幀數一起扣
+        self.pending_frames += 1
+        FRAME_JOBS.submit(
+            "equipment.update",
+            self._update_timers,
+            player,
+            key=(self, "update"),
+            deadline=EQUIPMENT_UPDATE_DEADLINE,
+        )
+
+    def _update_timers(self, player):
+        """
+        扣掉上次更新後經過的幀數：技能冷卻、隱身和護盾計時器，再應用持續效果\n
+        \n
+        參數:\n
+        player: 玩家物件\n
+        """
+        frames = self.pending_frames
+        self.pending_frames = 0
+
         # 更新技能冷卻時間
         for skill_name in self.skill_cooldowns:
             if self.skill_cooldowns[skill_name] > 0:
-                self.skill_cooldowns[skill_name] -= 1
+                self.skill_cooldowns[skill_name] = max(0, self.skill_cooldowns[skill_name] - frames)
 
         # 更新技能效果計時器
         if self.invisibility_timer > 0:
-            self.invisibility_timer -= 1
+            self.invisibility_timer = max(0, self.invisibility_timer - frames)
 
         if self.shield_timer > 0:
-            self.shield_timer -= 1
+            self.shield_timer = max(0, self.shield_timer - frames)
 
         # 應用持續效果
         self.apply_effects_to_player(player)
@@ -419,6 +445,7 @@ class EquipmentManager:
         self.skill_cooldowns = {skill: 0 for skill in self.skill_cooldowns}
         self.invisibility_timer = 0
         self.shield_timer = 0
+        self.pending_frames = 0
 
     def generate_random_drop(self) -> Optional[str]:
         """
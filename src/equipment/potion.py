@@ -2,6 +2,35 @@
 import pygame
 import random
 import math
+from src.levels.spatial_hash import SpatialHash, get_pickup_bounds
+from src.effects.effect_sprites import get_fill_sprite, get_glow_sprite
+
+
+######################藥水設定######################
+# 各種藥水的外觀和效果（所有藥水物品共用，不可修改）
+POTION_CONFIGS = {
+    "healing": {
+        "name": "治療藥水",
+        "color": (255, 50, 50),  # 紅色
+        "glow": (255, 100, 100),
+        "effect_value": 60,
+        "description": "回復 60 點血量",
+    },
+    "shield": {
+        "name": "護盾藥水",
+        "color": (50, 150, 255),  # 藍色
+        "glow": (100, 200, 255),
+        "effect_value": 50,
+        "description": "獲得 50 點護盾",
+    },
+    "attack": {
+        "name": "攻擊藥水",
+        "color": (255, 200, 50),  # 金色
+        "glow": (255, 255, 100),
+        "effect_value": 50,  # 50% 攻擊力加成
+        "description": "攻擊力提升 50%，持續 15 秒",
+    },
+}
 
 
 ######################藥水物品基礎類別######################
@@ -22,6 +51,21 @@ class Potion:
     lifetime (int): 存在時間計數器\n
     """
 
+    __slots__ = (
+        "x",
+        "y",
+        "potion_type",
+        "width",
+        "height",
+        "lifetime",
+        "max_lifetime",
+        "float_offset",
+        "glow_intensity",
+        "pulse_timer",
+        "pickup_range",
+        "config",
+    )
+
     def __init__(self, x: int, y: int, potion_type: str):
         """
         初始化藥水物品\n
@@ -51,35 +95,8 @@ class Potion:
         # 撿拾範圍
         self.pickup_range = 30
 
-        # 藥水配置
-        self.potion_configs = {
-            "healing": {
-                "name": "治療藥水",
-                "color": (255, 50, 50),  # 紅色
-                "glow": (255, 100, 100),
-                "effect_value": 60,
-                "description": "回復 60 點血量",
-            },
-            "shield": {
-                "name": "護盾藥水",
-                "color": (50, 150, 255),  # 藍色
-                "glow": (100, 200, 255),
-                "effect_value": 50,
-                "description": "獲得 50 點護盾",
-            },
-            "attack": {
-                "name": "攻擊藥水",
-                "color": (255, 200, 50),  # 金色
-                "glow": (255, 255, 100),
-                "effect_value": 50,  # 50% 攻擊力加成
-                "description": "攻擊力提升 50%，持續 15 秒",
-            },
-        }
-
         # 獲取當前藥水的配置
-        self.config = self.potion_configs.get(
-            potion_type, self.potion_configs["healing"]
-        )
+        self.config = POTION_CONFIGS.get(potion_type, POTION_CONFIGS["healing"])
 
     def update(self):
         """
@@ -126,22 +143,9 @@ class Potion:
             glow_color = self.config["glow"]
             glow_alpha = int(self.glow_intensity)
 
-            # 創建光暈表面
+            # 漸變光暈（4 層圓形，從預先畫好的特效圖片取用）
             glow_size = self.width + 25
-            glow_surface = pygame.Surface((glow_size, glow_size), pygame.SRCALPHA)
-
-            # 繪製漸變光暈
-            for i in range(4):
-                radius = (glow_size // 2) - i * 4
-                alpha = glow_alpha // (i + 1)
-                if radius > 0:
-                    color_with_alpha = (*glow_color, alpha)
-                    pygame.draw.circle(
-                        glow_surface,
-                        color_with_alpha,
-                        (glow_size // 2, glow_size // 2),
-                        radius,
-                    )
+            glow_surface = get_glow_sprite(glow_size, glow_color, glow_alpha, rings=4, ring_step=4)
 
             screen.blit(glow_surface, (screen_x - 12, screen_y - 12))
 
@@ -175,8 +179,7 @@ class Potion:
         # 繪製存在時間警告（最後3秒）
         if self.lifetime < 180:
             alpha = int(abs(math.sin(self.lifetime * 0.15)) * 200)
-            warning_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-            warning_surface.fill((255, 255, 255, alpha))
+            warning_surface = get_fill_sprite(self.width, self.height, (255, 255, 255), alpha)
             screen.blit(warning_surface, (screen_x, screen_y))
 
     def _draw_potion_symbol(self, screen, x, y):
@@ -295,6 +298,9 @@ class PotionDropManager:
         # 場景中的所有藥水物品
         self.potions = []
 
+        # 藥水撿拾範圍的空間索引，檢查撿拾時只看玩家附近的藥水
+        self.potion_index = SpatialHash(bounds=get_pickup_bounds)
+
         # 基礎掉落機率
         self.base_drop_chance = 0.5  # 50% 掉落率
 
@@ -338,6 +344,7 @@ class PotionDropManager:
             # 創建藥水物品
             potion = Potion(x, y, potion_type)
             self.potions.append(potion)
+            self.potion_index.insert(potion)
             return True
 
         return False
@@ -376,6 +383,7 @@ class PotionDropManager:
         """
         potion = Potion(x, y, potion_type)
         self.potions.append(potion)
+        self.potion_index.insert(potion)
         return potion
 
     def update(self):
@@ -391,6 +399,7 @@ class PotionDropManager:
             # 移除過期藥水
             if potion.is_expired():
                 self.potions.remove(potion)
+                self.potion_index.remove(potion)
 
     def draw(self, screen, camera_x=0, camera_y=0):
         """
@@ -408,7 +417,7 @@ class PotionDropManager:
         """
         檢查玩家撿拾並收集藥水到庫存\n
         \n
-        檢測玩家範圍內的藥水並加入玩家庫存\n
+        檢測玩家範圍內的藥水並加入玩家庫存（只檢查撿拾範圍蓋到玩家位置的藥水）\n
         \n
         參數:\n
         player_x (int): 玩家 x 座標\n
@@ -420,7 +429,7 @@ class PotionDropManager:
         """
         picked_potions = []
 
-        for potion in self.potions[:]:  # 使用複本避免修改時出錯
+        for potion in self.potion_index.query_point(player_x, player_y):
             if potion.can_pickup(player_x, player_y):
                 # 嘗試添加藥水到玩家庫存
                 if player.add_potion(potion.potion_type):
@@ -428,6 +437,7 @@ class PotionDropManager:
                     picked_potions.append(potion.get_pickup_info())
                     # 從場景中移除藥水
                     self.potions.remove(potion)
+                    self.potion_index.remove(potion)
 
         return picked_potions
 
@@ -438,6 +448,7 @@ class PotionDropManager:
         用於重新開始遊戲或切換關卡\n
         """
         self.potions.clear()
+        self.potion_index.clear()
 
     def get_potion_count(self) -> int:
         """
@@ -1,6 +1,41 @@
 ######################載入套件######################
 import pygame
 from typing import List, Tuple
+from src.performance.frame_profiler import FRAME_PROFILER
+from src.performance.frame_jobs import FRAME_JOBS
+from src.ui.text_cache import DEFAULT_FONT, TEXT_CACHE
+from src.assets.asset_manager import ASSET_MANAGER
+from src.levels.static_layer import StaticLevelLayer
+from src.levels.spatial_hash import LevelSpatialIndex
+from src.enemies.enemy_batch import EnemyBatch
+from src.levels.update_lod import UpdateLodScheduler
+
+######################關卡資源設定######################
+LEVEL_ASSET_SCOPE = "level_{}"  # 關卡圖片在資源管理器中的參考範圍名稱
+NIGHT_SKY_PARALLAX = 0.1  # 第四關星空跟著攝影機移動的比例（遠景）
+PATROL_ADJUST_DEADLINE = 30  # 巡邏範圍調整最多可以延後幾幀（啟用工作排程時）
+
+# 第四關的星星位置（預設的星空圖案）
+NIGHT_SKY_STARS = [
+    (50, 100),
+    (150, 80),
+    (250, 120),
+    (350, 90),
+    (450, 110),
+    (550, 70),
+    (650, 100),
+    (750, 85),
+    (850, 95),
+    (950, 75),
+    (1050, 105),
+    (1150, 90),
+    (80, 300),
+    (280, 280),
+    (480, 310),
+    (680, 290),
+    (880, 300),
+    (1080, 285),
+]
 
 
 ######################關卡基礎類別######################
@@ -22,6 +57,10 @@ class Level:
     player_start_x, player_start_y (float): 玩家起始位置\n
     level_completion_height (float): 完成關卡所需到達的高度\n
     background_color (Tuple): 背景顏色 RGB 值\n
+    static_layer (StaticLevelLayer): 平台預先繪製的靜態圖層\n
+    spatial_index (LevelSpatialIndex): 平台、陷阱、敵人的碰撞索引（含快取的碰撞矩形）\n
+    enemy_batch (EnemyBatch): 基本敵人的批次引擎，沒有啟用時是 None\n
+    update_lod (UpdateLodScheduler): 敵人和陷阱的更新細節層級排程，沒有啟用時是 None\n
     \n
     關卡設計原則:\n
     - 垂直向上的攀爬結構\n
@@ -74,6 +113,14 @@ class Level:
         self.background_image_path = background_image
         self.background_image = None
         self.background_scaled = None
+        # 由關卡管理器建立時沿用它的範圍名稱（可能帶有遊戲自己的前綴）
+        self.asset_scope = ASSET_MANAGER.current_scope or LEVEL_ASSET_SCOPE.format(level_number)
+
+        # 靜態圖層：平台（跟著攝影機）、星空等遠景裝飾（依視差比例移動）
+        self.static_layer = StaticLevelLayer()
+        self.decoration_layer = StaticLevelLayer()
+        for platform in platforms:
+            platform.static_layer = self.static_layer
 
         # 載入背景圖片
         if self.background_image_path:
@@ -97,6 +144,71 @@ class Level:
         # 自動調整敵人巡邏範圍，避免掉下平台
         self._adjust_enemies_patrol_ranges()
 
+        # 碰撞索引：玩家、敵人、投射物的碰撞檢查只查詢附近的物件
+        self.spatial_index = LevelSpatialIndex(platforms, traps, enemies)
+
+        # 敵人批次引擎（預設關閉，呼叫 enable_enemy_batch() 才啟用）
+        self.enemy_batch = None
+
+        # 更新細節層級排程（預設關閉，呼叫 enable_update_lod() 才啟用）
+        self.update_lod = None
+
+    def enable_enemy_batch(self):
+        """
+        啟用敵人批次引擎\n
+        \n
+        關卡裡的基本敵人換成批次敵人，之後每幀用 NumPy 一次更新全部基本敵人，\n
+        只有可能和玩家互動的敵人才逐一處理；Boss 等其他敵人照常逐一更新\n
+        """
+        if self.enemy_batch is not None:
+            return
+        self.enemy_batch = EnemyBatch(self.spatial_index)
+        self._attach_enemy_batch()
+
+    def enable_update_lod(self):
+        """
+        啟用更新細節層級排程\n
+        \n
+        之後畫面內的敵人和陷阱照常每幀更新，畫面外的降低更新頻率（一次推進好幾幀），\n
+        遠距離又還沒被玩家激活的敵人睡眠；Boss 和移動平台不受影響\n
+        """
+        if self.update_lod is None:
+            self.update_lod = UpdateLodScheduler()
+            for entity in self.enemies + self.traps:
+                self.update_lod.assign_slot(entity)
+
+    def _attach_enemy_batch(self):
+        """
+        把敵人清單中的基本敵人交給批次引擎（清單順序不變）\n
+        """
+        enemy_batch = self.enemy_batch
+        enemy_batch.clear()
+        self.enemies = [
+            enemy_batch.adopt(enemy) if enemy_batch.can_adopt(enemy) else enemy
+            for enemy in self.enemies
+        ]
+        self.spatial_index.sync_enemies(self.enemies)
+
+    def add_enemy(self, enemy):
+        """
+        在遊戲進行中加入敵人（大量敵人的活動關卡使用）\n
+        \n
+        加入的敵人不在原始配置裡，關卡重置後就不會再出現\n
+        \n
+        參數:\n
+        enemy: 敵人物件\n
+        \n
+        回傳:\n
+        實際加入關卡的敵人（啟用批次引擎時基本敵人會換成批次敵人）\n
+        """
+        if self.enemy_batch is not None and self.enemy_batch.can_adopt(enemy):
+            enemy = self.enemy_batch.adopt(enemy)
+        elif self.update_lod is not None:
+            self.update_lod.assign_slot(enemy)
+        self.enemies.append(enemy)
+        self.spatial_index.enemies.insert(enemy, len(self.enemies) - 1)
+        return enemy
+
     def _load_background_image(self):
         """
         載入關卡背景圖片\n
@@ -111,7 +223,9 @@ class Level:
                 return
                 
             # 載入背景圖片
-            self.background_image = pygame.image.load(self.background_image_path).convert()
+            self.background_image = ASSET_MANAGER.get_image(
+                self.background_image_path, alpha=False, scope=self.asset_scope
+            )
             print(f"成功載入背景圖片: {self.background_image_path}")
             
         except pygame.error as e:
@@ -150,9 +264,11 @@ class Level:
             target_height = int(original_height * scale)
             
             # 等比例縮放背景圖片
-            self.background_scaled = pygame.transform.scale(
-                self.background_image, 
-                (target_width, target_height)
+            self.background_scaled = ASSET_MANAGER.get_image(
+                self.background_image_path,
+                (target_width, target_height),
+                alpha=False,
+                scope=self.asset_scope,
             )
             
             # 如果縮放後的圖片比螢幕大，計算置中偏移
@@ -171,10 +287,24 @@ class Level:
         \n
         在關卡初始化時自動檢查每個敵人的巡邏範圍是否安全，\n
         如果可能導致敵人掉下平台就自動縮小範圍\n
+        啟用工作排程時分成好幾幀做完（敵人本身的懸崖偵測在調整完之前也會防止掉落）\n
         """
-        for enemy in self.enemies:
+        FRAME_JOBS.submit(
+            "level.adjust_patrol_ranges",
+            self._adjust_patrol_ranges_job,
+            deadline=PATROL_ADJUST_DEADLINE,
+        )
+
+    def _adjust_patrol_ranges_job(self):
+        """
+        逐一調整敵人的巡邏範圍，每調整一個敵人就讓出一次（工作排程可以在這裡切開）\n
+        \n
+        開始執行時才取敵人清單，延後期間換成批次敵人也會調整到目前的敵人\n
+        """
+        for enemy in list(self.enemies):
             if hasattr(enemy, "adjust_patrol_range_for_platforms"):
                 enemy.adjust_patrol_range_for_platforms(self.platforms)
+            yield
 
     def update(self, player):
         """
@@ -189,20 +319,38 @@ class Level:
         參數:\n
         player: 玩家物件，用於敵人 AI 和互動檢測\n
         """
-        # 更新所有敵人
-        for enemy in self.enemies[:]:  # 使用副本避免修改列表時出錯
-            # 建立包含移動平台的完整平台清單
-            all_platforms = self.platforms.copy()
+        # 批次引擎一次更新所有基本敵人
+        enemy_batch = self.enemy_batch
+        if enemy_batch is not None:
+            enemy_batch.retain(self.enemies)
+            with FRAME_PROFILER.span("level.enemy_batch"):
+                enemy_batch.update(player, self.spatial_index)
 
-            # 把移動平台也加入平台清單，讓敵人可以站在上面
-            from src.traps.moving_platform import MovingPlatform
-
-            for trap in self.traps:
-                if isinstance(trap, MovingPlatform):
-                    all_platforms.append(trap)
+        # 更新細節層級排程：畫面外的敵人和陷阱降低更新頻率
+        update_lod = self.update_lod
+        if update_lod is not None:
+            update_lod.begin_frame()
 
-            # 更新敵人，傳入平台資料用於碰撞檢測
-            enemy.update(player, all_platforms)
+        # 更新所有敵人
+        for enemy in self.enemies[:]:  # 使用副本避免修改列表時出錯
+            if enemy.enemy_batch is not None:
+                # 已經由批次引擎更新，這一幀不可能和玩家互動的敵人直接跳過
+                if not enemy.enemy_batch.begin_interaction(enemy, player):
+                    continue
+            elif update_lod is None:
+                # 更新敵人，傳入碰撞索引（包含移動平台）用於碰撞檢測
+                with FRAME_PROFILER.span("level.enemy_update", type(enemy).__name__):
+                    enemy.update(player, self.spatial_index)
+            else:
+                # 這一幀沒輪到或睡眠中的敵人在畫面外，不可能和玩家互動，直接跳過
+                steps = update_lod.schedule(enemy, player.y, can_sleep=not enemy.has_been_touched)
+                if not steps:
+                    continue
+                with FRAME_PROFILER.span("level.enemy_update", type(enemy).__name__):
+                    if steps == 1:
+                        enemy.update(player, self.spatial_index)
+                    else:
+                        enemy.update_scaled(player, self.spatial_index, steps)
 
             # 檢查玩家是否與敵人發生接觸（用來激活敵人追蹤）
             if not enemy.has_been_touched:
@@ -244,7 +392,18 @@ class Level:
 
         # 更新所有陷阱
         for trap in self.traps:
-            trap.update()
+            steps = 1 if update_lod is None else update_lod.schedule(trap, player.y)
+            if not steps:
+                continue
+            with FRAME_PROFILER.span("level.trap_update", type(trap).__name__):
+                if steps == 1:
+                    trap.update()
+                else:
+                    trap.update_scaled(steps)
+
+        # 移動平台和敵人的位置都變了，同步碰撞索引
+        self.spatial_index.update_moving_platforms()
+        self.spatial_index.sync_enemies(self.enemies)
 
         # 更新關卡計時器
         if not self.is_completed:
@@ -278,28 +437,37 @@ class Level:
         camera_y (float): 攝影機的 Y 軸偏移（用於卷軸效果）\n
         \n
         繪製順序:\n
-        1. 背景圖片 → 2. 背景裝飾 → 3. 平台 → 4. 陷阱 → 5. 敵人\n
+        1. 背景圖片 → 2. 背景裝飾 → 3. 靜態圖層（平台） → 4. 陷阱 → 5. 敵人 → 6. 完成線\n
         """
         # 繪製背景圖片（固定背景，不跟隨攝影機移動）
-        self._draw_background_image(screen, camera_y)
+        with FRAME_PROFILER.span("level.background"):
+            self._draw_background_image(screen, camera_y)
 
         # 繪製背景裝飾（雲朵、遠山等）- 在背景圖片之上，但在遊戲物件之下
-        self._draw_background_decorations(screen, camera_y)
+        with FRAME_PROFILER.span("level.decorations"):
+            self._draw_background_decorations(screen, camera_y)
 
-        # 繪製所有平台
-        for platform in self.platforms:
-            platform.render(screen, camera_y)
+        # 貼出靜態圖層中攝影機看得到的部分（平台）
+        with FRAME_PROFILER.span("level.static_layer"):
+            self.static_layer.render(screen, camera_y, self._draw_static_geometry)
 
         # 繪製所有陷阱
-        for trap in self.traps:
-            trap.render(screen, camera_y)
+        with FRAME_PROFILER.span("level.traps"):
+            for trap in self.traps:
+                trap.render(screen, camera_y)
 
         # 繪製所有敵人
-        for enemy in self.enemies:
-            enemy.render(screen, camera_y)
-
-        # 繪製關卡特殊效果
-        self._draw_level_effects(screen, camera_y)
+        with FRAME_PROFILER.span("level.enemies"):
+            for enemy in self.enemies:
+                enemy.render(screen, camera_y)
+
+        # 完成線畫在陷阱和敵人之上，不放進靜態圖層
+        with FRAME_PROFILER.span("level.goal_line"):
+            completion_screen_y = (
+                self.level_completion_height - camera_y + screen.get_height() // 2
+            )
+            if -10 < completion_screen_y < screen.get_height() + 10:
+                self._draw_goal_line(screen, completion_screen_y)
 
     def _draw_background_image(self, screen: pygame.Surface, camera_y: float):
         """
@@ -358,77 +526,59 @@ class Level:
 
         # 根據關卡編號繪製不同的背景裝飾
         if self.level_number == 4:
-            # 第四關繪製夜晚星空（保留星星）
-            self._draw_night_sky(screen, camera_y)
+            # 第四關繪製夜晚星空（保留星星），星空移動較慢，用視差比例換算攝影機位置
+            self.decoration_layer.render(
+                screen, camera_y * NIGHT_SKY_PARALLAX, self._draw_night_sky
+            )
         # 第一二關的雲朵、第三關的工業背景、第五關的能量圓圈已移除
 
-    def _draw_night_sky(self, screen: pygame.Surface, camera_y: float):
+    def _draw_night_sky(self, surface: pygame.Surface, offset_y: int):
         """
-        繪製夜空星星\n
+        繪製夜空星星（畫在裝飾圖層上）\n
         \n
         第四關的夜晚背景\n
+        \n
+        參數:\n
+        surface (pygame.Surface): 圖層的圖塊\n
+        offset_y (int): 星星座標換算到圖塊上的 Y 偏移\n
         """
         star_color = (255, 255, 200)
-        screen_height = screen.get_height()
-
-        # 星星位置（預設的星空圖案）
-        stars = [
-            (50, 100),
-            (150, 80),
-            (250, 120),
-            (350, 90),
-            (450, 110),
-            (550, 70),
-            (650, 100),
-            (750, 85),
-            (850, 95),
-            (950, 75),
-            (1050, 105),
-            (1150, 90),
-            (80, 300),
-            (280, 280),
-            (480, 310),
-            (680, 290),
-            (880, 300),
-            (1080, 285),
-        ]
-
-        for star_x, star_y in stars:
-            screen_y = star_y - camera_y * 0.1 + screen_height // 2
-            if -20 < screen_y < screen_height + 20:
-                # 繪製閃爍的星星
-                pygame.draw.circle(screen, star_color, (int(star_x), int(screen_y)), 2)
+        for star_x, star_y in NIGHT_SKY_STARS:
+            pygame.draw.circle(surface, star_color, (star_x, star_y + offset_y), 2)
 
-    def _draw_level_effects(self, screen: pygame.Surface, camera_y: float):
+    def _draw_static_geometry(self, surface: pygame.Surface, offset_y: int):
         """
-        繪製關卡特殊效果\n
+        繪製靜態圖層的一個圖塊：所有平台\n
         \n
-        如完成線、提示箭頭等\n
+        參數:\n
+        surface (pygame.Surface): 圖層的圖塊\n
+        offset_y (int): 世界座標換算到圖塊上的 Y 偏移\n
         """
-        screen_height = screen.get_height()
+        # 換算成平台 render() 使用的攝影機位置，讓平台畫在圖塊上正確的位置
+        camera_y = surface.get_height() // 2 - offset_y
+        for platform in self.platforms:
+            platform.render(surface, camera_y)
 
-        # 繪製完成線（目標高度的視覺指示）
-        completion_screen_y = (
-            self.level_completion_height - camera_y + screen_height // 2
+    def _draw_goal_line(self, surface: pygame.Surface, line_y: float):
+        """
+        繪製完成線（目標高度的視覺指示）\n
+        \n
+        參數:\n
+        surface (pygame.Surface): 要繪製到的表面\n
+        line_y (float): 完成線在表面上的 Y 座標\n
+        """
+        line_color = (255, 215, 0)  # 金色
+        pygame.draw.line(
+            surface,
+            line_color,
+            (0, line_y),
+            (surface.get_width(), line_y),
+            3,
         )
 
-        if -10 < completion_screen_y < screen_height + 10:
-            # 繪製閃爍的完成線
-            line_color = (255, 215, 0)  # 金色
-            pygame.draw.line(
-                screen,
-                line_color,
-                (0, completion_screen_y),
-                (screen.get_width(), completion_screen_y),
-                3,
-            )
-
-            # 繪製「GOAL」文字
-            font = pygame.font.Font(None, 36)
-            goal_text = font.render("GOAL!", True, line_color)
-            screen.blit(
-                goal_text, (screen.get_width() // 2 - 40, completion_screen_y - 25)
-            )
+        # 繪製「GOAL」文字
+        goal_text = TEXT_CACHE.render(DEFAULT_FONT, 36, "GOAL!", True, line_color)
+        surface.blit(goal_text, (surface.get_width() // 2 - 40, line_y - 25))
 
     def reset(self):
         """
@@ -465,17 +615,14 @@ class Level:
         config = {
             "type": type(enemy).__name__,
             "module": type(enemy).__module__,
-            "x": enemy.start_x if hasattr(enemy, "start_x") else enemy.x,
-            "y": enemy.start_y if hasattr(enemy, "start_y") else enemy.y,
+            "x": enemy.start_x,
+            "y": enemy.start_y,
             "health": enemy.max_health,
             "attack_damage": enemy.attack_damage,
             "speed": enemy.speed,
+            "patrol_range": enemy.patrol_range,
         }
 
-        # 如果是基礎敵人，還要儲存巡邏範圍
-        if hasattr(enemy, "patrol_range"):
-            config["patrol_range"] = enemy.patrol_range
-
         # 如果是 Boss，儲存 Boss 類型
         if hasattr(enemy, "boss_type"):
             config["boss_type"] = enemy.boss_type
@@ -563,6 +710,14 @@ class Level:
         for trap in self.traps:
             trap.reset()
 
+        # 敵人重建、移動平台回到起點，同步碰撞索引
+        self.spatial_index.update_moving_platforms()
+        self.spatial_index.sync_enemies(self.enemies)
+
+        # 重建的基本敵人重新交給批次引擎
+        if self.enemy_batch is not None:
+            self._attach_enemy_batch()
+
     def get_completion_stats(self) -> dict:
         """
         取得關卡完成統計\n
@@ -1,13 +1,45 @@
 ######################載入套件######################
 import pygame
+import random
 from typing import List, Tuple, Optional
-from src.levels.level import Level
+from src.levels.level import Level, LEVEL_ASSET_SCOPE
 from src.levels.platform import Platform
 from src.traps.spike import Spike
 from src.traps.fire_wall import FireWall
 from src.traps.moving_platform import MovingPlatform
 from src.enemies.basic_enemy import BasicEnemy
 from src.enemies.boss import Boss
+from src.assets.asset_manager import ASSET_MANAGER
+
+######################關卡載入設定######################
+PREFETCH_DISTANCE = 300  # 玩家離完成高度多近（像素）就開始預先載入下一關
+LEVEL_BUILD_SEED = 1000  # 建立關卡時使用的亂數種子基數，讓關卡內容不受建立時機影響
+
+# 各關卡的背景圖片
+LEVEL_BACKGROUNDS = {
+    1: "assets/images/場景1.png",
+    2: "assets/images/場景2.png",
+    3: "assets/images/場景3.png",
+    4: "assets/images/場景4.png",
+    5: "assets/images/場景5.png",
+    6: "assets/images/場景6.png",
+}
+
+# 關卡物件共用的圖片（平台、陷阱、敵人）
+LEVEL_SPRITE_PATHS = (
+    "assets/images/tile_0103.png",
+    "assets/images/tile_0104.png",
+    "assets/images/tile_0106.png",
+    "assets/images/tile_0068.png",
+    "assets/images/tile_0100.png",
+    "assets/images/tile_0101.png",
+    "assets/images/tile_0102.png",
+    "assets/images/tile_0127.png",
+    "assets/images/角色2圖片1.png",
+    "assets/images/boss.png",
+    "assets/images/boss2.png",
+    "assets/images/boss3.png",
+)
 
 
 ######################關卡管理器類別######################
@@ -21,10 +53,17 @@ class LevelManager:
     3. 關卡進度追蹤\n
     4. 動態生成關卡元素\n
     \n
+    關卡第一次進入時才建立，玩家接近完成高度時先在背景解碼下一關的圖片，\n
+    解碼好就先建立下一關，過關時可以直接切換\n
+    \n
     屬性:\n
     current_level_number (int): 當前關卡編號\n
-    levels (List[Level]): 所有關卡物件的清單\n
+    levels (List[Level]): 所有關卡物件的清單，還沒建立或已卸載的是 None\n
     max_level (int): 最高關卡數\n
+    prefetch_level (int): 正在預先載入的關卡編號，沒有時為 None\n
+    use_enemy_batch (bool): 建立關卡時是否啟用敵人批次引擎\n
+    use_update_lod (bool): 建立關卡時是否啟用更新細節層級排程\n
+    asset_scope_prefix (str): 關卡資源範圍名稱的前綴\n
     \n
     關卡設計概念:\n
     - 每個關卡都是垂直向上的結構\n
@@ -32,53 +71,141 @@ class LevelManager:
     - 隨著關卡增加，難度逐漸提升\n
     """
 
-    def __init__(self, sound_manager=None):
+    def __init__(
+        self,
+        sound_manager=None,
+        use_enemy_batch: bool = False,
+        use_update_lod: bool = False,
+        asset_scope_prefix: str = "",
+    ):
         """
         初始化關卡管理器\n
         \n
-        建立所有關卡的基本資料和配置\n
+        關卡不在這裡建立，第一次進入時才建立，讓選單可以更快出現\n
         \n
         參數:\n
         sound_manager (SoundManager): 音效管理器，用於播放關卡切換音效\n
+        use_enemy_batch (bool): 是否用批次引擎更新基本敵人（大量敵人的關卡使用）\n
+        use_update_lod (bool): 是否讓畫面外的敵人和陷阱降低更新頻率\n
+        asset_scope_prefix (str): 關卡資源範圍名稱的前綴，同一個行程裡有好幾個遊戲時\n
+        每個遊戲用不同的前綴，卸載關卡才不會釋放到其他遊戲還在用的圖片\n
         """
         self.current_level_number = 1
-        self.levels = []
         self.max_level = 6  # 更新為 6 個關卡，新增第六關 Boss 戰
+        self.levels: List[Optional[Level]] = [None] * self.max_level
         self.difficulty = "easy"  # 預設難度為簡單模式
         self.sound_manager = sound_manager  # 音效管理器引用
+        self.prefetch_level = None  # 正在預先載入的關卡編號
+        self.use_enemy_batch = use_enemy_batch
+        self.use_update_lod = use_update_lod
+        self.asset_scope_prefix = asset_scope_prefix
+
+    def _build_level(self, level_number: int) -> Level:
+        """
+        建立指定關卡\n
+        \n
+        建立時用固定種子的亂數（火焰牆粒子等），建完再還原原本的亂數狀態，\n
+        這樣不管關卡在哪一幀建立，關卡內容和遊戲中的亂數序列都不會改變（重播才對得上）\n
+        關卡物件取得的圖片都記在這一關的資源範圍，卸載時一起釋放\n
+        \n
+        參數:\n
+        level_number (int): 關卡編號，範圍 1-6\n
+        \n
+        回傳:\n
+        Level: 建立好的關卡物件\n
+        """
+        asset_scope = self.asset_scope_prefix + LEVEL_ASSET_SCOPE.format(level_number)
+        random_state = random.getstate()
+        random.seed(LEVEL_BUILD_SEED + level_number)
+        try:
+            with ASSET_MANAGER.scope(asset_scope):
+                level = getattr(self, f"_create_level_{level_number}")()
+        finally:
+            random.setstate(random_state)
 
-        # 建立所有關卡
-        self._create_all_levels()
+        if self.use_enemy_batch:
+            level.enable_enemy_batch()
+        if self.use_update_lod:
+            level.enable_update_lod()
 
-    def _create_all_levels(self):
+        self.levels[level_number - 1] = level
+        if self.prefetch_level == level_number:
+            self.prefetch_level = None
+        return level
+
+    def get_level(self, level_number: int) -> Level:
         """
-        建立所有關卡資料\n
+        取得指定關卡，還沒建立就馬上建立\n
+        \n
+        參數:\n
+        level_number (int): 關卡編號，範圍 1-6\n
         \n
-        根據設計規格建立每個關卡的平台、陷阱、敵人配置\n
+        回傳:\n
+        Level: 關卡物件\n
         """
-        # 第一關：基礎教學關卡
-        level_1 = self._create_level_1()
-        self.levels.append(level_1)
+        level = self.levels[level_number - 1]
+        if level is None:
+            level = self._build_level(level_number)
+        return level
 
-        # 第二關：引入陷阱
-        level_2 = self._create_level_2()
-        self.levels.append(level_2)
+    def build_all_levels(self):
+        """
+        建立所有還沒建立的關卡\n
+        \n
+        重播跳到某個關鍵幀時需要用到所有關卡的圖片，才能還原圖片參考\n
+        """
+        for level_number in range(1, self.max_level + 1):
+            self.get_level(level_number)
+
+    def _unload_other_levels(self, keep_level_number: int):
+        """
+        卸載指定關卡以外的所有關卡，並釋放它們的圖片參考，降低常駐記憶體\n
+        \n
+        參數:\n
+        keep_level_number (int): 要保留的關卡編號\n
+        """
+        for index in range(self.max_level):
+            if index != keep_level_number - 1 and self.levels[index]:
+                ASSET_MANAGER.release_scope(self.levels[index].asset_scope)
+                self.levels[index] = None
+        self.prefetch_level = None
 
-        # 第三關：移動平台挑戰
-        level_3 = self._create_level_3()
-        self.levels.append(level_3)
+    def _get_level_image_paths(self, level_number: int) -> List[str]:
+        """
+        取得關卡會用到的圖片路徑\n
+        \n
+        參數:\n
+        level_number (int): 關卡編號\n
+        \n
+        回傳:\n
+        List[str]: 背景和關卡物件的圖片路徑\n
+        """
+        return [LEVEL_BACKGROUNDS[level_number], *LEVEL_SPRITE_PATHS]
 
-        # 第四關：敵人關卡
-        level_4 = self._create_level_4()
-        self.levels.append(level_4)
+    def _update_prefetch(self, player):
+        """
+        玩家接近完成高度時預先載入下一關\n
+        \n
+        1. 第一次進入範圍時把下一關的圖片交給背景執行緒解碼\n
+        2. 之後每幀檢查，解碼好了就在主執行緒建立下一關（只剩 convert，很快）\n
+        \n
+        參數:\n
+        player: 玩家物件，用 y 座標判斷離完成高度多近\n
+        """
+        next_level_number = self.current_level_number + 1
+        if next_level_number > self.max_level or self.levels[next_level_number - 1]:
+            return
 
-        # 第五關：普通挑戰關卡
-        level_5 = self._create_level_5()
-        self.levels.append(level_5)
+        current_level = self.get_current_level()
+        if self.prefetch_level != next_level_number:
+            if player.y > current_level.level_completion_height + PREFETCH_DISTANCE:
+                return
+            ASSET_MANAGER.prefetch(self._get_level_image_paths(next_level_number))
+            self.prefetch_level = next_level_number
+            return
 
-        # 第六關：最終 Boss 戰
-        level_6 = self._create_level_6()
-        self.levels.append(level_6)
+        if ASSET_MANAGER.is_ready(self._get_level_image_paths(next_level_number)):
+            self._build_level(next_level_number)
 
     def _create_level_1(self) -> Level:
         """
@@ -118,7 +245,7 @@ class LevelManager:
             player_start_y=700,  # 在地面出生
             level_completion_height=30,  # 到達高度 30 就算完成
             background_color=(135, 206, 235),  # 天空藍
-            background_image="assets/images/場景1.png",  # 第一關背景圖片
+            background_image=LEVEL_BACKGROUNDS[1],  # 第一關背景圖片
         )
 
     def _create_level_2(self) -> Level:
@@ -174,7 +301,7 @@ class LevelManager:
             player_start_y=700,  # 在地面出生
             level_completion_height=30,
             background_color=(100, 149, 237),  # 深一點的藍色
-            background_image="assets/images/場景2.png",  # 第二關背景圖片
+            background_image=LEVEL_BACKGROUNDS[2],  # 第二關背景圖片
         )
 
     def _create_level_3(self) -> Level:
@@ -239,7 +366,7 @@ class LevelManager:
             player_start_y=700,
             level_completion_height=30,
             background_color=(70, 130, 180),  # 鋼青色
-            background_image="assets/images/場景3.png",  # 第三關背景圖片
+            background_image=LEVEL_BACKGROUNDS[3],  # 第三關背景圖片
         )
 
     def _create_level_4(self) -> Level:
@@ -302,7 +429,7 @@ class LevelManager:
             player_start_y=700,
             level_completion_height=30,
             background_color=(25, 25, 112),  # 深夜藍
-            background_image="assets/images/場景4.png",  # 第四關背景圖片
+            background_image=LEVEL_BACKGROUNDS[4],  # 第四關背景圖片
         )
 
     def _create_level_5(self) -> Level:
@@ -371,7 +498,7 @@ class LevelManager:
             player_start_y=700,
             level_completion_height=30,
             background_color=(25, 25, 112),  # 深夜藍（保持挑戰關卡的氛圍）
-            background_image="assets/images/場景5.png",  # 第五關背景圖片
+            background_image=LEVEL_BACKGROUNDS[5],  # 第五關背景圖片
         )
 
     def _create_level_6(self) -> Level:
@@ -465,7 +592,7 @@ class LevelManager:
             player_start_y=700,
             level_completion_height=60,  # 調整完成高度，配合新的勝利平台
             background_color=(75, 0, 130),  # 深紫色（最終 Boss 戰氣氛）
-            background_image="assets/images/場景6.png",  # 第六關背景圖片
+            background_image=LEVEL_BACKGROUNDS[6],  # 第六關背景圖片
         )
 
     def get_current_level(self) -> Level:
@@ -475,19 +602,22 @@ class LevelManager:
         回傳:\n
         Level: 當前關卡的完整資料\n
         """
-        return self.levels[self.current_level_number - 1]
+        return self.get_level(self.current_level_number)
 
     def advance_to_next_level(self) -> bool:
         """
         前進到下一關\n
         \n
         檢查是否還有下一關，有的話就切換過去\n
+        下一關通常已經預先建立好，直接切換；剛離開的關卡會卸載\n
         \n
         回傳:\n
         bool: 是否成功前進到下一關\n
         """
         if self.current_level_number < self.max_level:
             self.current_level_number += 1
+            self.get_level(self.current_level_number)
+            self._unload_other_levels(self.current_level_number)
             # 播放新關卡的背景音樂
             if self.sound_manager:
                 self.sound_manager.play_level_music(self.current_level_number)
@@ -502,9 +632,10 @@ class LevelManager:
         """
         self.current_level_number = 1
 
-        # 重置所有關卡的狀態
-        for level in self.levels:
-            level.reset()
+        # 第一關重置狀態，其他關卡卸載（之後進入時會重新建立）
+        # 先取得第一關再卸載，共用的圖片才不會被釋放後又重新載入
+        self.get_current_level().reset()
+        self._unload_other_levels(1)
         
         # 播放第一關背景音樂
         if self.sound_manager:
@@ -531,6 +662,9 @@ class LevelManager:
         current_level = self.get_current_level()
         current_level.update(player)
 
+        # 接近終點時預先載入下一關
+        self._update_prefetch(player)
+
     def are_all_enemies_defeated(self) -> bool:
         """
         檢查當前關卡的所有敵人是否都被擊敗\n
@@ -643,11 +777,12 @@ class LevelManager:
                 self.sound_manager.play_level_music(target_level)
             return True
 
-        # 切換到目標關卡
+        # 切換到目標關卡（先建立目標關卡再卸載其他關卡，共用的圖片才不會被釋放）
         self.current_level_number = target_level
+        target_level_obj = self.get_current_level()
+        self._unload_other_levels(target_level)
         
         # 重置目標關卡的狀態（清除死亡的敵人、重置陷阱等）
-        target_level_obj = self.get_current_level()
         target_level_obj.reset()
         
         # 播放目標關卡的背景音樂
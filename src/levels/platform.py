@@ -2,6 +2,8 @@
 import pygame
 from typing import Tuple
 import os
+from src.assets.asset_manager import ASSET_MANAGER
+from src.assets.baked_surfaces import BAKED_SURFACES
 
 
 ######################平台類別######################
@@ -27,6 +29,27 @@ class Platform:
     - bounce: 彈跳平台，增加跳躍高度\n
     """
 
+    __slots__ = (
+        "x",
+        "y",
+        "width",
+        "height",
+        "platform_type",
+        "color",
+        "border_color",
+        "durability",
+        "friction",
+        "bounce_power",
+        "is_active",
+        "damage_level",
+        "static_layer",
+        "tile_size",
+        "tile_left",
+        "tile_middle",
+        "tile_right",
+        "bake_key",
+    )
+
     def __init__(
         self,
         x: float,
@@ -66,6 +89,16 @@ class Platform:
         self.is_active = True
         self.damage_level = 0  # 損壞程度（0-100）
 
+        # 所屬關卡的靜態圖層（由 Level 設定），外觀改變時要通知它重畫
+        self.static_layer = None
+
+        # 平台圖片（由 _load_platform_images 設定，載入失敗時維持預設值改用幾何圖形）
+        self.tile_size = (32, 32)
+        self.tile_left = None
+        self.tile_middle = None
+        self.tile_right = None
+        self.bake_key = None
+
         # 載入平台圖片
         self._load_platform_images()
 
@@ -146,12 +179,10 @@ class Platform:
         try:
             # 載入平台的左中右 tile 圖片
             assets_path = "assets/images/"
-            self.tile_left = pygame.image.load(os.path.join(assets_path, "tile_0103.png")).convert_alpha()
-            self.tile_middle = pygame.image.load(os.path.join(assets_path, "tile_0104.png")).convert_alpha()
-            self.tile_right = pygame.image.load(os.path.join(assets_path, "tile_0106.png")).convert_alpha()
+            tile_paths = [os.path.join(assets_path, name) for name in ("tile_0103.png", "tile_0104.png", "tile_0106.png")]
             
             # 取得 tile 的原始尺寸
-            self.tile_size = self.tile_left.get_size()
+            self.tile_size = ASSET_MANAGER.get_image_size(tile_paths[0])
             
             # 根據平台高度調整 tile 大小
             if self.height != self.tile_size[1]:
@@ -159,19 +190,31 @@ class Platform:
                 new_width = int(self.tile_size[0] * scale_ratio)
                 new_height = int(self.height)
                 
-                self.tile_left = pygame.transform.scale(self.tile_left, (new_width, new_height))
-                self.tile_middle = pygame.transform.scale(self.tile_middle, (new_width, new_height))
-                self.tile_right = pygame.transform.scale(self.tile_right, (new_width, new_height))
-                
                 # 更新 tile 尺寸
                 self.tile_size = (new_width, new_height)
             
+            # 同樣高度的平台共用圖集裡同一份縮放後的 tile
+            self.tile_left, self.tile_middle, self.tile_right = (
+                ASSET_MANAGER.get_region(path, self.tile_size) for path in tile_paths
+            )
+
+            # 合成圖片的快取鍵值：tile 和平台尺寸相同的平台外觀完全一樣
+            self.bake_key = (
+                "platform",
+                self.tile_left.key,
+                self.tile_middle.key,
+                self.tile_right.key,
+                int(self.width),
+                self.tile_size[1],
+            )
+
         except pygame.error as e:
             print(f"無法載入平台圖片: {e}")
             # 如果載入失敗，設定為 None，改用幾何圖形
             self.tile_left = None
             self.tile_middle = None
             self.tile_right = None
+            self.bake_key = None
             self.tile_size = (32, 32)  # 預設大小
 
     def get_collision_rect(self) -> pygame.Rect:
@@ -206,6 +249,7 @@ class Platform:
 
         # 處理脆弱平台的損壞
         if self.platform_type == "fragile" and self.durability > 0:
+            visual_state = self._get_visual_state()
             self.damage_level += 1  # 每次踩踏增加損壞
 
             if self.damage_level >= self.durability:
@@ -216,6 +260,10 @@ class Platform:
                 # 平台開始裂開（視覺效果）
                 interaction_result["platform_damaged"] = True
 
+            # 碎裂或出現裂痕時，靜態圖層要重畫這個平台所在的位置
+            if self._get_visual_state() != visual_state:
+                self._invalidate_static_layer()
+
         return interaction_result
 
     def repair(self):
@@ -224,8 +272,29 @@ class Platform:
         \n
         恢復平台到完好狀態，通常在關卡重置時使用\n
         """
+        visual_state = self._get_visual_state()
         self.is_active = True
         self.damage_level = 0
+        if self._get_visual_state() != visual_state:
+            self._invalidate_static_layer()
+
+    def _get_visual_state(self) -> tuple:
+        """
+        取得會影響平台外觀的狀態\n
+        \n
+        回傳:\n
+        tuple: (是否存在, 是否顯示裂痕)\n
+        """
+        cracked = self.platform_type == "fragile" and self.damage_level > self.durability * 0.5
+        return (self.is_active, cracked)
+
+    def _invalidate_static_layer(self):
+        """
+        通知靜態圖層重畫這個平台所在的範圍\n
+        """
+        if self.static_layer is not None:
+            # 裂痕會畫到平台下緣再往下 8 像素
+            self.static_layer.invalidate(self.y, self.y + self.height + 8)
 
     def render(self, screen: pygame.Surface, camera_y: float):
         """
@@ -267,37 +336,55 @@ class Platform:
         """
         使用 tile 圖片繪製平台\n
         \n
-        根據平台寬度拼接左中右 tile 圖片\n
+        繪製預先拼接好的左中右 tile 圖片（見 _bake_tiles）\n
+        """
+        # 整個平台預先合成成一張圖片，同樣尺寸的平台共用，每幀只要一次 blit
+        screen.blit(BAKED_SURFACES.get(self.bake_key, self._bake_tiles), (screen_x, screen_y))
+
+    def _bake_tiles(self) -> pygame.Surface:
+        """
+        把左中右 tile 拼接成整個平台的圖片\n
+        \n
+        回傳:\n
+        pygame.Surface: 合成好的平台圖片\n
         """
-        tile_width = self.tile_size[0]
+        tile_width, tile_height = self.tile_size
+        baked = pygame.Surface((int(self.width), tile_height), pygame.SRCALPHA)
         
         # 計算需要多少個中間 tile
         remaining_width = self.width - (tile_width * 2)  # 扣除左右兩個 tile
         middle_tiles_count = max(0, int(remaining_width / tile_width))
         
-        current_x = screen_x
+        current_x = 0
+
+        # 所有 tile 都在圖集頁面上，收集好 (頁面, 位置, 區塊) 後一次 blits 畫完
+        blit_sequence = []
         
         # 繪製左側 tile
-        screen.blit(self.tile_left, (current_x, screen_y))
+        blit_sequence.append((self.tile_left.surface, (current_x, 0), self.tile_left.rect))
         current_x += tile_width
         
         # 繪製中間 tile（重複拼接）
+        middle_page = self.tile_middle.surface
+        middle_rect = self.tile_middle.rect
         for i in range(middle_tiles_count):
-            screen.blit(self.tile_middle, (current_x, screen_y))
+            blit_sequence.append((middle_page, (current_x, 0), middle_rect))
             current_x += tile_width
         
         # 如果還有剩餘空間，繪製部分中間 tile
-        remaining_space = self.width - (current_x - screen_x) - tile_width
+        remaining_space = self.width - current_x - tile_width
         if remaining_space > 0:
-            # 裁切中間 tile 來填補剩餘空間
-            partial_tile = pygame.Surface((int(remaining_space), self.tile_size[1]), pygame.SRCALPHA)
-            partial_tile.blit(self.tile_middle, (0, 0), (0, 0, int(remaining_space), self.tile_size[1]))
-            screen.blit(partial_tile, (current_x, screen_y))
+            # 只取圖集區塊的左半部來填補剩餘空間
+            partial_rect = pygame.Rect(middle_rect.x, middle_rect.y, int(remaining_space), middle_rect.height)
+            blit_sequence.append((middle_page, (current_x, 0), partial_rect))
             current_x += remaining_space
         
         # 繪製右側 tile
-        if current_x < screen_x + self.width:
-            screen.blit(self.tile_right, (screen_x + self.width - tile_width, screen_y))
+        if current_x < self.width:
+            blit_sequence.append((self.tile_right.surface, (self.width - tile_width, 0), self.tile_right.rect))
+
+        baked.blits(blit_sequence, doreturn=False)
+        return baked
 
     def _render_with_geometry(self, screen: pygame.Surface, screen_x: int, screen_y: int):
         """
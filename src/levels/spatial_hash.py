@@ -0,0 +1,531 @@
+######################載入套件######################
+import math
+from typing import Callable, Dict, List, Tuple
+
+import pygame
+
+######################空間索引設定######################
+SPATIAL_CELL_SIZE = 128  # 每一格的邊長（像素），大約是一個平台的寬度
+SPATIAL_MARGIN = 1  # 物件範圍往外放寬的像素，涵蓋 pygame.Rect 把浮點座標截成整數的誤差
+
+
+def get_object_bounds(obj) -> Tuple[float, float, float, float]:
+    """
+    取得物件的碰撞範圍（平台、陷阱、敵人都有 x、y、width、height）\n
+    \n
+    參數:\n
+    obj: 遊戲物件\n
+    \n
+    回傳:\n
+    Tuple[float, float, float, float]: (x, y, 寬, 高)\n
+    """
+    return obj.x, obj.y, obj.width, obj.height
+
+
+def get_pickup_bounds(obj) -> Tuple[float, float, float, float]:
+    """
+    取得掉落物的撿拾範圍（以物品位置為中心、pickup_range 為半徑的正方形）\n
+    \n
+    參數:\n
+    obj: 有 x、y、pickup_range 的掉落物\n
+    \n
+    回傳:\n
+    Tuple[float, float, float, float]: (x, y, 寬, 高)\n
+    """
+    radius = obj.pickup_range
+    return obj.x - radius, obj.y - radius, radius * 2, radius * 2
+
+
+######################空間雜湊######################
+class SpatialHash:
+    """
+    均勻網格空間雜湊（碰撞檢查的粗篩）\n
+    \n
+    把世界切成 cell_size 大小的格子，每個物件登記在它範圍蓋到的每一格，\n
+    查詢時只看查詢範圍蓋到的格子，成本只和附近的物件數量有關，和關卡大小無關\n
+    \n
+    查詢結果是「可能碰到」的候選物件，呼叫端仍要用原本的精確條件判斷；\n
+    結果依登記順序排列，和原本逐一掃描清單的順序相同，\n
+    找到第一個就 break 的碰撞邏輯結果不會改變\n
+    \n
+    會移動的物件（移動平台、敵人）位置改變後呼叫 update()，\n
+    只有蓋到的格子改變時才需要搬移\n
+    \n
+    屬性:\n
+    cell_size (int): 格子邊長\n
+    bounds (Callable): 取得物件範圍 (x, y, 寬, 高) 的函式\n
+    cells (Dict[Tuple[int, int], List]): 格子座標對應的物件清單\n
+    """
+
+    def __init__(
+        self,
+        cell_size: int = SPATIAL_CELL_SIZE,
+        bounds: Callable = get_object_bounds,
+    ):
+        """
+        初始化空間雜湊\n
+        \n
+        參數:\n
+        cell_size (int): 格子邊長\n
+        bounds (Callable): 取得物件範圍的函式（必須是模組層級函式，回放時才能序列化）\n
+        """
+        self.cell_size = cell_size
+        self.bounds = bounds
+        self.cells: Dict[Tuple[int, int], List] = {}
+
+        # 物件 -> [順序, 左, 上, 右, 下, 格子左, 格子上, 格子右, 格子下]
+        self._entries: Dict[object, list] = {}
+        self._next_order = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, obj) -> bool:
+        return obj in self._entries
+
+    def __iter__(self):
+        return iter(sorted(self._entries, key=lambda obj: self._entries[obj][0]))
+
+    def insert(self, obj, order: int = None):
+        """
+        登記物件\n
+        \n
+        參數:\n
+        obj: 遊戲物件\n
+        order (int): 排序用的順序，None 表示排在目前所有物件之後\n
+        """
+        if obj in self._entries:
+            self.remove(obj)
+        if order is None:
+            order = self._next_order
+        self._next_order = max(self._next_order, order + 1)
+
+        left, top, right, bottom = self._get_expanded_bounds(obj)
+        cell_range = self._get_cell_range(left, top, right, bottom)
+        self._entries[obj] = [order, left, top, right, bottom, *cell_range]
+        self._add_to_cells(obj, cell_range)
+
+    def update(self, obj):
+        """
+        物件移動後更新位置，蓋到的格子沒變時不用搬移\n
+        \n
+        參數:\n
+        obj: 已登記的遊戲物件\n
+        """
+        entry = self._entries.get(obj)
+        if entry is None:
+            self.insert(obj)
+            return
+
+        left, top, right, bottom = self._get_expanded_bounds(obj)
+        cell_range = self._get_cell_range(left, top, right, bottom)
+        entry[1:5] = left, top, right, bottom
+        if tuple(entry[5:9]) != cell_range:
+            self._remove_from_cells(obj, entry[5:9])
+            entry[5:9] = cell_range
+            self._add_to_cells(obj, cell_range)
+
+    def remove(self, obj):
+        """
+        移除物件（沒登記過就忽略）\n
+        \n
+        參數:\n
+        obj: 遊戲物件\n
+        """
+        entry = self._entries.pop(obj, None)
+        if entry is not None:
+            self._remove_from_cells(obj, entry[5:9])
+
+    def sync(self, objects: List):
+        """
+        讓索引內容和清單一致：更新每個物件的位置、移除已不在清單中的物件\n
+        \n
+        順序依清單中的位置重新編號，適合敵人這種會被移除、位置每幀都會變的物件\n
+        \n
+        參數:\n
+        objects (List): 目前的物件清單\n
+        """
+        if len(objects) != len(self._entries) or any(
+            obj not in self._entries for obj in objects
+        ):
+            current = set(objects)
+            for obj in [obj for obj in self._entries if obj not in current]:
+                self.remove(obj)
+
+        for order, obj in enumerate(objects):
+            self.update(obj)
+            self._entries[obj][0] = order
+        self._next_order = len(objects)
+
+    def clear(self):
+        """
+        移除所有物件\n
+        """
+        self.cells.clear()
+        self._entries.clear()
+        self._next_order = 0
+
+    def get_entries(self) -> List[Tuple]:
+        """
+        取得所有物件和登記的範圍（批次碰撞檢查一次拿到全部物件用）\n
+        \n
+        回傳:\n
+        List[Tuple]: (物件, 左, 上, 右, 下)，依登記順序排列，範圍已放寬 SPATIAL_MARGIN\n
+        """
+        entries = sorted(self._entries.items(), key=lambda item: item[1][0])
+        return [(obj, entry[1], entry[2], entry[3], entry[4]) for obj, entry in entries]
+
+    def query_rect(self, rect) -> List:
+        """
+        找出範圍可能和矩形重疊的物件\n
+        \n
+        參數:\n
+        rect (pygame.Rect): 查詢範圍（也可以是 (x, y, 寬, 高)）\n
+        \n
+        回傳:\n
+        List: 候選物件，依登記順序排列\n
+        """
+        x, y, width, height = rect
+        return self._query_bounds(x, y, x + width, y + height)
+
+    def query_point(self, x: float, y: float) -> List:
+        """
+        找出範圍包含某個點的物件\n
+        \n
+        參數:\n
+        x (float): 點的 X 座標\n
+        y (float): 點的 Y 座標\n
+        \n
+        回傳:\n
+        List: 候選物件，依登記順序排列\n
+        """
+        return self._query_bounds(x, y, x, y)
+
+    def query_ray(self, start_x: float, start_y: float, end_x: float, end_y: float) -> List:
+        """
+        找出範圍和線段相交的物件（沿著線段逐格走訪，長線段也不用掃整個範圍）\n
+        \n
+        參數:\n
+        start_x (float): 起點 X 座標\n
+        start_y (float): 起點 Y 座標\n
+        end_x (float): 終點 X 座標\n
+        end_y (float): 終點 Y 座標\n
+        \n
+        回傳:\n
+        List: 候選物件，依線段進入物件範圍的先後排列（同時進入的依登記順序）\n
+        """
+        size = self.cell_size
+        delta_x = end_x - start_x
+        delta_y = end_y - start_y
+        cell_x = math.floor(start_x / size)
+        cell_y = math.floor(start_y / size)
+        end_cell_x = math.floor(end_x / size)
+        end_cell_y = math.floor(end_y / size)
+
+        # 沿線段走訪格子（Amanatides-Woo），分別記錄下一次跨越直線和橫線的比例位置
+        step_x = 1 if delta_x > 0 else -1
+        step_y = 1 if delta_y > 0 else -1
+        if delta_x != 0:
+            next_x = ((cell_x + (step_x > 0)) * size - start_x) / delta_x
+            span_x = size / abs(delta_x)
+        else:
+            next_x = span_x = math.inf
+        if delta_y != 0:
+            next_y = ((cell_y + (step_y > 0)) * size - start_y) / delta_y
+            span_y = size / abs(delta_y)
+        else:
+            next_y = span_y = math.inf
+
+        candidates = {}
+        steps = abs(end_cell_x - cell_x) + abs(end_cell_y - cell_y)
+        for _ in range(steps + 1):
+            for obj in self.cells.get((cell_x, cell_y), ()):
+                candidates[obj] = None
+            if next_x < next_y:
+                cell_x += step_x
+                next_x += span_x
+            else:
+                cell_y += step_y
+                next_y += span_y
+
+        hits = []
+        for obj in candidates:
+            entry = self._entries[obj]
+            enter = self._get_segment_entry(entry, start_x, start_y, delta_x, delta_y)
+            if enter is not None:
+                hits.append((enter, entry[0], obj))
+        hits.sort(key=lambda hit: (hit[0], hit[1]))
+        return [obj for _, _, obj in hits]
+
+    def _query_bounds(self, left: float, top: float, right: float, bottom: float) -> List:
+        """
+        找出範圍和指定邊界重疊的物件\n
+        \n
+        參數:\n
+        left, top, right, bottom (float): 查詢邊界\n
+        \n
+        回傳:\n
+        List: 候選物件，依登記順序排列\n
+        """
+        cell_left, cell_top, cell_right, cell_bottom = self._get_cell_range(
+            left, top, right, bottom
+        )
+        cells = self.cells
+        found = {}
+        for cell_x in range(cell_left, cell_right + 1):
+            for cell_y in range(cell_top, cell_bottom + 1):
+                for obj in cells.get((cell_x, cell_y), ()):
+                    found[obj] = None
+
+        entries = self._entries
+        hits = []
+        for obj in found:
+            entry = entries[obj]
+            if entry[1] <= right and entry[3] >= left and entry[2] <= bottom and entry[4] >= top:
+                hits.append(entry[0])
+                hits.append(obj)
+        if len(hits) <= 2:
+            return hits[1::2]
+        pairs = sorted(zip(hits[::2], hits[1::2]), key=lambda pair: pair[0])
+        return [obj for _, obj in pairs]
+
+    def _get_segment_entry(
+        self, entry: list, start_x: float, start_y: float, delta_x: float, delta_y: float
+    ):
+        """
+        計算線段進入物件範圍的比例位置（slab 檢測）\n
+        \n
+        參數:\n
+        entry (list): 物件的登記資料\n
+        start_x, start_y (float): 線段起點\n
+        delta_x, delta_y (float): 線段位移\n
+        \n
+        回傳:\n
+        float: 0~1 之間的進入位置，沒有相交時回傳 None\n
+        """
+        enter, leave = 0.0, 1.0
+        for start, delta, low, high in (
+            (start_x, delta_x, entry[1], entry[3]),
+            (start_y, delta_y, entry[2], entry[4]),
+        ):
+            if delta == 0:
+                if start < low or start > high:
+                    return None
+                continue
+            t_low = (low - start) / delta
+            t_high = (high - start) / delta
+            if t_low > t_high:
+                t_low, t_high = t_high, t_low
+            enter = max(enter, t_low)
+            leave = min(leave, t_high)
+            if enter > leave:
+                return None
+        return enter
+
+    def _get_expanded_bounds(self, obj) -> Tuple[float, float, float, float]:
+        """
+        取得物件放寬 SPATIAL_MARGIN 之後的邊界\n
+        \n
+        參數:\n
+        obj: 遊戲物件\n
+        \n
+        回傳:\n
+        Tuple[float, float, float, float]: (左, 上, 右, 下)\n
+        """
+        x, y, width, height = self.bounds(obj)
+        return (
+            x - SPATIAL_MARGIN,
+            y - SPATIAL_MARGIN,
+            x + width + SPATIAL_MARGIN,
+            y + height + SPATIAL_MARGIN,
+        )
+
+    def _get_cell_range(
+        self, left: float, top: float, right: float, bottom: float
+    ) -> Tuple[int, int, int, int]:
+        """
+        計算邊界蓋到的格子範圍\n
+        \n
+        參數:\n
+        left, top, right, bottom (float): 邊界\n
+        \n
+        回傳:\n
+        Tuple[int, int, int, int]: (格子左, 格子上, 格子右, 格子下)，包含兩端\n
+        """
+        size = self.cell_size
+        return (
+            math.floor(left / size),
+            math.floor(top / size),
+            math.floor(right / size),
+            math.floor(bottom / size),
+        )
+
+    def _add_to_cells(self, obj, cell_range):
+        cell_left, cell_top, cell_right, cell_bottom = cell_range
+        cells = self.cells
+        for cell_x in range(cell_left, cell_right + 1):
+            for cell_y in range(cell_top, cell_bottom + 1):
+                cell = cells.get((cell_x, cell_y))
+                if cell is None:
+                    cells[(cell_x, cell_y)] = [obj]
+                else:
+                    cell.append(obj)
+
+    def _remove_from_cells(self, obj, cell_range):
+        cell_left, cell_top, cell_right, cell_bottom = cell_range
+        cells = self.cells
+        for cell_x in range(cell_left, cell_right + 1):
+            for cell_y in range(cell_top, cell_bottom + 1):
+                cell = cells[(cell_x, cell_y)]
+                cell.remove(obj)
+                if not cell:
+                    del cells[(cell_x, cell_y)]
+
+
+######################關卡碰撞索引######################
+class LevelSpatialIndex:
+    """
+    關卡的碰撞世界：玩家、敵人、投射物的碰撞檢查都透過它查詢\n
+    \n
+    分成三個空間雜湊：\n
+    - solids：可以站立的平台（一般平台在前，移動平台依陷阱順序接在後面）\n
+    - traps：所有陷阱（包含移動平台）\n
+    - enemies：敵人（每幀更新完同步一次）\n
+    \n
+    平台和陷阱的碰撞矩形在建立時算好一次存在 rects，之後一直重複使用，\n
+    移動平台每幀移動後在 update_moving_platforms() 原地更新矩形，\n
+    查詢時直接拿到 (物件, 矩形)，不用每次碰撞檢查都建立新的 pygame.Rect。\n
+    矩形是共用的，呼叫端只能讀取，不能修改\n
+    \n
+    屬性:\n
+    platforms (List): 一般平台清單（和 Level.platforms 是同一個清單）\n
+    moving_platforms (List): 陷阱中的移動平台\n
+    all_platforms (List): 一般平台 + 移動平台合併的清單，順序和 solids 相同\n
+    rects (Dict): 平台、陷阱對應的快取碰撞矩形\n
+    solids (SpatialHash): 平台索引\n
+    traps (SpatialHash): 陷阱索引\n
+    enemies (SpatialHash): 敵人索引\n
+    """
+
+    def __init__(self, platforms: List, traps: List, enemies: List, cell_size: int = SPATIAL_CELL_SIZE):
+        """
+        建立關卡碰撞世界\n
+        \n
+        參數:\n
+        platforms (List): 一般平台清單\n
+        traps (List): 陷阱清單\n
+        enemies (List): 敵人清單\n
+        cell_size (int): 格子邊長\n
+        """
+        from src.traps.moving_platform import MovingPlatform
+
+        self.platforms = platforms
+        self.moving_platforms = [trap for trap in traps if isinstance(trap, MovingPlatform)]
+        self.all_platforms = platforms + self.moving_platforms
+        self._moving_platform_set = set(self.moving_platforms)
+
+        self.rects: Dict = {}
+        for obj in self.all_platforms + traps:
+            if obj not in self.rects:
+                self.rects[obj] = pygame.Rect(obj.x, obj.y, obj.width, obj.height)
+
+        self.solids = SpatialHash(cell_size)
+        for platform in self.all_platforms:
+            self.solids.insert(platform)
+
+        self.traps = SpatialHash(cell_size)
+        for trap in traps:
+            self.traps.insert(trap)
+
+        self.enemies = SpatialHash(cell_size)
+        self.enemies.sync(enemies)
+
+    def get_rect(self, obj) -> pygame.Rect:
+        """
+        取得平台或陷阱的快取碰撞矩形\n
+        \n
+        參數:\n
+        obj: 平台或陷阱\n
+        \n
+        回傳:\n
+        pygame.Rect: 共用的碰撞矩形（不能修改）\n
+        """
+        return self.rects[obj]
+
+    def query_solids(self, rect: pygame.Rect, include_moving: bool = True) -> List:
+        """
+        找出可能和矩形重疊的平台\n
+        \n
+        參數:\n
+        rect (pygame.Rect): 查詢範圍\n
+        include_moving (bool): 是否包含移動平台\n
+        \n
+        回傳:\n
+        List: 候選平台，順序和 all_platforms 相同\n
+        """
+        candidates = self.solids.query_rect(rect)
+        if include_moving or not self.moving_platforms:
+            return candidates
+        moving_platforms = self._moving_platform_set
+        return [platform for platform in candidates if platform not in moving_platforms]
+
+    def query_solid_rects(self, rect: pygame.Rect, include_moving: bool = True) -> List[Tuple]:
+        """
+        找出可能和矩形重疊的平台，連同快取的碰撞矩形一起回傳\n
+        \n
+        參數:\n
+        rect (pygame.Rect): 查詢範圍\n
+        include_moving (bool): 是否包含移動平台\n
+        \n
+        回傳:\n
+        List[Tuple]: (平台, 碰撞矩形)，順序和 all_platforms 相同\n
+        """
+        rects = self.rects
+        return [(platform, rects[platform]) for platform in self.query_solids(rect, include_moving)]
+
+    def query_trap_rects(self, rect: pygame.Rect) -> List[Tuple]:
+        """
+        找出可能和矩形重疊的陷阱，連同快取的碰撞矩形一起回傳\n
+        \n
+        參數:\n
+        rect (pygame.Rect): 查詢範圍\n
+        \n
+        回傳:\n
+        List[Tuple]: (陷阱, 碰撞矩形)，依陷阱順序排列\n
+        """
+        rects = self.rects
+        return [(trap, rects[trap]) for trap in self.traps.query_rect(rect)]
+
+    def query_moving_platforms(self, rect: pygame.Rect) -> List:
+        """
+        找出可能和矩形重疊的移動平台\n
+        \n
+        參數:\n
+        rect (pygame.Rect): 查詢範圍\n
+        \n
+        回傳:\n
+        List: 候選移動平台，依陷阱順序排列\n
+        """
+        if not self.moving_platforms:
+            return []
+        moving_platforms = self._moving_platform_set
+        return [platform for platform in self.solids.query_rect(rect) if platform in moving_platforms]
+
+    def update_moving_platforms(self):
+        """
+        移動平台更新位置後呼叫，原地更新快取矩形並同步兩個索引中的位置\n
+        """
+        rects = self.rects
+        for platform in self.moving_platforms:
+            rects[platform].update(platform.x, platform.y, platform.width, platform.height)
+            self.solids.update(platform)
+            self.traps.update(platform)
+
+    def sync_enemies(self, enemies: List):
+        """
+        敵人移動、死亡移除或重建後呼叫，同步敵人索引\n
+        \n
+        參數:\n
+        enemies (List): 目前的敵人清單\n
+        """
+        self.enemies.sync(enemies)
@@ -0,0 +1,117 @@
+######################載入套件######################
+import math
+from typing import Callable, Dict
+
+import pygame
+
+######################靜態圖層設定######################
+STATIC_CHUNK_HEIGHT = 512  # 每一塊預先繪製的高度（像素），整個關卡由上往下切成很多塊
+
+
+######################靜態圖層######################
+class StaticLevelLayer:
+    """
+    關卡靜態圖層\n
+    \n
+    平台這類不會動的東西預先畫在一張透明圖層上，\n
+    每幀只要依攝影機位置貼出畫面看得到的那一段，不用每個平台重新計算座標和繪製。\n
+    \n
+    整個關卡很高，一整張圖層太佔記憶體，所以由上往下切成 STATIC_CHUNK_HEIGHT 高的小塊，\n
+    攝影機第一次看到某一塊時才繪製，之後一直重複使用，直到呼叫 invalidate() 為止\n
+    \n
+    圖塊繪製完成後開啟 RLE 加速，大片透明的區域（包含完全空白的圖塊）貼圖時幾乎不花時間\n
+    \n
+    回放的關鍵幀不保存已繪製的圖塊，還原後需要時再重新繪製\n
+    \n
+    屬性:\n
+    chunk_height (int): 每一塊的高度\n
+    chunks (Dict[int, pygame.Surface]): 圖塊編號對應的圖片\n
+    build_count (int): 累計繪製過的圖塊數量\n
+    """
+
+    def __init__(self, chunk_height: int = STATIC_CHUNK_HEIGHT):
+        """
+        初始化靜態圖層（圖塊用到才繪製）\n
+        \n
+        參數:\n
+        chunk_height (int): 每一塊的高度\n
+        """
+        self.chunk_height = chunk_height
+        self.chunks: Dict[int, pygame.Surface] = {}
+        self.width = 0
+        self.build_count = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["chunks"] = {}
+        state["width"] = 0
+        return state
+
+    def invalidate(self, top: float = None, bottom: float = None):
+        """
+        作廢已繪製的圖塊，下次看到時重新繪製\n
+        \n
+        參數:\n
+        top (float): 變動範圍的世界座標上緣，None 表示整個圖層\n
+        bottom (float): 變動範圍的世界座標下緣\n
+        """
+        if top is None or bottom is None:
+            self.chunks.clear()
+            return
+        first = math.floor(top / self.chunk_height)
+        last = math.floor(bottom / self.chunk_height)
+        for index in range(first, last + 1):
+            self.chunks.pop(index, None)
+
+    def render(
+        self,
+        screen: pygame.Surface,
+        camera_y: float,
+        draw: Callable[[pygame.Surface, int], None],
+    ):
+        """
+        貼出攝影機看得到的圖層範圍\n
+        \n
+        參數:\n
+        screen (pygame.Surface): 螢幕表面\n
+        camera_y (float): 攝影機偏移（和各物件 render() 使用的相同）\n
+        draw (Callable): 繪製圖塊的函式 draw(圖塊, offset_y)，世界座標 y 畫在圖塊的 y + offset_y\n
+        """
+        screen_width, screen_height = screen.get_size()
+        if screen_width != self.width:
+            # 螢幕寬度改變時全部重畫
+            self.chunks.clear()
+            self.width = screen_width
+
+        # 和 int(y - camera_y + 螢幕高度 // 2) 相同的換算，整數座標的物件位置完全一致
+        offset_y = math.floor(screen_height // 2 - camera_y)
+        view_top = -offset_y
+        first = view_top // self.chunk_height
+        last = (view_top + screen_height - 1) // self.chunk_height
+
+        for index in range(first, last + 1):
+            chunk = self.chunks.get(index)
+            if chunk is None:
+                chunk = self._build_chunk(index, draw)
+            screen.blit(chunk, (0, index * self.chunk_height + offset_y))
+
+    def _build_chunk(
+        self, index: int, draw: Callable[[pygame.Surface, int], None]
+    ) -> pygame.Surface:
+        """
+        繪製一個圖塊\n
+        \n
+        參數:\n
+        index (int): 圖塊編號（世界座標 y 除以圖塊高度）\n
+        draw (Callable): 繪製圖塊的函式\n
+        \n
+        回傳:\n
+        pygame.Surface: 繪製好的圖塊\n
+        """
+        chunk = pygame.Surface((self.width, self.chunk_height), pygame.SRCALPHA)
+        draw(chunk, -index * self.chunk_height)
+        self.build_count += 1
+
+        chunk.set_alpha(255, pygame.RLEACCEL)
+        self.chunks[index] = chunk
+        return chunk
@@ -0,0 +1,206 @@
+######################載入套件######################
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+import pygame
+
+######################連續碰撞設定######################
+# 出發時已經陷進平台多深（像素）還算是這一幀撞到它（站不穩、被移動平台頂到時的容錯）
+PLAYER_CONTACT_TOLERANCE = 3
+ENEMY_CONTACT_TOLERANCE = 5
+
+
+######################掃掠碰撞（Swept AABB）######################
+def sweep_rect(
+    left: float,
+    top: float,
+    width: float,
+    height: float,
+    dx: float,
+    dy: float,
+    rect: pygame.Rect,
+    tolerance: float = 0.0,
+) -> Optional[Tuple[float, int, int]]:
+    """
+    計算移動中的矩形沿著位移向量第一次碰到靜止矩形的時間\n
+    \n
+    重疊的規則和 pygame.Rect.colliderect 相同（邊緣剛好貼齊不算碰到），\n
+    所以移動結束時剛好貼在平台上不算碰撞。出發時已經重疊的情況：\n
+    沿著進入方向陷進去不超過 tolerance 像素，算作時間 0 碰到；陷得更深就當作沒碰到\n
+    （由呼叫端原本的重疊處理負責），tolerance 為無限大時任何出發時的重疊都算碰到\n
+    \n
+    參數:\n
+    left, top (float): 移動矩形出發時的左上角\n
+    width, height (float): 移動矩形的大小\n
+    dx, dy (float): 這一幀的位移\n
+    rect (pygame.Rect): 靜止的矩形\n
+    tolerance (float): 出發時允許的陷入深度\n
+    \n
+    回傳:\n
+    Optional[Tuple[float, int, int]]: (碰撞時間 0~1, 法向量 x, 法向量 y)，沒碰到回傳 None。\n
+    法向量是被撞的那一面朝外的方向，例如從上方落到平台上是 (0, -1)\n
+    """
+    if (dx == 0 and dy == 0) or width <= 0 or height <= 0 or rect.width <= 0 or rect.height <= 0:
+        return None
+
+    # 各軸開始重疊和結束重疊的時間，沒有移動的軸必須一直重疊
+    if dx > 0:
+        x_entry = (rect.left - (left + width)) / dx
+        x_exit = (rect.right - left) / dx
+    elif dx < 0:
+        x_entry = (left - rect.right) / -dx
+        x_exit = (left + width - rect.left) / -dx
+    elif left < rect.right and rect.left < left + width:
+        x_entry, x_exit = -math.inf, math.inf
+    else:
+        return None
+
+    if dy > 0:
+        y_entry = (rect.top - (top + height)) / dy
+        y_exit = (rect.bottom - top) / dy
+    elif dy < 0:
+        y_entry = (top - rect.bottom) / -dy
+        y_exit = (top + height - rect.top) / -dy
+    elif top < rect.bottom and rect.top < top + height:
+        y_entry, y_exit = -math.inf, math.inf
+    else:
+        return None
+
+    # 兩軸都重疊的時間區間，同時進入時算作垂直方向（落在角落上算著陸）
+    hit_vertical = y_entry >= x_entry
+    entry = y_entry if hit_vertical else x_entry
+    exit_time = min(x_exit, y_exit)
+    if entry >= exit_time or entry >= 1 or exit_time <= 0:
+        return None
+
+    if entry < 0:
+        depth = -entry * (abs(dy) if hit_vertical else abs(dx))
+        if depth > tolerance:
+            return None
+        entry = 0.0
+
+    if hit_vertical:
+        return entry, 0, -1 if dy > 0 else 1
+    return entry, -1 if dx > 0 else 1, 0
+
+
+def sweep_solids(
+    spatial_index,
+    left: float,
+    top: float,
+    width: float,
+    height: float,
+    dx: float,
+    dy: float,
+    tolerance: float = 0.0,
+    include_moving: bool = True,
+) -> Optional[Tuple]:
+    """
+    沿著位移向量找出最先碰到的平台\n
+    \n
+    只查詢整段移動範圍內的平台，同時碰到好幾個時取平台順序（all_platforms）最前面的，\n
+    不管移動多快都不會穿過平台，也不需要把一幀拆成好幾步\n
+    \n
+    參數:\n
+    spatial_index (LevelSpatialIndex): 關卡碰撞世界\n
+    left, top (float): 移動矩形出發時的左上角\n
+    width, height (float): 移動矩形的大小\n
+    dx, dy (float): 這一幀的位移\n
+    tolerance (float): 出發時允許的陷入深度（見 sweep_rect）\n
+    include_moving (bool): 是否包含移動平台\n
+    \n
+    回傳:\n
+    Optional[Tuple]: (平台, 碰撞矩形, 碰撞時間, 法向量 x, 法向量 y)，沒碰到回傳 None\n
+    """
+    if dx == 0 and dy == 0:
+        return None
+
+    # 整段移動掃過的範圍（往外取整，小數座標也不會漏掉平台）
+    swept_area = pygame.Rect(
+        math.floor(min(left, left + dx)),
+        math.floor(min(top, top + dy)),
+        math.ceil(width + abs(dx)) + 1,
+        math.ceil(height + abs(dy)) + 1,
+    )
+
+    contact = None
+    for platform, platform_rect in spatial_index.query_solid_rects(swept_area, include_moving):
+        hit = sweep_rect(left, top, width, height, dx, dy, platform_rect, tolerance)
+        if hit is not None and (contact is None or hit[0] < contact[2]):
+            contact = (platform, platform_rect, *hit)
+            if hit[0] == 0:
+                break
+    return contact
+
+
+def sweep_rects(
+    left,
+    top,
+    width,
+    height,
+    dx,
+    dy,
+    rect_left,
+    rect_top,
+    rect_right,
+    rect_bottom,
+    tolerance: float = 0.0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    sweep_rect 的陣列版本，一次算很多組 (移動矩形, 靜止矩形)，結果和逐一計算相同\n
+    \n
+    參數:\n
+    left, top, width, height: 移動矩形出發時的範圍（陣列，可以廣播）\n
+    dx, dy: 位移\n
+    rect_left, rect_top, rect_right, rect_bottom: 靜止矩形的範圍\n
+    tolerance (float): 出發時允許的陷入深度\n
+    \n
+    回傳:\n
+    Tuple[np.ndarray, np.ndarray, np.ndarray]: (碰撞時間, 法向量 x, 法向量 y)，沒碰到的時間是 inf\n
+    """
+    left, top, width, height, dx, dy, rect_left, rect_top, rect_right, rect_bottom = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (
+            left, top, width, height, dx, dy, rect_left, rect_top, rect_right, rect_bottom
+        ))
+    )
+    x_entry, x_exit = _axis_times(left, width, dx, rect_left, rect_right)
+    y_entry, y_exit = _axis_times(top, height, dy, rect_top, rect_bottom)
+
+    hit_vertical = y_entry >= x_entry
+    entry = np.where(hit_vertical, y_entry, x_entry)
+    exit_time = np.minimum(x_exit, y_exit)
+    valid = (
+        ((dx != 0) | (dy != 0))
+        & (width > 0)
+        & (height > 0)
+        & (rect_right > rect_left)
+        & (rect_bottom > rect_top)
+        & (entry < exit_time)
+        & (entry < 1)
+        & (exit_time > 0)
+    )
+
+    with np.errstate(invalid="ignore"):
+        depth = -entry * np.where(hit_vertical, np.abs(dy), np.abs(dx))
+        valid &= (entry >= 0) | (depth <= tolerance)
+
+    time = np.where(valid, np.maximum(entry, 0.0), np.inf)
+    normal_x = np.where(valid & ~hit_vertical, -np.sign(dx), 0).astype(np.int64)
+    normal_y = np.where(valid & hit_vertical, -np.sign(dy), 0).astype(np.int64)
+    return time, normal_x, normal_y
+
+
+def _axis_times(start, size, delta, rect_start, rect_end) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    單一軸開始重疊和結束重疊的時間（沒有移動的軸：一直重疊是 (-inf, inf)，不重疊是 (inf, -inf)）\n
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        distance = np.abs(delta)
+        entry = np.where(delta > 0, rect_start - (start + size), start - rect_end) / distance
+        exit_time = np.where(delta > 0, rect_end - start, start + size - rect_start) / distance
+    overlapping = (start < rect_end) & (rect_start < start + size)
+    still = delta == 0
+    entry = np.where(still, np.where(overlapping, -np.inf, np.inf), entry)
+    exit_time = np.where(still, np.where(overlapping, np.inf, -np.inf), exit_time)
+    return entry, exit_time
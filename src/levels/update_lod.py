@@ -0,0 +1,200 @@
+######################載入套件######################
+from typing import Dict
+
+######################更新細節層級設定######################
+LOD_VIEW_WIDTH = 1200  # 畫面寬度（和 main.py 的視窗大小相同）
+LOD_VIEW_HEIGHT = 800  # 畫面高度
+LOD_VIEW_MARGIN = 160  # 畫面外多少像素內仍然每幀更新（涵蓋攝影機平滑跟隨的落後和剛走出畫面的物件）
+LOD_FAR_DISTANCE = 1200  # 和玩家的垂直距離超過這個就算遠距離
+LOD_REDUCED_INTERVAL = 2  # 畫面外附近的物件每幾幀更新一次
+LOD_FAR_INTERVAL = 4  # 遠距離的物件每幾幀更新一次
+LOD_MAX_STEPS = LOD_FAR_INTERVAL  # 一次更新最多補幾幀（從睡眠醒來時不補睡掉的時間）
+
+# 更新層級：每幀更新、降頻更新、遠距離降頻更新、睡眠（不更新）
+LOD_FULL = 0
+LOD_REDUCED = 1
+LOD_FAR = 2
+LOD_SLEEP = 3
+LOD_TIER_NAMES = ("full", "reduced", "far", "sleep")
+LOD_INTERVALS = (1, LOD_REDUCED_INTERVAL, LOD_FAR_INTERVAL, 0)
+
+
+######################更新細節層級排程######################
+class UpdateLodScheduler:
+    """
+    依照和玩家的距離決定敵人、陷阱這一幀要不要更新、一次要補幾幀\n
+    \n
+    攝影機跟著玩家，所以用玩家的位置當作畫面中心：\n
+    1. 畫面內（含邊界）的物件每幀更新，看得到的行為完全不變\n
+    2. 畫面外附近的物件每 LOD_REDUCED_INTERVAL 幀更新一次，時間步長放大成經過的幀數\n
+    3. 遠距離的物件每 LOD_FAR_INTERVAL 幀更新一次\n
+    4. 遠距離而且還沒被玩家激活的物件睡眠，完全不更新\n
+    \n
+    同一層級的物件依固定編號錯開更新的幀，負載平均分散在每一幀；\n
+    編號在物件加入關卡時分配，之後不會變，清單中有物件被移除時其他物件輪到的幀也不會改變\n
+    物件要有 is_in_view()、allows_update_lod、lod_frame（最後一次更新的幀數）和 lod_slot（固定編號）\n
+    \n
+    屬性:\n
+    view_width, view_height (int): 畫面大小\n
+    margin (int): 畫面外仍然每幀更新的距離\n
+    far_distance (float): 遠距離的門檻\n
+    frame (int): 排程的幀數\n
+    next_slot (int): 下一個要分配的固定編號\n
+    tier_counts (List[int]): 這一幀各層級的物件數量（睡眠以外是實際更新的數量）\n
+    skipped (int): 這一幀還沒輪到、沒有更新的物件數量\n
+    total_counts (List[int]): 累計的各層級數量\n
+    """
+
+    __slots__ = (
+        "view_width",
+        "view_height",
+        "margin",
+        "far_distance",
+        "frame",
+        "next_slot",
+        "tier_counts",
+        "skipped",
+        "total_counts",
+        "total_skipped",
+    )
+
+    def __init__(
+        self,
+        view_width: int = LOD_VIEW_WIDTH,
+        view_height: int = LOD_VIEW_HEIGHT,
+        margin: int = LOD_VIEW_MARGIN,
+        far_distance: float = LOD_FAR_DISTANCE,
+    ):
+        """
+        初始化更新排程\n
+        \n
+        參數:\n
+        view_width (int): 畫面寬度\n
+        view_height (int): 畫面高度\n
+        margin (int): 畫面外仍然每幀更新的距離\n
+        far_distance (float): 遠距離的門檻（和玩家的垂直距離）\n
+        """
+        self.view_width = view_width
+        self.view_height = view_height
+        self.margin = margin
+        self.far_distance = far_distance
+        self.frame = 0
+        self.next_slot = 0
+        self.tier_counts = [0] * len(LOD_TIER_NAMES)
+        self.skipped = 0
+        self.total_counts = [0] * len(LOD_TIER_NAMES)
+        self.total_skipped = 0
+
+    def begin_frame(self):
+        """
+        開始新的一幀，清除這一幀的統計\n
+        """
+        self.frame += 1
+        tier_counts = self.tier_counts
+        for tier in range(len(tier_counts)):
+            tier_counts[tier] = 0
+        self.skipped = 0
+
+    def assign_slot(self, entity) -> int:
+        """
+        分配物件的固定編號（已經有編號時沿用）\n
+        \n
+        參數:\n
+        entity: 敵人或陷阱\n
+        \n
+        回傳:\n
+        int: 物件的固定編號\n
+        """
+        slot = entity.lod_slot
+        if slot is None:
+            slot = entity.lod_slot = self.next_slot
+            self.next_slot += 1
+        return slot
+
+    def classify(self, entity, center_y: float, can_sleep: bool) -> int:
+        """
+        決定物件這一幀的更新層級\n
+        \n
+        參數:\n
+        entity: 敵人或陷阱\n
+        center_y (float): 畫面中心的世界 Y 座標（玩家位置）\n
+        can_sleep (bool): 遠距離時是否可以睡眠（還沒被玩家激活的敵人）\n
+        \n
+        回傳:\n
+        int: 更新層級（LOD_FULL、LOD_REDUCED、LOD_FAR、LOD_SLEEP）\n
+        """
+        if not entity.allows_update_lod or entity.is_in_view(
+            center_y, self.view_width, self.view_height, self.margin
+        ):
+            return LOD_FULL
+        if abs(entity.y - center_y) <= self.far_distance:
+            return LOD_REDUCED
+        return LOD_SLEEP if can_sleep else LOD_FAR
+
+    def schedule(self, entity, center_y: float, can_sleep: bool = False) -> int:
+        """
+        決定物件這一幀要更新幾幀的時間\n
+        \n
+        參數:\n
+        entity: 敵人或陷阱（還沒有固定編號時在這裡分配）\n
+        center_y (float): 畫面中心的世界 Y 座標（玩家位置）\n
+        can_sleep (bool): 遠距離時是否可以睡眠\n
+        \n
+        回傳:\n
+        int: 這一幀要推進的幀數，0 表示這一幀不更新\n
+        """
+        tier = self.classify(entity, center_y, can_sleep)
+        frame = self.frame
+
+        if tier == LOD_SLEEP:
+            # 睡眠的時間不補，醒來時從下一幀接著算
+            entity.lod_frame = None
+            self.tier_counts[LOD_SLEEP] += 1
+            self.total_counts[LOD_SLEEP] += 1
+            return 0
+
+        last_frame = entity.lod_frame
+        if last_frame is None:
+            last_frame = frame - 1
+
+        slot = entity.lod_slot
+        if slot is None:
+            slot = self.assign_slot(entity)
+
+        interval = LOD_INTERVALS[tier]
+        if interval > 1 and (frame + slot) % interval:
+            # 記下最後一次更新的幀，輪到時補上中間沒更新的幀
+            entity.lod_frame = last_frame
+            self.skipped += 1
+            self.total_skipped += 1
+            return 0
+
+        entity.lod_frame = frame
+        self.tier_counts[tier] += 1
+        self.total_counts[tier] += 1
+        return min(frame - last_frame, LOD_MAX_STEPS)
+
+    def get_tier_counts(self, total: bool = False) -> Dict[str, int]:
+        """
+        取得各層級的物件數量\n
+        \n
+        參數:\n
+        total (bool): True 取累計數量，False 取這一幀的數量\n
+        \n
+        回傳:\n
+        Dict[str, int]: 層級名稱 → 數量（full/reduced/far 是實際更新的數量，\n
+        sleep 是睡眠的數量，skipped 是還沒輪到的數量）\n
+        """
+        counts = self.total_counts if total else self.tier_counts
+        result = dict(zip(LOD_TIER_NAMES, counts))
+        result["skipped"] = self.total_skipped if total else self.skipped
+        return result
+
+    def reset_totals(self):
+        """
+        清除累計的統計（效能測試暖身結束時使用）\n
+        """
+        total_counts = self.total_counts
+        for tier in range(len(total_counts)):
+            total_counts[tier] = 0
+        self.total_skipped = 0
@@ -0,0 +1,312 @@
+######################載入套件######################
+import time
+from inspect import isgenerator
+from typing import Callable, Dict, Hashable
+
+######################工作排程設定######################
+FRAME_JOB_BUDGET_MS = 2.0  # 每幀最多花多少毫秒執行可以延後的工作
+JOB_PRIORITY_HIGH = 0  # 影響遊戲判定的工作（敵人決策）
+JOB_PRIORITY_NORMAL = 1  # 一般的狀態整理（裝備計時器、巡邏範圍）
+JOB_PRIORITY_LOW = 2  # 只影響畫面和音效的工作（粒子補充、殘血提示）
+DEFAULT_JOB_DEADLINE = 4  # 預設最多可以延後幾幀
+
+
+######################延後的工作######################
+class _FrameJob:
+    """
+    排隊中的一個工作\n
+    \n
+    屬性:\n
+    key: 排隊用的鍵\n
+    name (str): 工作名稱（統計用）\n
+    callback (Callable): 要執行的函式，回傳產生器時每次 yield 都可以在那裡切開分幀執行\n
+    args (tuple): 函式參數\n
+    priority (int): 優先順序，數字越小越先執行\n
+    due_frame (int): 最晚必須執行完的幀\n
+    submitted_frame (int): 送出的幀\n
+    sequence (int): 送出順序（同優先順序先送先做）\n
+    generator: 執行到一半的產生器，還沒開始時是 None\n
+    """
+
+    __slots__ = (
+        "key",
+        "name",
+        "callback",
+        "args",
+        "priority",
+        "due_frame",
+        "submitted_frame",
+        "sequence",
+        "generator",
+    )
+
+    def __init__(self, key, name, callback, args, priority, due_frame, submitted_frame, sequence):
+        self.key = key
+        self.name = name
+        self.callback = callback
+        self.args = args
+        self.priority = priority
+        self.due_frame = due_frame
+        self.submitted_frame = submitted_frame
+        self.sequence = sequence
+        self.generator = None
+
+
+def _job_order(job: _FrameJob):
+    """
+    工作的執行順序：優先順序，再來是送出順序\n
+    """
+    return job.priority, job.sequence
+
+
+######################每幀時間預算的工作排程######################
+class FrameJobScheduler:
+    """
+    有每幀時間預算的協作式工作排程\n
+    \n
+    不需要在同一幀做完的整理工作用 submit() 送進來，每幀結束時 run_frame() 在預算內執行：\n
+    1. 已經到期限的工作一定執行（不管預算），保證最多只延後 deadline 幀\n
+    2. 其餘的工作依優先順序執行，用完預算就留到下一幀\n
+    3. 工作函式回傳產生器時，每次 yield 都是可以切開的地方，長工作可以分好幾幀做完\n
+    4. 同一個 key 排隊中時不重複加入（每幀送出的工作合併成一個）\n
+    5. 統計每種工作的執行次數、耗時和等待的幀數\n
+    \n
+    停用時 submit() 直接執行工作並回傳結果，行為和沒有排程完全相同（重播需要這樣才對得上）\n
+    物理和碰撞不經過排程，一直都是同步執行\n
+    \n
+    屬性:\n
+    enabled (bool): 是否延後工作\n
+    budget_ns (int): 每幀的時間預算（奈秒）\n
+    frame (int): 排程的幀數\n
+    last_frame_ns (int): 上一幀執行工作花的時間\n
+    max_frame_ns (int): 執行工作花最多時間的一幀\n
+    """
+
+    def __init__(self, budget_ms: float = FRAME_JOB_BUDGET_MS):
+        """
+        初始化工作排程（預設停用）\n
+        \n
+        參數:\n
+        budget_ms (float): 每幀的時間預算（毫秒）\n
+        """
+        self.enabled = False
+        self.budget_ns = int(budget_ms * 1_000_000)
+        self.frame = 0
+        self._pending: Dict[Hashable, _FrameJob] = {}
+        self._sequence = 0
+
+        # 統計：工作名稱 → [執行次數, 總耗時, 最長耗時, 總等待幀數, 最長等待幀數, 到期強制執行次數]
+        self._stats: Dict[str, list] = {}
+        self.last_frame_ns = 0
+        self.max_frame_ns = 0
+
+    def set_enabled(self, enabled: bool):
+        """
+        開啟或關閉延後執行，關閉時先把排隊中的工作全部做完\n
+        \n
+        參數:\n
+        enabled (bool): 是否延後工作\n
+        """
+        if not enabled:
+            self.flush()
+        self.enabled = enabled
+
+    def set_budget(self, budget_ms: float):
+        """
+        設定每幀的時間預算\n
+        \n
+        參數:\n
+        budget_ms (float): 每幀的時間預算（毫秒）\n
+        """
+        self.budget_ns = int(budget_ms * 1_000_000)
+
+    def submit(
+        self,
+        name: str,
+        callback: Callable,
+        *args,
+        key: Hashable = None,
+        priority: int = JOB_PRIORITY_NORMAL,
+        deadline: int = DEFAULT_JOB_DEADLINE,
+    ):
+        """
+        送出一個可以延後的工作\n
+        \n
+        參數:\n
+        name (str): 工作名稱（統計用）\n
+        callback (Callable): 要執行的函式\n
+        *args: 函式參數\n
+        key (Hashable): 合併用的鍵，同一個 key 排隊中時不重複加入，None 表示不合併\n
+        priority (int): 優先順序（JOB_PRIORITY_*）\n
+        deadline (int): 最多可以延後幾幀，0 表示這一幀結束前一定執行\n
+        \n
+        回傳:\n
+        停用時是工作函式的回傳值（產生器會直接執行完，回傳 None）；延後執行時回傳 None\n
+        """
+        if not self.enabled:
+            result = callback(*args)
+            if isgenerator(result):
+                for _ in result:
+                    pass
+                return None
+            return result
+
+        self._sequence += 1
+        if key is None:
+            key = self._sequence
+        elif key in self._pending:
+            return None
+
+        self._pending[key] = _FrameJob(
+            key, name, callback, args, priority, self.frame + deadline, self.frame, self._sequence
+        )
+        return None
+
+    def run_frame(self):
+        """
+        在這一幀的時間預算內執行排隊中的工作（每個模擬幀結束時呼叫一次）\n
+        """
+        frame = self.frame
+        pending = self._pending
+        start = now = time.perf_counter_ns()
+
+        if pending:
+            stop_at = start + self.budget_ns
+            # 到期的工作排最前面，接著依優先順序、送出順序
+            jobs = sorted(pending.values(), key=_job_order)
+            jobs.sort(key=lambda job: job.due_frame > frame)
+            for job in jobs:
+                overdue = job.due_frame <= frame
+                if not overdue and now >= stop_at:
+                    break
+                finished = self._run_job(job, overdue, stop_at)
+                end = time.perf_counter_ns()
+                self._record(job, end - now, finished, overdue)
+                now = end
+                if finished:
+                    del pending[job.key]
+
+        self.frame = frame + 1
+        self.last_frame_ns = now - start
+        if self.last_frame_ns > self.max_frame_ns:
+            self.max_frame_ns = self.last_frame_ns
+
+    def _run_job(self, job: _FrameJob, overdue: bool, stop_at: int) -> bool:
+        """
+        執行一個工作，產生器工作用完預算時停在 yield 的地方\n
+        \n
+        參數:\n
+        job (_FrameJob): 要執行的工作\n
+        overdue (bool): 是否已經到期（到期的一定做完）\n
+        stop_at (int): 這一幀預算用完的時間（perf_counter_ns）\n
+        \n
+        回傳:\n
+        bool: 工作是否做完\n
+        """
+        if job.generator is None:
+            result = job.callback(*job.args)
+            if not isgenerator(result):
+                return True
+            job.generator = result
+        for _ in job.generator:
+            if not overdue and time.perf_counter_ns() >= stop_at:
+                return False
+        return True
+
+    def _record(self, job: _FrameJob, elapsed: int, finished: bool, overdue: bool):
+        """
+        記錄一次執行的耗時（產生器工作的每一段都算），做完時記錄等待的幀數\n
+        \n
+        參數:\n
+        job (_FrameJob): 執行的工作\n
+        elapsed (int): 這次執行的耗時（奈秒）\n
+        finished (bool): 工作是否做完\n
+        overdue (bool): 是否因為到期強制執行\n
+        """
+        stats = self._stats.get(job.name)
+        if stats is None:
+            stats = self._stats[job.name] = [0, 0, 0, 0, 0, 0]
+        stats[1] += elapsed
+        if elapsed > stats[2]:
+            stats[2] = elapsed
+        if finished:
+            waited = self.frame - job.submitted_frame
+            stats[0] += 1
+            stats[3] += waited
+            if waited > stats[4]:
+                stats[4] = waited
+            if overdue:
+                stats[5] += 1
+
+    def flush(self):
+        """
+        立刻把排隊中的工作全部做完（停用排程和切換關卡前使用）\n
+        """
+        while self._pending:
+            for job in sorted(self._pending.values(), key=_job_order):
+                start = time.perf_counter_ns()
+                self._run_job(job, True, 0)
+                self._record(job, time.perf_counter_ns() - start, True, True)
+                del self._pending[job.key]
+
+    def clear(self):
+        """
+        丟掉排隊中的工作（重新開始遊戲、重置關卡或回到選單時使用）\n
+        """
+        self._pending.clear()
+
+    def get_pending_count(self) -> int:
+        """
+        取得排隊中的工作數量\n
+        \n
+        回傳:\n
+        int: 工作數量\n
+        """
+        return len(self._pending)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        取得每種工作的統計\n
+        \n
+        回傳:\n
+        Dict[str, Dict[str, float]]: 工作名稱 → 執行次數、平均與最長耗時（毫秒）、\n
+        平均與最長等待幀數、到期強制執行的次數\n
+        """
+        return {
+            name: {
+                "runs": runs,
+                "mean_ms": total_ns / runs / 1_000_000 if runs else 0.0,
+                "max_ms": max_ns / 1_000_000,
+                "mean_wait_frames": total_wait / runs if runs else 0.0,
+                "max_wait_frames": max_wait,
+                "overdue_runs": overdue_runs,
+            }
+            for name, (runs, total_ns, max_ns, total_wait, max_wait, overdue_runs) in sorted(
+                self._stats.items()
+            )
+        }
+
+    def reset_stats(self):
+        """
+        清除統計（效能測試暖身結束時使用）\n
+        """
+        self._stats.clear()
+        self.last_frame_ns = 0
+        self.max_frame_ns = 0
+
+    def swap_state(self, other: "FrameJobScheduler"):
+        """
+        和另一個排程交換所有狀態（排隊中的工作、設定、統計）\n
+        \n
+        同一個行程輪流推進好幾個遊戲時（向量化模擬），每個遊戲有自己的排程，\n
+        推進前後各交換一次，這段期間全域的 FRAME_JOBS 就是那個遊戲的排程，\n
+        一個遊戲 clear() 不會丟掉其他遊戲排隊中的工作\n
+        \n
+        參數:\n
+        other (FrameJobScheduler): 要交換的排程\n
+        """
+        self.__dict__, other.__dict__ = other.__dict__, self.__dict__
+
+
+# 全遊戲共用的工作排程（預設停用，送出的工作直接執行）
+FRAME_JOBS = FrameJobScheduler()
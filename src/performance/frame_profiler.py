@@ -0,0 +1,303 @@
+######################載入套件######################
+import json
+import time
+from array import array
+from typing import Dict, List, Optional
+
+######################分析器設定######################
+SPAN_CAPACITY = 65536  # 環形緩衝區可保存的區段數量
+FRAME_HISTORY = 180  # 疊圖保留的幀數（3 秒）
+GRAPH_DEPTH = 1  # 疊圖統計的層級：0 是 update/render，1 是各子系統
+
+# 疊圖用的顏色，依區段名稱編號輪流使用
+GRAPH_COLORS = [
+    (255, 99, 71),
+    (65, 105, 225),
+    (50, 205, 50),
+    (255, 215, 0),
+    (186, 85, 211),
+    (0, 206, 209),
+    (255, 140, 0),
+    (199, 21, 133),
+    (154, 205, 50),
+    (135, 206, 250),
+    (244, 164, 96),
+    (220, 220, 220),
+]
+
+
+######################空區段######################
+class _NullSpan:
+    """
+    停用時回傳的空區段\n
+    \n
+    with 進出都不做任何事，讓量測點可以一直留在程式碼裡\n
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+######################階層式幀分析器######################
+class FrameProfiler:
+    """
+    階層式幀時間分析器\n
+    \n
+    用 with profiler.span("名稱") 包住要量測的區段：\n
+    1. 停用時 span() 直接回傳空區段，幾乎沒有成本\n
+    2. 啟用時記錄開始時間、耗時和巢狀深度到固定大小的環形緩衝區\n
+    3. 每幀彙整指定層級的耗時，給 F12 疊圖使用\n
+    4. 可匯出 Chrome trace-event JSON（chrome://tracing 或 Perfetto 開啟）\n
+    5. 設定 allocation_tracker 後，同一層級的區段也會統計記憶體配置量\n
+    \n
+    屬性:\n
+    enabled (bool): 是否正在記錄\n
+    allocation_tracker (AllocationTracker): 配置分析器，None 表示不統計配置\n
+    frame_index (int): 目前的幀編號\n
+    frame_breakdowns (List): 最近幾幀各區段的耗時（毫秒）\n
+    """
+
+    def __init__(self, capacity: int = SPAN_CAPACITY, frame_history: int = FRAME_HISTORY):
+        """
+        初始化分析器，預先配置好環形緩衝區\n
+        \n
+        參數:\n
+        capacity (int): 最多保存的區段數量\n
+        frame_history (int): 疊圖保留的幀數\n
+        """
+        self.enabled = False
+        self.capacity = capacity
+
+        # 區段名稱對照表（字串只存一次，緩衝區只存編號）
+        self.names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+
+        # 環形緩衝區（固定大小，不會在遊戲中配置記憶體）
+        self._span_names = array("i", [0]) * capacity
+        self._span_details = array("i", [-1]) * capacity
+        self._span_depths = array("b", [0]) * capacity
+        self._span_frames = array("I", [0]) * capacity
+        self._span_starts = array("q", [0]) * capacity
+        self._span_durations = array("q", [0]) * capacity
+        self._write_index = 0
+        self._span_count = 0
+
+        # 目前開啟中的區段堆疊 (名稱編號, 細節編號, 開始時間)
+        self._stack = []
+
+        # 每幀彙整
+        self.frame_index = 0
+        self.frame_history = frame_history
+        self.frame_breakdowns: List[Optional[Dict[int, float]]] = [None] * frame_history
+        self.frame_totals = array("d", [0.0]) * frame_history
+        self._frame_start = 0
+        self._current_breakdown: Dict[int, float] = {}
+
+        self._origin = time.perf_counter_ns()
+
+        # 配置分析器（tracemalloc 模式才會設定）
+        self.allocation_tracker = None
+
+    def set_enabled(self, enabled: bool):
+        """
+        開啟或關閉記錄\n
+        \n
+        參數:\n
+        enabled (bool): 是否記錄\n
+        """
+        self.enabled = enabled
+        self._stack.clear()
+
+    def _get_name_id(self, name: str) -> int:
+        """
+        取得區段名稱的編號，第一次出現時登記\n
+        \n
+        參數:\n
+        name (str): 區段名稱\n
+        \n
+        回傳:\n
+        int: 名稱編號\n
+        """
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(name)
+            self._name_ids[name] = name_id
+        return name_id
+
+    def span(self, name: str, detail: str = None):
+        """
+        建立一個量測區段，用 with 包住要量測的程式碼\n
+        \n
+        參數:\n
+        name (str): 區段名稱，例如 "player.update"\n
+        detail (str): 額外說明，例如敵人類別名稱（匯出時放在 args）\n
+        \n
+        回傳:\n
+        停用時回傳空區段，啟用時回傳分析器本身\n
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        if self.allocation_tracker and len(self._stack) == GRAPH_DEPTH:
+            self.allocation_tracker.begin_span()
+        self._stack.append(
+            (
+                self._get_name_id(name),
+                self._get_name_id(detail) if detail else -1,
+                time.perf_counter_ns(),
+            )
+        )
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter_ns()
+        if not self._stack:
+            return False
+
+        name_id, detail_id, start = self._stack.pop()
+        depth = len(self._stack)
+        duration = end - start
+
+        # 寫入環形緩衝區，滿了就覆蓋最舊的資料
+        index = self._write_index
+        self._span_names[index] = name_id
+        self._span_details[index] = detail_id
+        self._span_depths[index] = min(depth, 127)
+        self._span_frames[index] = self.frame_index
+        self._span_starts[index] = start - self._origin
+        self._span_durations[index] = duration
+        self._write_index = (index + 1) % self.capacity
+        if self._span_count < self.capacity:
+            self._span_count += 1
+
+        # 疊圖只統計指定層級，避免巢狀區段重複計算
+        if depth == GRAPH_DEPTH:
+            breakdown = self._current_breakdown
+            breakdown[name_id] = breakdown.get(name_id, 0.0) + duration / 1_000_000
+            if self.allocation_tracker:
+                self.allocation_tracker.end_span(name_id)
+        return False
+
+    def begin_frame(self):
+        """
+        開始新的一幀（每次主迴圈開頭呼叫）\n
+        """
+        if not self.enabled:
+            return
+        self._frame_start = time.perf_counter_ns()
+        self._current_breakdown = {}
+
+    def end_frame(self):
+        """
+        結束這一幀，把彙整結果放進疊圖歷史\n
+        """
+        if not self.enabled:
+            return
+        slot = self.frame_index % self.frame_history
+        self.frame_breakdowns[slot] = self._current_breakdown
+        self.frame_totals[slot] = (time.perf_counter_ns() - self._frame_start) / 1_000_000
+        self.frame_index += 1
+        if self.allocation_tracker:
+            self.allocation_tracker.end_frame()
+
+    def get_recent_frames(self) -> List[Dict[int, float]]:
+        """
+        取得最近幾幀的彙整資料（由舊到新）\n
+        \n
+        回傳:\n
+        List[Dict[int, float]]: 每幀各區段編號對應的毫秒數\n
+        """
+        count = min(self.frame_index, self.frame_history)
+        start = self.frame_index - count
+        return [
+            self.frame_breakdowns[(start + offset) % self.frame_history]
+            for offset in range(count)
+        ]
+
+    def get_average_breakdown(self) -> List[tuple]:
+        """
+        計算最近幾幀各區段的平均耗時\n
+        \n
+        回傳:\n
+        List[tuple]: (區段名稱, 名稱編號, 平均毫秒)，由大到小排序\n
+        """
+        frames = self.get_recent_frames()
+        if not frames:
+            return []
+        totals = {}
+        for breakdown in frames:
+            for name_id, duration in breakdown.items():
+                totals[name_id] = totals.get(name_id, 0.0) + duration
+        averages = [
+            (self.names[name_id], name_id, total / len(frames))
+            for name_id, total in totals.items()
+        ]
+        averages.sort(key=lambda item: item[2], reverse=True)
+        return averages
+
+    def get_color(self, name_id: int) -> tuple:
+        """
+        取得區段在疊圖中的顏色\n
+        \n
+        參數:\n
+        name_id (int): 名稱編號\n
+        \n
+        回傳:\n
+        tuple: RGB 顏色\n
+        """
+        return GRAPH_COLORS[name_id % len(GRAPH_COLORS)]
+
+    def export_chrome_trace(self, path: str) -> int:
+        """
+        把環形緩衝區內的區段匯出成 Chrome trace-event JSON\n
+        \n
+        參數:\n
+        path (str): 輸出檔案路徑\n
+        \n
+        回傳:\n
+        int: 匯出的區段數量\n
+        """
+        events = []
+        oldest = (self._write_index - self._span_count) % self.capacity
+        for offset in range(self._span_count):
+            index = (oldest + offset) % self.capacity
+            event = {
+                "name": self.names[self._span_names[index]],
+                "cat": "frame",
+                "ph": "X",
+                "ts": self._span_starts[index] / 1000,
+                "dur": self._span_durations[index] / 1000,
+                "pid": 1,
+                "tid": 1,
+                "args": {"frame": self._span_frames[index]},
+            }
+            detail_id = self._span_details[index]
+            if detail_id >= 0:
+                event["args"]["detail"] = self.names[detail_id]
+            events.append(event)
+
+        # Chrome 依開始時間排序顯示，同時間時外層要排前面
+        events.sort(key=lambda event: (event["ts"], -event["dur"]))
+
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump(
+                {"traceEvents": events, "displayTimeUnit": "ms"},
+                trace_file,
+                ensure_ascii=False,
+            )
+        return len(events)
+
+
+# 全遊戲共用的分析器，各模組直接 import 使用
+FRAME_PROFILER = FrameProfiler()
@@ -0,0 +1,285 @@
+######################載入套件######################
+import gc
+import os
+import time
+import threading
+import tracemalloc
+from array import array
+from typing import Dict, List, Optional
+
+import psutil
+
+######################記憶體分析設定######################
+RSS_SAMPLE_INTERVAL = 0.25  # 背景執行緒取樣 RSS 的間隔（秒）
+RSS_HISTORY = 240  # 保留的 RSS 樣本數（約 60 秒）
+TRACEBACK_DEPTH = 1  # tracemalloc 每筆配置保留的呼叫堆疊深度
+SNAPSHOT_INTERVAL = 120  # 每隔幾幀比較一次 tracemalloc 快照，找出配置熱點
+ALLOCATION_HISTORY = 120  # 各子系統每幀配置量保留的幀數
+TOP_SITE_COUNT = 5  # 保留的配置熱點數量
+
+
+######################RSS 背景取樣######################
+class RssSampler:
+    """
+    背景執行緒 RSS 取樣器\n
+    \n
+    psutil.Process.memory_info() 是系統呼叫，每幀叫一次會吃掉主迴圈的時間，\n
+    改由背景執行緒固定間隔取樣，寫進固定大小的環形陣列，主迴圈只讀最新值\n
+    \n
+    屬性:\n
+    interval (float): 取樣間隔（秒）\n
+    samples (array): RSS 樣本（MB）的環形陣列\n
+    sample_count (int): 累計取樣次數\n
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL, capacity: int = RSS_HISTORY):
+        """
+        初始化取樣器\n
+        \n
+        參數:\n
+        interval (float): 取樣間隔（秒）\n
+        capacity (int): 保留的樣本數\n
+        """
+        self.interval = interval
+        self.capacity = capacity
+        self.samples = array("d", [0.0]) * capacity
+        self.sample_count = 0
+
+        self._process = psutil.Process(os.getpid())
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # 先取一個樣本，讓畫面一開始就有數值
+        self._take_sample()
+
+    def start(self):
+        """
+        啟動背景取樣執行緒\n
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="rss-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        停止背景取樣執行緒\n
+        """
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        """
+        背景執行緒主迴圈\n
+        """
+        while not self._stop_event.wait(self.interval):
+            self._take_sample()
+
+    def _take_sample(self):
+        """
+        取一個 RSS 樣本，寫進環形陣列\n
+        \n
+        只有這個執行緒會寫入，先寫資料再遞增計數，讀取端不需要加鎖\n
+        """
+        try:
+            rss_mb = self._process.memory_info().rss / 1024 / 1024
+        except psutil.Error:
+            return
+        self.samples[self.sample_count % self.capacity] = rss_mb
+        self.sample_count += 1
+
+    def latest(self) -> float:
+        """
+        取得最新的 RSS（MB）\n
+        \n
+        回傳:\n
+        float: 最新樣本\n
+        """
+        if self.sample_count == 0:
+            return 0.0
+        return self.samples[(self.sample_count - 1) % self.capacity]
+
+    def get_samples(self) -> List[float]:
+        """
+        取得保留中的樣本（由舊到新）\n
+        \n
+        回傳:\n
+        List[float]: RSS 樣本（MB）\n
+        """
+        count = min(self.sample_count, self.capacity)
+        start = self.sample_count - count
+        return [self.samples[(start + offset) % self.capacity] for offset in range(count)]
+
+
+######################配置分析######################
+class AllocationTracker:
+    """
+    tracemalloc 配置分析器（需要時才開啟）\n
+    \n
+    搭配 FrameProfiler 的子系統區段使用：\n
+    1. 每個子系統區段開始時重設 tracemalloc 峰值，結束時用峰值差算出這段期間的暫時配置量\n
+    2. 每隔 SNAPSHOT_INTERVAL 幀比較快照，列出記憶體成長最多的程式行\n
+    3. 用 gc.callbacks 量測垃圾回收次數和暫停時間\n
+    \n
+    注意: pygame.Surface 的像素記憶體由 SDL 配置，tracemalloc 看不到，\n
+    這裡量到的是 Python 物件本身（Surface/Rect 包裝物件、list、dict、tuple 等）\n
+    \n
+    屬性:\n
+    active (bool): 是否正在追蹤\n
+    top_sites (List): 最近一次比較找到的配置熱點\n
+    gc_collections (List[int]): 各世代的回收次數\n
+    gc_pause_ms (float): 累計 GC 暫停時間（毫秒）\n
+    """
+
+    def __init__(self):
+        """
+        初始化配置分析器\n
+        """
+        self.active = False
+        self.started_tracemalloc = False
+
+        # 子系統區段的峰值追蹤堆疊
+        self._span_starts = []
+        self._current_frame: Dict[int, int] = {}
+        self.frame_allocations: List[Optional[Dict[int, int]]] = [None] * ALLOCATION_HISTORY
+        self.frame_count = 0
+
+        # 配置熱點
+        self._previous_snapshot = None
+        self.top_sites: List[tuple] = []
+
+        # 垃圾回收統計
+        self.gc_collections = [0, 0, 0]
+        self.gc_pause_ms = 0.0
+        self.gc_max_pause_ms = 0.0
+        self._gc_start = 0
+
+    def start(self):
+        """
+        開始追蹤配置（會讓遊戲明顯變慢，只在分析時開啟）\n
+        """
+        if self.active:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEBACK_DEPTH)
+            self.started_tracemalloc = True
+        self._previous_snapshot = self._take_snapshot()
+        gc.callbacks.append(self._on_gc)
+        self.active = True
+
+    def stop(self):
+        """
+        停止追蹤配置\n
+        """
+        if not self.active:
+            return
+        self.active = False
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+        self._previous_snapshot = None
+        self._span_starts.clear()
+
+    def _take_snapshot(self):
+        """
+        取得 tracemalloc 快照，排除 tracemalloc 自己和分析工具（整個 performance 套件）的配置\n
+        \n
+        回傳:\n
+        tracemalloc.Snapshot: 過濾後的快照\n
+        """
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, os.path.join(os.path.dirname(__file__), "*")),
+            )
+        )
+
+    def begin_span(self):
+        """
+        子系統區段開始：記錄目前配置量並重設峰值\n
+        """
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self._span_starts.append(current)
+
+    def end_span(self, name_id: int):
+        """
+        子系統區段結束：峰值減去開始時的配置量，就是這段期間最多暫時配置了多少\n
+        \n
+        參數:\n
+        name_id (int): FrameProfiler 的區段名稱編號\n
+        """
+        if not self._span_starts:
+            return
+        _, peak = tracemalloc.get_traced_memory()
+        allocated = max(0, peak - self._span_starts.pop())
+        self._current_frame[name_id] = self._current_frame.get(name_id, 0) + allocated
+
+    def end_frame(self):
+        """
+        結束一幀：保存各子系統配置量，定期比較快照\n
+        """
+        self.frame_allocations[self.frame_count % ALLOCATION_HISTORY] = self._current_frame
+        self._current_frame = {}
+        self.frame_count += 1
+
+        if self.frame_count % SNAPSHOT_INTERVAL == 0:
+            self._update_top_sites()
+
+    def _update_top_sites(self):
+        """
+        比較前後兩次快照，找出記憶體成長最多的程式行\n
+        """
+        snapshot = self._take_snapshot()
+        if self._previous_snapshot is not None:
+            differences = snapshot.compare_to(self._previous_snapshot, "lineno")
+            differences.sort(key=lambda stat: stat.size_diff, reverse=True)
+            self.top_sites = [
+                (
+                    f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                    stat.size_diff,
+                    stat.count_diff,
+                )
+                for stat in differences[:TOP_SITE_COUNT]
+                if stat.size_diff > 0
+            ]
+        self._previous_snapshot = snapshot
+
+    def _on_gc(self, phase: str, info: Dict):
+        """
+        gc.callbacks 回呼：量測每次垃圾回收的暫停時間\n
+        \n
+        參數:\n
+        phase (str): "start" 或 "stop"\n
+        info (Dict): 包含回收的世代\n
+        """
+        if phase == "start":
+            self._gc_start = time.perf_counter_ns()
+            return
+        pause_ms = (time.perf_counter_ns() - self._gc_start) / 1_000_000
+        self.gc_collections[info["generation"]] += 1
+        self.gc_pause_ms += pause_ms
+        self.gc_max_pause_ms = max(self.gc_max_pause_ms, pause_ms)
+
+    def get_average_allocations(self) -> Dict[int, float]:
+        """
+        計算最近幾幀各子系統的平均配置量\n
+        \n
+        回傳:\n
+        Dict[int, float]: 區段名稱編號對應每幀平均配置的 KB\n
+        """
+        frames = [frame for frame in self.frame_allocations if frame is not None]
+        if not frames:
+            return {}
+        totals = {}
+        for frame in frames:
+            for name_id, allocated in frame.items():
+                totals[name_id] = totals.get(name_id, 0) + allocated
+        return {name_id: total / len(frames) / 1024 for name_id, total in totals.items()}
@@ -0,0 +1,601 @@
+######################載入套件######################
+import math
+from typing import List, Tuple
+
+import numpy as np
+import pygame
+
+from src.effects.particle_system import PARTICLE_RNG, ParticleEmitter
+from src.levels.swept_collision import sweep_rects
+
+######################投射物引擎設定######################
+PROJECTILE_POOL_CAPACITY = 64  # 一開始配置的格子數量，不夠時加倍
+PROJECTILE_TRAIL_INTERVAL = 3  # 每幾幀產生一個軌跡粒子
+PROJECTILE_TRAIL_LIFE = 15  # 軌跡粒子存活幀數
+PROJECTILE_TRAIL_FADE = 17  # 軌跡粒子每幀減少的透明度
+PROJECTILE_TRAIL_SHRINK = 0.1  # 軌跡粒子每幀縮小的尺寸
+PROJECTILE_TRAIL_RAMP = (0.7, 0.3)  # 軌跡顏色依剩餘壽命比例切換的門檻
+PROJECTILE_BURST_PARTICLES = 8  # 撞到平台或敵人時噴出的粒子數量
+
+
+######################投射物種類######################
+class ProjectileKind:
+    """
+    投射物種類（火球、冰球等）的共用設定和效果掛勾\n
+    \n
+    投射物本身的位置、速度、存活時間都存在 ProjectilePool 的陣列裡，\n
+    種類物件只負責「這一類投射物」共用的部分：\n
+    1. 尺寸、速度、傷害比例、存活時間\n
+    2. 擊中敵人時的狀態效果（子類別覆寫 apply_effect）\n
+    3. 外觀（軌跡和爆炸粒子的顏色、核心和光暈的繪製）\n
+    \n
+    屬性:\n
+    name (str): 種類名稱\n
+    kind_id (int): 在投射物引擎中的編號（註冊時設定）\n
+    width, height (int): 碰撞尺寸\n
+    radius (int): 圓形碰撞半徑\n
+    speed (float): 飛行速度\n
+    damage_ratio (float): 傷害佔玩家攻擊力的比例\n
+    lifetime (int): 存活幀數（防止永遠飛行）\n
+    trail_palette (Tuple): 軌跡粒子顏色，依剩餘壽命由多到少\n
+    """
+
+    __slots__ = ("kind_id",)
+
+    name = "projectile"
+    width = 12
+    height = 12
+    radius = 6
+    speed = 8.0
+    damage_ratio = 1.0
+    lifetime = 600  # 10秒後自動消失
+    trail_palette = ((255, 255, 255),)
+
+    def __init__(self):
+        """
+        初始化投射物種類（kind_id 在註冊到投射物引擎時設定）\n
+        """
+        self.kind_id = -1
+
+    def get_damage(self, player_attack: int) -> int:
+        """
+        計算投射物傷害\n
+        \n
+        參數:\n
+        player_attack (int): 玩家攻擊力\n
+        \n
+        回傳:\n
+        int: 擊中敵人時的直接傷害\n
+        """
+        return int(player_attack * self.damage_ratio)
+
+    def on_hit(self, enemy, damage: int):
+        """
+        投射物擊中敵人：造成直接傷害並施加狀態效果\n
+        \n
+        參數:\n
+        enemy: 被擊中的敵人\n
+        damage (int): 直接傷害\n
+        """
+        enemy.take_damage(damage)
+        self.apply_effect(enemy)
+
+    def apply_effect(self, enemy):
+        """
+        對敵人施加這類投射物的狀態效果（子類別覆寫）\n
+        \n
+        參數:\n
+        enemy: 被擊中的敵人\n
+        """
+
+    def create_emitter(self) -> ParticleEmitter:
+        """
+        建立這類投射物的軌跡和爆炸粒子發射器\n
+        \n
+        回傳:\n
+        ParticleEmitter: 粒子發射器\n
+        """
+        return ParticleEmitter(
+            self.trail_palette,
+            decay=1,
+            fade=PROJECTILE_TRAIL_FADE,
+            shrink=PROJECTILE_TRAIL_SHRINK,
+            ramp=PROJECTILE_TRAIL_RAMP,
+        )
+
+    def render_body(self, screen: pygame.Surface, screen_x: int, screen_y: int, animation_frame: int):
+        """
+        繪製投射物主體（子類別覆寫）\n
+        \n
+        參數:\n
+        screen (pygame.Surface): 螢幕表面\n
+        screen_x (int): 螢幕 X 座標\n
+        screen_y (int): 螢幕 Y 座標\n
+        animation_frame (int): 動畫幀數\n
+        """
+
+
+######################投射物引擎######################
+class ProjectilePool:
+    """
+    投射物引擎（預先配置格子 + Structure of Arrays）\n
+    \n
+    所有種類的投射物共用同一組 NumPy 陣列（每個屬性一個陣列、每個投射物一格），\n
+    發射時從空格清單拿一格、消失時還回去，不會每發都建立新物件；\n
+    格子不夠時容量加倍，數千發同時在場上也只是陣列變長。\n
+    \n
+    每幀一次算完所有投射物的：\n
+    1. 移動、動畫幀數、軌跡粒子（每個種類一個 ParticleEmitter）\n
+    2. 飛出畫面、撞到平台（一次比對所有投射物和平台）、存活時間用完\n
+    3. 和敵人的距離，只有真的擊中的投射物才逐一交給種類的 on_hit() 處理\n
+    \n
+    擊中判定的規則和順序與原本逐一更新相同：同一種類依發射先後、種類依註冊先後處理，\n
+    每發投射物擊中「範圍內、還活著、距離最近」的敵人後消失\n
+    \n
+    軌跡和爆炸粒子放在粒子系統裡，投射物消失後仍會自然淡出；\n
+    粒子的隨機偏移只影響畫面，使用 PARTICLE_RNG，\n
+    場上投射物的數量不會改變遊戲邏輯使用的全域 random 序列\n
+    \n
+    屬性:\n
+    kinds (List[ProjectileKind]): 已註冊的投射物種類\n
+    emitters (List[ParticleEmitter]): 每個種類的軌跡和爆炸粒子\n
+    capacity (int): 目前配置的格子數量\n
+    active (np.ndarray): 每一格是否有投射物\n
+    kind (np.ndarray): 每一格的種類編號\n
+    x, y (np.ndarray): 位置\n
+    velocity_x, velocity_y (np.ndarray): 飛行速度\n
+    lifetime (np.ndarray): 剩餘存活幀數\n
+    damage (np.ndarray): 擊中時的直接傷害\n
+    """
+
+    def __init__(self, capacity: int = PROJECTILE_POOL_CAPACITY):
+        """
+        建立投射物引擎\n
+        \n
+        參數:\n
+        capacity (int): 一開始配置的格子數量\n
+        """
+        self.kinds: List[ProjectileKind] = []
+        self.emitters: List[ParticleEmitter] = []
+        self._kind_width = np.zeros(0, dtype=np.int64)
+        self._kind_height = np.zeros(0, dtype=np.int64)
+        self._kind_radius = np.zeros(0, dtype=np.int64)
+
+        self.capacity = 0
+        self.active = np.zeros(0, dtype=bool)
+        self.kind = np.zeros(0, dtype=np.int64)
+        self.spawn_order = np.zeros(0, dtype=np.int64)
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.previous_x = np.zeros(0)
+        self.previous_y = np.zeros(0)
+        self.velocity_x = np.zeros(0)
+        self.velocity_y = np.zeros(0)
+        self.lifetime = np.zeros(0, dtype=np.int64)
+        self.animation_frame = np.zeros(0, dtype=np.int64)
+        self.damage = np.zeros(0, dtype=np.int64)
+
+        self._free_slots: List[int] = []
+        self._next_spawn_order = 0
+        self._platform_index = None
+        self._grow(capacity)
+
+    ######################種類與發射######################
+    def register_kind(self, kind: ProjectileKind) -> ProjectileKind:
+        """
+        註冊投射物種類\n
+        \n
+        參數:\n
+        kind (ProjectileKind): 投射物種類\n
+        \n
+        回傳:\n
+        ProjectileKind: 同一個種類物件（已設定 kind_id）\n
+        """
+        kind.kind_id = len(self.kinds)
+        self.kinds.append(kind)
+        self.emitters.append(kind.create_emitter())
+        self._kind_width = np.append(self._kind_width, kind.width)
+        self._kind_height = np.append(self._kind_height, kind.height)
+        self._kind_radius = np.append(self._kind_radius, kind.radius)
+        return kind
+
+    def spawn(self, kind: ProjectileKind, start_x: float, start_y: float, direction: int, player_attack: int = 25) -> int:
+        """
+        發射投射物\n
+        \n
+        參數:\n
+        kind (ProjectileKind): 投射物種類（必須已註冊）\n
+        start_x (float): 發射起始 X 座標\n
+        start_y (float): 發射起始 Y 座標\n
+        direction (int): 發射方向（1: 右, -1: 左）\n
+        player_attack (int): 玩家攻擊力，用於計算傷害\n
+        \n
+        回傳:\n
+        int: 投射物使用的格子編號\n
+        """
+        if not self._free_slots:
+            self._grow(self.capacity * 2)
+        slot = self._free_slots.pop()
+
+        self.active[slot] = True
+        self.kind[slot] = kind.kind_id
+        self.spawn_order[slot] = self._next_spawn_order
+        self._next_spawn_order += 1
+        self.x[slot] = self.previous_x[slot] = float(start_x)
+        self.y[slot] = self.previous_y[slot] = float(start_y)
+        self.velocity_x[slot] = direction * kind.speed
+        self.velocity_y[slot] = 0.0  # 水平飛行，無垂直分量
+        self.lifetime[slot] = kind.lifetime
+        self.animation_frame[slot] = 0
+        self.damage[slot] = kind.get_damage(player_attack)
+        return slot
+
+    def clear(self, kind: ProjectileKind = None):
+        """
+        清除投射物（關卡切換或遊戲重置用）\n
+        \n
+        參數:\n
+        kind (ProjectileKind): 只清除這個種類，None 表示全部\n
+        """
+        mask = self.active if kind is None else self.active & (self.kind == kind.kind_id)
+        self._release(np.flatnonzero(mask))
+        for emitter in self.emitters if kind is None else [self.emitters[kind.kind_id]]:
+            emitter.clear()
+
+    def count(self, kind: ProjectileKind = None) -> int:
+        """
+        取得場上的投射物數量\n
+        \n
+        參數:\n
+        kind (ProjectileKind): 只計算這個種類，None 表示全部\n
+        \n
+        回傳:\n
+        int: 投射物數量\n
+        """
+        if kind is None:
+            return int(np.count_nonzero(self.active))
+        return int(np.count_nonzero(self.active & (self.kind == kind.kind_id)))
+
+    def __len__(self) -> int:
+        return self.count()
+
+    ######################每幀更新######################
+    def update(self, spatial_index, screen_width: int = 800):
+        """
+        更新所有投射物\n
+        \n
+        處理順序：移動 → 軌跡 → 飛出畫面 → 撞平台（連續碰撞，爆炸）→ 存活時間 → 擊中敵人（爆炸）\n
+        \n
+        參數:\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞世界（平台和敵人）\n
+        screen_width (int): 螢幕寬度，用於邊界檢測\n
+        """
+        slots = np.flatnonzero(self.active)
+        # 移動前的碰撞矩形位置（和 pygame.Rect 一樣捨去小數），撞平台用連續碰撞檢查整段移動
+        start_left = np.trunc(self.x[slots]).astype(np.int64)
+        start_top = np.trunc(self.y[slots]).astype(np.int64)
+        self.x[slots] += self.velocity_x[slots]
+        self.y[slots] += self.velocity_y[slots]
+        self.animation_frame[slots] += 1
+        self._emit_trails(slots)
+
+        # 投射物消失後粒子仍會淡出，所以沒有投射物時也要更新
+        for emitter in self.emitters:
+            emitter.update()
+        if len(slots) == 0:
+            return
+
+        # 飛出畫面直接消失
+        width = self._kind_width[self.kind[slots]]
+        x = self.x[slots]
+        outside = (x < -width) | (x > screen_width + width)
+        self._release(slots[outside])
+        slots = slots[~outside]
+        start_left = start_left[~outside]
+        start_top = start_top[~outside]
+
+        # 撞到平台消失，停在最先碰到平台的位置爆炸
+        hit_platform = self._sweep_platforms(slots, start_left, start_top, spatial_index)
+        self._emit_bursts(slots[hit_platform])
+        self._release(slots[hit_platform])
+        slots = slots[~hit_platform]
+
+        # 存活時間用完消失
+        self.lifetime[slots] -= 1
+        expired = self.lifetime[slots] <= 0
+        self._release(slots[expired])
+        slots = slots[~expired]
+
+        if len(slots) > 0:
+            self._resolve_enemy_hits(slots, spatial_index)
+
+    def _emit_trails(self, slots: np.ndarray):
+        """
+        每 PROJECTILE_TRAIL_INTERVAL 幀在投射物後方產生一個軌跡粒子\n
+        \n
+        參數:\n
+        slots (np.ndarray): 場上的格子\n
+        """
+        spawning = slots[self.animation_frame[slots] % PROJECTILE_TRAIL_INTERVAL == 0]
+        for kind in self.kinds:
+            group = spawning[self.kind[spawning] == kind.kind_id]
+            if len(group) == 0:
+                continue
+            self.emitters[kind.kind_id].emit(
+                self.x[group] + kind.width // 2 - self.velocity_x[group] * 0.5,
+                self.y[group] + kind.height // 2 + PARTICLE_RNG.integers(-3, 4, len(group)),
+                life=PROJECTILE_TRAIL_LIFE,
+                size=PARTICLE_RNG.integers(2, 5, len(group)),
+            )
+
+    def _emit_bursts(self, slots: np.ndarray):
+        """
+        投射物撞到平台或敵人時，從中心往四周噴出爆炸（碎裂）粒子\n
+        \n
+        參數:\n
+        slots (np.ndarray): 撞到東西的格子\n
+        """
+        for kind in self.kinds:
+            group = slots[self.kind[slots] == kind.kind_id]
+            if len(group) == 0:
+                continue
+            amount = len(group) * PROJECTILE_BURST_PARTICLES
+            angle = PARTICLE_RNG.uniform(0, 2 * math.pi, amount)
+            speed = PARTICLE_RNG.uniform(2, 5, amount)
+            self.emitters[kind.kind_id].emit(
+                np.repeat(self.x[group] + kind.width // 2, PROJECTILE_BURST_PARTICLES),
+                np.repeat(self.y[group] + kind.height // 2, PROJECTILE_BURST_PARTICLES),
+                velocity_x=np.cos(angle) * speed,
+                velocity_y=np.sin(angle) * speed,
+                life=PARTICLE_RNG.integers(20, 41, amount),
+                size=PARTICLE_RNG.integers(3, 7, amount),
+            )
+
+    def _load_platforms(self, spatial_index):
+        """
+        準備平台的碰撞矩形陣列（一般平台只建一次，移動平台每幀更新位置）\n
+        \n
+        參數:\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞世界\n
+        """
+        if self._platform_index is not spatial_index:
+            self._platform_index = spatial_index
+            rects = [spatial_index.get_rect(platform) for platform in spatial_index.all_platforms]
+            self._platform_left = np.array([rect.x for rect in rects], dtype=np.int64)
+            self._platform_top = np.array([rect.y for rect in rects], dtype=np.int64)
+            self._platform_right = np.array([rect.right for rect in rects], dtype=np.int64)
+            self._platform_bottom = np.array([rect.bottom for rect in rects], dtype=np.int64)
+            # 移動平台接在一般平台後面
+            first_moving = len(rects) - len(spatial_index.moving_platforms)
+            self._moving_rows = range(first_moving, len(rects))
+
+        for row, platform in zip(self._moving_rows, spatial_index.moving_platforms):
+            rect = spatial_index.get_rect(platform)
+            self._platform_left[row] = rect.x
+            self._platform_top[row] = rect.y
+            self._platform_right[row] = rect.right
+            self._platform_bottom[row] = rect.bottom
+
+    def _sweep_platforms(
+        self, slots: np.ndarray, start_left: np.ndarray, start_top: np.ndarray, spatial_index
+    ) -> np.ndarray:
+        """
+        一次檢查所有投射物這一幀的整段移動有沒有碰到平台\n
+        \n
+        投射物的碰撞矩形和 pygame.Rect(x, y, 寬, 高) 相同（座標捨去小數），\n
+        用連續碰撞（swept AABB）從移動前的位置掃到現在的位置，速度再快也不會穿過薄平台；\n
+        出發時就和平台重疊也算撞到。先只留下高度範圍和移動範圍有交集的平台，\n
+        再做 (投射物, 平台) 的碰撞時間表，撞到的投射物移回最先碰到平台的位置\n
+        \n
+        參數:\n
+        slots (np.ndarray): 要檢查的格子\n
+        start_left (np.ndarray): 各格子移動前碰撞矩形的左緣\n
+        start_top (np.ndarray): 各格子移動前碰撞矩形的上緣\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞世界\n
+        \n
+        回傳:\n
+        np.ndarray: 每個格子是否撞到平台\n
+        """
+        if len(slots) == 0 or not spatial_index.all_platforms:
+            return np.zeros(len(slots), dtype=bool)
+        self._load_platforms(spatial_index)
+
+        kinds = self.kind[slots]
+        width = self._kind_width[kinds]
+        height = self._kind_height[kinds]
+        delta_x = np.trunc(self.x[slots]).astype(np.int64) - start_left
+        delta_y = np.trunc(self.y[slots]).astype(np.int64) - start_top
+
+        swept_top = np.minimum(start_top, start_top + delta_y)
+        swept_bottom = np.maximum(start_top, start_top + delta_y) + height
+        band = (self._platform_top < swept_bottom.max()) & (self._platform_bottom > swept_top.min())
+        if not band.any():
+            return np.zeros(len(slots), dtype=bool)
+        contact_time, _, _ = sweep_rects(
+            start_left[:, None],
+            start_top[:, None],
+            width[:, None],
+            height[:, None],
+            delta_x[:, None],
+            delta_y[:, None],
+            self._platform_left[band][None, :],
+            self._platform_top[band][None, :],
+            self._platform_right[band][None, :],
+            self._platform_bottom[band][None, :],
+            tolerance=np.inf,
+        )
+        earliest = contact_time.min(axis=1)
+        hit = np.isfinite(earliest)
+
+        hit_slots = slots[hit]
+        self.x[hit_slots] = start_left[hit] + delta_x[hit] * earliest[hit]
+        self.y[hit_slots] = start_top[hit] + delta_y[hit] * earliest[hit]
+        return hit
+
+    def _resolve_enemy_hits(self, slots: np.ndarray, spatial_index):
+        """
+        一次算出所有投射物和敵人的距離，只逐一處理真的擊中的投射物\n
+        \n
+        候選敵人和原本的查詢相同：登記範圍和投射物中心附近 (半徑 + 1) 的方塊重疊、\n
+        還活著、中心距離不超過 半徑 + 敵人短邊的一半；\n
+        多個候選時擊中距離最近的（距離相同時依敵人順序）\n
+        \n
+        參數:\n
+        slots (np.ndarray): 還在場上的格子\n
+        spatial_index (LevelSpatialIndex): 關卡碰撞世界\n
+        """
+        entries = spatial_index.enemies.get_entries()
+        if not entries:
+            return
+
+        enemies = [entry[0] for entry in entries]
+        bounds = np.array([entry[1:] for entry in entries], dtype=np.float64)
+        rects = [enemy.get_collision_rect() for enemy in enemies]
+        enemy_center_x = np.array([rect.x + rect.width // 2 for rect in rects], dtype=np.int64)
+        enemy_center_y = np.array([rect.y + rect.height // 2 for rect in rects], dtype=np.int64)
+        enemy_half = np.array([min(rect.width, rect.height) // 2 for rect in rects], dtype=np.int64)
+        alive = np.array([not enemy.is_dead for enemy in enemies], dtype=bool)
+
+        kinds = self.kind[slots]
+        radius = self._kind_radius[kinds]
+        center_x = self.x[slots] + self._kind_width[kinds] // 2
+        center_y = self.y[slots] + self._kind_height[kinds] // 2
+        reach = (radius + 1)[:, None]
+
+        nearby = (
+            (bounds[None, :, 0] <= center_x[:, None] + reach)
+            & (bounds[None, :, 2] >= center_x[:, None] - reach)
+            & (bounds[None, :, 1] <= center_y[:, None] + reach)
+            & (bounds[None, :, 3] >= center_y[:, None] - reach)
+        )
+        distance = np.sqrt(
+            (enemy_center_x[None, :] - center_x[:, None]) ** 2
+            + (enemy_center_y[None, :] - center_y[:, None]) ** 2
+        )
+        hits = nearby & alive[None, :] & (distance <= radius[:, None] + enemy_half[None, :])
+
+        rows = np.flatnonzero(hits.any(axis=1))
+        if len(rows) == 0:
+            return
+
+        # 依種類註冊順序、發射先後處理，前一發打死的敵人後面的投射物不會再打到
+        rows = rows[np.lexsort((self.spawn_order[slots[rows]], kinds[rows]))]
+        hit_slots = []
+        for row in rows:
+            slot = slots[row]
+            columns = [column for column in np.flatnonzero(hits[row]) if not enemies[column].is_dead]
+            if not columns:
+                continue
+            target = min(columns, key=lambda column: distance[row, column])
+            self.kinds[kinds[row]].on_hit(enemies[target], int(self.damage[slot]))
+            hit_slots.append(slot)
+
+        hit_slots = np.array(hit_slots, dtype=np.int64)
+        self._emit_bursts(hit_slots)
+        self._release(hit_slots)
+
+    def _release(self, slots: np.ndarray):
+        """
+        投射物消失，格子還回空格清單\n
+        \n
+        參數:\n
+        slots (np.ndarray): 要釋放的格子\n
+        """
+        if len(slots) == 0:
+            return
+        self.active[slots] = False
+        self._free_slots.extend(int(slot) for slot in slots)
+
+    def _grow(self, capacity: int):
+        """
+        擴充陣列容量\n
+        \n
+        參數:\n
+        capacity (int): 新的容量\n
+        """
+        capacity = max(capacity, 1)
+        for name in (
+            "active", "kind", "spawn_order", "x", "y", "previous_x", "previous_y",
+            "velocity_x", "velocity_y", "lifetime", "animation_frame", "damage",
+        ):
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[: self.capacity] = array
+            setattr(self, name, grown)
+        # 反向放入，pop() 會先拿到編號小的格子
+        self._free_slots = list(range(capacity - 1, self.capacity - 1, -1)) + self._free_slots
+        self.capacity = capacity
+
+    ######################繪製插值######################
+    def capture_previous_positions(self):
+        """
+        記錄模擬步開始前的位置，供繪製時在前後兩步之間插值\n
+        """
+        self.previous_x[:] = self.x
+        self.previous_y[:] = self.y
+
+    def apply_interpolation(self, alpha: float, snap_distance: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        把位置暫時移到插值位置\n
+        \n
+        參數:\n
+        alpha (float): 插值比例，0 是上一步，1 是目前這一步\n
+        snap_distance (float): 位移超過這個距離視為瞬移，不做插值\n
+        \n
+        回傳:\n
+        Tuple[np.ndarray, np.ndarray]: 原本的位置，繪製完交給 restore_interpolation() 還原\n
+        """
+        saved = (self.x.copy(), self.y.copy())
+        delta_x = self.x - self.previous_x
+        delta_y = self.y - self.previous_y
+        smooth = self.active & (np.abs(delta_x) <= snap_distance) & (np.abs(delta_y) <= snap_distance)
+        self.x[smooth] = self.previous_x[smooth] + delta_x[smooth] * alpha
+        self.y[smooth] = self.previous_y[smooth] + delta_y[smooth] * alpha
+        return saved
+
+    def restore_interpolation(self, saved: Tuple[np.ndarray, np.ndarray]):
+        """
+        還原插值前的位置\n
+        \n
+        參數:\n
+        saved (Tuple[np.ndarray, np.ndarray]): apply_interpolation() 回傳的原始位置\n
+        """
+        self.x[:], self.y[:] = saved
+
+    ######################繪製######################
+    def render_all(self, screen: pygame.Surface, camera_y: float):
+        """
+        繪製所有粒子和畫面範圍內的投射物（種類依註冊順序、同種類依發射先後）\n
+        \n
+        參數:\n
+        screen (pygame.Surface): 螢幕表面\n
+        camera_y (float): 攝影機 Y 軸偏移\n
+        """
+        # 先繪製軌跡粒子（在投射物後面）
+        for emitter in self.emitters:
+            emitter.render(screen, camera_y)
+
+        screen_width, screen_height = screen.get_size()
+        slots = np.flatnonzero(self.active)
+        if len(slots) == 0:
+            return
+
+        kinds = self.kind[slots]
+        width = self._kind_width[kinds]
+        height = self._kind_height[kinds]
+        x = self.x[slots]
+        screen_y = self.y[slots] - camera_y + screen_height // 2
+        visible = (
+            (-width < x) & (x < screen_width + width)
+            & (-height < screen_y) & (screen_y < screen_height + height)
+        )
+        slots = slots[visible]
+        slots = slots[np.lexsort((self.spawn_order[slots], self.kind[slots]))]
+
+        for slot in slots:
+            self.kinds[self.kind[slot]].render_body(
+                screen,
+                int(self.x[slot]),
+                int(self.y[slot] - camera_y + screen_height // 2),
+                int(self.animation_frame[slot]),
+            )
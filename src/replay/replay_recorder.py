@@ -0,0 +1,560 @@
+######################載入套件######################
+import pygame
+import random
+import pickle
+import hashlib
+import json
+import struct
+import zlib
+import io
+import sys
+import weakref
+from array import array
+from typing import Dict, List, Optional
+
+######################重播檔案格式######################
+# 檔案結構（全部為小端序）：
+# [MAGIC 8 bytes]
+# [標頭長度 u32][標頭 JSON]                 種子、角色、難度、幀數、關鍵幀間隔
+# [輸入長度 u32][zlib(每幀按鍵位元遮罩 u16)]
+# [事件長度 u32][zlib(JSON {幀: [按鍵代碼]})]  handle_events 的按鍵按下事件
+# [關鍵幀資料...]                             每個都是 zlib(pickle(完整遊戲狀態))
+# [索引長度 u32][索引 JSON [[幀, 位移, 長度], ...]]
+# [索引位移 u64]                              固定在檔案最後 8 bytes，用來快速找到索引
+REPLAY_MAGIC = b"MCRPLAY1"
+REPLAY_VERSION = 1
+
+# 預設每 600 幀（約 10 秒）存一個完整狀態關鍵幀
+DEFAULT_KEYFRAME_INTERVAL = 600
+
+# Player.handle_input() 會讀取的按鍵，依序對應位元遮罩的每一個位元
+RECORDED_KEYS = [
+    pygame.K_r,
+    pygame.K_a,
+    pygame.K_LEFT,
+    pygame.K_d,
+    pygame.K_RIGHT,
+    pygame.K_w,
+    pygame.K_SPACE,
+    pygame.K_s,
+    pygame.K_DOWN,
+    pygame.K_c,
+    pygame.K_v,
+    pygame.K_1,
+    pygame.K_2,
+    pygame.K_3,
+    pygame.K_4,
+]
+KEY_BITS = {key: 1 << index for index, key in enumerate(RECORDED_KEYS)}
+
+
+######################按鍵狀態######################
+def encode_key_state(keys) -> int:
+    """
+    把按鍵狀態壓成位元遮罩\n
+    \n
+    參數:\n
+    keys: pygame.key.get_pressed() 的結果或 RecordedKeyState\n
+    \n
+    回傳:\n
+    int: 16 位元的按鍵遮罩\n
+    """
+    mask = 0
+    for key, bit in KEY_BITS.items():
+        if keys[key]:
+            mask |= bit
+    return mask
+
+
+class RecordedKeyState:
+    """
+    重播用的按鍵狀態\n
+    \n
+    模擬 pygame.key.get_pressed() 回傳的物件，\n
+    讓 Player.handle_input() 不需要修改就能吃重播資料\n
+    \n
+    屬性:\n
+    mask (int): 按鍵位元遮罩\n
+    """
+
+    def __init__(self, mask: int = 0):
+        """
+        初始化按鍵狀態\n
+        \n
+        參數:\n
+        mask (int): 按鍵位元遮罩\n
+        """
+        self.mask = mask
+
+    def __getitem__(self, key: int) -> bool:
+        """
+        查詢按鍵是否按下\n
+        \n
+        參數:\n
+        key (int): pygame 按鍵代碼\n
+        \n
+        回傳:\n
+        bool: 按鍵是否按下，沒有錄製的按鍵一律回傳 False\n
+        """
+        return bool(self.mask & KEY_BITS.get(key, 0))
+
+
+######################完整遊戲狀態######################
+class _StatePickler(pickle.Pickler):
+    """
+    遊戲狀態序列化器\n
+    \n
+    圖片和音效不能也不需要存進關鍵幀：\n
+    圖片用內容雜湊代替，音效管理器用代號代替，還原時接回目標遊戲的資源\n
+    """
+
+    def __init__(self, file, surface_digest):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.surface_digest = surface_digest
+
+    def persistent_id(self, obj):
+        from src.audio.sound_manager import SoundManager
+
+        if isinstance(obj, pygame.Surface):
+            return ("surface", self.surface_digest(obj))
+        if isinstance(obj, SoundManager):
+            return ("sound_manager",)
+        return None
+
+
+class _StateUnpickler(pickle.Unpickler):
+    """
+    遊戲狀態還原器\n
+    \n
+    把序列化時替換掉的圖片和音效管理器接回目標遊戲的資源\n
+    """
+
+    def __init__(self, file, surfaces: Dict, sound_manager):
+        super().__init__(file)
+        self.surfaces = surfaces
+        self.sound_manager = sound_manager
+
+    def persistent_load(self, pid):
+        if pid[0] == "surface":
+            # 找不到的多半是縮放背景這類衍生快取，設成 None 後繪製時會重建
+            return self.surfaces.get(pid[1])
+        if pid[0] == "sound_manager":
+            return self.sound_manager
+        raise pickle.UnpicklingError(f"未知的資源代號: {pid}")
+
+
+class SurfaceDigestCache:
+    """
+    圖片內容雜湊快取\n
+    \n
+    同一張圖片只算一次雜湊，之後用物件 id 查表，\n
+    讓每個關鍵幀的序列化時間不會被大張背景圖拖慢\n
+    """
+
+    def __init__(self):
+        """
+        初始化雜湊快取\n
+        """
+        self._digests = {}
+
+    def digest(self, surface: pygame.Surface) -> str:
+        """
+        取得圖片的內容雜湊\n
+        \n
+        參數:\n
+        surface (pygame.Surface): 要計算的圖片\n
+        \n
+        回傳:\n
+        str: 尺寸加像素內容的雜湊字串\n
+        """
+        cached = self._digests.get(id(surface))
+        if cached and cached[0]() is surface:
+            return cached[1]
+
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(struct.pack("<II", *surface.get_size()))
+        hasher.update(pygame.image.tobytes(surface, "RGBA"))
+        digest = hasher.hexdigest()
+
+        self._digests[id(surface)] = (weakref.ref(surface), digest)
+        return digest
+
+
+def capture_game_state(game) -> Dict:
+    """
+    取得遊戲的完整模擬狀態\n
+    \n
+    包含玩家、關卡、各管理器、相機和亂數狀態，\n
+    放在同一個字典裡序列化，物件之間的共用參考才會被保留\n
+    \n
+    參數:\n
+    game (MarioClimbingGame): 遊戲主控制器\n
+    \n
+    回傳:\n
+    Dict: 遊戲狀態（仍是活的物件參考，需要馬上序列化）\n
+    """
+    return {
+        "game_state": game.game_state,
+        "camera_y": game.camera_y,
+        "selected_character_index": game.selected_character_index,
+        "selected_difficulty": game.selected_difficulty,
+        "player": game.player,
+        "level_manager": game.level_manager,
+        "equipment_manager": game.equipment_manager,
+        "potion_drop_manager": game.potion_drop_manager,
+        "projectile_pool": game.projectile_pool,
+        "fireball_manager": game.fireball_manager,
+        "iceball_manager": game.iceball_manager,
+        "random_state": random.getstate(),
+    }
+
+
+def serialize_game_state(game, digest_cache: SurfaceDigestCache) -> bytes:
+    """
+    把遊戲狀態序列化並壓縮\n
+    \n
+    參數:\n
+    game (MarioClimbingGame): 遊戲主控制器\n
+    digest_cache (SurfaceDigestCache): 圖片雜湊快取\n
+    \n
+    回傳:\n
+    bytes: 壓縮後的關鍵幀資料\n
+    """
+    buffer = io.BytesIO()
+    _StatePickler(buffer, digest_cache.digest).dump(capture_game_state(game))
+    return zlib.compress(buffer.getvalue())
+
+
+def collect_game_surfaces(game, digest_cache: SurfaceDigestCache) -> Dict:
+    """
+    收集目標遊戲目前持有的所有圖片\n
+    \n
+    走一遍和序列化相同的物件圖，建立「雜湊 → 圖片」對照表\n
+    \n
+    參數:\n
+    game (MarioClimbingGame): 遊戲主控制器\n
+    digest_cache (SurfaceDigestCache): 圖片雜湊快取\n
+    \n
+    回傳:\n
+    Dict: 雜湊到圖片物件的對照表\n
+    """
+    surfaces = {}
+
+    def remember(surface):
+        digest = digest_cache.digest(surface)
+        surfaces[digest] = surface
+        return digest
+
+    _StatePickler(io.BytesIO(), remember).dump(capture_game_state(game))
+    return surfaces
+
+
+def restore_game_state(game, data: bytes, digest_cache: SurfaceDigestCache):
+    """
+    把關鍵幀還原到遊戲上\n
+    \n
+    參數:\n
+    game (MarioClimbingGame): 要還原的遊戲主控制器\n
+    data (bytes): serialize_game_state() 產生的資料\n
+    digest_cache (SurfaceDigestCache): 圖片雜湊快取\n
+    """
+    # 關卡是用到才建立的，先把所有關卡建好，關鍵幀裡任何一關的圖片才找得到
+    game.level_manager.build_all_levels()
+    surfaces = collect_game_surfaces(game, digest_cache)
+    state = _StateUnpickler(
+        io.BytesIO(zlib.decompress(data)), surfaces, game.sound_manager
+    ).load()
+
+    random.setstate(state.pop("random_state"))
+    for name, value in state.items():
+        setattr(game, name, value)
+
+    # 插值用的上一步位置屬於舊物件，直接作廢
+    game.previous_camera_y = game.camera_y
+    game.previous_positions = []
+
+
+######################錄製器######################
+class ReplayRecorder:
+    """
+    輸入錄製器\n
+    \n
+    記錄每一個模擬幀餵給 Player.handle_input() 的按鍵狀態，\n
+    加上 handle_events() 處理的按鍵事件，並定期存下完整狀態關鍵幀\n
+    \n
+    所有敵人、粒子和藥水掉落都使用全域 random，\n
+    開始錄製時設定種子，關鍵幀再存下 random 的完整狀態，就能完全重現\n
+    只影響畫面的隨機數（燃燒粒子、雷電長度等）改用 PARTICLE_RNG，繪製次數不同也不會讓 random 狀態分歧\n
+    \n
+    屬性:\n
+    path (str): 重播檔路徑\n
+    seed (int): 亂數種子\n
+    frame_count (int): 已錄製的幀數\n
+    keyframe_interval (int): 關鍵幀間隔（幀）\n
+    """
+
+    def __init__(
+        self,
+        path: str,
+        seed: Optional[int] = None,
+        keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+    ):
+        """
+        初始化錄製器\n
+        \n
+        參數:\n
+        path (str): 重播檔儲存路徑\n
+        seed (int): 亂數種子，None 表示隨機產生一個\n
+        keyframe_interval (int): 每隔幾幀存一個關鍵幀\n
+        """
+        self.path = path
+        self.seed = seed if seed is not None else random.randrange(2**31)
+        self.keyframe_interval = keyframe_interval
+
+        self.frame_count = 0
+        self.key_masks = array("H")
+        self.key_down_events = {}
+        self.keyframes = []  # (幀, 壓縮資料)
+        self.digest_cache = SurfaceDigestCache()
+
+        self.character_type = 0
+        self.difficulty = "easy"
+
+    def start(self, game):
+        """
+        開始錄製\n
+        \n
+        設定亂數種子，並存下第 0 幀的關鍵幀，\n
+        重播一律從關鍵幀開始，不受關卡建立時的亂數影響\n
+        \n
+        參數:\n
+        game (MarioClimbingGame): 遊戲主控制器\n
+        """
+        random.seed(self.seed)
+        self.character_type = game.player.character_type if game.player else 0
+        self.difficulty = game.level_manager.get_difficulty()
+        self._capture_keyframe(game)
+
+    def record_frame(self, keys):
+        """
+        記錄這一幀的按鍵狀態\n
+        \n
+        參數:\n
+        keys: 這一幀餵給玩家的按鍵狀態\n
+        """
+        self.key_masks.append(encode_key_state(keys))
+
+    def record_key_down(self, key: int):
+        """
+        記錄按鍵按下事件，重播時會在下一個模擬幀開始前送回\n
+        \n
+        參數:\n
+        key (int): pygame 按鍵代碼\n
+        """
+        self.key_down_events.setdefault(self.frame_count, []).append(key)
+
+    def end_frame(self, game):
+        """
+        結束一個模擬幀，必要時存下關鍵幀\n
+        \n
+        參數:\n
+        game (MarioClimbingGame): 遊戲主控制器\n
+        """
+        self.frame_count += 1
+        if self.frame_count % self.keyframe_interval == 0:
+            self._capture_keyframe(game)
+
+    def _capture_keyframe(self, game):
+        """
+        存下目前狀態作為關鍵幀（代表第 frame_count 幀開始前的狀態）\n
+        \n
+        參數:\n
+        game (MarioClimbingGame): 遊戲主控制器\n
+        """
+        self.keyframes.append(
+            (self.frame_count, serialize_game_state(game, self.digest_cache))
+        )
+
+    def save(self):
+        """
+        把錄製結果寫入重播檔\n
+        """
+        header = {
+            "version": REPLAY_VERSION,
+            "seed": self.seed,
+            "character_type": self.character_type,
+            "difficulty": self.difficulty,
+            "frame_count": self.frame_count,
+            "keyframe_interval": self.keyframe_interval,
+            "recorded_keys": RECORDED_KEYS,
+        }
+        key_masks = array("H", self.key_masks[: self.frame_count])
+        if sys.byteorder == "big":
+            key_masks.byteswap()
+        events = {str(frame): keys for frame, keys in self.key_down_events.items()}
+
+        with open(self.path, "wb") as replay_file:
+            replay_file.write(REPLAY_MAGIC)
+            _write_block(replay_file, json.dumps(header).encode("utf-8"))
+            _write_block(replay_file, zlib.compress(key_masks.tobytes(), 9))
+            _write_block(replay_file, zlib.compress(json.dumps(events).encode("utf-8")))
+
+            index = []
+            for frame, data in self.keyframes:
+                index.append([frame, replay_file.tell(), len(data)])
+                replay_file.write(data)
+
+            index_offset = replay_file.tell()
+            _write_block(replay_file, json.dumps(index).encode("utf-8"))
+            replay_file.write(struct.pack("<Q", index_offset))
+
+        print(
+            f"重播檔已儲存: {self.path}（{self.frame_count} 幀，{len(self.keyframes)} 個關鍵幀）"
+        )
+
+
+######################重播器######################
+class ReplayPlayer:
+    """
+    重播器\n
+    \n
+    讀取重播檔，逐幀提供按鍵狀態和按鍵事件，\n
+    並可以透過索引跳到任一幀：從最近的關鍵幀還原後再模擬剩下的幀數\n
+    \n
+    屬性:\n
+    path (str): 重播檔路徑\n
+    header (Dict): 重播檔標頭資訊\n
+    frame_count (int): 重播檔總幀數\n
+    current_frame (int): 目前播放到的幀\n
+    finished (bool): 是否已播放完畢\n
+    """
+
+    def __init__(self, path: str):
+        """
+        開啟重播檔，只讀取標頭、輸入和索引，關鍵幀用到時才讀\n
+        \n
+        參數:\n
+        path (str): 重播檔路徑\n
+        """
+        self.path = path
+        self.digest_cache = SurfaceDigestCache()
+
+        with open(path, "rb") as replay_file:
+            if replay_file.read(len(REPLAY_MAGIC)) != REPLAY_MAGIC:
+                raise ValueError(f"不是有效的重播檔: {path}")
+
+            self.header = json.loads(_read_block(replay_file).decode("utf-8"))
+            self.key_masks = array("H", zlib.decompress(_read_block(replay_file)))
+            if sys.byteorder == "big":
+                self.key_masks.byteswap()
+            events = json.loads(zlib.decompress(_read_block(replay_file)))
+            self.key_down_events = {
+                int(frame): keys for frame, keys in events.items()
+            }
+
+            replay_file.seek(-8, io.SEEK_END)
+            (index_offset,) = struct.unpack("<Q", replay_file.read(8))
+            replay_file.seek(index_offset)
+            self.keyframe_index = json.loads(_read_block(replay_file).decode("utf-8"))
+
+        self.frame_count = self.header["frame_count"]
+        self.current_frame = 0
+        self.finished = self.frame_count == 0
+
+    def attach(self, game):
+        """
+        把重播接到遊戲上，從第 0 幀開始播放\n
+        \n
+        參數:\n
+        game (MarioClimbingGame): 遊戲主控制器\n
+        """
+        game.replay_player = self
+        self.seek(game, 0)
+
+    def seek(self, game, target_frame: int):
+        """
+        跳到指定幀\n
+        \n
+        從不超過目標幀的最近關鍵幀還原，再模擬剩下的幀數，\n
+        最多只需要模擬一個關鍵幀間隔\n
+        \n
+        參數:\n
+        game (MarioClimbingGame): 遊戲主控制器\n
+        target_frame (int): 目標幀\n
+        """
+        target_frame = max(0, min(target_frame, self.frame_count))
+        keyframe_frame, offset, length = self.keyframe_index[0]
+        for frame, frame_offset, frame_length in self.keyframe_index:
+            if frame > target_frame:
+                break
+            keyframe_frame, offset, length = frame, frame_offset, frame_length
+
+        with open(self.path, "rb") as replay_file:
+            replay_file.seek(offset)
+            data = replay_file.read(length)
+        restore_game_state(game, data, self.digest_cache)
+
+        self.current_frame = keyframe_frame
+        self.finished = self.current_frame >= self.frame_count
+
+        # 快轉時不需要繪製
+        render_enabled = game.render_enabled
+        game.render_enabled = False
+        while self.current_frame < target_frame and game.running:
+            game.step()
+        game.render_enabled = render_enabled
+
+    def get_key_down_events(self) -> List[int]:
+        """
+        取得目前幀開始前要送出的按鍵事件\n
+        \n
+        回傳:\n
+        List[int]: 按鍵代碼清單\n
+        """
+        return self.key_down_events.get(self.current_frame, [])
+
+    def get_frame_keys(self) -> RecordedKeyState:
+        """
+        取得目前幀的按鍵狀態\n
+        \n
+        回傳:\n
+        RecordedKeyState: 可以直接交給 Player.handle_input() 的按鍵狀態\n
+        """
+        if self.current_frame < self.frame_count:
+            return RecordedKeyState(self.key_masks[self.current_frame])
+        return RecordedKeyState()
+
+    def end_frame(self):
+        """
+        結束一個模擬幀，播放到最後一幀時標記為完成\n
+        """
+        self.current_frame += 1
+        if self.current_frame >= self.frame_count:
+            self.finished = True
+
+
+######################檔案區塊讀寫######################
+def _write_block(replay_file, data: bytes):
+    """
+    寫入一個帶長度前綴的資料區塊\n
+    \n
+    參數:\n
+    replay_file: 已開啟的二進位檔案\n
+    data (bytes): 區塊內容\n
+    """
+    replay_file.write(struct.pack("<I", len(data)))
+    replay_file.write(data)
+
+
+def _read_block(replay_file) -> bytes:
+    """
+    讀取一個帶長度前綴的資料區塊\n
+    \n
+    參數:\n
+    replay_file: 已開啟的二進位檔案\n
+    \n
+    回傳:\n
+    bytes: 區塊內容\n
+    """
+    (length,) = struct.unpack("<I", replay_file.read(4))
+    return replay_file.read(length)
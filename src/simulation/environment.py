@@ -0,0 +1,551 @@
+######################載入套件######################
+import itertools
+import random
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+import numpy as np
+import pygame
+
+from src.characters.player import Player
+from src.effects.particle_system import PARTICLE_BUDGET, ParticleBudget
+from src.enemies.boss import Boss
+from src.performance.frame_jobs import FRAME_JOBS, FrameJobScheduler
+from src.replay.replay_recorder import RecordedKeyState, KEY_BITS
+from src.traps.fire_wall import FireWall
+from src.traps.moving_platform import MovingPlatform
+from src.traps.spike import Spike
+
+######################環境設定######################
+DEFAULT_MAX_EPISODE_STEPS = 3600  # 一個回合最多幾步（約 1 分鐘遊戲時間），超過就截斷
+WORLD_WIDTH = 1200  # 觀測值正規化用的關卡寬度（和視窗寬度相同）
+WORLD_HEIGHT = 800  # 觀測值正規化用的關卡高度
+VELOCITY_SCALE = 10.0  # 速度正規化的比例
+ENV_ASSET_SCOPE_PREFIX = "env{}/"  # 每個世界的關卡資源範圍前綴，同一個行程裡的世界卸載關卡時互不影響
+
+# 回饋值
+REWARD_CLIMB = 0.01  # 每爬高到新的最高點 1 像素
+REWARD_ENEMY_DEFEATED = 1.0  # 每擊敗一個敵人
+REWARD_LEVEL_COMPLETE = 10.0  # 過關
+REWARD_DEATH = -10.0  # 死亡或掉出地圖
+
+# 離散動作對應的按鍵（Player.handle_input 讀取的按鍵）
+ACTION_KEYS = (
+    (),  # 0: 不動
+    (pygame.K_a,),  # 1: 往左
+    (pygame.K_d,),  # 2: 往右
+    (pygame.K_SPACE,),  # 3: 跳
+    (pygame.K_a, pygame.K_SPACE),  # 4: 往左跳
+    (pygame.K_d, pygame.K_SPACE),  # 5: 往右跳
+    (pygame.K_c,),  # 6: 攻擊
+    (pygame.K_s,),  # 7: 蹲下
+    (pygame.K_r, pygame.K_a),  # 8: 往左衝刺
+    (pygame.K_r, pygame.K_d),  # 9: 往右衝刺
+    (pygame.K_a, pygame.K_c),  # 10: 往左邊走邊攻擊
+    (pygame.K_d, pygame.K_c),  # 11: 往右邊走邊攻擊
+)
+ACTION_MASKS = tuple(sum(KEY_BITS[key] for key in keys) for keys in ACTION_KEYS)
+ACTION_COUNT = len(ACTION_MASKS)
+
+# 觀測值每一段的數量和每一筆的特徵數（附近的物件依距離排序，不足的補 0，第一個特徵是「有沒有這一筆」）
+PLAYER_FEATURES = 11  # x、y、水平速度、垂直速度、血量比例、在地面、能二段跳、攻擊冷卻完畢、面向、關卡進度、關卡編號
+NEARBY_PLATFORMS = 6
+PLATFORM_FEATURES = 5  # 有無、相對 x、相對 y、寬、高
+NEARBY_ENEMIES = 4
+ENEMY_FEATURES = 7  # 有無、相對 x、相對 y、水平速度、垂直速度、血量比例、是否為 Boss
+NEARBY_PROJECTILES = 4
+PROJECTILE_FEATURES = 6  # 有無、相對 x、相對 y、水平速度、垂直速度、種類編號
+NEARBY_TRAPS = 4
+TRAP_TYPES = (Spike, FireWall, MovingPlatform)
+TRAP_FEATURES = 6 + len(TRAP_TYPES)  # 有無、相對 x、相對 y、寬、高、是否啟用、種類（one-hot）
+
+OBSERVATION_SIZE = (
+    PLAYER_FEATURES
+    + NEARBY_PLATFORMS * PLATFORM_FEATURES
+    + NEARBY_ENEMIES * ENEMY_FEATURES
+    + NEARBY_PROJECTILES * PROJECTILE_FEATURES
+    + NEARBY_TRAPS * TRAP_FEATURES
+)
+
+
+######################附近物件######################
+def _rect_distance(left: float, top: float, width: float, height: float, point_x: float, point_y: float) -> float:
+    """
+    計算一點到矩形的距離平方（點在矩形內時是 0）\n
+    \n
+    參數:\n
+    left, top, width, height (float): 矩形\n
+    point_x, point_y (float): 點的座標\n
+    \n
+    回傳:\n
+    float: 距離平方\n
+    """
+    if point_x < left:
+        dx = left - point_x
+    elif point_x > left + width:
+        dx = point_x - left - width
+    else:
+        dx = 0.0
+    if point_y < top:
+        dy = top - point_y
+    elif point_y > top + height:
+        dy = point_y - top - height
+    else:
+        dy = 0.0
+    return dx * dx + dy * dy
+
+
+def _distance_key(item: tuple) -> float:
+    """
+    附近物件排序用的鍵（距離）\n
+    """
+    return item[0]
+
+
+def _append_nearest(values: list, items: list, count: int, features: int):
+    """
+    把最近的幾筆物件特徵接到觀測值後面，不足的補 0\n
+    \n
+    物件數量只有幾個到幾十個，直接用 Python 排序比 NumPy 小陣列的呼叫成本低\n
+    \n
+    參數:\n
+    values (list): 觀測值\n
+    items (list): (距離, 特徵) 的清單，特徵不含第一欄的「有沒有這一筆」\n
+    count (int): 要寫幾筆\n
+    features (int): 每一筆的特徵數（含第一欄）\n
+    """
+    if len(items) > 1:
+        items.sort(key=_distance_key)
+    for _, item_features in items[:count]:
+        values.append(1.0)
+        values.extend(item_features)
+    missing = count - len(items)
+    if missing > 0:
+        values.extend([0.0] * (missing * features))
+
+
+######################遊戲環境######################
+# 世界編號（關卡資源範圍的前綴用）
+_ENVIRONMENT_IDS = itertools.count()
+
+class GameEnvironment:
+    """
+    用程式推進的單一遊戲環境（訓練 AI、自動測試、平衡關卡用）\n
+    \n
+    不開視窗也不繪製，用離散動作代替鍵盤：\n
+    1. step(action) 把動作換成 Player.handle_input 讀取的按鍵狀態，推進一幀，\n
+       回傳攤平的觀測值、回饋值和回合是否結束\n
+    2. 觀測值包含玩家狀態，以及最近的平台、敵人、投射物和陷阱相對玩家的位置\n
+    3. reset() 同一關、同一角色時只用 Level.reset 重置，不重新建立關卡\n
+    \n
+    回合在死亡、掉出地圖、過關或超過 max_episode_steps 步時結束，結束後要呼叫 reset()\n
+    \n
+    同一個行程可以有好幾個世界（向量化模擬的工作行程）：每個世界有自己的 random 狀態、\n
+    工作排程、粒子預算和關卡資源範圍，推進時才換進全域，結果和單獨執行時相同\n
+    \n
+    屬性:\n
+    game (MarioClimbingGame): 無視窗、不繪製的遊戲\n
+    keys (RecordedKeyState): 這一步的按鍵狀態\n
+    level_number (int): 回合進行的關卡\n
+    character_type (int): 角色類型\n
+    difficulty (str): 難度\n
+    max_episode_steps (int): 一個回合最多幾步\n
+    episode_steps (int): 這個回合走了幾步\n
+    episode_return (float): 這個回合累計的回饋值\n
+    level_completed (bool): 這個回合是否過關\n
+    died (bool): 這個回合是否死亡\n
+    truncated (bool): 這個回合是否因為超過步數而結束\n
+    """
+
+    def __init__(
+        self,
+        level_number: int = 1,
+        character_type: int = 0,
+        difficulty: str = "easy",
+        max_episode_steps: int = DEFAULT_MAX_EPISODE_STEPS,
+        seed: Optional[int] = None,
+    ):
+        """
+        建立遊戲並進入指定關卡\n
+        \n
+        參數:\n
+        level_number (int): 關卡編號 1-6\n
+        character_type (int): 角色類型 0-2\n
+        difficulty (str): 難度，"easy" 或 "hard"\n
+        max_episode_steps (int): 一個回合最多幾步\n
+        seed (int): 這個世界的亂數種子，None 表示從目前的 random 取一個\n
+        """
+        from main import MarioClimbingGame
+
+        if seed is None:
+            seed = random.getrandbits(64)
+        self._random_state = random.Random(seed).getstate()
+        self._frame_jobs = FrameJobScheduler()
+        self._particle_budget = ParticleBudget()
+
+        self.keys = RecordedKeyState()
+        self.max_episode_steps = max_episode_steps
+        self.level_number = 1
+        self.character_type = character_type
+        self.difficulty = difficulty
+
+        # 平台不會移動、陷阱種類不會變，換關卡時才重新整理
+        self._cached_level = None
+        self._platforms = []
+        self._traps = []
+
+        with self._activate():
+            self.game = MarioClimbingGame(
+                headless=True,
+                render_enabled=False,
+                asset_scope_prefix=ENV_ASSET_SCOPE_PREFIX.format(next(_ENVIRONMENT_IDS)),
+            )
+            self.game.input_override = self._read_keys
+            self.game.start_game_with_character(character_type, difficulty)
+            self._reset(level_number)
+
+    @contextmanager
+    def _activate(self):
+        """
+        這個世界推進期間，把它自己的 random 狀態、工作排程和粒子預算換進全域，結束時換回來\n
+        """
+        self._swap_globals()
+        try:
+            yield
+        finally:
+            self._swap_globals()
+
+    def _swap_globals(self):
+        """
+        和全域的 random 狀態、FRAME_JOBS、PARTICLE_BUDGET 交換狀態（換兩次就還原）\n
+        """
+        FRAME_JOBS.swap_state(self._frame_jobs)
+        PARTICLE_BUDGET.swap_state(self._particle_budget)
+        random_state = random.getstate()
+        random.setstate(self._random_state)
+        self._random_state = random_state
+
+    def _read_keys(self) -> RecordedKeyState:
+        """
+        遊戲每一步讀取按鍵時呼叫（代替 pygame.key.get_pressed）\n
+        """
+        return self.keys
+
+    def reset(
+        self,
+        level_number: Optional[int] = None,
+        character_type: Optional[int] = None,
+        difficulty: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        開始新的回合：關卡回到初始狀態，玩家回到起點、補滿血量、清空裝備\n
+        \n
+        同一關只用 Level.reset 重置（約 0.1 毫秒）；換關卡才需要建立關卡\n
+        \n
+        參數:\n
+        level_number (int): 關卡編號 1-6，None 表示沿用\n
+        character_type (int): 角色類型 0-2，None 表示沿用\n
+        difficulty (str): 難度，None 表示沿用\n
+        \n
+        回傳:\n
+        np.ndarray: 新回合的第一個觀測值\n
+        """
+        with self._activate():
+            self._reset(level_number, character_type, difficulty)
+        return self.get_observation()
+
+    def _reset(
+        self,
+        level_number: Optional[int] = None,
+        character_type: Optional[int] = None,
+        difficulty: Optional[str] = None,
+    ):
+        """
+        重置回合（呼叫前要先換進這個世界的全域狀態），參數同 reset()\n
+        """
+        game = self.game
+        if level_number is not None:
+            self.level_number = level_number
+        if difficulty is not None:
+            self.difficulty = difficulty
+            game.level_manager.set_difficulty(difficulty)
+        if character_type is not None and character_type != self.character_type:
+            self.character_type = character_type
+            self._replace_player(character_type)
+
+        game.game_state = "playing"
+        if game.level_manager.current_level_number != self.level_number:
+            # 換關卡（或過關後回到原本的關卡）
+            game._jump_to_level(self.level_number)
+
+        game.equipment_manager.reset_equipment()
+        game.player.health = game.player.max_health
+        game._reset_current_level()
+        self.keys.mask = 0
+
+        self.episode_steps = 0
+        self.episode_return = 0.0
+        self.level_completed = False
+        self.died = False
+        self.truncated = False
+        self._best_y = game.player.y
+        self._enemies_defeated = game.level_manager.get_current_level().enemies_defeated
+
+    def _replace_player(self, character_type: int):
+        """
+        換成另一種角色（不重新開始遊戲，關卡不會被卸載）\n
+        \n
+        參數:\n
+        character_type (int): 角色類型 0-2\n
+        """
+        game = self.game
+        player = Player(game.player.x, game.player.y, character_type)
+        player.set_equipment_manager(game.equipment_manager)
+        player.set_fireball_manager(game.fireball_manager)
+        player.set_iceball_manager(game.iceball_manager)
+        player.set_sound_manager(game.sound_manager)
+        game.player = player
+        game.selected_character_index = character_type
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool, dict]:
+        """
+        用離散動作推進一幀\n
+        \n
+        參數:\n
+        action (int): 動作編號（0 到 ACTION_COUNT - 1，見 ACTION_KEYS）\n
+        \n
+        回傳:\n
+        Tuple[np.ndarray, float, bool, dict]: (觀測值, 回饋值, 回合是否結束, 額外資訊)，\n
+        額外資訊有 level_completed、died、truncated、episode_steps、episode_return\n
+        """
+        reward, done = self.advance(action)
+        info = {
+            "level_completed": self.level_completed,
+            "died": self.died,
+            "truncated": self.truncated,
+            "episode_steps": self.episode_steps,
+            "episode_return": self.episode_return,
+        }
+        return self.get_observation(), reward, done, info
+
+    def advance(self, action: int) -> Tuple[float, bool]:
+        """
+        用離散動作推進一幀，不產生觀測值（向量化模擬直接寫進共享記憶體用）\n
+        \n
+        參數:\n
+        action (int): 動作編號（0 到 ACTION_COUNT - 1）\n
+        \n
+        回傳:\n
+        Tuple[float, bool]: (回饋值, 回合是否結束)\n
+        """
+        if not 0 <= action < ACTION_COUNT:
+            raise ValueError(f"動作編號必須在 0 到 {ACTION_COUNT - 1} 之間: {action}")
+        if self.level_completed or self.died:
+            # 回合已經結束，呼叫 reset() 之前不再推進
+            return 0.0, True
+
+        game = self.game
+        self.keys.mask = ACTION_MASKS[action]
+        with self._activate():
+            game.update()
+        self.episode_steps += 1
+
+        player = game.player
+        reward = 0.0
+
+        if player.y < self._best_y:
+            reward += (self._best_y - player.y) * REWARD_CLIMB
+            self._best_y = player.y
+
+        if game.level_manager.current_level_number != self.level_number or game.game_state == "victory":
+            # 過關時遊戲已經切換到下一關，擊敗敵人的數量不再比較
+            reward += REWARD_LEVEL_COMPLETE
+            self.level_completed = True
+        else:
+            enemies_defeated = game.level_manager.get_current_level().enemies_defeated
+            if enemies_defeated > self._enemies_defeated:
+                reward += (enemies_defeated - self._enemies_defeated) * REWARD_ENEMY_DEFEATED
+                self._enemies_defeated = enemies_defeated
+            if game.game_state == "game_over":
+                reward += REWARD_DEATH
+                self.died = True
+
+        if self.episode_steps >= self.max_episode_steps and not (self.level_completed or self.died):
+            self.truncated = True
+
+        self.episode_return += reward
+        return reward, self.level_completed or self.died or self.truncated
+
+    def get_observation(self) -> np.ndarray:
+        """
+        取得目前的觀測值（新的陣列，可以直接保留）\n
+        \n
+        回傳:\n
+        np.ndarray: 長度 OBSERVATION_SIZE 的 float32 陣列\n
+        """
+        return np.array(self._build_observation(), dtype=np.float32)
+
+    def write_observation(self, observation: np.ndarray):
+        """
+        把目前的觀測值寫進現有的陣列（例如共享記憶體的一列）\n
+        \n
+        參數:\n
+        observation (np.ndarray): 長度 OBSERVATION_SIZE 的陣列\n
+        """
+        observation[:] = self._build_observation()
+
+    def _build_observation(self) -> list:
+        """
+        整理目前的狀態（所有位置都相對玩家中心，並依關卡大小正規化）\n
+        \n
+        回傳:\n
+        list: 長度 OBSERVATION_SIZE 的數值\n
+        """
+        game = self.game
+        player = game.player
+        level = game.level_manager.get_current_level()
+        center_x = player.x + player.width / 2
+        center_y = player.y + player.height / 2
+        climb_height = level.player_start_y - level.level_completion_height
+
+        values = [
+            player.x / WORLD_WIDTH,
+            player.y / WORLD_HEIGHT,
+            player.velocity_x / VELOCITY_SCALE,
+            player.velocity_y / VELOCITY_SCALE,
+            player.health / player.max_health,
+            float(player.is_on_ground),
+            float(player.can_double_jump),
+            float(player.attack_cooldown <= 0),
+            float(player.last_facing_direction or 0),
+            (level.player_start_y - player.y) / climb_height if climb_height else 0.0,
+            self.level_number / game.level_manager.max_level,
+        ]
+
+        if self._cached_level is not level:
+            self._cache_level(level)
+
+        # 存在的平台（脆弱平台踩壞後就不列入）：相對位置是平台中心，距離用平台邊緣算
+        items = [
+            (
+                _rect_distance(left, top, width, height, center_x, center_y),
+                (
+                    (platform_x - center_x) / WORLD_WIDTH,
+                    (platform_y - center_y) / WORLD_HEIGHT,
+                    width_ratio,
+                    height_ratio,
+                ),
+            )
+            for (
+                platform,
+                left,
+                top,
+                width,
+                height,
+                platform_x,
+                platform_y,
+                width_ratio,
+                height_ratio,
+            ) in self._platforms
+            if platform.is_active
+        ]
+        _append_nearest(values, items, NEARBY_PLATFORMS, PLATFORM_FEATURES)
+
+        # 活著的敵人
+        items = [
+            (
+                _rect_distance(enemy.x, enemy.y, enemy.width, enemy.height, center_x, center_y),
+                (
+                    (enemy.x + enemy.width / 2 - center_x) / WORLD_WIDTH,
+                    (enemy.y + enemy.height / 2 - center_y) / WORLD_HEIGHT,
+                    enemy.velocity_x / VELOCITY_SCALE,
+                    enemy.velocity_y / VELOCITY_SCALE,
+                    enemy.health / enemy.max_health if enemy.max_health else 0.0,
+                    float(isinstance(enemy, Boss)),
+                ),
+            )
+            for enemy in level.enemies
+            if not enemy.is_dead
+        ]
+        _append_nearest(values, items, NEARBY_ENEMIES, ENEMY_FEATURES)
+
+        # 投射物：直接讀投射物引擎的陣列
+        pool = game.projectile_pool
+        slots = np.flatnonzero(pool.active)
+        items = []
+        if len(slots):
+            for x, y, velocity_x, velocity_y, kind in zip(
+                pool.x[slots].tolist(),
+                pool.y[slots].tolist(),
+                pool.velocity_x[slots].tolist(),
+                pool.velocity_y[slots].tolist(),
+                pool.kind[slots].tolist(),
+            ):
+                delta_x = x - center_x
+                delta_y = y - center_y
+                items.append(
+                    (
+                        delta_x * delta_x + delta_y * delta_y,
+                        (
+                            delta_x / WORLD_WIDTH,
+                            delta_y / WORLD_HEIGHT,
+                            velocity_x / VELOCITY_SCALE,
+                            velocity_y / VELOCITY_SCALE,
+                            float(kind),
+                        ),
+                    )
+                )
+        _append_nearest(values, items, NEARBY_PROJECTILES, PROJECTILE_FEATURES)
+
+        # 陷阱：尖刺、火焰牆、移動平台（種類每個關卡整理一次）
+        items = [
+            (
+                _rect_distance(trap.x, trap.y, trap.width, trap.height, center_x, center_y),
+                (
+                    (trap.x + trap.width / 2 - center_x) / WORLD_WIDTH,
+                    (trap.y + trap.height / 2 - center_y) / WORLD_HEIGHT,
+                    trap.width / WORLD_WIDTH,
+                    trap.height / WORLD_HEIGHT,
+                    float(trap.is_active),
+                    *trap_type,
+                ),
+            )
+            for trap, trap_type in self._traps
+        ]
+        _append_nearest(values, items, NEARBY_TRAPS, TRAP_FEATURES)
+
+        return values
+
+    def _cache_level(self, level):
+        """
+        整理關卡裡不會變的資料：平台位置和尺寸、陷阱種類\n
+        （平台是否存在會變，建立觀測值時才檢查）\n
+        \n
+        參數:\n
+        level (Level): 目前的關卡\n
+        """
+        self._cached_level = level
+        self._platforms = [
+            (
+                platform,
+                platform.x,
+                platform.y,
+                platform.width,
+                platform.height,
+                platform.x + platform.width / 2,
+                platform.y + platform.height / 2,
+                platform.width / WORLD_WIDTH,
+                platform.height / WORLD_HEIGHT,
+            )
+            for platform in level.platforms
+        ]
+        self._traps = [
+            (trap, tuple(float(isinstance(trap, trap_type)) for trap_type in TRAP_TYPES))
+            for trap in level.traps
+        ]
+
+    def close(self):
+        """
+        停止遊戲的背景執行緒\n
+        """
+        self.game.performance_monitor.shutdown()
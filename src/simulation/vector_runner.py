@@ -0,0 +1,458 @@
+######################載入套件######################
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pygame
+
+from src.simulation.environment import (
+    ACTION_COUNT,
+    DEFAULT_MAX_EPISODE_STEPS,
+    OBSERVATION_SIZE,
+    GameEnvironment,
+)
+
+######################模擬設定######################
+WORKER_POLL_SECONDS = 5.0  # 等待工作行程時多久檢查一次它還在不在
+
+# 工作行程的指令
+COMMAND_STEP = 0
+COMMAND_RESET = 1
+COMMAND_CLOSE = 2
+
+
+######################共享記憶體陣列######################
+class SharedArrays:
+    """
+    放在同一塊 multiprocessing.shared_memory 裡的所有陣列\n
+    \n
+    主行程和工作行程用同一個名稱對應到同一塊記憶體，\n
+    每一步交換動作、觀測值、回饋值和結束旗標都不需要序列化（pickle）\n
+    \n
+    屬性:\n
+    memory (SharedMemory): 共享記憶體\n
+    commands (np.ndarray): 每個工作行程下一個要做的指令\n
+    actions (np.ndarray): 每個世界這一步的動作\n
+    observations (np.ndarray): 每個世界的觀測值 (世界數, OBSERVATION_SIZE)\n
+    rewards (np.ndarray): 每個世界這一步的回饋值\n
+    dones (np.ndarray): 每個世界這一步是否結束回合（結束後已經自動重來）\n
+    episode_returns (np.ndarray): 每個世界上一個結束的回合的總回饋\n
+    episode_lengths (np.ndarray): 每個世界上一個結束的回合的步數\n
+    """
+
+    def __init__(self, num_envs: int, num_workers: int, name: str = None):
+        """
+        建立或連接共享記憶體\n
+        \n
+        參數:\n
+        num_envs (int): 世界數量\n
+        num_workers (int): 工作行程數量\n
+        name (str): 共享記憶體名稱，None 表示建立新的一塊\n
+        """
+        layout = (
+            ("commands", np.int32, (num_workers,)),
+            ("actions", np.int32, (num_envs,)),
+            ("observations", np.float32, (num_envs, OBSERVATION_SIZE)),
+            ("rewards", np.float32, (num_envs,)),
+            ("dones", np.bool_, (num_envs,)),
+            ("episode_returns", np.float32, (num_envs,)),
+            ("episode_lengths", np.int32, (num_envs,)),
+        )
+
+        # 每個陣列對齊 8 位元組
+        offsets = []
+        size = 0
+        for _, dtype, shape in layout:
+            offsets.append(size)
+            size += -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // 8) * 8
+
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.memory = _attach_shared_memory(name)
+
+        for (field, dtype, shape), offset in zip(layout, offsets):
+            setattr(self, field, np.ndarray(shape, dtype, self.memory.buf, offset))
+
+        if name is None:
+            for field, _, _ in layout:
+                getattr(self, field).fill(0)
+
+    @property
+    def name(self) -> str:
+        """
+        共享記憶體名稱（給工作行程連接用）\n
+        """
+        return self.memory.name
+
+    def close(self):
+        """
+        放開陣列並關閉共享記憶體（不會刪除）\n
+        """
+        for field in (
+            "commands",
+            "actions",
+            "observations",
+            "rewards",
+            "dones",
+            "episode_returns",
+            "episode_lengths",
+        ):
+            setattr(self, field, None)
+        self.memory.close()
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    連接主行程建立的共享記憶體，交給主行程負責刪除\n
+    \n
+    工作行程和主行程共用同一個資源追蹤器，重複登記不會被誤判為洩漏；\n
+    Python 3.13 以後直接不登記\n
+    \n
+    參數:\n
+    name (str): 共享記憶體名稱\n
+    \n
+    回傳:\n
+    SharedMemory: 共享記憶體\n
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+######################工作行程######################
+def _worker_main(
+    worker_index: int,
+    env_indices: List[int],
+    shared_name: str,
+    num_envs: int,
+    num_workers: int,
+    start_semaphore,
+    done_semaphore,
+    config: dict,
+):
+    """
+    工作行程進入點：建立負責的世界（GameEnvironment），之後每次被喚醒就執行共享記憶體裡的指令\n
+    \n
+    參數:\n
+    worker_index (int): 工作行程編號\n
+    env_indices (List[int]): 負責的世界編號\n
+    shared_name (str): 共享記憶體名稱\n
+    num_envs (int): 世界總數\n
+    num_workers (int): 工作行程總數\n
+    start_semaphore: 主行程送出指令時釋放\n
+    done_semaphore: 這個工作行程做完指令時釋放\n
+    config (dict): 世界設定（每個世界的關卡、角色、難度、回合步數、亂數種子、是否安靜）\n
+    """
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    if config["quiet"]:
+        # 遊戲會印出關卡切換等訊息，大量世界同時執行時關掉
+        sys.stdout = open(os.devnull, "w")
+
+    shared = SharedArrays(num_envs, num_workers, shared_name)
+
+    # 每個世界用自己的種子，結果和它分到哪個工作行程、同一個行程還有哪些世界無關
+    environments = [
+        GameEnvironment(
+            config["level_numbers"][env_index],
+            config["character_type"],
+            config["difficulty"],
+            config["max_episode_steps"],
+            seed=config["seed"] + env_index,
+        )
+        for env_index in env_indices
+    ]
+    for environment, env_index in zip(environments, env_indices):
+        environment.write_observation(shared.observations[env_index])
+    done_semaphore.release()
+
+    commands = shared.commands
+    actions = shared.actions
+    observations = shared.observations
+    rewards = shared.rewards
+    dones = shared.dones
+    try:
+        while True:
+            start_semaphore.acquire()
+            command = commands[worker_index]
+            if command == COMMAND_CLOSE:
+                break
+
+            for environment, env_index in zip(environments, env_indices):
+                if command == COMMAND_RESET:
+                    environment.reset()
+                    rewards[env_index] = 0.0
+                    dones[env_index] = False
+                else:
+                    reward, done = environment.advance(int(actions[env_index]))
+                    rewards[env_index] = reward
+                    dones[env_index] = done
+                    if done:
+                        # 自動重來，觀測值是新回合的第一步
+                        shared.episode_returns[env_index] = environment.episode_return
+                        shared.episode_lengths[env_index] = environment.episode_steps
+                        environment.reset()
+                environment.write_observation(observations[env_index])
+
+            done_semaphore.release()
+    finally:
+        for environment in environments:
+            environment.close()
+        commands = actions = observations = rewards = dones = None
+        shared.close()
+        pygame.quit()
+
+
+######################多行程向量化模擬######################
+class VectorRunner:
+    """
+    多行程向量化模擬\n
+    \n
+    在多個工作行程裡同時執行 num_envs 個獨立的無視窗遊戲世界（訓練 AI、平衡關卡用）：\n
+    1. 世界平均分給工作行程，每個工作行程依序推進自己的世界\n
+    2. 動作、觀測值、回饋值、結束旗標都放在共享記憶體，每一步只用信號量同步，不序列化任何資料\n
+    3. 回合結束（死亡、過關、超過步數）時工作行程用 Level.reset 自動重來\n
+    \n
+    step() 回傳的陣列直接對應共享記憶體，下一次 step() 會被覆寫，要保留就自己複製\n
+    \n
+    屬性:\n
+    num_envs (int): 世界數量\n
+    num_workers (int): 工作行程數量\n
+    shared (SharedArrays): 共享記憶體陣列\n
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        num_workers: Optional[int] = None,
+        level_number: Union[int, Sequence[int]] = 1,
+        character_type: int = 0,
+        difficulty: str = "easy",
+        max_episode_steps: int = DEFAULT_MAX_EPISODE_STEPS,
+        seed: int = 0,
+        quiet: bool = True,
+        start_method: Optional[str] = None,
+    ):
+        """
+        建立共享記憶體並啟動工作行程（所有世界建立好才回傳）\n
+        \n
+        參數:\n
+        num_envs (int): 世界數量\n
+        num_workers (int): 工作行程數量，None 表示 CPU 核心數（不超過世界數量）\n
+        level_number (int | Sequence[int]): 關卡編號 1-6，或每個世界各自的關卡編號\n
+        character_type (int): 角色類型\n
+        difficulty (str): 難度\n
+        max_episode_steps (int): 一個回合最多幾步\n
+        seed (int): 亂數種子（每個世界加上自己的編號）\n
+        quiet (bool): 是否關掉工作行程的文字輸出\n
+        start_method (str): multiprocessing 啟動方式，None 表示平台預設\n
+        """
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        num_workers = max(1, min(num_workers, num_envs))
+        if isinstance(level_number, int):
+            level_numbers = [level_number] * num_envs
+        else:
+            level_numbers = list(level_number)
+            if len(level_numbers) != num_envs:
+                raise ValueError(f"關卡編號有 {len(level_numbers)} 個，世界有 {num_envs} 個")
+
+        self.num_envs = num_envs
+        self.num_workers = num_workers
+        self.shared = SharedArrays(num_envs, num_workers)
+        self._closed = False
+
+        config = {
+            "level_numbers": level_numbers,
+            "character_type": character_type,
+            "difficulty": difficulty,
+            "max_episode_steps": max_episode_steps,
+            "seed": seed,
+            "quiet": quiet,
+        }
+
+        context = multiprocessing.get_context(start_method)
+        self._start_semaphores = []
+        self._done_semaphores = []
+        self._processes = []
+        for worker_index in range(num_workers):
+            start_semaphore = context.Semaphore(0)
+            done_semaphore = context.Semaphore(0)
+            env_indices = list(range(worker_index, num_envs, num_workers))
+            process = context.Process(
+                target=_worker_main,
+                args=(
+                    worker_index,
+                    env_indices,
+                    self.shared.name,
+                    num_envs,
+                    num_workers,
+                    start_semaphore,
+                    done_semaphore,
+                    config,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self._start_semaphores.append(start_semaphore)
+            self._done_semaphores.append(done_semaphore)
+            self._processes.append(process)
+
+        # 等所有世界建立好（第一個觀測值已經寫進共享記憶體）
+        self._wait_workers()
+
+    def _wait_workers(self):
+        """
+        等所有工作行程做完目前的指令\n
+        """
+        for done_semaphore, process in zip(self._done_semaphores, self._processes):
+            # 定期檢查工作行程還在不在，出錯結束時不要一直等下去
+            while not done_semaphore.acquire(timeout=WORKER_POLL_SECONDS):
+                if not process.is_alive():
+                    self._closed = True
+                    self._shutdown()
+                    raise RuntimeError(f"模擬工作行程意外結束（結束代碼 {process.exitcode}）")
+
+    def _send(self, command: int):
+        """
+        送出指令給所有工作行程\n
+        \n
+        參數:\n
+        command (int): COMMAND_STEP、COMMAND_RESET 或 COMMAND_CLOSE\n
+        """
+        self.shared.commands[:] = command
+        for start_semaphore in self._start_semaphores:
+            start_semaphore.release()
+
+    def reset(self) -> np.ndarray:
+        """
+        重置所有世界\n
+        \n
+        回傳:\n
+        np.ndarray: 觀測值 (num_envs, OBSERVATION_SIZE)\n
+        """
+        self._send(COMMAND_RESET)
+        self._wait_workers()
+        return self.shared.observations
+
+    def step_async(self, actions):
+        """
+        送出這一步所有世界的動作，不等待結果（可以先做別的事再呼叫 step_wait）\n
+        \n
+        參數:\n
+        actions: 長度 num_envs 的動作編號\n
+        """
+        self.shared.actions[:] = actions
+        self._send(COMMAND_STEP)
+
+    def step_wait(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        等待 step_async 送出的這一步完成\n
+        \n
+        回傳:\n
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (觀測值, 回饋值, 結束旗標)\n
+        """
+        self._wait_workers()
+        shared = self.shared
+        return shared.observations, shared.rewards, shared.dones
+
+    def step(self, actions) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        所有世界同時推進一步\n
+        \n
+        參數:\n
+        actions: 長度 num_envs 的動作編號\n
+        \n
+        回傳:\n
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (觀測值, 回饋值, 結束旗標)，\n
+        結束的世界已經自動重來，觀測值是新回合的第一步\n
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        """
+        結束所有工作行程並刪除共享記憶體\n
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._send(COMMAND_CLOSE)
+        self._shutdown()
+
+    def _shutdown(self):
+        """
+        等工作行程結束（逾時就強制結束）並刪除共享記憶體\n
+        """
+        for process in self._processes:
+            process.join(timeout=WORKER_POLL_SECONDS)
+            if process.is_alive():
+                process.terminate()
+        self.shared.close()
+        self.shared.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+######################命令列進入點######################
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    量測向量化模擬的總步數/秒\n
+    \n
+    用法: python -m src.simulation.vector_runner --envs 16 --workers 4 --steps 2000\n
+    \n
+    參數:\n
+    argv (List[str]): 命令列參數，None 表示使用 sys.argv\n
+    \n
+    回傳:\n
+    int: 結束代碼\n
+    """
+    parser = argparse.ArgumentParser(description="瑪莉歐攀爬遊戲多行程模擬")
+    parser.add_argument("--envs", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=[None])
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--character", type=int, default=0)
+    parser.add_argument("--difficulty", default="easy")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for num_workers in args.workers:
+        with VectorRunner(
+            args.envs,
+            num_workers,
+            level_number=args.level,
+            character_type=args.character,
+            difficulty=args.difficulty,
+            seed=args.seed,
+        ) as runner:
+            rng = np.random.default_rng(args.seed)
+            episodes = 0
+            start = time.perf_counter()
+            for _ in range(args.steps):
+                _, _, dones = runner.step(rng.integers(0, ACTION_COUNT, args.envs))
+                episodes += int(dones.sum())
+            elapsed = time.perf_counter() - start
+
+        steps_per_second = args.steps * args.envs / elapsed
+        print(
+            f"{runner.num_workers} 個工作行程、{args.envs} 個世界: "
+            f"{steps_per_second:,.0f} 步/秒（完成 {episodes} 個回合）"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,6 +27,25 @@ class BaseTrap(ABC):
     - _trigger_effect(): 陷阱被觸發時的特殊效果\n
     """
 
+    __slots__ = (
+        "x",
+        "y",
+        "width",
+        "height",
+        "damage",
+        "is_active",
+        "is_triggered",
+        "trigger_cooldown",
+        "max_cooldown",
+        "animation_frame",
+        "flash_timer",
+        "lod_frame",
+        "lod_slot",
+    )
+
+    # 可以交給更新細節層級排程（UpdateLodScheduler）在畫面外降低更新頻率
+    allows_update_lod = True
+
     def __init__(
         self,
         x: float,
@@ -65,6 +84,11 @@ class BaseTrap(ABC):
         self.animation_frame = 0
         self.flash_timer = 0  # 用於閃爍效果
 
+        # 更新細節層級排程最後一次更新這個陷阱的幀數，沒有啟用排程時不使用
+        self.lod_frame = None
+        # 更新細節層級排程分配的固定編號（錯開更新的幀），第一次排程前是 None
+        self.lod_slot = None
+
     @abstractmethod
     def update(self):
         """
@@ -77,6 +101,18 @@ class BaseTrap(ABC):
         """
         pass
 
+    def update_scaled(self, steps: int):
+        """
+        一次推進好幾幀的陷阱狀態（畫面外降低更新頻率時使用）\n
+        \n
+        預設逐幀呼叫 update()，有比較耗時的效果（例如粒子）的子類別可以覆寫\n
+        \n
+        參數:\n
+        steps (int): 要推進的幀數\n
+        """
+        for _ in range(steps):
+            self.update()
+
     @abstractmethod
     def render(self, screen: pygame.Surface, camera_y: float):
         """
@@ -203,11 +239,28 @@ class BaseTrap(ABC):
         回傳:\n
         bool: 是否在可見範圍內\n
         """
-        screen_y = self.y - camera_y + screen.get_height() // 2
+        return self.is_in_view(camera_y, screen.get_width(), screen.get_height())
+
+    def is_in_view(
+        self, camera_y: float, view_width: int, view_height: int, margin: float = 0
+    ) -> bool:
+        """
+        檢查陷阱是否在畫面範圍內（不需要螢幕表面，更新排程也用它判斷遠近）\n
+        \n
+        參數:\n
+        camera_y (float): 攝影機偏移（畫面中心的世界 Y 座標）\n
+        view_width (int): 畫面寬度\n
+        view_height (int): 畫面高度\n
+        margin (float): 畫面外還算在範圍內的距離\n
+        \n
+        回傳:\n
+        bool: 是否在範圍內\n
+        """
+        screen_y = self.y - camera_y + view_height // 2
 
         return (
-            -self.height < screen_y < screen.get_height() + self.height
-            and -self.width < self.x < screen.get_width() + self.width
+            -self.height - margin < screen_y < view_height + self.height + margin
+            and -self.width - margin < self.x < view_width + self.width + margin
         )
 
     def _update_base_properties(self):
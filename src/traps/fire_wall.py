@@ -3,8 +3,19 @@ import pygame
 import math
 import random
 import os
+import numpy as np
 from typing import Tuple, List
 from src.traps.base_trap import BaseTrap
+from src.assets.asset_manager import ASSET_MANAGER
+from src.assets.baked_surfaces import BAKED_SURFACES, FLASH_LEVELS, get_flash_level
+from src.effects.particle_system import PARTICLE_RNG, PARTICLE_STYLE_SHADE, ParticleEmitter
+from src.performance.frame_jobs import FRAME_JOBS, JOB_PRIORITY_LOW
+
+######################火焰牆設定######################
+FIRE_HIGH_TINT = ((255, 255, 255, 30), pygame.BLEND_RGBA_ADD)  # 高強度時圖片更亮
+FIRE_LOW_TINT = ((0, 0, 0, 50), pygame.BLEND_RGBA_MULT)  # 低強度時圖片較暗
+FLAME_PARTICLE_DECAY = 0.02  # 火焰粒子每幀減少的壽命
+FLAME_REFILL_DEADLINE = 6  # 補充火焰粒子最多可以延後幾幀（啟用工作排程時）
 
 
 ######################火焰牆陷阱類別######################
@@ -25,6 +36,23 @@ class FireWall(BaseTrap):
     - 可以阻擋路徑或作為時間挑戰\n
     """
 
+    __slots__ = (
+        "fire_intensity",
+        "intensity_cycle",
+        "base_colors",
+        "flame_emitter",
+        "max_particles",
+        "pending_respawns",
+        "flame_phase",
+        "pulsing_intensity",
+        "fire_image",
+        "fire_regions",
+        "tile_size",
+        "tiles_x",
+        "tiles_y",
+        "bake_key",
+    )
+
     def __init__(
         self,
         x: float,
@@ -58,14 +86,23 @@ class FireWall(BaseTrap):
             "high": [(255, 255, 255), (255, 0, 0), (255, 100, 0)],  # 白紅橘色
         }
 
-        # 火焰粒子系統
-        self.flame_particles = []
+        # 火焰粒子系統（數量受全域粒子預算限制）
+        self.flame_emitter = None
         self.max_particles = max(10, int(self.width * self.height / 100))
+        self.pending_respawns = 0  # 壽命用完、等著從底部重生的粒子數量
 
         # 火焰動畫狀態
         self.flame_phase = 0
         self.pulsing_intensity = 1.0
 
+        # 火焰牆圖片（由 _load_fire_image 設定，載入失敗時維持預設值改用幾何圖形）
+        self.fire_image = None
+        self.fire_regions = {}
+        self.tile_size = (32, 32)
+        self.tiles_x = 1
+        self.tiles_y = 1
+        self.bake_key = None
+
         # 初始化火焰粒子
         self._initialize_particles()
         
@@ -76,22 +113,46 @@ class FireWall(BaseTrap):
         """
         初始化火焰粒子系統\n
         \n
-        建立火焰效果所需的粒子物件\n
-        """
-        self.flame_particles = []
-
-        for _ in range(self.max_particles):
-            particle = {
-                "x": random.uniform(self.x, self.x + self.width),
-                "y": random.uniform(self.y, self.y + self.height),
-                "vx": random.uniform(-1, 1),  # 水平速度
-                "vy": random.uniform(-3, -1),  # 向上移動
-                "life": random.uniform(0.5, 1.0),  # 生命週期
-                "max_life": random.uniform(0.5, 1.0),
-                "size": random.uniform(3, 8),
-                "color_index": random.randint(0, 2),
-            }
-            self.flame_particles.append(particle)
+        建立火焰粒子發射器，一開始粒子隨機散佈在整個火焰區域\n
+        """
+        self.flame_emitter = ParticleEmitter(
+            self.base_colors[self.fire_intensity],
+            style=PARTICLE_STYLE_SHADE,
+            decay=FLAME_PARTICLE_DECAY,
+            bounds_x=(self.x, self.x + self.width),
+            bounce=-0.5,  # 反彈但減速
+            capacity=self.max_particles,
+        )
+        self._spawn_flames(self.max_particles, from_bottom=False)
+
+    def _spawn_flames(self, count: int, from_bottom: bool = True):
+        """
+        產生火焰粒子\n
+        \n
+        參數:\n
+        count (int): 粒子數量\n
+        from_bottom (bool): True 從火焰底部產生（重生），False 散佈在整個火焰區域\n
+        """
+        if count <= 0:
+            return
+        if from_bottom:
+            y = np.full(count, self.y + self.height)
+            life = max_life = PARTICLE_RNG.uniform(0.5, 1.0, count)
+        else:
+            y = PARTICLE_RNG.uniform(self.y, self.y + self.height, count)
+            life = PARTICLE_RNG.uniform(0.5, 1.0, count)  # 生命週期
+            max_life = PARTICLE_RNG.uniform(0.5, 1.0, count)
+
+        self.flame_emitter.emit(
+            PARTICLE_RNG.uniform(self.x, self.x + self.width, count),
+            y,
+            velocity_x=PARTICLE_RNG.uniform(-1, 1, count),  # 水平速度
+            velocity_y=PARTICLE_RNG.uniform(-3, -1, count),  # 向上移動
+            life=life,
+            max_life=max_life,
+            size=PARTICLE_RNG.uniform(3, 8, count),
+            color=PARTICLE_RNG.integers(0, 3, count),
+        )
 
     def _load_fire_image(self):
         """
@@ -102,7 +163,14 @@ class FireWall(BaseTrap):
         try:
             # 載入火焰牆 tile 圖片
             assets_path = "assets/images/"
-            self.fire_image = pygame.image.load(os.path.join(assets_path, "tile_0127.png")).convert_alpha()
+            fire_path = os.path.join(assets_path, "tile_0127.png")
+            self.fire_image = ASSET_MANAGER.get_region(fire_path)
+
+            # 火焰強度的明暗版本預先混色好放進圖集，繪製時不用每幀複製
+            self.fire_regions = {
+                "high": ASSET_MANAGER.get_region(fire_path, tint=FIRE_HIGH_TINT),
+                "low": ASSET_MANAGER.get_region(fire_path, tint=FIRE_LOW_TINT),
+            }
             
             # 取得原始尺寸
             original_size = self.fire_image.get_size()
@@ -115,10 +183,15 @@ class FireWall(BaseTrap):
             self.tiles_x = tiles_x
             self.tiles_y = tiles_y
             
+            # 合成圖片的快取鍵值（繪製時再加上火焰強度和閃爍等級）
+            self.bake_key = ("fire_wall", self.fire_image.key, int(self.width), int(self.height))
+
         except pygame.error as e:
             print(f"無法載入火焰牆圖片: {e}")
             # 如果載入失敗，設定為 None，改用幾何圖形
             self.fire_image = None
+            self.fire_regions = {}
+            self.bake_key = None
             self.tile_size = (32, 32)  # 預設大小
             self.tiles_x = 1
             self.tiles_y = 1
@@ -145,34 +218,56 @@ class FireWall(BaseTrap):
         if self.intensity_cycle % 180 == 0:  # 每 3 秒變化一次
             self._cycle_intensity()
 
-    def _update_particles(self):
+    def update_scaled(self, steps: int):
         """
-        更新火焰粒子系統\n
+        一次推進好幾幀的火焰牆狀態（畫面外降低更新頻率時使用）\n
         \n
-        處理每個粒子的移動、生命週期和重生\n
+        冷卻、強度週期逐幀推進（強度變化的時機不變），粒子只整批移動一次\n
+        \n
+        參數:\n
+        steps (int): 要推進的幀數\n
         """
-        colors = self.base_colors[self.fire_intensity]
+        for _ in range(steps):
+            self._update_base_properties()
+            self.intensity_cycle += 1
+            if self.intensity_cycle % 180 == 0:
+                self._cycle_intensity()
 
-        for particle in self.flame_particles:
-            # 更新粒子位置
-            particle["x"] += particle["vx"]
-            particle["y"] += particle["vy"] * self.pulsing_intensity
+        self.flame_phase = (self.flame_phase + 0.1 * steps) % (2 * math.pi)
+        self.pulsing_intensity = 0.7 + 0.3 * math.sin(self.flame_phase * 2)
+        self._update_particles(steps)
 
-            # 更新生命週期
-            particle["life"] -= 0.02
+    def _update_particles(self, steps: int = 1):
+        """
+        更新火焰粒子系統\n
+        \n
+        整批處理粒子的移動（垂直速度隨脈動強度變化）、生命週期和左右反彈，\n
+        補充粒子交給工作排程（只影響畫面，可以延後幾幀）\n
+        \n
+        參數:\n
+        steps (int): 時間步長（幀數）\n
+        """
+        self.pending_respawns += self.flame_emitter.update(self.pulsing_intensity, steps)
 
-            # 粒子死亡後重生
-            if particle["life"] <= 0:
-                particle["x"] = random.uniform(self.x, self.x + self.width)
-                particle["y"] = self.y + self.height  # 從底部重生
-                particle["vx"] = random.uniform(-1, 1)
-                particle["vy"] = random.uniform(-3, -1)
-                particle["life"] = particle["max_life"]
-                particle["color_index"] = random.randint(0, len(colors) - 1)
+        FRAME_JOBS.submit(
+            "fire_wall.refill_flames",
+            self._refill_flames,
+            key=(self, "refill_flames"),
+            priority=JOB_PRIORITY_LOW,
+            deadline=FLAME_REFILL_DEADLINE,
+        )
 
-            # 限制粒子在火焰區域內
-            if particle["x"] < self.x or particle["x"] > self.x + self.width:
-                particle["vx"] *= -0.5  # 反彈但減速
+    def _refill_flames(self):
+        """
+        補充火焰粒子\n
+        \n
+        壽命用完的粒子從底部重生；被粒子預算擋下的粒子在預算足夠時補回\n
+        """
+        missing = self.max_particles - len(self.flame_emitter)
+        respawned = min(self.pending_respawns, missing)
+        self.pending_respawns = 0
+        self._spawn_flames(respawned, from_bottom=True)
+        self._spawn_flames(missing - respawned, from_bottom=False)
 
     def _cycle_intensity(self):
         """
@@ -227,54 +322,63 @@ class FireWall(BaseTrap):
         """
         使用 tile 圖片繪製火焰牆基底\n
         \n
-        根據火焰區域大小重複繪製 tile_0127.png\n
+        繪製預先拼接好的 tile_0127.png（見 _bake_tiles）\n
+        """
+        # 每種火焰強度和閃爍等級各預先合成一張，每幀只要一次 blit
+        flash_level = get_flash_level(self.flash_timer)
+        baked = BAKED_SURFACES.get(
+            self.bake_key + (self.fire_intensity, flash_level),
+            self._bake_tiles,
+            self.fire_intensity,
+            flash_level,
+        )
+        screen.blit(baked, (screen_x, screen_y))
+
+    def _bake_tiles(self, fire_intensity: str, flash_level: int) -> pygame.Surface:
+        """
+        把 tile 重複拼接成整個火焰區域的圖片\n
+        \n
+        參數:\n
+        fire_intensity (str): 火焰強度 ('low', 'normal', 'high')\n
+        flash_level (int): 量化後的閃爍等級，0 表示沒有閃爍\n
+        \n
+        回傳:\n
+        pygame.Surface: 合成好的火焰牆基底圖片\n
         """
         tile_width, tile_height = self.tile_size
+        baked = pygame.Surface((int(self.width), int(self.height)), pygame.SRCALPHA)
         
-        # 根據火焰強度和觸發狀態調整圖片效果
-        fire_image = self.fire_image
+        # 根據火焰強度選擇圖集裡預先混色好的版本
+        fire_region = self.fire_regions.get(fire_intensity, self.fire_image)
+        source = fire_region.surface
+        source_rect = fire_region.rect
         
-        # 根據火焰強度調整圖片顏色
-        if self.fire_intensity == "high":
-            # 高強度時圖片更亮
-            brightness_overlay = pygame.Surface(self.tile_size, pygame.SRCALPHA)
-            brightness_overlay.fill((255, 255, 255, 30))
-            fire_image = self.fire_image.copy()
-            fire_image.blit(brightness_overlay, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
-        elif self.fire_intensity == "low":
-            # 低強度時圖片較暗
-            darkness_overlay = pygame.Surface(self.tile_size, pygame.SRCALPHA)
-            darkness_overlay.fill((0, 0, 0, 50))
-            fire_image = self.fire_image.copy()
-            fire_image.blit(darkness_overlay, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-        
-        if self.flash_timer > 0:
+        if flash_level > 0:
             # 觸發時增加紅色光暈
-            intensity = self.flash_timer / 20.0
+            intensity = flash_level / FLASH_LEVELS
             red_overlay = pygame.Surface(self.tile_size, pygame.SRCALPHA)
             red_overlay.fill((255, 100, 0, int(80 * intensity)))
-            if fire_image == self.fire_image:
-                fire_image = self.fire_image.copy()
-            fire_image.blit(red_overlay, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+            source = fire_region.copy()
+            source.blit(red_overlay, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+            source_rect = source.get_rect()
         
         # 重複繪製 tile 來填滿整個火焰區域
+        blit_sequence = []
         for tile_y in range(self.tiles_y):
             for tile_x in range(self.tiles_x):
-                draw_x = screen_x + tile_x * tile_width
-                draw_y = screen_y + tile_y * tile_height
+                draw_x = tile_x * tile_width
+                draw_y = tile_y * tile_height
                 
                 # 確保不超出火焰區域邊界
-                clip_width = min(tile_width, self.width - tile_x * tile_width)
-                clip_height = min(tile_height, self.height - tile_y * tile_height)
+                clip_width = int(min(tile_width, self.width - draw_x))
+                clip_height = int(min(tile_height, self.height - draw_y))
                 
                 if clip_width > 0 and clip_height > 0:
-                    # 如果需要裁切，創建裁切後的圖片
-                    if clip_width < tile_width or clip_height < tile_height:
-                        clipped_tile = pygame.Surface((clip_width, clip_height), pygame.SRCALPHA)
-                        clipped_tile.blit(fire_image, (0, 0), (0, 0, clip_width, clip_height))
-                        screen.blit(clipped_tile, (draw_x, draw_y))
-                    else:
-                        screen.blit(fire_image, (draw_x, draw_y))
+                    # 需要裁切時只取區塊的左上部分
+                    area = pygame.Rect(source_rect.x, source_rect.y, clip_width, clip_height)
+                    blit_sequence.append((source, (draw_x, draw_y), area))
+        baked.blits(blit_sequence, doreturn=False)
+        return baked
 
     def _render_with_geometry(self, screen: pygame.Surface, screen_x: int, screen_y: int):
         """
@@ -293,35 +397,14 @@ class FireWall(BaseTrap):
         """
         繪製火焰粒子\n
         \n
-        渲染所有火焰粒子，創造動態火焰效果\n
+        粒子大小和顏色強度隨生命週期和脈動變化，整批從預先畫好的粒子圖片貼上\n
         """
-        colors = self.base_colors[self.fire_intensity]
-
-        for particle in self.flame_particles:
-            if particle["life"] > 0:
-                # 計算粒子的螢幕位置
-                particle_screen_y = particle["y"] - camera_y + screen.get_height() // 2
-
-                # 根據生命週期調整透明度和大小
-                life_ratio = particle["life"] / particle["max_life"]
-                size = int(particle["size"] * life_ratio * self.pulsing_intensity)
-
-                if size > 1:
-                    # 選擇顏色
-                    color = colors[particle["color_index"]]
-
-                    # 根據生命週期調整顏色強度，確保數值在有效範圍內 (0-255)
-                    adjusted_color = tuple(
-                        max(0, min(255, int(c * life_ratio))) for c in color
-                    )
-
-                    # 繪製粒子（用圓形）
-                    pygame.draw.circle(
-                        screen,
-                        adjusted_color,
-                        (int(particle["x"]), int(particle_screen_y)),
-                        size,
-                    )
+        self.flame_emitter.render(
+            screen,
+            camera_y,
+            size_scale=self.pulsing_intensity,
+            palette=self.base_colors[self.fire_intensity],
+        )
 
     def _render_flame_body(self, screen: pygame.Surface, screen_y: float):
         """
@@ -4,6 +4,8 @@ import math
 import os
 from typing import Tuple
 from src.traps.base_trap import BaseTrap
+from src.assets.asset_manager import ASSET_MANAGER
+from src.assets.baked_surfaces import BAKED_SURFACES, FLASH_LEVELS, get_flash_level
 
 
 ######################尖刺陷阱類別######################
@@ -24,6 +26,20 @@ class Spike(BaseTrap):
     - 有輕微的擊退效果\n
     """
 
+    __slots__ = (
+        "spike_type",
+        "spike_color",
+        "spike_tip_color",
+        "base_color",
+        "spike_direction",
+        "spike_points",
+        "spike_image",
+        "tile_size",
+        "tiles_x",
+        "tiles_y",
+        "bake_key",
+    )
+
     def __init__(
         self,
         x: float,
@@ -57,6 +73,13 @@ class Spike(BaseTrap):
 
         # 計算尖刺的幾何形狀
         self.spike_points = self._calculate_spike_geometry()
+
+        # 尖刺圖片（由 _load_spike_image 設定，載入失敗時維持預設值改用幾何圖形）
+        self.spike_image = None
+        self.tile_size = (32, 32)
+        self.tiles_x = 1
+        self.tiles_y = 1
+        self.bake_key = None
         
         # 載入尖刺圖片
         self._load_spike_image()
@@ -127,7 +150,7 @@ class Spike(BaseTrap):
         try:
             # 載入尖刺 tile 圖片
             assets_path = "assets/images/"
-            self.spike_image = pygame.image.load(os.path.join(assets_path, "tile_0068.png")).convert_alpha()
+            self.spike_image = ASSET_MANAGER.get_region(os.path.join(assets_path, "tile_0068.png"))
             
             # 取得原始尺寸
             original_size = self.spike_image.get_size()
@@ -141,10 +164,14 @@ class Spike(BaseTrap):
             self.tiles_x = tiles_x
             self.tiles_y = tiles_y
             
+            # 合成圖片的快取鍵值（繪製時再加上閃爍等級）
+            self.bake_key = ("spike", self.spike_image.key, int(self.width), int(self.height))
+            
         except pygame.error as e:
             print(f"無法載入尖刺圖片: {e}")
             # 如果載入失敗，設定為 None，改用幾何圖形
             self.spike_image = None
+            self.bake_key = None
             self.tile_size = (32, 32)  # 預設大小
             self.tiles_x = 1
             self.tiles_y = 1
@@ -191,39 +218,55 @@ class Spike(BaseTrap):
         """
         使用 tile 圖片繪製尖刺\n
         \n
-        根據尖刺區域大小重複繪製 tile_0068.png\n
+        繪製預先拼接好的 tile_0068.png（見 _bake_tiles）\n
+        """
+        # 整個尖刺區域依閃爍等級預先合成，每幀只要一次 blit
+        flash_level = get_flash_level(self.flash_timer)
+        baked = BAKED_SURFACES.get(self.bake_key + (flash_level,), self._bake_tiles, flash_level)
+        screen.blit(baked, (screen_x, screen_y))
+
+    def _bake_tiles(self, flash_level: int) -> pygame.Surface:
+        """
+        把 tile 重複拼接成整個尖刺區域的圖片\n
+        \n
+        參數:\n
+        flash_level (int): 量化後的閃爍等級，0 表示沒有閃爍\n
+        \n
+        回傳:\n
+        pygame.Surface: 合成好的尖刺圖片\n
         """
         tile_width, tile_height = self.tile_size
+        baked = pygame.Surface((int(self.width), int(self.height)), pygame.SRCALPHA)
         
-        # 根據觸發狀態調整圖片顏色
-        spike_image = self.spike_image
-        if self.flash_timer > 0:
+        source = self.spike_image.surface
+        source_rect = self.spike_image.rect
+        if flash_level > 0:
             # 觸發時變紅色
-            intensity = self.flash_timer / 20.0
+            intensity = flash_level / FLASH_LEVELS
             red_overlay = pygame.Surface(self.tile_size, pygame.SRCALPHA)
             red_overlay.fill((255, 0, 0, int(100 * intensity)))
             
-            spike_image = self.spike_image.copy()
-            spike_image.blit(red_overlay, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+            source = self.spike_image.copy()
+            source.blit(red_overlay, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+            source_rect = source.get_rect()
         
         # 重複繪製 tile 來填滿整個尖刺區域
+        blit_sequence = []
         for tile_y in range(self.tiles_y):
             for tile_x in range(self.tiles_x):
-                draw_x = screen_x + tile_x * tile_width
-                draw_y = screen_y + tile_y * tile_height
+                draw_x = tile_x * tile_width
+                draw_y = tile_y * tile_height
                 
                 # 確保不超出尖刺區域邊界
-                clip_width = min(tile_width, self.width - tile_x * tile_width)
-                clip_height = min(tile_height, self.height - tile_y * tile_height)
+                clip_width = int(min(tile_width, self.width - draw_x))
+                clip_height = int(min(tile_height, self.height - draw_y))
                 
                 if clip_width > 0 and clip_height > 0:
-                    # 如果需要裁切，創建裁切後的圖片
-                    if clip_width < tile_width or clip_height < tile_height:
-                        clipped_tile = pygame.Surface((clip_width, clip_height), pygame.SRCALPHA)
-                        clipped_tile.blit(spike_image, (0, 0), (0, 0, clip_width, clip_height))
-                        screen.blit(clipped_tile, (draw_x, draw_y))
-                    else:
-                        screen.blit(spike_image, (draw_x, draw_y))
+                    # 需要裁切時只取區塊的左上部分
+                    area = pygame.Rect(source_rect.x, source_rect.y, clip_width, clip_height)
+                    blit_sequence.append((source, (draw_x, draw_y), area))
+        baked.blits(blit_sequence, doreturn=False)
+        return baked
 
     def _render_with_geometry(self, screen: pygame.Surface, screen_x: int, screen_y: int):
         """
@@ -0,0 +1,119 @@
+######################載入套件######################
+from typing import List, Optional
+
+import pygame
+
+
+######################髒矩形繪製器######################
+class DirtyRectRenderer:
+    """
+    髒矩形繪製器：靜態畫面不重畫、不整張送到螢幕\n
+    \n
+    軟體繪製的環境下，每幀清空畫面、重畫場景再 display.flip() 是最花時間的步驟，\n
+    暫停、遊戲結束、勝利這些畫面其實幾乎不會變。\n
+    遊戲中攝影機一直跟著玩家捲動，每幀本來就是整個畫面都在變，照常整張重畫、整張送出。\n
+    \n
+    每幀的流程:\n
+    1. begin_frame()：場景鍵值和上一幀相同（靜態畫面沒變）時不用重畫，\n
+       只用保存的場景蓋掉上一幀畫在上面的疊加層\n
+    2. 需要重畫時遊戲照常把場景畫到螢幕表面，畫完呼叫 end_scene() 保存靜態場景\n
+    3. 畫疊加層（效能資訊、勝利畫面的星星動畫），把畫過的範圍交給 present()：\n
+       - 場景重畫過：整張更新\n
+       - 場景沒變：只用 pygame.display.update(rects) 送出這一幀和上一幀疊加層的範圍，\n
+         沒有疊加層時什麼都不送\n
+    \n
+    屬性:\n
+    last_rects (List[pygame.Rect]): 上一幀送出的矩形\n
+    full_updates (int): 整張更新的次數\n
+    partial_updates (int): 只更新疊加層矩形的次數\n
+    skipped_frames (int): 畫面完全沒變、什麼都沒送的次數\n
+    """
+
+    def __init__(self):
+        """
+        初始化髒矩形繪製器（第一幀一定整張重畫、整張更新）\n
+        """
+        self.last_rects: List[pygame.Rect] = []
+        self.full_updates = 0
+        self.partial_updates = 0
+        self.skipped_frames = 0
+
+        self._scene_key = None
+        self._scene_snapshot: Optional[pygame.Surface] = None
+        self._scene_reused = False
+        self._overlay_rects: List[pygame.Rect] = []
+
+    def reset(self):
+        """
+        丟掉保存的場景，下一幀整張重畫、整張更新（視窗被蓋住後重新顯示等情況使用）\n
+        """
+        self._scene_key = None
+        self._scene_snapshot = None
+
+    def begin_frame(self, screen: pygame.Surface, scene_key=None) -> bool:
+        """
+        開始新的一幀\n
+        \n
+        參數:\n
+        screen (pygame.Surface): 螢幕表面\n
+        scene_key: 靜態畫面的鍵值，和上一幀相同表示場景完全沒變；None 表示場景每幀都會變\n
+        \n
+        回傳:\n
+        bool: True 表示需要重畫場景，False 表示沿用螢幕上已經畫好的場景\n
+        """
+        self._scene_reused = (
+            scene_key is not None
+            and scene_key == self._scene_key
+            and self._scene_snapshot is not None
+            and self._scene_snapshot.get_size() == screen.get_size()
+        )
+        if not self._scene_reused:
+            self._scene_key = scene_key
+            self._scene_snapshot = None
+            return True
+
+        # 用保存的場景蓋掉上一幀的疊加層
+        for rect in self._overlay_rects:
+            screen.blit(self._scene_snapshot, rect, rect)
+        return False
+
+    def end_scene(self, screen: pygame.Surface):
+        """
+        場景畫完（疊加層還沒畫）時呼叫，靜態畫面保存一份供之後幾幀擦掉疊加層\n
+        \n
+        參數:\n
+        screen (pygame.Surface): 螢幕表面\n
+        """
+        if self._scene_key is not None:
+            self._scene_snapshot = screen.copy()
+
+    def present(self, screen: pygame.Surface, overlay_rects: List[pygame.Rect]) -> List[pygame.Rect]:
+        """
+        把這一幀送到螢幕\n
+        \n
+        參數:\n
+        screen (pygame.Surface): 畫好的螢幕表面\n
+        overlay_rects (List[pygame.Rect]): 這一幀畫在場景上面的疊加層範圍\n
+        \n
+        回傳:\n
+        List[pygame.Rect]: 送出的矩形，整張更新時是整個畫面\n
+        """
+        screen_rect = screen.get_rect()
+        overlay_rects = [rect.clip(screen_rect) for rect in overlay_rects]
+
+        if not self._scene_reused:
+            pygame.display.flip()
+            self.full_updates += 1
+            self.last_rects = [screen_rect]
+        else:
+            # 上一幀的疊加層範圍也要送出，擦掉的部分才會顯示出來
+            rects = [rect for rect in self._overlay_rects + overlay_rects if rect.width and rect.height]
+            if rects:
+                pygame.display.update(rects)
+                self.partial_updates += 1
+            else:
+                self.skipped_frames += 1
+            self.last_rects = rects
+
+        self._overlay_rects = overlay_rects
+        return self.last_rects
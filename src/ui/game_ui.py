@@ -1,6 +1,12 @@
 ######################載入套件######################
 import pygame
 from typing import Tuple, Optional
+from src.performance.frame_profiler import FRAME_PROFILER
+from src.ui.text_cache import CHINESE_FONT, FONT_REGISTRY, TEXT_CACHE
+from src.assets.asset_manager import ASSET_MANAGER
+
+######################UI 字型設定######################
+UI_FONT_SIZES = {"title": 72, "large": 48, "medium": 36, "small": 24, "tiny": 18}
 
 
 ######################遊戲 UI 管理類別######################
@@ -107,67 +113,34 @@ class GameUI:
         """
         初始化支援繁體中文的字型系統\n
         \n
-        嘗試載入支援中文的字型，如果找不到就使用系統預設字型\n
+        字型由共用的字型註冊表建立，找不到中文字型時會使用系統預設字型\n
         \n
         回傳:\n
         dict: 包含不同大小字型的字典\n
         """
-        import os
-        import platform
-
-        # 常見的中文字型路徑
-        chinese_font_paths = []
-
-        # Windows 系統字型路徑
-        if platform.system() == "Windows":
-            chinese_font_paths = [
-                "C:/Windows/Fonts/msjh.ttc",  # 微軟正黑體
-                "C:/Windows/Fonts/mingliu.ttc",  # 細明體
-                "C:/Windows/Fonts/simsun.ttc",  # 宋體
-                "C:/Windows/Fonts/kaiu.ttf",  # 標楷體
-            ]
-        # macOS 系統字型路徑
-        elif platform.system() == "Darwin":
-            chinese_font_paths = [
-                "/System/Library/Fonts/PingFang.ttc",
-                "/Library/Fonts/Arial Unicode MS.ttf",
-                "/System/Library/Fonts/STHeiti Light.ttc",
-            ]
-        # Linux 系統字型路徑
-        elif platform.system() == "Linux":
-            chinese_font_paths = [
-                "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
-                "/usr/share/fonts/truetype/arphic/uming.ttc",
-                "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
-            ]
-
-        # 尋找可用的中文字型
-        font_path = None
-        for path in chinese_font_paths:
-            if os.path.exists(path):
-                font_path = path
-                print(f"找到中文字型: {path}")
-                break
-
-        # 嘗試載入字型
-        fonts = {}
-        font_sizes = {"title": 72, "large": 48, "medium": 36, "small": 24, "tiny": 18}
-
-        for name, size in font_sizes.items():
-            try:
-                if font_path:
-                    # 使用找到的中文字型
-                    fonts[name] = pygame.font.Font(font_path, size)
-                else:
-                    # 使用系統預設字型
-                    print("警告: 未找到中文字型檔案，使用系統預設字型")
-                    fonts[name] = pygame.font.Font(None, size)
-            except Exception as e:
-                print(f"載入字型失敗 {name}: {e}")
-                # 降級使用系統預設字型
-                fonts[name] = pygame.font.Font(None, size)
+        return {
+            name: FONT_REGISTRY.get_font(CHINESE_FONT, size)
+            for name, size in UI_FONT_SIZES.items()
+        }
 
-        return fonts
+    def _render_text(
+        self, font_name: str, text: str, antialias: bool, color: Tuple[int, int, int]
+    ) -> pygame.Surface:
+        """
+        透過共用文字快取渲染文字，同樣的文字不會每幀重新光柵化\n
+        \n
+        參數:\n
+        font_name (str): 字型大小名稱（title/large/medium/small/tiny）\n
+        text (str): 要顯示的文字\n
+        antialias (bool): 是否反鋸齒\n
+        color (Tuple[int, int, int]): 文字顏色\n
+        \n
+        回傳:\n
+        pygame.Surface: 文字圖片（共用，不可修改）\n
+        """
+        return TEXT_CACHE.render(
+            CHINESE_FONT, UI_FONT_SIZES[font_name], text, antialias, color
+        )
 
     def _load_character_selection_image(self):
         """
@@ -177,8 +150,7 @@ class GameUI:
         pygame.Surface: 快取的角色選擇圖片，載入失敗時回傳 None\n
         """
         try:
-            character_image = pygame.image.load("assets/images/角色1.png").convert_alpha()
-            return pygame.transform.scale(character_image, (80, 80))  # 預設預覽大小
+            return ASSET_MANAGER.get_image("assets/images/角色1.png", (80, 80))  # 預設預覽大小
         except (pygame.error, FileNotFoundError) as e:
             print(f"無法載入角色選擇圖片: {e}")
             return None
@@ -218,15 +190,15 @@ class GameUI:
         screen.blit(overlay, (0, 0))
 
         # 標題
-        title_text = self.fonts["title"].render(
-            "選擇你的角色", True, self.ui_colors["accent"]
+        title_text = self._render_text(
+            "title", "選擇你的角色", True, self.ui_colors["accent"]
         )
         title_rect = title_text.get_rect(center=(self.screen_width // 2, 60))
         screen.blit(title_text, title_rect)
 
         # 操作提示
-        hint_text = self.fonts["small"].render(
-            "← → 選擇角色，↑ ↓ 選擇難度，按 Enter 開始遊戲", True, self.ui_colors["secondary"]
+        hint_text = self._render_text(
+            "small", "← → 選擇角色，↑ ↓ 選擇難度，按 Enter 開始遊戲", True, self.ui_colors["secondary"]
         )
         hint_rect = hint_text.get_rect(
             center=(self.screen_width // 2, self.screen_height - 30)
@@ -311,8 +283,8 @@ class GameUI:
         pygame.draw.rect(screen, (0, 0, 0), preview_rect, 3)
 
         # 角色名稱
-        name_text = self.fonts["medium"].render(
-            character["name"], True, self.ui_colors["primary"]
+        name_text = self._render_text(
+            "medium", character["name"], True, self.ui_colors["primary"]
         )
         name_rect = name_text.get_rect(
             center=(x + width // 2, preview_y + preview_size + 30)
@@ -320,8 +292,8 @@ class GameUI:
         screen.blit(name_text, name_rect)
 
         # 角色描述
-        desc_text = self.fonts["small"].render(
-            character["description"], True, self.ui_colors["secondary"]
+        desc_text = self._render_text(
+            "small", character["description"], True, self.ui_colors["secondary"]
         )
         desc_rect = desc_text.get_rect(center=(x + width // 2, name_rect.bottom + 20))
         screen.blit(desc_text, desc_rect)
@@ -380,8 +352,8 @@ class GameUI:
         - 中間值：黃色\n
         """
         # 能力名稱
-        name_text = self.fonts["tiny"].render(
-            stat_name, True, self.ui_colors["primary"]
+        name_text = self._render_text(
+            "tiny", stat_name, True, self.ui_colors["primary"]
         )
         screen.blit(name_text, (x, y - 15))
 
@@ -405,7 +377,7 @@ class GameUI:
             pygame.draw.rect(screen, fill_color, fill_rect)
 
         # 數值文字，使用相同的比較顏色
-        value_text = self.fonts["tiny"].render(str(stat_value), True, fill_color)
+        value_text = self._render_text("tiny", str(stat_value), True, fill_color)
         value_rect = value_text.get_rect(right=x + width, centery=y + bar_height // 2)
         screen.blit(value_text, value_rect)
 
@@ -424,8 +396,8 @@ class GameUI:
         section_height = 200
         
         # 繪製難度選擇標題
-        difficulty_title = self.fonts["large"].render(
-            "選擇遊戲難度", True, self.ui_colors["accent"]
+        difficulty_title = self._render_text(
+            "large", "選擇遊戲難度", True, self.ui_colors["accent"]
         )
         title_rect = difficulty_title.get_rect(center=(self.screen_width // 2, section_y))
         screen.blit(difficulty_title, title_rect)
@@ -484,15 +456,15 @@ class GameUI:
         pygame.draw.rect(screen, border_color, option_rect, border_width)
 
         # 難度名稱
-        name_text = self.fonts["medium"].render(
-            difficulty_data["name"], True, difficulty_data["color"]
+        name_text = self._render_text(
+            "medium", difficulty_data["name"], True, difficulty_data["color"]
         )
         name_rect = name_text.get_rect(center=(x + width // 2, y + 25))
         screen.blit(name_text, name_rect)
 
         # 難度描述 - 使用更小的字體避免超出邊界
-        desc_text = self.fonts["tiny"].render(
-            difficulty_data["description"], True, self.ui_colors["secondary"]
+        desc_text = self._render_text(
+            "tiny", difficulty_data["description"], True, self.ui_colors["secondary"]
         )
         desc_rect = desc_text.get_rect(center=(x + width // 2, y + 55))
         screen.blit(desc_text, desc_rect)
@@ -501,8 +473,8 @@ class GameUI:
         details_start_y = y + 80
         for i, detail in enumerate(difficulty_data["details"]):
             # 使用 tiny 字體並確保文字適合框內
-            detail_text = self.fonts["tiny"].render(
-                f"• {detail}", True, self.ui_colors["primary"]
+            detail_text = self._render_text(
+                "tiny", f"• {detail}", True, self.ui_colors["primary"]
             )
             # 確保文字不超出選項卡寬度
             detail_rect = detail_text.get_rect(
@@ -525,16 +497,20 @@ class GameUI:
         level_manager: 關卡管理器物件\n
         """
         # 繪製玩家血量條和攻擊模式指示器，並取得下一個可用的Y位置
-        next_y = self._draw_player_health(screen, player)
+        with FRAME_PROFILER.span("ui.player_health"):
+            next_y = self._draw_player_health(screen, player)
 
         # 繪製關卡資訊（包含剩餘敵人數量）
-        self._draw_level_info(screen, level_manager)
+        with FRAME_PROFILER.span("ui.level_info"):
+            self._draw_level_info(screen, level_manager)
 
         # 繪製藥水庫存（在攻擊模式指示器下方）
-        self._draw_potion_inventory(screen, player, next_y)
+        with FRAME_PROFILER.span("ui.potion_inventory"):
+            self._draw_potion_inventory(screen, player, next_y)
 
         # 繪製操作提示
-        self._draw_controls_hint(screen)
+        with FRAME_PROFILER.span("ui.controls_hint"):
+            self._draw_controls_hint(screen)
 
     def _draw_player_health(self, screen: pygame.Surface, player):
         """
@@ -573,8 +549,8 @@ class GameUI:
             pygame.draw.rect(screen, health_color, fill_rect)
 
         # 血量數值文字
-        health_text = self.fonts["small"].render(
-            f"{player.health}/{player.max_health}", True, self.ui_colors["primary"]
+        health_text = self._render_text(
+            "small", f"{player.health}/{player.max_health}", True, self.ui_colors["primary"]
         )
         text_rect = health_text.get_rect(
             center=(bar_x + bar_width // 2, bar_y + bar_height // 2)
@@ -583,7 +559,7 @@ class GameUI:
 
         # 護盾條（如果有護盾值）
         shield_y = bar_y + bar_height + 5
-        if hasattr(player, "shield") and player.shield > 0:
+        if player.shield > 0:
             # 護盾條背景
             shield_bg_rect = pygame.Rect(bar_x, shield_y, bar_width, 15)
             pygame.draw.rect(screen, (30, 30, 60), shield_bg_rect)
@@ -598,32 +574,27 @@ class GameUI:
                 pygame.draw.rect(screen, (50, 150, 255), shield_fill_rect)
 
             # 護盾數值文字
-            shield_text = self.fonts["tiny"].render(
-                f"護盾: {player.shield}/{player.max_shield}", True, (200, 220, 255)
+            shield_text = self._render_text(
+                "tiny", f"護盾: {player.shield}/{player.max_shield}", True, (200, 220, 255)
             )
             screen.blit(shield_text, (bar_x + bar_width + 10, shield_y))
 
         # 角色名稱
-        name_text = self.fonts["tiny"].render(
-            player.name, True, self.ui_colors["secondary"]
+        name_text = self._render_text(
+            "tiny", player.name, True, self.ui_colors["secondary"]
         )
         screen.blit(name_text, (bar_x, bar_y - 15))
 
         # 攻擊力增強效果顯示
         attack_boost_y = (
             shield_y + 20
-            if (hasattr(player, "shield") and player.shield > 0)
+            if player.shield > 0
             else bar_y + bar_height + 10
         )
-        if (
-            hasattr(player, "attack_boost_percentage")
-            and player.attack_boost_percentage > 0
-        ):
+        if player.attack_boost_percentage > 0:
             # 顯示攻擊力增強效果
-            boost_text = self.fonts["tiny"].render(
-                f"攻擊力 +{player.attack_boost_percentage}% ({player.attack_boost_duration // 60}秒)",
-                True,
-                (255, 200, 50),
+            boost_text = self._render_text(
+                "tiny", f"攻擊力 +{player.attack_boost_percentage}% ({player.attack_boost_duration // 60}秒)", True, (255, 200, 50),
             )
             screen.blit(boost_text, (bar_x, attack_boost_y))
             attack_boost_y += 15
@@ -650,10 +621,6 @@ class GameUI:
         回傳:\n
         int: 下一個可用的 Y 座標位置\n
         """
-        # 檢查玩家是否有投射物類型屬性
-        if not hasattr(player, "projectile_type"):
-            return y
-
         # 根據投射物類型設定顯示內容和顏色
         if player.projectile_type == "fireball":
             mode_text = "🔥 火焰球模式"
@@ -669,7 +636,7 @@ class GameUI:
             bg_color = (40, 40, 40)  # 深灰色背景
 
         # 計算文字尺寸和背景框
-        mode_surface = self.fonts["tiny"].render(mode_text, True, mode_color)
+        mode_surface = self._render_text("tiny", mode_text, True, mode_color)
         text_width = mode_surface.get_width()
         text_height = mode_surface.get_height()
 
@@ -689,8 +656,8 @@ class GameUI:
         screen.blit(mode_surface, (text_x, text_y))
 
         # 繪製切換提示（在指示器右側）
-        hint_text = self.fonts["tiny"].render(
-            "(V切換)", True, self.ui_colors["secondary"]
+        hint_text = self._render_text(
+            "tiny", "(V切換)", True, self.ui_colors["secondary"]
         )
         hint_x = x + bg_width + 10
         hint_y = y + bg_height // 2 - hint_text.get_height() // 2
@@ -712,8 +679,8 @@ class GameUI:
         difficulty = level_info.get("difficulty", "easy")
 
         # 關卡編號
-        level_text = self.fonts["medium"].render(
-            f"第 {level_number} 關", True, self.ui_colors["accent"]
+        level_text = self._render_text(
+            "medium", f"第 {level_number} 關", True, self.ui_colors["accent"]
         )
         level_rect = level_text.get_rect(right=self.screen_width - 20, top=20)
         screen.blit(level_text, level_rect)
@@ -721,8 +688,8 @@ class GameUI:
         # 難度顯示 - 在關卡編號旁邊
         difficulty_name = "簡單" if difficulty == "easy" else "困難"
         difficulty_color = (50, 255, 50) if difficulty == "easy" else (255, 50, 50)
-        difficulty_text = self.fonts["small"].render(
-            f"[{difficulty_name}]", True, difficulty_color
+        difficulty_text = self._render_text(
+            "small", f"[{difficulty_name}]", True, difficulty_color
         )
         difficulty_rect = difficulty_text.get_rect(
             right=level_rect.left - 10, centery=level_rect.centery
@@ -735,8 +702,8 @@ class GameUI:
             if remaining_enemies > 0
             else self.ui_colors["success"]
         )
-        enemy_text = self.fonts["small"].render(
-            f"剩餘敵人: {remaining_enemies}", True, enemy_color
+        enemy_text = self._render_text(
+            "small", f"剩餘敵人: {remaining_enemies}", True, enemy_color
         )
         enemy_rect = enemy_text.get_rect(
             right=self.screen_width - 20, top=level_rect.bottom + 5
@@ -764,41 +731,41 @@ class GameUI:
         if level_number == 6:
             if difficulty == "easy":
                 if remaining_enemies == 0:
-                    clear_text = self.fonts["tiny"].render(
-                        "可以前往關卡頂部過關！", True, self.ui_colors["success"]
+                    clear_text = self._render_text(
+                        "tiny", "可以前往關卡頂部過關！", True, self.ui_colors["success"]
                     )
                 else:
-                    clear_text = self.fonts["tiny"].render(
-                        "擊敗Boss通關", True, self.ui_colors["info"]
+                    clear_text = self._render_text(
+                        "tiny", "擊敗Boss通關", True, self.ui_colors["info"]
                     )
             else:  # hard mode
                 if remaining_enemies == 0:
-                    clear_text = self.fonts["tiny"].render(
-                        "可以前往關卡頂部過關！", True, self.ui_colors["success"]
+                    clear_text = self._render_text(
+                        "tiny", "可以前往關卡頂部過關！", True, self.ui_colors["success"]
                     )
                 else:
-                    clear_text = self.fonts["tiny"].render(
-                        "擊敗Boss和小怪通關", True, self.ui_colors["warning"]
+                    clear_text = self._render_text(
+                        "tiny", "擊敗Boss和小怪通關", True, self.ui_colors["warning"]
                     )
         else:
             # 其他關卡使用原本的文字
             if difficulty == "easy":
                 if remaining_enemies == 0:
-                    clear_text = self.fonts["tiny"].render(
-                        "可以前往關卡頂部過關！", True, self.ui_colors["success"]
+                    clear_text = self._render_text(
+                        "tiny", "可以前往關卡頂部過關！", True, self.ui_colors["success"]
                     )
                 else:
-                    clear_text = self.fonts["tiny"].render(
-                        "前往關卡頂部即可過關", True, self.ui_colors["info"]
+                    clear_text = self._render_text(
+                        "tiny", "前往關卡頂部即可過關", True, self.ui_colors["info"]
                     )
             else:  # hard mode
                 if remaining_enemies == 0:
-                    clear_text = self.fonts["tiny"].render(
-                        "可以前往關卡頂部過關！", True, self.ui_colors["success"]
+                    clear_text = self._render_text(
+                        "tiny", "可以前往關卡頂部過關！", True, self.ui_colors["success"]
                     )
                 else:
-                    clear_text = self.fonts["tiny"].render(
-                        "需擊敗所有敵人才能過關", True, self.ui_colors["warning"]
+                    clear_text = self._render_text(
+                        "tiny", "需擊敗所有敵人才能過關", True, self.ui_colors["warning"]
                     )
 
         clear_rect = clear_text.get_rect(
@@ -838,8 +805,8 @@ class GameUI:
 
         hint_y = self.screen_height - 95  # 調整位置給更多提示留空間
         for i, hint in enumerate(hints):
-            hint_text = self.fonts["tiny"].render(
-                hint, True, self.ui_colors["secondary"]
+            hint_text = self._render_text(
+                "tiny", hint, True, self.ui_colors["secondary"]
             )
             hint_rect = hint_text.get_rect(left=20, top=hint_y + i * 15)
             screen.blit(hint_text, hint_rect)
@@ -854,9 +821,6 @@ class GameUI:
         screen (pygame.Surface): 螢幕表面\n
         player: 玩家物件\n
         """
-        if not hasattr(player, "projectile_type"):
-            return
-
         # 根據投射物類型設定顯示內容和顏色
         if player.projectile_type == "fireball":
             type_text = "火焰球"
@@ -882,13 +846,13 @@ class GameUI:
         pygame.draw.rect(screen, type_color, bg_rect, 2)
 
         # 繪製投射物類型文字
-        projectile_text = self.fonts["small"].render(type_text, True, type_color)
+        projectile_text = self._render_text("small", type_text, True, type_color)
         text_rect = projectile_text.get_rect(center=bg_rect.center)
         screen.blit(projectile_text, text_rect)
 
         # 繪製切換提示
-        hint_text = self.fonts["tiny"].render(
-            "V: 切換", True, self.ui_colors["secondary"]
+        hint_text = self._render_text(
+            "tiny", "V: 切換", True, self.ui_colors["secondary"]
         )
         hint_rect = hint_text.get_rect(centerx=bg_rect.centerx, bottom=bg_y - 5)
         screen.blit(hint_text, hint_rect)
@@ -906,9 +870,7 @@ class GameUI:
         screen.blit(overlay, (0, 0))
 
         # 暫停標題
-        title_text = self.fonts["title"].render(
-            "遊戲暫停", True, self.ui_colors["accent"]
-        )
+        title_text = self._render_text("title", "遊戲暫停", True, self.ui_colors["accent"])
         title_rect = title_text.get_rect(
             center=(self.screen_width // 2, self.screen_height // 2 - 50)
         )
@@ -918,8 +880,8 @@ class GameUI:
         options = ["空白鍵 - 繼續遊戲", "ESC - 返回選單"]
 
         for i, option in enumerate(options):
-            option_text = self.fonts["medium"].render(
-                option, True, self.ui_colors["primary"]
+            option_text = self._render_text(
+                "medium", option, True, self.ui_colors["primary"]
             )
             option_rect = option_text.get_rect(
                 center=(self.screen_width // 2, self.screen_height // 2 + 30 + i * 50)
@@ -939,17 +901,15 @@ class GameUI:
         screen.blit(overlay, (0, 0))
 
         # 遊戲結束標題
-        title_text = self.fonts["title"].render(
-            "遊戲結束", True, self.ui_colors["danger"]
-        )
+        title_text = self._render_text("title", "遊戲結束", True, self.ui_colors["danger"])
         title_rect = title_text.get_rect(
             center=(self.screen_width // 2, self.screen_height // 2 - 50)
         )
         screen.blit(title_text, title_rect)
 
         # 重試提示
-        retry_text = self.fonts["medium"].render(
-            "按 ESC 返回選單重新開始", True, self.ui_colors["primary"]
+        retry_text = self._render_text(
+            "medium", "按 ESC 返回選單重新開始", True, self.ui_colors["primary"]
         )
         retry_rect = retry_text.get_rect(
             center=(self.screen_width // 2, self.screen_height // 2 + 50)
@@ -960,7 +920,7 @@ class GameUI:
         """
         繪製勝利畫面\n
         \n
-        顯示遊戲勝利訊息和後續選項\n
+        顯示遊戲勝利訊息和後續選項（星星動畫由 draw_victory_stars() 另外畫）\n
         \n
         參數:\n
         screen (pygame.Surface): 要繪製到的螢幕表面\n
@@ -972,17 +932,15 @@ class GameUI:
         screen.blit(overlay, (0, 0))
 
         # 勝利標題
-        title_text = self.fonts["title"].render(
-            "恭喜！遊戲完成！", True, (255, 215, 0)  # 金色
-        )
+        title_text = self._render_text("title", "恭喜！遊戲完成！", True, (255, 215, 0))  # 金色
         title_rect = title_text.get_rect(
             center=(self.screen_width // 2, self.screen_height // 2 - 80)
         )
         screen.blit(title_text, title_rect)
 
         # 恭喜訊息
-        congrats_text = self.fonts["medium"].render(
-            "你成功擊敗了所有的 Boss！", True, self.ui_colors["primary"]
+        congrats_text = self._render_text(
+            "medium", "你成功擊敗了所有的 Boss！", True, self.ui_colors["primary"]
         )
         congrats_rect = congrats_text.get_rect(
             center=(self.screen_width // 2, self.screen_height // 2 - 20)
@@ -990,28 +948,52 @@ class GameUI:
         screen.blit(congrats_text, congrats_rect)
 
         # 操作提示
-        restart_text = self.fonts["small"].render(
-            "按 SPACE 關閉遊戲", True, self.ui_colors["secondary"]
+        restart_text = self._render_text(
+            "small", "按 SPACE 關閉遊戲", True, self.ui_colors["secondary"]
         )
         restart_rect = restart_text.get_rect(
             center=(self.screen_width // 2, self.screen_height // 2 + 30)
         )
         screen.blit(restart_text, restart_rect)
 
-        menu_text = self.fonts["small"].render(
-            "按 ESC 返回主選單", True, self.ui_colors["secondary"]
+        menu_text = self._render_text(
+            "small", "按 ESC 返回主選單", True, self.ui_colors["secondary"]
         )
         menu_rect = menu_text.get_rect(
             center=(self.screen_width // 2, self.screen_height // 2 + 60)
         )
         screen.blit(menu_text, menu_rect)
 
+    def draw_victory_stars(self, screen: pygame.Surface) -> pygame.Rect:
+        """
+        繪製勝利畫面的慶祝星星動畫
+
+        
+
+        勝利畫面只有星星會動，和 draw_victory_screen() 分開畫，
+
+        髒矩形模式下其他部分不用每幀重畫
+
+        
+
+        參數:
+
+        screen (pygame.Surface): 要繪製到的螢幕表面
+
+        
+
+        回傳:
+
+        pygame.Rect: 這一幀星星畫到的範圍
+
+        """
         # 繪製一些慶祝效果（簡單的星星）
         import math
         import time
 
         current_time = time.time()
 
+        drawn_rect = None
         for i in range(15):
             # 計算星星的動畫位置
             angle = (current_time * 2 + i * 0.4) % (2 * math.pi)
@@ -1021,7 +1003,9 @@ class GameUI:
             star_y = int(self.screen_height // 2 - 80 + radius * math.sin(angle))
 
             # 繪製簡單的星星（小圓點）
-            pygame.draw.circle(screen, (255, 215, 0), (star_x, star_y), 3)
+            star_rect = pygame.draw.circle(screen, (255, 215, 0), (star_x, star_y), 3)
+            drawn_rect = star_rect if drawn_rect is None else drawn_rect.union(star_rect)
+        return drawn_rect
 
     def _draw_potion_inventory(self, screen: pygame.Surface, player, start_y: int):
         """
@@ -1050,7 +1034,7 @@ class GameUI:
 
             # 顯示藥水名稱和數量
             text = f"[{potion['key']}] {potion['name']}: {count}"
-            rendered_text = self.fonts["tiny"].render(text, True, potion["color"])
+            rendered_text = self._render_text("tiny", text, True, potion["color"])
             text_rect = rendered_text.get_rect(left=start_x, y=y_pos)
             
             # 為藥水文字添加背景色，提高可讀性
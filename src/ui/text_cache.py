@@ -0,0 +1,203 @@
+######################載入套件######################
+import os
+import platform
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+######################文字快取設定######################
+TEXT_CACHE_CAPACITY = 512  # 最多保留幾張渲染好的文字圖片
+
+# 遊戲共用的字型名稱
+CHINESE_FONT = "chinese"  # 支援繁體中文的字型（找不到時退回預設字型）
+DEFAULT_FONT = "default"  # pygame 內建預設字型
+
+# 常見的中文字型路徑（依作業系統）
+CHINESE_FONT_PATHS = {
+    "Windows": [
+        "C:/Windows/Fonts/msjh.ttc",  # 微軟正黑體
+        "C:/Windows/Fonts/mingliu.ttc",  # 細明體
+        "C:/Windows/Fonts/simsun.ttc",  # 宋體
+        "C:/Windows/Fonts/kaiu.ttf",  # 標楷體
+    ],
+    "Darwin": [
+        "/System/Library/Fonts/PingFang.ttc",
+        "/Library/Fonts/Arial Unicode MS.ttf",
+        "/System/Library/Fonts/STHeiti Light.ttc",
+    ],
+    "Linux": [
+        "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
+        "/usr/share/fonts/truetype/arphic/uming.ttc",
+        "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    ],
+}
+
+
+######################字型註冊表######################
+class FontRegistry:
+    """
+    全遊戲共用的字型註冊表\n
+    \n
+    同一個字型和大小只建立一次 pygame.font.Font，\n
+    中文字型路徑也只在第一次用到時搜尋一次\n
+    \n
+    屬性:\n
+    fonts (Dict): (字型名稱, 大小) 對應的字型物件\n
+    """
+
+    def __init__(self):
+        """
+        初始化字型註冊表\n
+        """
+        self.fonts: Dict[Tuple[str, int], pygame.font.Font] = {}
+        self._font_paths: Dict[str, Optional[str]] = {DEFAULT_FONT: None}
+
+    def _find_chinese_font(self) -> Optional[str]:
+        """
+        尋找可用的中文字型檔案\n
+        \n
+        回傳:\n
+        str: 字型檔案路徑，找不到時回傳 None\n
+        """
+        for path in CHINESE_FONT_PATHS.get(platform.system(), []):
+            if os.path.exists(path):
+                print(f"找到中文字型: {path}")
+                return path
+        print("警告: 未找到中文字型檔案，使用系統預設字型")
+        return None
+
+    def get_font(self, font_name: str, size: int) -> pygame.font.Font:
+        """
+        取得字型物件，第一次用到時才建立\n
+        \n
+        參數:\n
+        font_name (str): 字型名稱（CHINESE_FONT 或 DEFAULT_FONT）\n
+        size (int): 字型大小\n
+        \n
+        回傳:\n
+        pygame.font.Font: 字型物件\n
+        """
+        key = (font_name, size)
+        font = self.fonts.get(key)
+        if font is not None:
+            return font
+
+        if not pygame.font.get_init():
+            pygame.font.init()
+        if font_name not in self._font_paths:
+            self._font_paths[font_name] = (
+                self._find_chinese_font() if font_name == CHINESE_FONT else None
+            )
+
+        try:
+            font = pygame.font.Font(self._font_paths[font_name], size)
+        except Exception as e:
+            print(f"載入字型失敗 {font_name} {size}: {e}")
+            # 降級使用系統預設字型
+            font = pygame.font.Font(None, size)
+        self.fonts[key] = font
+        return font
+
+
+######################文字圖片快取######################
+class TextCache:
+    """
+    渲染好的文字圖片 LRU 快取\n
+    \n
+    Font.render 每次都要重新光柵化字形（中文字尤其慢），\n
+    HUD 上的文字大多每幀都一樣，所以用 (字型, 大小, 文字, 顏色, 反鋸齒) 當鍵把結果存起來，\n
+    超過容量時丟掉最久沒用到的\n
+    \n
+    注意: 回傳的圖片是共用的，呼叫端不能直接修改（要改透明度請先 copy()）\n
+    \n
+    屬性:\n
+    registry (FontRegistry): 字型註冊表\n
+    capacity (int): 最多保留的圖片數量\n
+    hits (int): 快取命中次數\n
+    misses (int): 快取未命中（實際渲染）次數\n
+    """
+
+    def __init__(self, registry: FontRegistry, capacity: int = TEXT_CACHE_CAPACITY):
+        """
+        初始化文字快取\n
+        \n
+        參數:\n
+        registry (FontRegistry): 字型註冊表\n
+        capacity (int): 最多保留的圖片數量\n
+        """
+        self.registry = registry
+        self.capacity = capacity
+        self._surfaces: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(
+        self,
+        font_name: str,
+        size: int,
+        text: str,
+        antialias: bool,
+        color: Tuple[int, int, int],
+    ) -> pygame.Surface:
+        """
+        取得渲染好的文字圖片，快取裡沒有才真的呼叫 Font.render\n
+        \n
+        參數:\n
+        font_name (str): 字型名稱\n
+        size (int): 字型大小\n
+        text (str): 要顯示的文字\n
+        antialias (bool): 是否反鋸齒\n
+        color (Tuple[int, int, int]): 文字顏色\n
+        \n
+        回傳:\n
+        pygame.Surface: 文字圖片（共用，不可修改）\n
+        """
+        key = (font_name, size, text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.registry.get_font(font_name, size).render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.capacity:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def get_hit_rate(self) -> float:
+        """
+        計算快取命中率\n
+        \n
+        回傳:\n
+        float: 命中率（0~1）\n
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        取得快取統計資料\n
+        \n
+        回傳:\n
+        Dict[str, float]: 命中、未命中、命中率和目前圖片數量\n
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.get_hit_rate(),
+            "entries": len(self._surfaces),
+        }
+
+    def clear(self):
+        """
+        清空快取（計數器保留）\n
+        """
+        self._surfaces.clear()
+
+
+# 全遊戲共用的字型註冊表和文字快取，各模組直接 import 使用
+FONT_REGISTRY = FontRegistry()
+TEXT_CACHE = TextCache(FONT_REGISTRY)
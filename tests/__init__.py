@@ -0,0 +1 @@
+# 此檔案讓 Python 認得這是一個套件
@@ -0,0 +1,48 @@
+"""
+資源管理器測試\n
+常駐範圍重複取得不會一直累積參考，關卡範圍釋放後不會動到常駐圖片\n
+"""
+
+import os
+
+import pygame
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from src.assets.asset_manager import AssetManager
+
+CHARACTER_PATH = "assets/images/角色1.png"
+BACKGROUND_PATH = "assets/images/場景1.png"
+
+
+@pytest.fixture
+def manager():
+    pygame.display.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+    return AssetManager()
+
+
+def test_global_references_do_not_grow_per_call(manager):
+    for _ in range(100):
+        manager.get_image(CHARACTER_PATH, (80, 80))
+    key = (CHARACTER_PATH, (80, 80), False, True)
+    assert manager.ref_counts[key] == 1
+    assert not manager._scope_keys
+
+
+def test_release_scope_keeps_global_images(manager):
+    shared = manager.get_image(CHARACTER_PATH, (80, 80))
+    with manager.scope("level_1"):
+        for _ in range(3):
+            assert manager.get_image(CHARACTER_PATH, (80, 80)) is shared
+        manager.get_image(BACKGROUND_PATH, alpha=False)
+    assert manager.ref_counts[(CHARACTER_PATH, (80, 80), False, True)] == 4
+
+    manager.release_scope("level_1")
+    assert manager.ref_counts[(CHARACTER_PATH, (80, 80), False, True)] == 1
+    assert (CHARACTER_PATH, (80, 80), False, True) in manager.images
+    assert (BACKGROUND_PATH, None, False, False) not in manager.images
+    assert manager.get_image(CHARACTER_PATH, (80, 80)) is shared
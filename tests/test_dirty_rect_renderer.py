@@ -0,0 +1,75 @@
+"""
+髒矩形模式測試\n
+靜態畫面沒變時不重畫、不整張送出，畫面內容仍然和每幀整張重畫相同\n
+"""
+
+import os
+
+import pygame
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from main import MarioClimbingGame
+
+
+def _start_paused_game(dirty_rects):
+    game = MarioClimbingGame(headless=True, dirty_rects=dirty_rects)
+    game.start_game_with_character(0, "easy")
+    game.update()
+    game.game_state = "paused"
+    return game
+
+
+def test_static_screen_is_drawn_and_flipped_once(monkeypatch):
+    game = _start_paused_game(dirty_rects=True)
+    scene_draws = []
+    original_render_scene = game._render_scene
+    monkeypatch.setattr(game, "_render_scene", lambda: scene_draws.append(1) or original_render_scene())
+
+    for _ in range(5):
+        game.render()
+    renderer = game.dirty_renderer
+    assert len(scene_draws) == 1
+    assert renderer.full_updates == 1
+    assert renderer.skipped_frames == 4
+
+    game.game_state = "game_over"
+    game.render()
+    game.render()
+    assert len(scene_draws) == 2
+    assert renderer.full_updates == 2
+
+
+def test_overlay_only_sends_its_rects():
+    game = _start_paused_game(dirty_rects=True)
+    game.render()
+    game.performance_monitor.show_performance = True
+    game.performance_monitor.tick(0)
+    game.performance_monitor.tick(0)
+
+    renderer = game.dirty_renderer
+    game.render()
+    assert renderer.partial_updates == 1
+    screen_area = game.screen.get_width() * game.screen.get_height()
+    sent_area = sum(rect.width * rect.height for rect in renderer.last_rects)
+    assert 0 < sent_area < screen_area / 2
+
+    # 關掉效能資訊後，上一幀的範圍要被擦掉並送出，畫面回到原本的場景
+    game.performance_monitor.show_performance = False
+    game.render()
+    assert renderer.partial_updates == 2
+    reference = _start_paused_game(dirty_rects=False)
+    reference.render()
+    assert pygame.image.tostring(game.screen, "RGB") == pygame.image.tostring(reference.screen, "RGB")
+
+
+def test_victory_stars_update_only_their_area():
+    game = _start_paused_game(dirty_rects=True)
+    game.game_state = "victory"
+    game.render()
+    game.render()
+    renderer = game.dirty_renderer
+    assert renderer.full_updates == 1
+    assert renderer.partial_updates == 1
+    assert all(rect.width <= 200 and rect.height <= 200 for rect in renderer.last_rects)
@@ -0,0 +1,55 @@
+"""
+遊戲環境測試\n
+檢查動作編號的範圍，以及踩壞的平台不再出現在觀測值裡\n
+"""
+
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from src.simulation.environment import (
+    ACTION_COUNT,
+    NEARBY_PLATFORMS,
+    PLATFORM_FEATURES,
+    PLAYER_FEATURES,
+    GameEnvironment,
+)
+
+
+@pytest.fixture
+def environment():
+    environment = GameEnvironment(1, seed=3)
+    yield environment
+    environment.close()
+
+
+def test_out_of_range_action_raises(environment):
+    for action in (-1, ACTION_COUNT, ACTION_COUNT + 5):
+        with pytest.raises(ValueError):
+            environment.advance(action)
+    assert environment.episode_steps == 0
+    environment.advance(ACTION_COUNT - 1)
+    assert environment.episode_steps == 1
+
+
+def _platform_features(environment):
+    start = PLAYER_FEATURES
+    return environment.get_observation()[start : start + NEARBY_PLATFORMS * PLATFORM_FEATURES]
+
+
+def test_inactive_platforms_leave_observation(environment):
+    before = _platform_features(environment)
+    assert before.any()
+
+    # 平台踩壞之後觀測值裡不再有它們，修好之後又回來
+    platforms = environment.game.level_manager.get_current_level().platforms
+    for platform in platforms:
+        platform.is_active = False
+    assert not _platform_features(environment).any()
+
+    for platform in platforms:
+        platform.repair()
+    assert (_platform_features(environment) == before).all()
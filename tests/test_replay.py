@@ -0,0 +1,89 @@
+"""
+重播測試\n
+錄製和重播的繪製次數不同時，遊戲邏輯的 random 狀態仍然要和關鍵幀一致\n
+"""
+
+import os
+import random
+
+import pygame
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from main import MarioClimbingGame
+from src.enemies.boss import Boss
+from src.replay.replay_recorder import RecordedKeyState, ReplayPlayer, KEY_BITS
+
+RECORD_FRAMES = 240
+KEYFRAME_INTERVAL = 120
+RECORD_SEED = 7
+RENDERS_PER_STEP = 2  # 錄製時每個模擬步繪製兩次（模擬高更新率螢幕）
+
+
+def _scripted_keys():
+    """
+    固定的按鍵輸入：往右走、定期跳躍和攻擊\n
+    """
+    frame = [0]
+
+    def read_keys():
+        mask = KEY_BITS[pygame.K_d]
+        if frame[0] % 40 < 5:
+            mask |= KEY_BITS[pygame.K_w]
+        if frame[0] % 30 == 0:
+            mask |= KEY_BITS[pygame.K_SPACE]
+        frame[0] += 1
+        return RecordedKeyState(mask)
+
+    return read_keys
+
+
+def _record(path):
+    """
+    錄製一段每個模擬步繪製多次的遊戲，回傳結束時的 random 狀態\n
+    """
+    game = MarioClimbingGame(headless=True)
+    game.input_override = _scripted_keys()
+    game.start_game_with_character(0, "easy")
+    game._jump_to_level(6)
+
+    # 讓所有敵人一直燃燒、Boss 開始衝刺，繪製時一定會畫到帶有隨機偏移的燃燒粒子和雷電
+    for enemy in game.level_manager.get_current_level().enemies:
+        enemy.is_burning = True
+        enemy.burn_timer = RECORD_FRAMES * 2
+        if isinstance(enemy, Boss):
+            enemy.visual_effects["charge_attack"]["active"] = True
+            enemy.visual_effects["charge_attack"]["timer"] = 45
+
+    game.start_recording(path, RECORD_SEED)
+    game.replay_recorder.keyframe_interval = KEYFRAME_INTERVAL
+    for _ in range(RECORD_FRAMES):
+        game.handle_events()
+        game.update()
+        for _ in range(RENDERS_PER_STEP):
+            game.render(0.5)
+    game.replay_recorder.save()
+    return random.getstate()
+
+
+def test_replay_rng_does_not_depend_on_render_cadence(tmp_path):
+    path = str(tmp_path / "cadence.rpl")
+    recorded_state = _record(path)
+
+    # 重播時完全不繪製
+    replay_game = MarioClimbingGame(headless=True, render_enabled=False)
+    replay_game.start_replay(path)
+    while replay_game.running:
+        replay_game.step()
+    replayed_state = random.getstate()
+
+    # 最後一個關鍵幀存下的 random 狀態
+    keyframe_game = MarioClimbingGame(headless=True, render_enabled=False)
+    player = ReplayPlayer(path)
+    assert player.keyframe_index[-1][0] == RECORD_FRAMES
+    player.seek(keyframe_game, RECORD_FRAMES)
+    keyframe_state = random.getstate()
+
+    assert keyframe_state == recorded_state
+    assert replayed_state == keyframe_state
@@ -0,0 +1,189 @@
+"""
+空間雜湊測試\n
+檢查射線剛好沿著格線走訪時不會漏掉物件，以及更新、移除、同步後的查詢順序\n
+"""
+
+import random
+
+from src.levels.spatial_hash import SPATIAL_CELL_SIZE, SPATIAL_MARGIN, SpatialHash
+
+SIZE = SPATIAL_CELL_SIZE
+
+
+class _Box:
+    """
+    測試用的簡單物件，只提供 x, y, width, height\n
+    """
+
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def __repr__(self):
+        return f"_Box({self.x}, {self.y}, {self.width}, {self.height})"
+
+
+def _segment_hits(box, start_x, start_y, end_x, end_y):
+    """
+    用逐一檢查的方式判斷線段有沒有碰到物件放寬後的範圍\n
+    """
+    low = (box.x - SPATIAL_MARGIN, box.y - SPATIAL_MARGIN)
+    high = (box.x + box.width + SPATIAL_MARGIN, box.y + box.height + SPATIAL_MARGIN)
+    enter, leave = 0.0, 1.0
+    for start, end, axis_low, axis_high in zip((start_x, start_y), (end_x, end_y), low, high):
+        delta = end - start
+        if delta == 0:
+            if not axis_low <= start <= axis_high:
+                return False
+            continue
+        times = sorted(((axis_low - start) / delta, (axis_high - start) / delta))
+        enter = max(enter, times[0])
+        leave = min(leave, times[1])
+    return enter <= leave
+
+
+def _grid_boxes():
+    """
+    產生剛好貼在格線兩側的物件（放寬之後邊界落在格線上）\n
+    """
+    boxes = []
+    for cell in range(-1, 5):
+        line = cell * SIZE
+        for column in range(-1, 5):
+            offset = column * SIZE + 40
+            boxes.append(_Box(line - 20 - SPATIAL_MARGIN, offset, 20, 20))
+            boxes.append(_Box(line + SPATIAL_MARGIN, offset, 20, 20))
+            boxes.append(_Box(offset, line - 20 - SPATIAL_MARGIN, 20, 20))
+            boxes.append(_Box(offset, line + SPATIAL_MARGIN, 20, 20))
+            boxes.append(_Box(line - 20 - SPATIAL_MARGIN, column * SIZE - 20 - SPATIAL_MARGIN, 20, 20))
+    return boxes
+
+
+######################射線走訪######################
+
+
+def test_ray_along_cell_lines_matches_brute_force():
+    boxes = _grid_boxes()
+    index = SpatialHash()
+    for box in boxes:
+        index.insert(box)
+
+    rays = []
+    for cell in range(0, 4):
+        line = cell * SIZE
+        rays.append((0, line, 4 * SIZE, line))
+        rays.append((4 * SIZE, line, 0, line))
+        rays.append((line, 0, line, 4 * SIZE))
+        rays.append((line, 4 * SIZE, line, 0))
+    rays.append((0, 0, 4 * SIZE, 4 * SIZE))
+    rays.append((4 * SIZE, 4 * SIZE, 0, 0))
+    rays.append((0, 4 * SIZE, 4 * SIZE, 0))
+    rays.append((SIZE, SIZE, SIZE, SIZE))
+    rays.append((SIZE, 0, 3 * SIZE, 0))
+
+    for ray in rays:
+        expected = {id(box) for box in boxes if _segment_hits(box, *ray)}
+        found = {id(box) for box in index.query_ray(*ray)}
+        assert found == expected, ray
+        assert expected
+
+
+def test_random_rays_match_brute_force():
+    rng = random.Random(4321)
+    boxes = [
+        _Box(rng.randrange(-200, 800), rng.randrange(-200, 800), rng.randrange(1, 200), rng.randrange(1, 200))
+        for _ in range(80)
+    ]
+    index = SpatialHash()
+    for box in boxes:
+        index.insert(box)
+
+    for _ in range(300):
+        coords = [rng.choice([rng.randrange(-4, 8) * SIZE, rng.uniform(-300, 900)]) for _ in range(4)]
+        expected = {id(box) for box in boxes if _segment_hits(box, *coords)}
+        found = {id(box) for box in index.query_ray(*coords)}
+        assert found == expected, coords
+
+
+def test_ray_results_sorted_by_entry_then_order():
+    far = _Box(300, 0, 20, 20)
+    near = _Box(100, 0, 20, 20)
+    same_a = _Box(200, 0, 20, 20)
+    same_b = _Box(200, 5, 20, 20)
+    index = SpatialHash()
+    for box in (far, same_b, near, same_a):
+        index.insert(box)
+    assert index.query_ray(0, 10, 400, 10) == [near, same_b, same_a, far]
+    assert index.query_ray(400, 10, 0, 10) == [far, same_b, same_a, near]
+
+
+######################更新、移除、同步######################
+
+
+def test_query_keeps_registration_order_after_update():
+    first = _Box(10, 10, 20, 20)
+    second = _Box(40, 10, 20, 20)
+    third = _Box(70, 10, 20, 20)
+    index = SpatialHash()
+    for box in (first, second, third):
+        index.insert(box)
+
+    first.x = 3 * SIZE + 10
+    index.update(first)
+    assert index.query_rect((0, 0, 4 * SIZE, SIZE)) == [first, second, third]
+    assert index.query_rect((0, 0, SIZE, SIZE)) == [second, third]
+    assert list(index) == [first, second, third]
+
+
+def test_update_inserts_unknown_object_at_end():
+    first = _Box(10, 10, 20, 20)
+    later = _Box(20, 10, 20, 20)
+    index = SpatialHash()
+    index.insert(first)
+    index.update(later)
+    assert later in index
+    assert index.query_point(25, 15) == [first, later]
+
+
+def test_remove_drops_object_and_empty_cells():
+    box = _Box(SIZE - 10, SIZE - 10, 20, 20)
+    other = _Box(10, 10, 20, 20)
+    index = SpatialHash()
+    index.insert(box)
+    index.insert(other)
+
+    index.remove(box)
+    index.remove(box)
+    assert box not in index
+    assert len(index) == 1
+    assert index.query_rect((0, 0, 2 * SIZE, 2 * SIZE)) == [other]
+    assert all(cell for cell in index.cells.values())
+    assert set(index.cells) == {(0, 0)}
+
+
+def test_sync_removes_missing_and_renumbers_order():
+    first = _Box(10, 10, 20, 20)
+    second = _Box(20, 10, 20, 20)
+    third = _Box(30, 10, 20, 20)
+    index = SpatialHash()
+    for box in (first, second, third):
+        index.insert(box)
+
+    third.y = 2 * SIZE
+    index.sync([third, first])
+    assert second not in index
+    assert list(index) == [third, first]
+    assert index.query_rect((0, 0, SIZE, 3 * SIZE)) == [third, first]
+    assert index.query_rect((0, 0, SIZE, SIZE // 2)) == [first]
+    assert [entry[0] for entry in index.get_entries()] == [third, first]
+
+
+def test_clear_empties_index():
+    index = SpatialHash()
+    index.insert(_Box(10, 10, 20, 20))
+    index.clear()
+    assert len(index) == 0
+    assert not index.cells
+    assert index.query_rect((0, 0, SIZE, SIZE)) == []
@@ -0,0 +1,129 @@
+"""
+掃掠碰撞測試\n
+檢查高速穿透、容忍深度的邊界，以及向量化版本和單一版本的結果一致\n
+"""
+
+import random
+
+import numpy as np
+import pygame
+
+from src.levels.spatial_hash import LevelSpatialIndex
+from src.levels.swept_collision import sweep_rect, sweep_rects, sweep_solids
+
+
+class _Platform:
+    """
+    測試用的簡單平台，只提供空間索引需要的屬性\n
+    """
+
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.rect = pygame.Rect(x, y, width, height)
+
+
+######################高速穿透######################
+
+
+def test_fast_fall_hits_thin_platform():
+    platform = pygame.Rect(0, 200, 100, 2)
+    hit = sweep_rect(10, 0, 10, 10, 0, 5000, platform)
+    assert hit is not None
+    time, normal_x, normal_y = hit
+    assert time == (200 - 10) / 5000
+    assert (normal_x, normal_y) == (0, -1)
+
+
+def test_fast_horizontal_move_hits_thin_wall():
+    wall = pygame.Rect(300, 0, 1, 100)
+    hit = sweep_rect(0, 10, 10, 10, 4000, 0, wall)
+    assert hit is not None
+    time, normal_x, normal_y = hit
+    assert time == (300 - 10) / 4000
+    assert (normal_x, normal_y) == (-1, 0)
+
+
+def test_fast_fall_picks_nearest_platform():
+    near = _Platform(0, 200, 100, 2)
+    far = _Platform(0, 400, 100, 2)
+    index = LevelSpatialIndex([far, near], [], [])
+    hit = sweep_solids(index, 10, 0, 10, 10, 0, 5000)
+    assert hit is not None
+    platform, rect, time, normal_x, normal_y = hit
+    assert platform is near
+    assert rect == near.rect
+    assert (normal_x, normal_y) == (0, -1)
+
+
+def test_move_passing_beside_platform_misses():
+    platform = pygame.Rect(0, 200, 100, 2)
+    assert sweep_rect(100, 0, 10, 10, 0, 5000, platform) is None
+
+
+######################邊界和容忍深度######################
+
+
+def test_ending_exactly_on_edge_is_not_a_hit():
+    platform = pygame.Rect(0, 200, 100, 20)
+    assert sweep_rect(10, 0, 10, 10, 0, 190, platform) is None
+
+
+def test_resting_on_edge_without_movement_is_not_a_hit():
+    platform = pygame.Rect(0, 200, 100, 20)
+    assert sweep_rect(10, 190, 10, 10, 0, 0, platform) is None
+
+
+def test_overlap_equal_to_tolerance_hits_at_zero():
+    platform = pygame.Rect(0, 200, 100, 20)
+    hit = sweep_rect(10, 193, 10, 10, 0, 5, platform, tolerance=3)
+    assert hit == (0.0, 0, -1)
+
+
+def test_overlap_deeper_than_tolerance_is_ignored():
+    platform = pygame.Rect(0, 200, 100, 20)
+    assert sweep_rect(10, 193, 10, 10, 0, 5, platform, tolerance=2.9) is None
+    assert sweep_rect(10, 193, 10, 10, 0, 5, platform) is None
+
+
+def test_corner_entry_counts_as_vertical():
+    platform = pygame.Rect(100, 100, 50, 50)
+    hit = sweep_rect(80, 80, 10, 10, 20, 20, platform)
+    assert hit is not None
+    time, normal_x, normal_y = hit
+    assert time == 0.5
+    assert (normal_x, normal_y) == (0, -1)
+
+
+######################向量化版本######################
+
+
+def test_sweep_rects_matches_sweep_rect():
+    rng = random.Random(1234)
+    rects = [
+        pygame.Rect(rng.randrange(0, 400), rng.randrange(0, 400), rng.randrange(1, 80), rng.randrange(1, 80))
+        for _ in range(40)
+    ]
+    rect_left = np.array([rect.left for rect in rects], dtype=np.float64)
+    rect_top = np.array([rect.top for rect in rects], dtype=np.float64)
+    rect_right = np.array([rect.right for rect in rects], dtype=np.float64)
+    rect_bottom = np.array([rect.bottom for rect in rects], dtype=np.float64)
+
+    for _ in range(200):
+        left = rng.randrange(0, 400)
+        top = rng.randrange(0, 400)
+        dx = rng.choice([0, rng.randrange(-300, 300)])
+        dy = rng.choice([0, rng.randrange(-300, 300)])
+        tolerance = rng.choice([0.0, 3.0, 5.0])
+        times, normal_x, normal_y = sweep_rects(
+            left, top, 10, 10, dx, dy, rect_left, rect_top, rect_right, rect_bottom, tolerance
+        )
+        for index, rect in enumerate(rects):
+            hit = sweep_rect(left, top, 10, 10, dx, dy, rect, tolerance)
+            if hit is None:
+                assert np.isinf(times[index])
+            else:
+                assert times[index] == hit[0]
+                assert (normal_x[index], normal_y[index]) == (hit[1], hit[2])
@@ -0,0 +1,74 @@
+"""
+更新細節層級排程測試\n
+錯開更新的幀由固定編號決定，清單中有物件被移除時其他物件輪到的幀不變\n
+"""
+
+from src.levels.update_lod import LOD_FAR_INTERVAL, LOD_REDUCED_INTERVAL, UpdateLodScheduler
+
+CENTER_Y = 0.0
+
+
+class _Entity:
+    """
+    測試用的畫面外物件，只提供排程需要的屬性\n
+    """
+
+    allows_update_lod = True
+
+    def __init__(self, y):
+        self.y = y
+        self.lod_frame = None
+        self.lod_slot = None
+
+    def is_in_view(self, center_y, view_width, view_height, margin):
+        return False
+
+
+def _updated_frames(scheduler, entities, frames, remove_at=None, removed=None):
+    """
+    推進好幾幀，記錄每個物件在哪些幀更新（remove_at 那一幀開始把 removed 移出清單）\n
+    """
+    updates = {id(entity): [] for entity in entities}
+    entities = list(entities)
+    for frame in range(frames):
+        if frame == remove_at:
+            entities.remove(removed)
+        scheduler.begin_frame()
+        for entity in entities:
+            if scheduler.schedule(entity, CENTER_Y):
+                updates[id(entity)].append(scheduler.frame)
+    return updates
+
+
+def test_slots_are_assigned_once_in_order():
+    scheduler = UpdateLodScheduler()
+    entities = [_Entity(1000) for _ in range(3)]
+    for entity in entities:
+        scheduler.assign_slot(entity)
+    assert [entity.lod_slot for entity in entities] == [0, 1, 2]
+
+    scheduler.assign_slot(entities[0])
+    later = _Entity(1000)
+    scheduler.schedule(later, CENTER_Y)
+    assert entities[0].lod_slot == 0
+    assert later.lod_slot == 3
+
+
+def test_removal_keeps_other_entities_stagger():
+    for distance, interval in ((1000, LOD_REDUCED_INTERVAL), (5000, LOD_FAR_INTERVAL)):
+        entities = [_Entity(distance) for _ in range(6)]
+        reference = _updated_frames(UpdateLodScheduler(), entities, 24)
+
+        entities = [_Entity(distance) for _ in range(6)]
+        removed = entities[1]
+        updates = _updated_frames(UpdateLodScheduler(), entities, 24, remove_at=10, removed=removed)
+
+        for index, entity in enumerate(entities):
+            if entity is removed:
+                continue
+            expected = list(reference.values())[index]
+            assert updates[id(entity)] == expected
+            assert all(
+                later - earlier == interval
+                for earlier, later in zip(expected, expected[1:])
+            )
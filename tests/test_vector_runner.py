@@ -0,0 +1,94 @@
+"""
+向量化模擬測試\n
+同一個工作行程裡的好幾個世界互不影響，每個世界的結果都和單獨執行時相同\n
+"""
+
+import os
+
+import numpy as np
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from src.assets.asset_manager import ASSET_MANAGER
+from src.simulation.environment import ACTION_COUNT, GameEnvironment
+from src.simulation.vector_runner import VectorRunner
+
+LEVELS = (3, 6)  # 第三關的火焰牆、第六關的 Boss 都會用到 random
+SEED = 11
+STEPS = 600
+MAX_EPISODE_STEPS = 300  # 測試期間每個世界至少自動重來一次
+
+
+def _actions():
+    """
+    所有世界共用的固定動作序列（每一步每個世界一個動作）\n
+    """
+    return np.random.default_rng(SEED).integers(0, ACTION_COUNT, (STEPS, len(LEVELS)))
+
+
+def _run_single(env_index, actions):
+    """
+    單獨執行一個世界（和工作行程相同的自動重來），回傳每一步的觀測值、回饋值、結束旗標\n
+    """
+    environment = GameEnvironment(
+        LEVELS[env_index], max_episode_steps=MAX_EPISODE_STEPS, seed=SEED + env_index
+    )
+    observations, rewards, dones = [], [], []
+    try:
+        for action in actions[:, env_index]:
+            reward, done = environment.advance(int(action))
+            if done:
+                environment.reset()
+            observations.append(environment.get_observation())
+            rewards.append(reward)
+            dones.append(done)
+    finally:
+        environment.close()
+    return np.array(observations), np.array(rewards, dtype=np.float32), np.array(dones)
+
+
+def test_envs_sharing_a_worker_match_single_env_runs():
+    actions = _actions()
+    observations, rewards, dones = [], [], []
+    with VectorRunner(
+        len(LEVELS),
+        num_workers=1,
+        level_number=LEVELS,
+        max_episode_steps=MAX_EPISODE_STEPS,
+        seed=SEED,
+    ) as runner:
+        for step_actions in actions:
+            step_observations, step_rewards, step_dones = runner.step(step_actions)
+            observations.append(step_observations.copy())
+            rewards.append(step_rewards.copy())
+            dones.append(step_dones.copy())
+    observations = np.array(observations)
+    rewards = np.array(rewards)
+    dones = np.array(dones)
+
+    for env_index in range(len(LEVELS)):
+        single_observations, single_rewards, single_dones = _run_single(env_index, actions)
+        assert single_dones.any()
+        np.testing.assert_array_equal(observations[:, env_index], single_observations)
+        np.testing.assert_array_equal(rewards[:, env_index], single_rewards)
+        np.testing.assert_array_equal(dones[:, env_index], single_dones)
+
+
+def test_interleaved_envs_keep_their_own_level_assets():
+    first = GameEnvironment(2, max_episode_steps=MAX_EPISODE_STEPS, seed=SEED)
+    second = GameEnvironment(2, max_episode_steps=MAX_EPISODE_STEPS, seed=SEED + 1)
+    try:
+        first_scope = first.game.level_manager.get_current_level().asset_scope
+        second_scope = second.game.level_manager.get_current_level().asset_scope
+        assert first_scope != second_scope
+
+        # 第二個世界換關卡會卸載它自己的第二關，第一個世界的圖片參考不受影響
+        first_refs = list(ASSET_MANAGER._scope_keys[first_scope])
+        second.reset(3)
+        assert second_scope not in ASSET_MANAGER._scope_keys
+        assert ASSET_MANAGER._scope_keys[first_scope] == first_refs
+        assert all(ASSET_MANAGER.ref_counts.get(key, 0) > 0 for key in first_refs)
+    finally:
+        first.close()
+        second.close()